@@ -11,7 +11,8 @@ import os
 from dotenv import load_dotenv
 from app.api.endpoints.auth import get_current_user
 from app.services.subscription_permissions import require_chart_quota
-from app.services.ephemeris import calcular_carta_completa
+from app.services.chart_cache import calcular_carta_cacheada_async
+from app.services.astro_executor import PoolAstroSaturado
 import re
 
 load_dotenv()
@@ -217,7 +218,7 @@ async def generate_chart(chart_data: ChartGenerate):
 
         # Calcular carta natal completa usando Swiss Ephemeris
         print(f"[GENERATE_CHART] Calculando carta natal...", file=sys.stderr)
-        carta_completa = calcular_carta_completa(
+        carta_completa = await calcular_carta_cacheada_async(
             fecha=chart_data.birth_date,
             hora=chart_data.birth_time,
             latitud=latitude,
@@ -299,6 +300,12 @@ async def generate_chart(chart_data: ChartGenerate):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Coordenadas inválidas: {str(e)}"
         )
+    except (PoolAstroSaturado, TimeoutError) as e:
+        print(f"[GENERATE_CHART] Pool de cálculo no disponible: {type(e).__name__}: {e}", file=sys.stderr)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servicio de cálculo saturado, inténtalo de nuevo en unos segundos"
+        )
     except Exception as e:
         print(f"[GENERATE_CHART] ERROR Exception: {type(e).__name__}: {e}", file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
@@ -18,7 +18,7 @@ from app.models.demo_chat import (
 )
 from app.services.demo_ai_service import demo_ai_service
 from app.api.endpoints.auth import get_current_user, get_optional_user, require_admin
-from app.services.ephemeris import calcular_carta_completa
+from app.services.chart_cache import calcular_carta_cacheada_async
 from app.services.subscription_permissions import get_user_subscription_tier
 from app.models.subscription import SubscriptionTier
 
@@ -236,7 +236,7 @@ async def start_demo_session(
             lon = float(chart_data.get("longitude", 0))
             
             # Calcular carta completa
-            full_chart = calcular_carta_completa(
+            full_chart = await calcular_carta_cacheada_async(
                 fecha=fecha,
                 hora=hora,
                 latitud=lat,
@@ -411,8 +411,7 @@ async def generate_demo_pdf(
         if chart_data and ("planetas" not in chart_data or "datos_entrada" not in chart_data):
             try:
                 print(f"Recalculando datos astrológicos para PDF (sesión {session_id})...")
-                from app.services.ephemeris import calcular_carta_completa
-                
+
                 fecha = chart_data.get("birth_date")
                 hora = chart_data.get("birth_time", "12:00")
                 # Manejar lat/lon que pueden venir como strings
@@ -420,7 +419,7 @@ async def generate_demo_pdf(
                 lon = float(chart_data.get("longitude", 0))
                 
                 if fecha:
-                    full_chart = calcular_carta_completa(fecha, hora, lat, lon)
+                    full_chart = await calcular_carta_cacheada_async(fecha, hora, lat, lon)
                     chart_data.update(full_chart)
                     
                     # Asegurar nombre en datos_entrada
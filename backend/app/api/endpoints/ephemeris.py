@@ -2,10 +2,41 @@
 Endpoints para cálculo de efemérides y carta astral
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional, Tuple
+from datetime import datetime
 from app.api.endpoints.auth import get_current_user
-from app.services.ephemeris import calcular_carta_completa, formato_texto_carta
+from app.services.ephemeris import (
+    calcular_carta_completa,
+    calcular_cartas_lote,
+    calcular_julian_day,
+    datetime_a_jd,
+    formato_texto_carta,
+)
+from app.services.event_calendar import cache_calendario, eventos_en_rango_async, horas_planetarias
+from app.services.fixed_stars import calcular_asteroides, conjunciones_estrellas
+from app.services.progressions import calcular_progresiones, jd_natal_de_carta
+from app.services.rectification import barrido_rectificacion
+from app.services.returns import cartas_retorno, retornos_lunares, retornos_solares
+from app.services.subscription_permissions import require_feature
+from app.services.chart_cache import (
+    calcular_carta_cacheada_async,
+    calcular_cartas_zodiacos_cacheadas_async,
+    chart_cache,
+    clave_carta,
+    estadisticas_cache,
+)
+from app.services.chart_incremental import diff_completo, recalcular_incremental
+from app.services.transit_search import (
+    buscar_transitos_exactos,
+    buscar_transitos_pagina,
+    clave_transito,
+    puntos_natales_de_carta,
+)
+from app.services.astro_executor import PoolAstroSaturado, astro_executor, ejecutar_astro
+import asyncio
+import json
 import sys
 
 router = APIRouter()
@@ -22,6 +53,21 @@ class ChartRequest(BaseModel):
         description="Zona horaria (ej: Europe/Madrid, America/Mexico_City)",
         example="Europe/Madrid"
     )
+    sistema_casas: Optional[str] = Field(
+        default=None,
+        description="Sistema de casas: placidus, koch, whole_sign, equal, regiomontanus, campanus, porphyry",
+        example="placidus"
+    )
+    zodiaco: Optional[str] = Field(
+        default=None,
+        description="Zodiaco: tropical o sideral (por defecto el de efemerides_config.json)",
+        example="tropical"
+    )
+    ayanamsa: Optional[str] = Field(
+        default=None,
+        description="Ayanamsa del zodiaco sideral: lahiri, fagan_bradley, krishnamurti, raman, ...",
+        example="lahiri"
+    )
     
     class Config:
         json_schema_extra = {
@@ -35,6 +81,141 @@ class ChartRequest(BaseModel):
         }
 
 
+class ChartChanges(BaseModel):
+    """Campos modificados respecto a la carta anterior (los omitidos se conservan)"""
+    fecha: Optional[str] = None
+    hora: Optional[str] = None
+    latitud: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitud: Optional[float] = Field(default=None, ge=-180, le=180)
+    zona_horaria: Optional[str] = None
+    sistema_casas: Optional[str] = None
+
+
+class IncrementalChartRequest(BaseModel):
+    """Recálculo incremental: carta anterior + cambios (editor interactivo)"""
+    anterior: ChartRequest
+    cambios: ChartChanges
+
+
+class BatchChartRequest(BaseModel):
+    """Lote de nacimientos para cálculo masivo (familias, equipos, importaciones)"""
+    cartas: List[ChartRequest] = Field(..., min_length=1, max_length=1000, description="Datos de nacimiento")
+    incluir_texto: bool = Field(default=False, description="Incluir `texto_legible` por carta (más lento y pesado)")
+
+
+class TransitSearchRequest(BaseModel):
+    """Búsqueda de tránsitos exactos a una carta natal en un rango de fechas"""
+    natal: ChartRequest
+    desde: str = Field(..., description="Inicio del rango (YYYY-MM-DD, UTC)", example="2026-01-01")
+    hasta: str = Field(..., description="Fin del rango (YYYY-MM-DD, UTC, exclusivo)", example="2028-01-01")
+    cuerpos: Optional[List[str]] = Field(default=None, description="Cuerpos en tránsito (por defecto, Júpiter a Plutón)")
+    aspectos: Optional[List[str]] = Field(default=None, description="Aspectos (por defecto, mayores)")
+    limit: int = Field(default=200, ge=1, le=1000, description="Resultados por página")
+    cursor: Optional[Tuple[float, str, str, str]] = Field(
+        default=None, description="`next_cursor` de la página anterior: [jd, cuerpo, aspecto, punto natal] (exclusivo)"
+    )
+
+
+class CalendarRequest(BaseModel):
+    """Calendario de eventos (fases lunares, ingresos, Luna vacía) en un rango de fechas"""
+    desde: str = Field(..., description="Inicio del rango (YYYY-MM-DD, UTC)", example="2026-01-01")
+    hasta: str = Field(..., description="Fin del rango (YYYY-MM-DD, UTC, exclusivo)", example="2026-02-01")
+    tipos: Optional[List[str]] = Field(default=None, description="fase, ingreso, luna_vacia (por defecto, todos)")
+
+
+class PlanetaryHoursRequest(BaseModel):
+    """Horas planetarias de un día en un lugar"""
+    fecha: str = Field(..., description="Día (YYYY-MM-DD, local)", example="2026-06-21")
+    latitud: float = Field(..., ge=-90, le=90)
+    longitud: float = Field(..., ge=-180, le=180)
+    zona_horaria: Optional[str] = Field(default=None, description="Zona IANA (se detecta si se omite)")
+
+
+class ReturnLocation(BaseModel):
+    """Lugar donde se levanta la revolución (por defecto, el de nacimiento)"""
+    latitud: float = Field(..., ge=-90, le=90)
+    longitud: float = Field(..., ge=-180, le=180)
+    zona_horaria: Optional[str] = Field(default=None, description="Zona IANA (se detecta si se omite)")
+
+
+class SolarReturnRequest(BaseModel):
+    """Revoluciones solares de una carta natal para uno o varios años consecutivos"""
+    natal: ChartRequest
+    año: int = Field(..., ge=1800, le=2300, description="Primer año", example=2026)
+    n: int = Field(default=1, ge=1, le=20, description="Número de años consecutivos")
+    ubicacion: Optional[ReturnLocation] = None
+
+
+class LunarReturnRequest(BaseModel):
+    """Revoluciones lunares de una carta natal a partir de una fecha"""
+    natal: ChartRequest
+    desde: str = Field(..., description="Fecha inicial (YYYY-MM-DD, UTC)", example="2026-01-01")
+    n: int = Field(default=1, ge=1, le=26, description="Número de revoluciones consecutivas")
+    ubicacion: Optional[ReturnLocation] = None
+
+
+class ProgressionsRequest(BaseModel):
+    """Líneas de tiempo de progresiones secundarias y arco solar"""
+    natal: ChartRequest
+    edad_desde: float = Field(default=0.0, ge=0, le=120, description="Edad inicial (años)")
+    edad_hasta: float = Field(default=90.0, ge=0, le=120, description="Edad final (años)")
+    paso_años: float = Field(default=1.0, ge=1 / 12, le=10, description="Resolución de la línea de tiempo (años)")
+    aspectos: Optional[List[str]] = Field(default=None, description="Aspectos para los contactos (por defecto, mayores)")
+    incluir_arco_solar: bool = Field(default=True)
+
+
+class FixedStarsRequest(BaseModel):
+    """Conjunciones con estrellas fijas y posiciones de asteroides de una carta natal"""
+    natal: ChartRequest
+    orbe: float = Field(default=1.0, gt=0, le=5, description="Orbe máximo de conjunción (grados)")
+    magnitud_max: Optional[float] = Field(default=None, description="Solo estrellas con magnitud <= este valor")
+    incluir_asteroides: bool = Field(default=True, description="Ceres, Palas, Juno, Vesta y Eris (requieren ficheros .se1)")
+
+
+class RectificationRequest(BaseModel):
+    """Barrido de la hora de nacimiento para rectificación"""
+    natal: ChartRequest
+    ventana_minutos: float = Field(default=120.0, gt=0, le=720, description="Semiventana: se barre hora ± ventana")
+    paso_minutos: float = Field(default=1.0, ge=0.25, le=60, description="Resolución del barrido")
+    cuerpos: Optional[List[str]] = Field(default=None, description="Cuerpos a seguir (por defecto, todos)")
+    incluir_muestras: bool = Field(default=False, description="Incluir ASC/MC de cada paso")
+
+
+# Rango máximo de una búsqueda de tránsitos
+MAX_RANGO_TRANSITOS_DIAS = 3660
+
+
+async def _preparar_busqueda_transitos(request: TransitSearchRequest):
+    """Valida el rango y resuelve la carta natal (con caché). Devuelve (puntos, jd_inicio, jd_fin)."""
+    try:
+        jd_inicio = datetime_a_jd(datetime.strptime(request.desde, "%Y-%m-%d"))
+        jd_fin = datetime_a_jd(datetime.strptime(request.hasta, "%Y-%m-%d"))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Fechas inválidas: {str(e)}")
+    if jd_fin <= jd_inicio or jd_fin - jd_inicio > MAX_RANGO_TRANSITOS_DIAS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Rango inválido: 'hasta' debe ser posterior a 'desde' y como máximo {MAX_RANGO_TRANSITOS_DIAS} días"
+        )
+    natal = request.natal
+    try:
+        carta = await calcular_carta_cacheada_async(
+            natal.fecha, natal.hora, natal.latitud, natal.longitud, natal.zona_horaria, natal.sistema_casas
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {str(e)}")
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
+    return puntos_natales_de_carta(carta), jd_inicio, jd_fin
+
+
+def _error_pool(e: Exception) -> HTTPException:
+    """503 cuando el pool de cálculo está saturado o la tarea excede su timeout."""
+    detalle = str(e) if isinstance(e, PoolAstroSaturado) else "El cálculo excedió el tiempo máximo"
+    print(f"[EPHEMERIS] ⚠️ Pool de cálculo: {detalle}", file=sys.stderr)
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detalle)
+
+
 @router.post("/calculate")
 async def calculate_chart(
     request: ChartRequest,
@@ -49,13 +230,16 @@ async def calculate_chart(
         print(f"[EPHEMERIS] Ubicación: Lat {request.latitud}, Lon {request.longitud}", file=sys.stderr)
         print(f"[EPHEMERIS] Zona horaria: {request.zona_horaria}", file=sys.stderr)
         
-        # Calcular carta completa
-        carta = calcular_carta_completa(
+        # Calcular carta completa (o servirla desde caché si ya se calculó)
+        carta = await calcular_carta_cacheada_async(
             fecha=request.fecha,
             hora=request.hora,
             latitud=request.latitud,
             longitud=request.longitud,
-            zona_horaria=request.zona_horaria
+            zona_horaria=request.zona_horaria,
+            sistema_casas=request.sistema_casas,
+            zodiaco=request.zodiaco,
+            ayanamsa=request.ayanamsa
         )
         
         print(f"[EPHEMERIS] ✅ Carta calculada exitosamente", file=sys.stderr)
@@ -72,6 +256,8 @@ async def calculate_chart(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Datos inválidos: {str(e)}"
         )
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
     except Exception as e:
         print(f"[EPHEMERIS] ❌ Error calculando carta: {type(e).__name__}: {e}", file=sys.stderr)
         raise HTTPException(
@@ -80,6 +266,355 @@ async def calculate_chart(
         )
 
 
+@router.post("/calculate-zodiacs")
+async def calculate_chart_zodiacs(
+    request: ChartRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """
+    Carta tropical y sideral (con `ayanamsa`) de una sola pasada de efemérides: la sideral se
+    obtiene restando el ayanamsa a todas las longitudes. Ambas quedan en caché.
+    """
+    try:
+        cartas = await calcular_cartas_zodiacos_cacheadas_async(
+            request.fecha, request.hora, request.latitud, request.longitud,
+            request.zona_horaria, request.sistema_casas, request.ayanamsa
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {str(e)}")
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
+    return {"success": True, "data": cartas}
+
+
+@router.post("/calculate-incremental")
+async def calculate_chart_incremental(
+    request: IncrementalChartRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """
+    Recalcula una carta tras un cambio de hora/lugar reutilizando la anterior y devuelve solo
+    el diff (aplicable sobre la carta anterior). Con el mismo instante UTC solo cambian casas;
+    en desplazamientos cortos los cuerpos lentos se extrapolan en lugar de recalcularse.
+
+    Solo es incremental si la carta anterior ya está en la caché: calcularla para luego derivar
+    la nueva costaría más que calcular la nueva directamente, que es lo que se hace en ese caso
+    (diff `completo` con la carta entera).
+    """
+    previo = request.anterior
+    nuevo = previo.model_copy(update=request.cambios.model_dump(exclude_none=True))
+    try:
+        clave_anterior = await asyncio.to_thread(
+            clave_carta, previo.fecha, previo.hora, previo.latitud, previo.longitud, previo.zona_horaria, previo.sistema_casas
+        )
+        anterior = chart_cache.get(clave_anterior)
+        if anterior is None:
+            carta = await calcular_carta_cacheada_async(
+                nuevo.fecha, nuevo.hora, nuevo.latitud, nuevo.longitud, nuevo.zona_horaria, nuevo.sistema_casas
+            )
+            return {"success": True, "diff": diff_completo(carta)}
+        carta, diff = await ejecutar_astro(
+            recalcular_incremental,
+            anterior, nuevo.fecha, nuevo.hora, nuevo.latitud, nuevo.longitud, nuevo.zona_horaria, nuevo.sistema_casas
+        )
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {str(e)}")
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
+
+    # La siguiente edición (o un /calculate con los mismos datos) parte de esta carta, pero solo
+    # si es exacta: con cuerpos extrapolados no puede ocupar la entrada de la carta calculada
+    if not diff["extrapolados"]:
+        clave = await asyncio.to_thread(
+            clave_carta, nuevo.fecha, nuevo.hora, nuevo.latitud, nuevo.longitud, nuevo.zona_horaria, nuevo.sistema_casas
+        )
+        chart_cache.put(clave, carta)
+    return {"success": True, "diff": diff}
+
+
+@router.post("/calculate-batch")
+async def calculate_chart_batch(
+    request: BatchChartRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """
+    Calcula varias cartas astrales en una sola petición.
+    Los errores son por carta: un registro inválido no invalida el resto del lote.
+    """
+    try:
+        print(f"[EPHEMERIS] Calculando lote de {len(request.cartas)} cartas", file=sys.stderr)
+
+        registros = [c.model_dump() for c in request.cartas]
+        resultados = await asyncio.to_thread(calcular_cartas_lote, registros, None, True)
+
+        items = []
+        for idx, res in enumerate(resultados):
+            if not res['ok']:
+                items.append({"index": idx, "success": False, "error": res['error']})
+                continue
+            # Las cartas llegan compactas del pool; se expanden solo al serializar
+            carta = res['carta'].a_dict()
+            item = {"index": idx, "success": True, "data": carta}
+            if request.incluir_texto:
+                item["texto_legible"] = formato_texto_carta(carta)
+            items.append(item)
+
+        errores = sum(1 for i in items if not i["success"])
+        print(f"[EPHEMERIS] ✅ Lote calculado ({len(items) - errores} ok, {errores} con error)", file=sys.stderr)
+
+        return {
+            "success": errores == 0,
+            "total": len(items),
+            "errores": errores,
+            "resultados": items
+        }
+
+    except (PoolAstroSaturado, TimeoutError) as e:
+        raise _error_pool(e)
+    except Exception as e:
+        print(f"[EPHEMERIS] ❌ Error calculando lote: {type(e).__name__}: {e}", file=sys.stderr)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calculando lote de cartas: {str(e)}"
+        )
+
+
+@router.post("/transits/search")
+async def search_transits(
+    request: TransitSearchRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """
+    Tránsitos exactos (al minuto) a los puntos natales, en orden cronológico y paginados.
+    Para la siguiente página, repetir la petición con `cursor = next_cursor`.
+    """
+    puntos, jd_inicio, jd_fin = await _preparar_busqueda_transitos(request)
+
+    try:
+        items = await ejecutar_astro(
+            buscar_transitos_pagina, puntos, jd_inicio, jd_fin, request.cuerpos, request.aspectos,
+            request.limit + 1, request.cursor
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cuerpo o aspecto desconocido: {e}")
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
+
+    next_cursor = None
+    if len(items) > request.limit:
+        items = items[:request.limit]
+        # Reanudar estrictamente después del último resultado devuelto (con desempate por cuerpo/aspecto/punto)
+        next_cursor = list(clave_transito(items[-1]))
+
+    return {"success": True, "total": len(items), "items": items, "next_cursor": next_cursor}
+
+
+@router.post("/transits/stream")
+async def stream_transits(
+    request: TransitSearchRequest,
+    current_user: dict = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Igual que `/transits/search` pero sin paginar: emite un resultado por línea (NDJSON)
+    a medida que se encuentran, sin esperar a recorrer todo el rango.
+    El generador corre en el threadpool de Starlette (un generador no cruza a otro proceso).
+    """
+    puntos, jd_inicio, jd_fin = await _preparar_busqueda_transitos(request)
+
+    def _lineas():
+        try:
+            for item in buscar_transitos_exactos(
+                puntos, jd_inicio, jd_fin, request.cuerpos, request.aspectos, request.cursor
+            ):
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+        except KeyError as e:
+            yield json.dumps({"error": f"Cuerpo o aspecto desconocido: {e}"}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_lineas(), media_type="application/x-ndjson")
+
+
+async def _calcular_revoluciones(tipo: str, natal: ChartRequest, ubicacion: Optional[ReturnLocation], buscar) -> dict:
+    """Raíces (cacheadas, en hilo) + cartas de revolución (en el pool de procesos)."""
+    try:
+        jd_natal, _, _ = await asyncio.to_thread(
+            calcular_julian_day, natal.fecha, natal.hora, natal.latitud, natal.longitud, natal.zona_horaria
+        )
+        jds = await asyncio.to_thread(buscar, jd_natal)
+        lugar = ubicacion or ReturnLocation(
+            latitud=natal.latitud, longitud=natal.longitud, zona_horaria=natal.zona_horaria
+        )
+        cartas = await ejecutar_astro(
+            cartas_retorno, tipo, jds, lugar.latitud, lugar.longitud, lugar.zona_horaria, natal.sistema_casas
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {str(e)}")
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
+    return {"success": True, "tipo": tipo, "total": len(cartas), "revoluciones": cartas}
+
+
+@router.post("/returns/solar")
+async def solar_returns(
+    request: SolarReturnRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """Revoluciones solares exactas (Sol en su longitud natal) y sus cartas en el lugar elegido"""
+    await require_feature(str(current_user.get("_id")), "solar_return")
+    print(f"[EPHEMERIS] Revoluciones solares {request.año}-{request.año + request.n - 1}", file=sys.stderr)
+
+    def _buscar(jd_natal: float) -> List[float]:
+        return [jd for _, jd in retornos_solares(jd_natal, request.año, request.n)]
+
+    return await _calcular_revoluciones("solar", request.natal, request.ubicacion, _buscar)
+
+
+@router.post("/returns/lunar")
+async def lunar_returns(
+    request: LunarReturnRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """Revoluciones lunares exactas (Luna en su longitud natal) a partir de `desde`"""
+    await require_feature(str(current_user.get("_id")), "solar_return")
+    try:
+        jd_desde = datetime_a_jd(datetime.strptime(request.desde, "%Y-%m-%d"))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Fecha inválida: {str(e)}")
+    print(f"[EPHEMERIS] {request.n} revoluciones lunares desde {request.desde}", file=sys.stderr)
+
+    def _buscar(jd_natal: float) -> List[float]:
+        return retornos_lunares(jd_natal, jd_desde, request.n)
+
+    return await _calcular_revoluciones("lunar", request.natal, request.ubicacion, _buscar)
+
+
+@router.post("/progressions")
+async def progressions(
+    request: ProgressionsRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """
+    Progresiones secundarias y direcciones por arco solar como arrays por edad,
+    con las edades exactas de los contactos progresado→natal y dirigido→natal.
+    """
+    natal = request.natal
+    try:
+        carta = await calcular_carta_cacheada_async(
+            natal.fecha, natal.hora, natal.latitud, natal.longitud, natal.zona_horaria, natal.sistema_casas
+        )
+        resultado = await ejecutar_astro(
+            calcular_progresiones,
+            jd_natal_de_carta(carta),
+            puntos_natales_de_carta(carta),
+            request.edad_desde,
+            request.edad_hasta,
+            request.paso_años,
+            request.aspectos,
+            request.incluir_arco_solar
+        )
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {str(e)}")
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
+    return {"success": True, **resultado}
+
+
+@router.post("/fixed-stars")
+async def fixed_stars(
+    request: FixedStarsRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """
+    Estrellas fijas en conjunción con los puntos de la carta (planetas, ASC, MC y, si están
+    disponibles, asteroides), usando el catálogo precesado a la época del nacimiento.
+    """
+    natal = request.natal
+    try:
+        carta = await calcular_carta_cacheada_async(
+            natal.fecha, natal.hora, natal.latitud, natal.longitud, natal.zona_horaria, natal.sistema_casas
+        )
+        jd_natal = jd_natal_de_carta(carta)
+        puntos = puntos_natales_de_carta(carta)
+        asteroides = {}
+        if request.incluir_asteroides:
+            asteroides = await asyncio.to_thread(calcular_asteroides, jd_natal)
+            puntos.update({n: p['longitud'] for n, p in asteroides.items() if p is not None})
+        conjunciones = conjunciones_estrellas(puntos, jd_natal, request.orbe, request.magnitud_max)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {str(e)}")
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
+    return {"success": True, "conjunciones": conjunciones, "asteroides": asteroides}
+
+
+@router.post("/rectification/sweep")
+async def rectification_sweep(
+    request: RectificationRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """
+    Barre la hora de nacimiento (p.ej. ±2 h en pasos de 1 minuto) y devuelve los instantes
+    en que cambian el signo del ASC/MC o de un cuerpo, o la casa de un cuerpo.
+    """
+    natal = request.natal
+    try:
+        resultado = await ejecutar_astro(
+            barrido_rectificacion,
+            natal.fecha, natal.hora, natal.latitud, natal.longitud, natal.zona_horaria, natal.sistema_casas,
+            request.ventana_minutos, request.paso_minutos, request.cuerpos, request.incluir_muestras
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {str(e)}")
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
+    return {"success": True, **resultado}
+
+
+@router.post("/calendar")
+async def event_calendar(
+    request: CalendarRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """
+    Fases lunares, ingresos en signo y periodos de Luna vacía de curso en el rango (hasta ~1 año).
+    Los meses se calculan una vez y se sirven desde caché (memoria y, si está activa, Mongo).
+    """
+    try:
+        jd_desde = datetime_a_jd(datetime.strptime(request.desde, "%Y-%m-%d"))
+        jd_hasta = datetime_a_jd(datetime.strptime(request.hasta, "%Y-%m-%d"))
+        eventos = await eventos_en_rango_async(jd_desde, jd_hasta, request.tipos)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {str(e)}")
+    except (PoolAstroSaturado, asyncio.TimeoutError) as e:
+        raise _error_pool(e)
+    return {"success": True, "desde": request.desde, "hasta": request.hasta, "total": len(eventos), "eventos": eventos}
+
+
+@router.post("/planetary-hours")
+async def planetary_hours(
+    request: PlanetaryHoursRequest,
+    current_user: dict = Depends(get_current_user)
+) -> dict:
+    """Las 24 horas planetarias del día (de salida a salida del Sol) con su regente"""
+    try:
+        resultado = await asyncio.to_thread(
+            horas_planetarias, request.fecha, request.latitud, request.longitud, request.zona_horaria
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Datos inválidos: {str(e)}")
+    return {"success": True, **resultado}
+
+
+@router.get("/cache/stats")
+async def chart_cache_stats(current_user: dict = Depends(get_current_user)) -> dict:
+    """Estadísticas de la caché de cartas (aciertos, fallos, expulsiones), del calendario y del pool de cálculo"""
+    return {
+        "success": True,
+        "cache": estadisticas_cache(),
+        "calendario": cache_calendario.stats(),
+        "pool": astro_executor.stats(),
+    }
+
+
 @router.get("/test")
 async def test_ephemeris(current_user: dict = Depends(get_current_user)) -> dict:
     """
@@ -88,12 +623,13 @@ async def test_ephemeris(current_user: dict = Depends(get_current_user)) -> dict
     """
     try:
         # Datos de prueba: 11 de Agosto de 1932, 17:00 en Morón (España)
-        carta = calcular_carta_completa(
-            fecha="1932-08-11",
-            hora="17:00",
-            latitud=37.1215,
-            longitud=-5.4560,
-            zona_horaria="Europe/Madrid"
+        carta = await ejecutar_astro(
+            calcular_carta_completa,
+            "1932-08-11",
+            "17:00",
+            37.1215,
+            -5.4560,
+            "Europe/Madrid"
         )
         
         return {
@@ -777,7 +777,7 @@ async def queue_free_report(
     Endpoint para WordPress: genera informe gratuito calculando la carta desde datos de nacimiento.
     Acepta datos de nacimiento (fecha, hora, coordenadas) y calcula la carta astral internamente.
     """
-    from app.services.ephemeris import calcular_carta_completa
+    from app.services.chart_cache import calcular_carta_cacheada_async
 
     user_id = str(current_user.get("_id"))
     user_name = request.name or current_user.get('full_name') or current_user.get('username') or "Consultante"
@@ -813,7 +813,7 @@ async def queue_free_report(
     # Calcular carta astral
     try:
         print(f"[FREE-REPORT] Calculando carta para {user_name}: {fecha} {hora} en ({request.latitude}, {request.longitude})")
-        carta_data = calcular_carta_completa(
+        carta_data = await calcular_carta_cacheada_async(
             fecha=fecha,
             hora=hora,
             latitud=request.latitude,
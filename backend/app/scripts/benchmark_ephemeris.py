@@ -0,0 +1,252 @@
+"""
+Micro-benchmarks del motor de efemérides sobre un corpus determinista de nacimientos.
+
+Example:
+  cd backend
+  python -m app.scripts.benchmark_ephemeris                      # compara con la baseline
+  python -m app.scripts.benchmark_ephemeris --n 500 --casos casas carta_completa
+  python -m app.scripts.benchmark_ephemeris --guardar-baseline   # tras una mejora intencionada
+
+Notes:
+  - El corpus (fechas 1700-2100, latitudes ±66°, todas las longitudes) se genera con semilla
+    fija: dos ejecuciones miden exactamente las mismas cartas.
+  - La zona horaria es la Etc/GMT±N de la longitud, para no medir TimezoneFinder
+    (tiene su propia etapa en /metrics).
+  - Cada muestra es un lote de operaciones (`lote` por caso) para que las funciones de
+    microsegundos no queden dominadas por el coste de medir. p50/p99 son por operación.
+  - Cada caso se repite `--repeticiones` veces y se queda la pasada más rápida (menos ruido).
+  - Sale con código 1 si algún caso empeora más que `--tolerancia` en ops/s o p50 respecto a
+    la baseline (p99 se informa pero es demasiado ruidoso para decidir). La baseline depende
+    de la máquina: regenerarla al cambiar de equipo.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import swisseph as swe
+
+from app.services.ephemeris import (
+    asignar_casas_a_planetas,
+    calcular_carta_completa,
+    calcular_casas_y_angulos,
+    calcular_posiciones_planetas,
+    grado_a_zodiaco,
+)
+
+try:
+    from orb_engine import OrbEngine
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+    from orb_engine import OrbEngine
+
+RUTA_BASELINE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "benchmark_baseline.json"
+)
+
+SEMILLA = 20240101
+N_POR_DEFECTO = 2000
+TOLERANCIA_POR_DEFECTO = 0.25
+REPETICIONES_POR_DEFECTO = 3
+
+# Orbes de referencia para validate_aspect (misma forma que los presets de calculation_rules)
+CONFIG_ORBES = {
+    "rules": {"aspects": {"strategy": "UMBRELLA_MAX"}},
+    "orbs": [
+        {"body": b, "conjunction": o, "opposition": o, "square": o - 2, "trine": o - 2, "sextile": o - 4}
+        for b, o in [("Sol", 10), ("Luna", 10), ("Mercurio", 8), ("Venus", 8), ("Marte", 7),
+                     ("Júpiter", 6), ("Saturno", 6), ("Urano", 5), ("Neptuno", 5), ("Plutón", 5)]
+    ],
+}
+
+
+def generar_corpus(n: int = N_POR_DEFECTO, semilla: int = SEMILLA) -> List[Dict[str, Any]]:
+    """Nacimientos deterministas: fecha, hora, lat, lon, zona Etc/GMT y JD UT."""
+    rng = random.Random(semilla)
+    corpus = []
+    for _ in range(n):
+        año = rng.randint(1700, 2099)
+        mes = rng.randint(1, 12)
+        dia = rng.randint(1, 28)
+        hora, minuto = rng.randint(0, 23), rng.randint(0, 59)
+        lat = round(rng.uniform(-66.0, 66.0), 4)
+        lon = round(rng.uniform(-180.0, 180.0), 4)
+        desfase = int(round(lon / 15.0))
+        corpus.append({
+            "fecha": f"{año:04d}-{mes:02d}-{dia:02d}",
+            "hora": f"{hora:02d}:{minuto:02d}",
+            "latitud": lat,
+            "longitud": lon,
+            # Etc/GMT tiene el signo invertido: Etc/GMT-1 es UTC+1
+            "zona_horaria": f"Etc/GMT{-desfase:+d}",
+            "jd": swe.julday(año, mes, dia, hora + minuto / 60.0 - desfase),
+        })
+    return corpus
+
+
+def construir_casos(corpus: Sequence[Dict[str, Any]]) -> Dict[str, Tuple[Callable[[int], Any], int]]:
+    """
+    Casos del benchmark: nombre -> (op(i) sobre el elemento i del corpus, operaciones por muestra).
+    Las entradas derivadas (posiciones, cúspides, ángulos) se precalculan fuera de la medición.
+    """
+    motor = OrbEngine()  # sin conexión a Mongo: solo lógica de orbes
+    posiciones = [calcular_posiciones_planetas(c["jd"]) for c in corpus]
+    cuspides = [[h["cuspide"] for h in calcular_casas_y_angulos(c["jd"], c["latitud"], c["longitud"])["casas"]]
+                for c in corpus]
+    rng = random.Random(SEMILLA + 1)
+    cuerpos = [o["body"] for o in CONFIG_ORBES["orbs"]]
+    pares = [(rng.choice(cuerpos), rng.choice(cuerpos), rng.uniform(0.0, 180.0)) for _ in corpus]
+    # Como los configs de get_effective_config: compilado una vez (un dict suelto se sellaría en cada llamada)
+    config_orbes = motor.compile_config(CONFIG_ORBES)
+    longitudes = [p["Sol"]["longitud"] for p in posiciones]
+
+    return {
+        "grado_a_zodiaco": (lambda i: grado_a_zodiaco(longitudes[i]), 200),
+        "posiciones": (lambda i: calcular_posiciones_planetas(corpus[i]["jd"]), 5),
+        "casas": (lambda i: calcular_casas_y_angulos(corpus[i]["jd"], corpus[i]["latitud"], corpus[i]["longitud"]), 20),
+        "asignar_casas": (lambda i: asignar_casas_a_planetas(posiciones[i], cuspides[i]), 50),
+        "validate_aspect": (lambda i: motor.validate_aspect(*pares[i], config_orbes), 100),
+        "carta_completa": (lambda i: calcular_carta_completa(
+            corpus[i]["fecha"], corpus[i]["hora"], corpus[i]["latitud"], corpus[i]["longitud"], corpus[i]["zona_horaria"]
+        ), 2),
+    }
+
+
+def _pasada(op: Callable[[int], Any], lote: int, n: int) -> Tuple[float, List[float]]:
+    reloj = time.perf_counter
+    muestras = []
+    total = 0.0
+    for inicio in range(0, n - lote + 1, lote):
+        t0 = reloj()
+        for i in range(inicio, inicio + lote):
+            op(i)
+        dt = reloj() - t0
+        total += dt
+        muestras.append(dt / lote)
+    return total, muestras
+
+
+def medir_caso(
+    op: Callable[[int], Any],
+    lote: int,
+    n: int,
+    repeticiones: int = REPETICIONES_POR_DEFECTO,
+    calentamiento: int = 50
+) -> Dict[str, float]:
+    """Recorre el corpus en lotes de `lote` operaciones y resume tiempos por operación (mejor pasada)."""
+    lote = max(1, min(lote, n // 10))
+    for i in range(min(calentamiento, n)):
+        op(i)
+    total, muestras = min((_pasada(op, lote, n) for _ in range(max(1, repeticiones))), key=lambda p: p[0])
+    muestras.sort()
+    ops = len(muestras) * lote
+
+    def _p(q: float) -> float:
+        return muestras[min(len(muestras) - 1, int(q * len(muestras)))] * 1e6
+
+    return {
+        "ops": ops,
+        "ops_por_segundo": round(ops / total, 1) if total else 0.0,
+        "p50_us": round(_p(0.50), 3),
+        "p99_us": round(_p(0.99), 3),
+    }
+
+
+def ejecutar_benchmark(
+    n: int = N_POR_DEFECTO,
+    casos: Optional[Sequence[str]] = None,
+    repeticiones: int = REPETICIONES_POR_DEFECTO
+) -> Dict[str, Any]:
+    corpus = generar_corpus(n)
+    disponibles = construir_casos(corpus)
+    seleccion = list(casos) if casos else list(disponibles)
+    desconocidos = [c for c in seleccion if c not in disponibles]
+    if desconocidos:
+        raise ValueError(f"Casos desconocidos: {', '.join(desconocidos)} (disponibles: {', '.join(disponibles)})")
+    resultados = {}
+    for nombre in seleccion:
+        op, lote = disponibles[nombre]
+        resultados[nombre] = medir_caso(op, lote, n, repeticiones)
+    return {
+        "n": n,
+        "semilla": SEMILLA,
+        "repeticiones": repeticiones,
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "casos": resultados,
+    }
+
+
+def comparar(actual: Dict[str, Any], baseline: Dict[str, Any], tolerancia: float) -> List[Dict[str, Any]]:
+    """Por caso común: ratios de ops/s, p50 y p99 frente a la baseline y si es regresión."""
+    filas = []
+    for nombre, r in actual["casos"].items():
+        base = baseline.get("casos", {}).get(nombre)
+        if not base:
+            continue
+        ratio_ops = r["ops_por_segundo"] / base["ops_por_segundo"] if base["ops_por_segundo"] else 1.0
+        ratio_p50 = r["p50_us"] / base["p50_us"] if base.get("p50_us") else 1.0
+        ratio_p99 = r["p99_us"] / base["p99_us"] if base.get("p99_us") else 1.0
+        filas.append({
+            "caso": nombre,
+            "ratio_ops": round(ratio_ops, 3),
+            "ratio_p50": round(ratio_p50, 3),
+            "ratio_p99": round(ratio_p99, 3),
+            "regresion": ratio_ops < 1.0 - tolerancia or ratio_p50 > 1.0 + tolerancia,
+        })
+    return filas
+
+
+def _imprimir(resultado: Dict[str, Any], comparacion: List[Dict[str, Any]]) -> None:
+    por_caso = {f["caso"]: f for f in comparacion}
+    print(f"{'caso':<18}{'ops/s':>12}{'p50 µs':>11}{'p99 µs':>11}{'vs base':>10}")
+    for nombre, r in resultado["casos"].items():
+        f = por_caso.get(nombre)
+        marca = "" if f is None else f"{f['ratio_ops']:.2f}x" + (" ❌" if f["regresion"] else "")
+        print(f"{nombre:<18}{r['ops_por_segundo']:>12,.0f}{r['p50_us']:>11.2f}{r['p99_us']:>11.2f}{marca:>10}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark del motor de efemérides")
+    ap.add_argument("--n", type=int, default=N_POR_DEFECTO, help="Tamaño del corpus")
+    ap.add_argument("--casos", nargs="*", default=None, help="Subconjunto de casos")
+    ap.add_argument("--repeticiones", type=int, default=REPETICIONES_POR_DEFECTO, help="Pasadas por caso (se usa la mejor)")
+    ap.add_argument("--baseline", default=RUTA_BASELINE, help="Fichero de baseline (JSON)")
+    ap.add_argument("--guardar-baseline", action="store_true", help="Sobrescribe la baseline con esta ejecución")
+    ap.add_argument("--tolerancia", type=float, default=TOLERANCIA_POR_DEFECTO, help="Empeoramiento admitido (0.25 = 25%%)")
+    args = ap.parse_args()
+
+    print(f"Corpus de {args.n} nacimientos (semilla {SEMILLA}) ...")
+    resultado = ejecutar_benchmark(args.n, args.casos, args.repeticiones)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.guardar_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    comparacion = comparar(resultado, baseline, args.tolerancia) if baseline else []
+    _imprimir(resultado, comparacion)
+
+    if args.guardar_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Baseline guardada en {args.baseline}")
+    elif baseline is None:
+        print(f"Sin baseline en {args.baseline} (usar --guardar-baseline)")
+    elif any(f["regresion"] for f in comparacion):
+        print(f"❌ Regresión de rendimiento (tolerancia {args.tolerancia:.0%})")
+        sys.exit(1)
+    else:
+        print("✅ Sin regresiones frente a la baseline")
+
+
+if __name__ == "__main__":
+    main()
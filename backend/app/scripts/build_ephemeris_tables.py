@@ -0,0 +1,41 @@
+"""
+Offline builder: Swiss Ephemeris -> tablas precalculadas (.npy + indice.json) para lookups rápidos.
+
+Example:
+  cd backend
+  python -m app.scripts.build_ephemeris_tables --desde 1900 --hasta 2100 --out ./data/ephemeris_tables
+
+Notes:
+  - Tarda varios minutos (la Luna se tabula cada hora). Ejecutar una vez por despliegue/imagen.
+  - En producción, apuntar `EPHEMERIS_TABLES_DIR` al directorio generado.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import swisseph as swe
+
+from app.services.ephemeris_tables import DIRECTORIO_POR_DEFECTO, construir_tablas
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Genera tablas de efemérides precalculadas")
+    ap.add_argument("--desde", type=int, default=1900, help="Año inicial (1 de enero)")
+    ap.add_argument("--hasta", type=int, default=2100, help="Año final (1 de enero)")
+    ap.add_argument("--out", default=DIRECTORIO_POR_DEFECTO, help="Directorio de salida")
+    ap.add_argument("--cuerpos", nargs="*", default=None, help="Subconjunto de cuerpos (por defecto, todos)")
+    args = ap.parse_args()
+
+    jd_inicio = swe.julday(args.desde, 1, 1, 0.0)
+    jd_fin = swe.julday(args.hasta, 1, 1, 0.0)
+
+    print(f"Tabulando {args.desde}-{args.hasta} en {args.out} ...")
+    t0 = time.time()
+    construir_tablas(args.out, jd_inicio, jd_fin, cuerpos=args.cuerpos)
+    print(f"Listo en {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Precalcula el calendario de eventos (fases lunares, ingresos, Luna vacía) por meses y lo guarda
+en la colección MongoDB `calendario_eventos`, de donde `/ephemeris/calendar` lo sirve sin calcular.
+
+Example:
+  cd backend
+  python -m app.scripts.build_event_calendar --desde 2020 --hasta 2031
+  python -m app.scripts.build_event_calendar --desde 2026 --hasta 2027 --out calendario_2026.json
+
+Notes:
+  - ~50 ms por mes (Moshier). Los meses ya presentes se sobrescriben (mismo `_id` por versión y mes).
+  - Con `--out` escribe un JSON {clave_mes: eventos} en lugar de tocar Mongo.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from app.services.event_calendar import MongoCalendarioTier, calcular_meses
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Precalcula el calendario de eventos astrológicos")
+    ap.add_argument("--desde", type=int, required=True, help="Año inicial")
+    ap.add_argument("--hasta", type=int, required=True, help="Año final (exclusivo)")
+    ap.add_argument("--out", default=None, help="Fichero JSON de salida (por defecto, Mongo)")
+    args = ap.parse_args()
+
+    meses = [(año, mes) for año in range(args.desde, args.hasta) for mes in range(1, 13)]
+    print(f"Calculando {len(meses)} meses ({args.desde}-{args.hasta}) ...")
+    t0 = time.time()
+    calendario = calcular_meses(meses)
+    total = sum(len(e) for e in calendario.values())
+    print(f"{total} eventos en {time.time() - t0:.1f}s")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(calendario, f, ensure_ascii=False)
+        print(f"Guardado en {args.out}")
+    else:
+        tier = MongoCalendarioTier()
+        asyncio.run(tier.guardar(calendario))
+        if tier.errors:
+            print("❌ No se pudo guardar en Mongo")
+            sys.exit(1)
+        print("Guardado en la colección calendario_eventos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Motor de aspectos vectorizado (natal, tránsitos y sinastría)
+
+Calcula la matriz completa de distancias angulares cuerpo×cuerpo con broadcasting de NumPy y
+clasifica todos los aspectos (mayores y, opcionalmente, menores) contra las tablas de orbes en
+una sola pasada. Con las velocidades se determina si cada aspecto es aplicativo o separativo
+(en tránsitos el cuerpo de B es un punto natal fijo y solo cuenta la velocidad de A; en sinastría,
+`b_fijo=False`, cuentan las de ambas cartas).
+
+La clasificación es la de `ConfigCompilada.validar_rejilla` de OrbEngine sobre el config efectivo
+(`orbs: [{body, conjunction, ...}]`, `rules.aspects.strategy`, `rules.aspects.catalog`), así que el
+catálogo, los orbes y la estrategia coinciden con `OrbEngine.validate_aspect`:
+- UMBRELLA_MAX (natal/sinastría): límite = máx(orbe A, orbe B)
+- RECEIVER_PRIORITY (tránsitos): límite = orbe del receptor (cuerpo B, natal)
+- Cuerpos que el config no define: orbe 0
+Solo si el config no trae orbes (p.ej. Mongo no disponible) se usan `ORBES_POR_DEFECTO` para todos los cuerpos.
+"""
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ASPECTOS_MAYORES = {
+    "conjunction": 0.0,
+    "sextile": 60.0,
+    "square": 90.0,
+    "trine": 120.0,
+    "opposition": 180.0,
+}
+
+ASPECTOS_MENORES = {
+    "semisextile": 30.0,
+    "semisquare": 45.0,
+    "quintile": 72.0,
+    "sesquiquadrate": 135.0,
+    "biquintile": 144.0,
+    "quincunx": 150.0,
+}
+
+# Orbes genéricos por aspecto (grados) si el config no trae orbes
+ORBES_POR_DEFECTO = {
+    "conjunction": 8.0,
+    "opposition": 8.0,
+    "square": 7.0,
+    "trine": 7.0,
+    "sextile": 5.0,
+    "semisextile": 2.0,
+    "semisquare": 2.0,
+    "quintile": 2.0,
+    "sesquiquadrate": 2.0,
+    "biquintile": 2.0,
+    "quincunx": 3.0,
+}
+# Los luminares amplían el orbe genérico
+EXTRA_LUMINARES = 2.0
+LUMINARES = frozenset({"Sol", "Luna"})
+
+# Definidos en orb_engine (única definición); se reexportan con `__getattr__`
+_REEXPORTADOS = ("UMBRELLA_MAX", "RECEIVER_PRIORITY", "NOMBRES_ESTRATEGIA", "normalizar_estrategia")
+
+
+def _orb_engine():
+    # Importación diferida: orb_engine (en la raíz del repo) importa este módulo
+    try:
+        import orb_engine
+    except ImportError:
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+        import orb_engine
+    return orb_engine
+
+
+def __getattr__(nombre: str):
+    if nombre in _REEXPORTADOS:
+        return getattr(_orb_engine(), nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+_MOTOR = None
+
+
+def _motor():
+    """OrbEngine sin Mongo para compilar (y memoizar por contenido) los configs de este módulo."""
+    global _MOTOR
+    if _MOTOR is None:
+        _MOTOR = _orb_engine().OrbEngine(vigilar=False)
+    return _MOTOR
+
+
+def _orbes_por_defecto(cuerpo: str) -> Dict:
+    extra = EXTRA_LUMINARES if cuerpo in LUMINARES else 0.0
+    return {"body": cuerpo, **{aspecto: orbe + extra for aspecto, orbe in ORBES_POR_DEFECTO.items()}}
+
+
+def compilar_config(config: Optional[Dict], cuerpos: Sequence[str] = (), incluir_menores: bool = False):
+    """
+    `ConfigCompilada` de OrbEngine con la que se clasifican las rejillas.
+
+    Args:
+        config: Config efectivo de OrbEngine (o una ConfigCompilada, que se usa tal cual)
+        cuerpos: Cuerpos que reciben `ORBES_POR_DEFECTO` si el config no trae orbes
+        incluir_menores: Añadir los aspectos menores si el config no define catálogo
+    """
+    orb_engine = _orb_engine()
+    if isinstance(config, orb_engine.ConfigCompilada):
+        return config
+    config = config or {}
+    reglas = config.get("rules") or {}
+    reglas_aspectos = reglas.get("aspects") or {}
+    sin_orbes = not config.get("orbs")
+    sin_catalogo = incluir_menores and not reglas_aspectos.get("catalog")
+    if sin_orbes or sin_catalogo:
+        # Copia superficial: el config efectivo es compartido
+        config = dict(config)
+        if sin_orbes:
+            config["orbs"] = [_orbes_por_defecto(c) for c in dict.fromkeys(cuerpos)]
+        if sin_catalogo:
+            catalogo = list(ASPECTOS_MAYORES) + list(ASPECTOS_MENORES)
+            config["rules"] = {**reglas, "aspects": {**reglas_aspectos, "catalog": catalogo}}
+    return _motor().compile_config(config)
+
+
+def matriz_aspectos(
+    lon_a: np.ndarray,
+    lon_b: np.ndarray,
+    vel_a: np.ndarray,
+    vel_b: np.ndarray,
+    cuerpos_a: Sequence[str],
+    cuerpos_b: Sequence[str],
+    compilada,
+    estrategia: Optional[str] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Núcleo vectorizado sobre `compilada.validar_rejilla`. Todas las salidas tienen forma (A, B).
+
+    Returns:
+        Dict con:
+          - distancia: separación angular en [0, 180]
+          - aspecto: índice en `compilada.aspectos` del aspecto válido (-1 si ninguno)
+          - orbe: desviación respecto al ángulo exacto (NaN si no hay aspecto)
+          - limite: orbe permitido para ese aspecto
+          - aplicativo: True si la desviación disminuye con las velocidades actuales
+            (`vel_b` a cero para tratar B como puntos fijos)
+    """
+    lon_a = np.asarray(lon_a, dtype="f8")
+    lon_b = np.asarray(lon_b, dtype="f8")
+
+    # Diferencia con signo en (-180, 180] y separación absoluta
+    delta = np.mod(lon_a[:, None] - lon_b[None, :] + 180.0, 360.0) - 180.0
+    distancia = np.abs(delta)
+
+    rejilla = compilada.validar_rejilla(cuerpos_a, cuerpos_b, distancia, estrategia)
+    hay_aspecto = rejilla["valido"]
+    aspecto = np.where(hay_aspecto, rejilla["aspecto"], -1)
+    exacto = compilada.exactos[np.maximum(aspecto, 0)] if len(compilada.exactos) else distancia
+
+    # d(distancia)/dt = sign(delta) * (vA - vB); la desviación disminuye si va hacia el exacto
+    vel_rel = np.asarray(vel_a, dtype="f8")[:, None] - np.asarray(vel_b, dtype="f8")[None, :]
+    d_distancia = np.sign(delta) * vel_rel
+    aplicativo = np.sign(distancia - exacto) * d_distancia < 0
+
+    return {
+        "distancia": distancia,
+        "aspecto": aspecto,
+        "orbe": np.where(hay_aspecto, rejilla["orbe"], np.nan),
+        "limite": np.where(hay_aspecto, rejilla["limite"], np.nan),
+        "aplicativo": aplicativo & hay_aspecto,
+    }
+
+
+def _extraer_puntos(planetas: Dict, incluir_angulos: Optional[Dict] = None) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Nombres, longitudes y velocidades de los cuerpos calculables de una carta."""
+    nombres, lons, vels = [], [], []
+    for nombre, pos in (planetas or {}).items():
+        if not isinstance(pos, dict) or pos.get("longitud") is None:
+            continue
+        nombres.append(str(nombre))
+        lons.append(float(pos["longitud"]))
+        vels.append(float(pos.get("velocidad") or 0.0))
+    for clave, etiqueta in (("ascendente", "Ascendente"), ("medio_cielo", "Medio Cielo")):
+        ang = (incluir_angulos or {}).get(clave)
+        if isinstance(ang, dict) and ang.get("longitud") is not None:
+            nombres.append(etiqueta)
+            lons.append(float(ang["longitud"]))
+            vels.append(0.0)
+    return nombres, np.array(lons, dtype="f8"), np.array(vels, dtype="f8")
+
+
+def _listar(
+    res: Dict[str, np.ndarray],
+    nombres_a: Sequence[str],
+    nombres_b: Sequence[str],
+    aspectos: Sequence[str],
+    angulos: np.ndarray,
+    solo_triangulo_superior: bool
+) -> List[Dict]:
+    filas, cols = np.nonzero(res["aspecto"] >= 0)
+    salida = []
+    for i, j in zip(filas.tolist(), cols.tolist()):
+        if solo_triangulo_superior and j <= i:
+            continue
+        k = int(res["aspecto"][i, j])
+        salida.append({
+            "p1": nombres_a[i],
+            "p2": nombres_b[j],
+            "tipo": aspectos[k],
+            "angulo_exacto": float(angulos[k]),
+            "distancia": round(float(res["distancia"][i, j]), 2),
+            "orbe": round(float(res["orbe"][i, j]), 2),
+            "limite": float(res["limite"][i, j]),
+            "aplicativo": bool(res["aplicativo"][i, j]),
+        })
+    salida.sort(key=lambda a: a["orbe"])
+    return salida
+
+
+def calcular_aspectos_natales(
+    planetas: Dict,
+    angulos: Optional[Dict] = None,
+    config: Optional[Dict] = None,
+    incluir_menores: bool = False
+) -> List[Dict]:
+    """
+    Aspectos entre los cuerpos de una misma carta (cada par una sola vez), ordenados por orbe.
+
+    Args:
+        planetas: `carta['planetas']` (formato de `calcular_posiciones_planetas`)
+        angulos: `carta['angulos']` para incluir Ascendente y Medio Cielo (opcional)
+        config: Config efectivo de OrbEngine (opcional)
+        incluir_menores: Incluir aspectos menores si el config no define catálogo
+    """
+    nombres, lons, vels = _extraer_puntos(planetas, angulos)
+    if len(nombres) < 2:
+        return []
+    compilada = compilar_config(config, nombres, incluir_menores)
+    res = matriz_aspectos(lons, lons, vels, vels, nombres, nombres, compilada)
+    return _listar(res, nombres, nombres, compilada.aspectos, compilada.exactos, solo_triangulo_superior=True)
+
+
+def calcular_aspectos_cruzados(
+    planetas_a: Dict,
+    planetas_b: Dict,
+    config: Optional[Dict] = None,
+    estrategia: Optional[str] = None,
+    incluir_menores: bool = False,
+    angulos_b: Optional[Dict] = None,
+    b_fijo: bool = True
+) -> List[Dict]:
+    """
+    Aspectos entre dos conjuntos de cuerpos (A × B): tránsitos→natal o sinastría.
+
+    Con RECEIVER_PRIORITY (tránsitos) manda el orbe del cuerpo de B (natal). Con `b_fijo` (tránsitos)
+    los puntos de B no se mueven: su velocidad registrada no interviene en aplicativo/separativo.
+    En sinastría (`b_fijo=False`) se usan las velocidades registradas de ambas cartas.
+    """
+    nombres_a, lons_a, vels_a = _extraer_puntos(planetas_a)
+    nombres_b, lons_b, vels_b = _extraer_puntos(planetas_b, angulos_b)
+    if b_fijo:
+        vels_b = np.zeros_like(lons_b)
+    if not nombres_a or not nombres_b:
+        return []
+    compilada = compilar_config(config, nombres_a + nombres_b, incluir_menores)
+    res = matriz_aspectos(lons_a, lons_b, vels_a, vels_b, nombres_a, nombres_b, compilada, estrategia)
+    return _listar(res, nombres_a, nombres_b, compilada.aspectos, compilada.exactos, solo_triangulo_superior=False)
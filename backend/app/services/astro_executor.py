@@ -0,0 +1,181 @@
+"""
+Pool de procesos acotado para el cálculo astrológico (CPU) fuera del event loop
+
+Swiss Ephemeris, `TimezoneFinder.timezone_at` y la localización con pytz son síncronos y
+ocupan la CPU: ejecutados dentro de un `async def` bloquean uvicorn (y con él el sondeo de
+progreso de informes). Este módulo ofrece un único pool compartido con:
+
+- Workers calientes: cada proceso fija la ruta de efemérides, carga TimezoneFinder y las
+  tablas precalculadas al arrancar (`_inicializar_worker`), no en la primera petición.
+- Contrapresión: como mucho `ASTRO_MAX_PENDING` tareas en vuelo; por encima se rechaza con
+  `PoolAstroSaturado` (los endpoints responden 503) en lugar de encolar sin límite.
+- Timeout por llamada (`ASTRO_TIMEOUT`, segundos).
+- Métricas: `ejecutar` y `map` traen con cada resultado lo medido en el worker y lo fusionan en
+  el registro del proceso principal (`GET /metrics` ve el desglose por etapa de los workers).
+
+Las funciones enviadas al pool deben ser de nivel de módulo (se serializan con pickle).
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import FIRST_EXCEPTION, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.services.metrics import ejecutar_con_delta, medir, registro
+
+ASTRO_WORKERS = int(os.getenv("ASTRO_WORKERS", "0") or 0) or (os.cpu_count() or 1)
+ASTRO_MAX_PENDING = int(os.getenv("ASTRO_MAX_PENDING", "0") or 0) or ASTRO_WORKERS * 8
+ASTRO_TIMEOUT = float(os.getenv("ASTRO_TIMEOUT", "30"))
+
+
+class PoolAstroSaturado(RuntimeError):
+    """El pool tiene demasiadas tareas en vuelo; el llamador debe reintentar más tarde."""
+
+
+def _inicializar_worker() -> None:
+    """Arranque de cada proceso: deja listos Swiss Ephemeris, TimezoneFinder y tablas."""
+    from app.services import ephemeris_files
+    from app.services.ephemeris_tables import obtener_tabla
+    from app.services.geolocation_service import tf
+
+    ephemeris_files.configurar_ruta()
+    # La primera consulta carga en memoria los polígonos de TimezoneFinder
+    tf.timezone_at(lat=40.4168, lng=-3.7038)
+    obtener_tabla()
+    # Abre los ficheros .se1 de todos los cuerpos una vez por worker (y marca los que faltan)
+    ephemeris_files.precalentar()
+
+
+class AstroExecutor:
+    """ProcessPoolExecutor compartido con límite de tareas en vuelo y timeouts."""
+
+    def __init__(
+        self,
+        max_workers: int = ASTRO_WORKERS,
+        max_pendientes: int = ASTRO_MAX_PENDING,
+        timeout: float = ASTRO_TIMEOUT
+    ):
+        self.max_workers = max_workers
+        self.max_pendientes = max_pendientes
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pendientes = 0
+        self.completadas = 0
+        self.rechazadas = 0
+        self.timeouts = 0
+        self.errores = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_inicializar_worker)
+            return self._pool
+
+    def _reservar(self, n: int = 1) -> None:
+        with self._lock:
+            if self.pendientes + n > self.max_pendientes:
+                self.rechazadas += 1
+                raise PoolAstroSaturado(
+                    f"Pool de cálculo saturado ({self.pendientes} tareas en vuelo, máximo {self.max_pendientes})"
+                )
+            self.pendientes += n
+
+    def _liberar(self, futuro: Future) -> None:
+        # Se libera al terminar en el worker, no al expirar el timeout: el proceso sigue ocupado
+        with self._lock:
+            self.pendientes -= 1
+            if futuro.cancelled() or futuro.exception() is not None:
+                self.errores += 1
+            else:
+                self.completadas += 1
+
+    def enviar(self, fn: Callable, *args: Any) -> Future:
+        """Envía una tarea al pool (síncrono). Lanza `PoolAstroSaturado` si no hay hueco."""
+        self._reservar()
+        try:
+            futuro = self._get_pool().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self.pendientes -= 1
+            raise
+        futuro.add_done_callback(self._liberar)
+        return futuro
+
+    async def ejecutar(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """Ejecuta `fn(*args)` en un worker y espera el resultado sin bloquear el event loop."""
+        futuro = self.enviar(ejecutar_con_delta, fn, *args)
+        try:
+            with medir("astro_pool.tarea"):
+                resultado, delta = await asyncio.wait_for(asyncio.wrap_future(futuro), timeout or self.timeout)
+            registro.fusionar(delta)
+            return resultado
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            futuro.cancel()
+            raise
+
+    def map(self, fn: Callable, bloques: Iterable[Any], timeout: Optional[float] = None) -> List[Any]:
+        """
+        `fn` sobre cada bloque en paralelo (uso síncrono, p.ej. lotes). Conserva el orden.
+        Si el envío falla a mitad (`PoolAstroSaturado`), se cancelan los bloques ya enviados.
+        El timeout es uno para todo el lote (no por bloque): al vencer se lanza `TimeoutError`.
+        """
+        futuros: List[Future] = []
+        try:
+            for bloque in bloques:
+                futuros.append(self.enviar(ejecutar_con_delta, fn, bloque))
+            _, pendientes = wait(futuros, timeout=timeout or self.timeout, return_when=FIRST_EXCEPTION)
+            fallido = next((f for f in futuros if f.done() and f.exception() is not None), None)
+            if fallido is not None:
+                raise fallido.exception()
+            if pendientes:
+                with self._lock:
+                    self.timeouts += 1
+                raise TimeoutError(f"Lote de {len(futuros)} bloques sin terminar tras {timeout or self.timeout}s")
+            resultados = []
+            for f in futuros:
+                resultado, delta = f.result()
+                registro.fusionar(delta)
+                resultados.append(resultado)
+            return resultados
+        finally:
+            for f in futuros:
+                f.cancel()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "iniciado": self._pool is not None,
+                "en_vuelo": self.pendientes,
+                "max_en_vuelo": self.max_pendientes,
+                "timeout_s": self.timeout,
+                "completadas": self.completadas,
+                "rechazadas": self.rechazadas,
+                "timeouts": self.timeouts,
+                "errores": self.errores,
+            }
+
+
+# Instancia global (un pool por proceso de uvicorn)
+astro_executor = AstroExecutor()
+
+
+async def ejecutar_astro(fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+    """Atajo para `astro_executor.ejecutar`."""
+    return await astro_executor.ejecutar(fn, *args, timeout=timeout)
+
+
+def precalentar_pool() -> None:
+    """Arranca todos los workers (llamar en el startup de la app)."""
+    pool = astro_executor._get_pool()
+    for f in [pool.submit(os.getpid) for _ in range(astro_executor.max_workers)]:
+        f.result()
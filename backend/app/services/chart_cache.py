@@ -0,0 +1,357 @@
+"""
+Caché de cartas completas (LRU + TTL) delante de `calcular_carta_completa`
+
+La misma carta se recalcula en la UI (`/ephemeris/calculate`), en los informes y en los flujos
+de WordPress. Este módulo normaliza los datos de nacimiento a una clave estable y guarda el
+resultado en:
+
+1. Un LRU en memoria por proceso (tamaño máximo + TTL, con contadores de aciertos/fallos).
+2. Opcionalmente, una colección MongoDB (`chart_cache`) compartida entre réplicas, con índice TTL.
+   Se activa con `CHART_CACHE_MONGO=1`.
+
+Los resultados se devuelven como copias profundas: los llamadores pueden mutar la carta
+(p.ej. añadir ciudad/país a `datos_entrada`) sin contaminar la caché.
+
+El zodiaco forma parte de la clave. Al calcular una carta sideral se guardan juntas la sideral y
+la tropical (salen de la misma pasada de efemérides, ver `CartaCompacta.a_sideral`), de modo que
+los informes con ambos zodiacos solo calculan una vez.
+"""
+import asyncio
+import copy
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.astro_executor import ejecutar_astro
+from app.services.chart_model import calcular_cartas_zodiacos
+from app.services.ephemeris import (
+    ZODIACO_SIDERAL,
+    ZODIACO_TROPICAL,
+    _resolver_zona_horaria,
+    calcular_carta_completa,
+    etiqueta_zodiaco,
+    normalizar_sistema_casas,
+)
+
+CHART_CACHE_MAX = int(os.getenv("CHART_CACHE_MAX", "2048"))
+CHART_CACHE_TTL = int(os.getenv("CHART_CACHE_TTL", str(7 * 24 * 3600)))
+CHART_CACHE_MONGO = (os.getenv("CHART_CACHE_MONGO") or "").strip().lower() in {"1", "true", "yes"}
+
+# Versión del formato de carta: subirla invalida todas las entradas persistidas
+CHART_CACHE_VERSION = 1
+
+
+def clave_carta(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None,
+    flags: str = ZODIACO_TROPICAL
+) -> str:
+    """
+    Clave normalizada de una carta.
+
+    Coordenadas redondeadas a 4 decimales (~11 m) y zona horaria resuelta, de modo que
+    "auto-detectada" y "explícita" comparten entrada si coinciden. `flags` es la etiqueta
+    del zodiaco (`etiqueta_zodiaco`: 'tropical' o 'sideral:<ayanamsa>').
+
+    Fecha y hora se parsean con el mismo formato que el cálculo ("9:05" y "09:05" comparten
+    entrada); una entrada que el cálculo rechazaría lanza ValueError aquí, antes de consultar la caché.
+    """
+    local_dt = datetime.strptime(f"{fecha} {hora}", "%Y-%m-%d %H:%M")
+    zona = _resolver_zona_horaria(float(latitud), float(longitud), zona_horaria)
+    partes = (
+        CHART_CACHE_VERSION,
+        local_dt.strftime("%Y-%m-%d"),
+        local_dt.strftime("%H:%M"),
+        f"{float(latitud):.4f}",
+        f"{float(longitud):.4f}",
+        zona,
+        normalizar_sistema_casas(sistema_casas),
+        flags,
+    )
+    return hashlib.sha1("|".join(str(p) for p in partes).encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """LRU en memoria con expiración por TTL. Thread-safe (los endpoints calculan en hilos)."""
+
+    def __init__(self, max_entries: int = CHART_CACHE_MAX, ttl_seconds: int = CHART_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, clave: str) -> Optional[Dict]:
+        with self._lock:
+            item = self._data.get(clave)
+            if item is None:
+                self.misses += 1
+                return None
+            guardado, carta = item
+            if time.monotonic() - guardado > self.ttl_seconds:
+                del self._data[clave]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(clave)
+            self.hits += 1
+        return copy.deepcopy(carta)
+
+    def put(self, clave: str, carta: Dict) -> None:
+        carta = copy.deepcopy(carta)
+        with self._lock:
+            self._data[clave] = (time.monotonic(), carta)
+            self._data.move_to_end(clave)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class MongoChartCacheTier:
+    """Segundo nivel persistente en MongoDB (colección con índice TTL sobre `expires_at`)."""
+
+    def __init__(self, ttl_seconds: int = CHART_CACHE_TTL):
+        self.ttl_seconds = ttl_seconds
+        self._collection = None
+        self._index_ready = False
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _get_collection(self):
+        if self._collection is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            mongo_url = os.getenv("MONGODB_URL") or os.getenv("MONGODB_URI") or "mongodb://localhost:27017"
+            options = {"serverSelectionTimeoutMS": 5000, "connectTimeoutMS": 10000}
+            if "mongodb+srv://" in mongo_url or "mongodb.net" in mongo_url:
+                options.update({"tls": True, "tlsAllowInvalidCertificates": True})
+            self._collection = AsyncIOMotorClient(mongo_url, **options).fraktal.chart_cache
+        return self._collection
+
+    async def _ensure_index(self) -> None:
+        if not self._index_ready:
+            await self._get_collection().create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+
+    async def get(self, clave: str) -> Optional[Dict]:
+        try:
+            doc = await self._get_collection().find_one(
+                {"_id": clave, "expires_at": {"$gt": datetime.utcnow()}},
+                {"carta": 1}
+            )
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ chart_cache Mongo no disponible (get): {e}")
+            return None
+        if not doc:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return doc.get("carta")
+
+    async def put(self, clave: str, carta: Dict) -> None:
+        try:
+            await self._ensure_index()
+            await self._get_collection().replace_one(
+                {"_id": clave},
+                {
+                    "_id": clave,
+                    "carta": carta,
+                    "created_at": datetime.utcnow(),
+                    "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds),
+                },
+                upsert=True
+            )
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ chart_cache Mongo no disponible (put): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+# Instancias globales
+chart_cache = ChartCache()
+chart_cache_mongo: Optional[MongoChartCacheTier] = MongoChartCacheTier() if CHART_CACHE_MONGO else None
+
+
+def _claves_zodiacos(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str],
+    sistema_casas: Optional[str],
+    ayanamsa: Optional[str]
+) -> Dict[str, str]:
+    """Claves de caché de la carta tropical y de la sideral con ese ayanamsa."""
+    return {
+        zodiaco: clave_carta(fecha, hora, latitud, longitud, zona_horaria, sistema_casas,
+                             etiqueta_zodiaco(zodiaco, ayanamsa))
+        for zodiaco in (ZODIACO_TROPICAL, ZODIACO_SIDERAL)
+    }
+
+
+def calcular_carta_cacheada(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None,
+    zodiaco: Optional[str] = None,
+    ayanamsa: Optional[str] = None
+) -> Dict:
+    """`calcular_carta_completa` con caché en memoria (uso síncrono)."""
+    etiqueta = etiqueta_zodiaco(zodiaco, ayanamsa)
+    if etiqueta != ZODIACO_TROPICAL:
+        return calcular_cartas_zodiacos_cacheadas(
+            fecha, hora, latitud, longitud, zona_horaria, sistema_casas, ayanamsa
+        )[ZODIACO_SIDERAL]
+
+    clave = clave_carta(fecha, hora, latitud, longitud, zona_horaria, sistema_casas)
+    carta = chart_cache.get(clave)
+    if carta is not None:
+        return carta
+
+    carta = calcular_carta_completa(fecha, hora, latitud, longitud, zona_horaria, sistema_casas)
+    chart_cache.put(clave, carta)
+    return carta
+
+
+def calcular_cartas_zodiacos_cacheadas(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None,
+    ayanamsa: Optional[str] = None
+) -> Dict[str, Dict]:
+    """
+    {'tropical': carta, 'sideral': carta} con caché en memoria. Si falta alguna de las dos se
+    calculan ambas en una pasada y se guardan juntas.
+    """
+    claves = _claves_zodiacos(fecha, hora, latitud, longitud, zona_horaria, sistema_casas, ayanamsa)
+    cartas = {zodiaco: chart_cache.get(clave) for zodiaco, clave in claves.items()}
+    if all(c is not None for c in cartas.values()):
+        return cartas
+
+    cartas = calcular_cartas_zodiacos(fecha, hora, latitud, longitud, zona_horaria, sistema_casas, ayanamsa)
+    for zodiaco, clave in claves.items():
+        chart_cache.put(clave, cartas[zodiaco])
+    return cartas
+
+
+async def calcular_carta_cacheada_async(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None,
+    zodiaco: Optional[str] = None,
+    ayanamsa: Optional[str] = None
+) -> Dict:
+    """
+    `calcular_carta_completa` con caché en dos niveles (memoria → Mongo → cálculo).
+    El cálculo se ejecuta en el pool de procesos (`astro_executor`), fuera del event loop.
+    """
+    if etiqueta_zodiaco(zodiaco, ayanamsa) != ZODIACO_TROPICAL:
+        cartas = await calcular_cartas_zodiacos_cacheadas_async(
+            fecha, hora, latitud, longitud, zona_horaria, sistema_casas, ayanamsa
+        )
+        return cartas[ZODIACO_SIDERAL]
+
+    # La zona se resuelve aquí (memoizada) para que el worker no repita la detección
+    zona_horaria = await asyncio.to_thread(_resolver_zona_horaria, float(latitud), float(longitud), zona_horaria)
+    clave = clave_carta(fecha, hora, latitud, longitud, zona_horaria, sistema_casas)
+    carta = chart_cache.get(clave)
+    if carta is not None:
+        return carta
+
+    if chart_cache_mongo is not None:
+        carta = await chart_cache_mongo.get(clave)
+        if carta is not None:
+            chart_cache.put(clave, carta)
+            return copy.deepcopy(carta)
+
+    carta = await ejecutar_astro(calcular_carta_completa, fecha, hora, latitud, longitud, zona_horaria, sistema_casas)
+    chart_cache.put(clave, carta)
+    if chart_cache_mongo is not None:
+        await chart_cache_mongo.put(clave, copy.deepcopy(carta))
+    return carta
+
+
+async def calcular_cartas_zodiacos_cacheadas_async(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None,
+    ayanamsa: Optional[str] = None
+) -> Dict[str, Dict]:
+    """
+    Versión async de `calcular_cartas_zodiacos_cacheadas` (memoria → Mongo → pool de procesos).
+    Tropical y sideral se calculan juntas en una tarea y se guardan juntas en ambos niveles.
+    """
+    zona_horaria = await asyncio.to_thread(_resolver_zona_horaria, float(latitud), float(longitud), zona_horaria)
+    claves = _claves_zodiacos(fecha, hora, latitud, longitud, zona_horaria, sistema_casas, ayanamsa)
+    cartas = {zodiaco: chart_cache.get(clave) for zodiaco, clave in claves.items()}
+
+    if chart_cache_mongo is not None:
+        for zodiaco, clave in claves.items():
+            if cartas[zodiaco] is None:
+                cartas[zodiaco] = await chart_cache_mongo.get(clave)
+                if cartas[zodiaco] is not None:
+                    chart_cache.put(clave, cartas[zodiaco])
+                    cartas[zodiaco] = copy.deepcopy(cartas[zodiaco])
+    if all(c is not None for c in cartas.values()):
+        return cartas
+
+    cartas = await ejecutar_astro(
+        calcular_cartas_zodiacos, fecha, hora, latitud, longitud, zona_horaria, sistema_casas, ayanamsa
+    )
+    for zodiaco, clave in claves.items():
+        chart_cache.put(clave, cartas[zodiaco])
+        if chart_cache_mongo is not None:
+            await chart_cache_mongo.put(clave, copy.deepcopy(cartas[zodiaco]))
+    return cartas
+
+
+def estadisticas_cache() -> Dict[str, Any]:
+    return {
+        "memoria": chart_cache.stats(),
+        "mongo": chart_cache_mongo.stats() if chart_cache_mongo is not None else None,
+    }
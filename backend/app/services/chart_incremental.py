@@ -0,0 +1,155 @@
+"""
+Recálculo incremental de cartas (editor interactivo)
+
+Al retocar hora o lugar en el editor, casi todo el documento de la carta sigue igual. Dada la
+carta anterior y los nuevos datos de nacimiento:
+
+- Mismo instante UTC (solo cambia el lugar, o la zona compensa): los planetas (geocéntricos)
+  no cambian; solo se recalculan casas, ángulos y la casa de cada planeta.
+- Desplazamiento pequeño: los cuerpos cuyo movimiento en ese intervalo es menor que
+  `UMBRAL_EXTRAPOLACION_GRADOS` se extrapolan con su velocidad (error de segundo orden,
+  despreciable) en lugar de recalcularse; el resto (Luna, Sol...) se recalcula.
+- Desplazamientos grandes: se recalculan todos los cuerpos.
+
+La respuesta es un diff compacto (solo los campos que cambian), aplicable con `aplicar_diff`.
+"""
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from app.services.chart_model import CartaCompacta
+from app.services.ephemeris import PLANETAS, _datos_entrada, _localizar, calcular_cuspides, normalizar_sistema_casas
+from app.services.ephemeris_vector import FLAGS_POR_DEFECTO
+
+# Por debajo de este movimiento (grados) un cuerpo se extrapola linealmente en vez de recalcularse
+UMBRAL_EXTRAPOLACION_GRADOS = 1.0 / 60.0
+
+# Por encima de este desplazamiento (días) se recalcula todo
+MAX_DESPLAZAMIENTO_INCREMENTAL_DIAS = 2.0
+
+MODO_SOLO_CASAS = "solo_casas"
+MODO_PARCIAL = "parcial"
+MODO_COMPLETO = "completo"
+
+
+def _diff(anterior: Any, nuevo: Any) -> Tuple[bool, Any]:
+    """(hay_cambios, diff). Dicts por clave; listas de dicts con 'numero' por elemento; resto por valor."""
+    if isinstance(anterior, dict) and isinstance(nuevo, dict):
+        cambios = {}
+        for clave, valor in nuevo.items():
+            if clave not in anterior:
+                cambios[clave] = valor
+                continue
+            distinto, sub = _diff(anterior[clave], valor)
+            if distinto:
+                cambios[clave] = sub
+        for clave in anterior:
+            if clave not in nuevo:
+                cambios[clave] = None
+        return bool(cambios), cambios
+    if (isinstance(anterior, list) and isinstance(nuevo, list) and len(anterior) == len(nuevo)
+            and all(isinstance(x, dict) and 'numero' in x for x in nuevo)):
+        cambios = []
+        for a, n in zip(anterior, nuevo):
+            distinto, sub = _diff(a, n)
+            if distinto:
+                cambios.append({'numero': n['numero'], **sub})
+        return bool(cambios), cambios
+    return anterior != nuevo, nuevo
+
+
+def aplicar_diff(carta: Dict, diff: Dict) -> Dict:
+    """Reconstruye la carta completa aplicando un diff de `recalcular_incremental` (no muta `carta`)."""
+    def _aplicar(base, cambios):
+        if isinstance(cambios, dict) and isinstance(base, dict):
+            out = dict(base)
+            for clave, valor in cambios.items():
+                if valor is None:
+                    out[clave] = None
+                else:
+                    out[clave] = _aplicar(base.get(clave), valor)
+            return out
+        if isinstance(cambios, list) and isinstance(base, list) and all(isinstance(x, dict) and 'numero' in x for x in cambios):
+            out = [dict(x) for x in base]
+            por_numero = {x['numero']: i for i, x in enumerate(out)}
+            for c in cambios:
+                out[por_numero[c['numero']]] = _aplicar(out[por_numero[c['numero']]], c)
+            return out
+        return copy.deepcopy(cambios)
+
+    return _aplicar(carta, diff['cambios'])
+
+
+def diff_completo(nueva: Dict) -> Dict:
+    """
+    Diff de una carta calculada desde cero (sin carta anterior a mano): `cambios` es la carta
+    entera, de modo que `aplicar_diff` sobre la carta anterior del cliente da igualmente `nueva`.
+    """
+    return {
+        'modo': MODO_COMPLETO,
+        'desplazamiento_dias': None,
+        'recalculados': [nombre for nombre, pos in (nueva.get('planetas') or {}).items() if pos],
+        'extrapolados': [],
+        'cambios': nueva,
+    }
+
+
+def recalcular_incremental(
+    anterior: Dict,
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None
+) -> Tuple[Dict, Dict]:
+    """
+    Carta para los nuevos datos partiendo de `anterior` (resultado de `calcular_carta_completa`).
+
+    Returns:
+        (carta nueva completa, diff) donde diff = {modo, desplazamiento_dias, recalculados,
+        extrapolados, cambios}
+    """
+    # Si la carta anterior sustituyó el sistema (latitud polar), se parte del pedido originalmente
+    previo = anterior['datos_entrada']
+    sistema = normalizar_sistema_casas(
+        sistema_casas or (previo.get('fallback_casas') or {}).get('solicitado') or previo.get('sistema_casas')
+    )
+    jd_ut, local_dt, dt_aware, dt_utc, zona = _localizar(fecha, hora, latitud, longitud, zona_horaria)
+
+    base = CartaCompacta.desde_dict(anterior)
+    posiciones = base.posiciones.copy()
+    delta = jd_ut - base.jd_ut
+
+    recalculados: List[str] = []
+    extrapolados: List[str] = []
+    if abs(delta) < 1e-9:
+        modo = MODO_SOLO_CASAS
+    else:
+        modo = MODO_PARCIAL if abs(delta) <= MAX_DESPLAZAMIENTO_INCREMENTAL_DIAS else MODO_COMPLETO
+        for b, nombre in enumerate(base.cuerpos):
+            lon, vel = posiciones['lon'][b], posiciones['speed'][b]
+            if np.isnan(lon):
+                continue  # Cuerpo no calculable (p.ej. Quirón sin .se1): seguirá sin datos
+            if modo == MODO_PARCIAL and abs(vel * delta) < UMBRAL_EXTRAPOLACION_GRADOS:
+                posiciones['lon'][b] = (lon + vel * delta) % 360.0
+                extrapolados.append(nombre)
+                continue
+            res = swe.calc_ut(jd_ut, PLANETAS[nombre], FLAGS_POR_DEFECTO)[0]
+            posiciones[b] = tuple(res[:4])
+            recalculados.append(nombre)
+
+    cuspides, ascmc, usado, fallback = calcular_cuspides(jd_ut, latitud, longitud, sistema)
+    datos = _datos_entrada(fecha, hora, latitud, longitud, local_dt, dt_aware, dt_utc, zona, usado, fallback)
+    nueva = CartaCompacta(jd_ut, posiciones, cuspides[:12], ascmc[0], ascmc[1], usado, datos, base.cuerpos).a_dict()
+
+    _, cambios = _diff(anterior, nueva)
+    return nueva, {
+        'modo': modo,
+        'desplazamiento_dias': round(float(delta), 8),
+        'recalculados': recalculados,
+        'extrapolados': extrapolados,
+        'cambios': cambios,
+    }
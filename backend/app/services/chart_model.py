@@ -0,0 +1,218 @@
+"""
+Modelo compacto de carta (`CartaCompacta`)
+
+Una carta de `calcular_carta_completa` son ~20 dicts anidados con claves de texto y f-strings
+ya formateados por cuerpo, casa y ángulo. Para lotes, pools de procesos y cachés eso es peso
+muerto: la información real cabe en unos pocos arrays.
+
+`CartaCompacta` guarda solo lo calculado (un array estructurado por cuerpo, 12 cúspides,
+ASC/MC y el bloque `datos_entrada`) en `__slots__`. El formato legacy (dict) y el JSON se
+generan bajo demanda con `a_dict()` / `a_json()` y son idénticos a los de
+`calcular_carta_completa`, así que los consumidores existentes no cambian.
+
+La variante sideral (`a_sideral`) sale de la tropical restando el ayanamsa al array completo de
+longitudes, a las cúspides y a ASC/MC: tropical y sideral cuestan una sola pasada de efemérides.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import swisseph as swe
+
+from app.services.ephemeris import (
+    ZODIACO_SIDERAL,
+    ZODIACO_TROPICAL,
+    _datos_entrada,
+    _formatear_casas,
+    _localizar,
+    calcular_cuspides,
+    calcular_parte_fortuna,
+    normalizar_ayanamsa,
+    normalizar_sistema_casas,
+    valor_ayanamsa,
+)
+from app.services.ephemeris_vector import CUERPOS, POSICION_DTYPE, calcular_posiciones_array, declinaciones, posiciones_a_dict
+from app.services.house_index import IndiceCasas
+
+
+class CartaCompacta:
+    """Carta natal en arrays, con conversión perezosa al formato de dicts legacy."""
+
+    __slots__ = ("jd_ut", "cuerpos", "posiciones", "casas", "cuspides", "ascendente", "medio_cielo",
+                 "sistema", "datos_entrada")
+
+    def __init__(
+        self,
+        jd_ut: float,
+        posiciones: np.ndarray,
+        cuspides: Sequence[float],
+        ascendente: float,
+        medio_cielo: float,
+        sistema: str,
+        datos_entrada: Dict[str, Any],
+        cuerpos: Sequence[str] = CUERPOS
+    ):
+        self.jd_ut = float(jd_ut)
+        self.cuerpos = tuple(cuerpos)
+        self.posiciones = posiciones
+        self.cuspides = np.asarray(cuspides, dtype="f8")
+        self.ascendente = float(ascendente)
+        self.medio_cielo = float(medio_cielo)
+        self.sistema = sistema
+        self.datos_entrada = datos_entrada
+        # Casa (1-12) de cada cuerpo; 0 si el cuerpo no se pudo calcular
+        self.casas = (IndiceCasas(self.cuspides).indices(posiciones['lon']) + 1).astype("i1")
+
+    def longitud(self, cuerpo: str) -> Optional[float]:
+        """Longitud eclíptica de un cuerpo (None si no se pudo calcular)."""
+        lon = float(self.posiciones['lon'][self.cuerpos.index(cuerpo)])
+        return None if np.isnan(lon) else lon
+
+    def casa(self, cuerpo: str) -> int:
+        return int(self.casas[self.cuerpos.index(cuerpo)])
+
+    def declinaciones(self) -> np.ndarray:
+        """Declinación de cada cuerpo (NaN si no se pudo calcular), para paralelos y contraparalelos."""
+        eps = swe.calc_ut(self.jd_ut, swe.ECL_NUT)[0][0]
+        # La declinación es ecuatorial: en una carta sideral se deshace el ayanamsa
+        lon = self.posiciones['lon'] + self.datos_entrada.get('ayanamsa_valor', 0.0)
+        return declinaciones(lon, self.posiciones['lat'], eps)
+
+    def a_dict(self) -> Dict:
+        """Carta en el formato de `calcular_carta_completa` (se construye en cada llamada)."""
+        planetas = posiciones_a_dict(self.posiciones, self.cuerpos)
+        for b, nombre in enumerate(self.cuerpos):
+            if planetas[nombre] is not None:
+                planetas[nombre]['casa'] = int(self.casas[b])
+
+        casas_data = _formatear_casas(tuple(self.cuspides.tolist()), (self.ascendente, self.medio_cielo), self.sistema)
+        return {
+            'datos_entrada': dict(self.datos_entrada),
+            'planetas': planetas,
+            'casas': casas_data['casas'],
+            'angulos': {
+                'ascendente': casas_data['ascendente'],
+                'medio_cielo': casas_data['medio_cielo'],
+                'parte_fortuna': calcular_parte_fortuna(
+                    self.ascendente, self.longitud('Sol'), self.longitud('Luna')
+                )
+            }
+        }
+
+    def a_json(self) -> str:
+        return json.dumps(self.a_dict(), ensure_ascii=False)
+
+    @property
+    def zodiaco(self) -> str:
+        return self.datos_entrada.get('zodiaco', ZODIACO_TROPICAL)
+
+    def a_sideral(self, ayanamsa: Optional[str] = None) -> "CartaCompacta":
+        """
+        Variante sideral de esta carta tropical: un único desplazamiento vectorial (- ayanamsa)
+        sobre todas las longitudes, las cúspides y los ángulos. Las velocidades se conservan
+        (la tasa del ayanamsa, ~0.00004°/día, no cambia ninguna retrogradación práctica).
+
+        Raises:
+            ValueError: si la carta ya es sideral o el ayanamsa no está soportado
+        """
+        if self.zodiaco != ZODIACO_TROPICAL:
+            raise ValueError("La carta ya es sideral")
+        nombre = normalizar_ayanamsa(ayanamsa)
+        aya = valor_ayanamsa(self.jd_ut, nombre)
+
+        posiciones = self.posiciones.copy()
+        posiciones['lon'] = np.mod(posiciones['lon'] - aya, 360.0)  # NaN (sin datos) sigue siendo NaN
+        ascendente = (self.ascendente - aya) % 360.0
+        if self.sistema == 'whole_sign':
+            # Signos enteros: las cúspides son los comienzos de signo a partir del ASC sideral
+            cuspides = np.mod((ascendente // 30.0) * 30.0 + 30.0 * np.arange(12), 360.0)
+        else:
+            cuspides = np.mod(self.cuspides - aya, 360.0)
+
+        datos = dict(self.datos_entrada)
+        datos.update({'zodiaco': ZODIACO_SIDERAL, 'ayanamsa': nombre, 'ayanamsa_valor': round(aya, 6)})
+        return CartaCompacta(
+            self.jd_ut, posiciones, cuspides, ascendente, (self.medio_cielo - aya) % 360.0,
+            self.sistema, datos, self.cuerpos
+        )
+
+    @classmethod
+    def desde_dict(cls, carta: Dict) -> "CartaCompacta":
+        """Reconstruye la forma compacta desde una carta legacy (p.ej. un documento de Mongo)."""
+        datos = carta['datos_entrada']
+        fecha_utc = datetime.strptime(datos['fecha_utc'].replace(" UTC", ""), "%Y-%m-%d %H:%M:%S")
+        jd_ut = swe.julday(fecha_utc.year, fecha_utc.month, fecha_utc.day,
+                           fecha_utc.hour + fecha_utc.minute / 60.0 + fecha_utc.second / 3600.0)
+        cuerpos = tuple(carta['planetas'])
+        posiciones = np.full(len(cuerpos), np.nan, dtype=POSICION_DTYPE)
+        for b, nombre in enumerate(cuerpos):
+            pos = carta['planetas'][nombre]
+            if pos is not None:
+                posiciones['lon'][b] = pos['longitud']
+                posiciones['speed'][b] = pos.get('velocidad', 0.0)
+        return cls(
+            jd_ut,
+            posiciones,
+            [c['cuspide'] for c in carta['casas']],
+            carta['angulos']['ascendente']['longitud'],
+            carta['angulos']['medio_cielo']['longitud'],
+            datos.get('sistema_casas') or normalizar_sistema_casas(None),
+            dict(datos),
+            cuerpos
+        )
+
+    def __repr__(self) -> str:
+        return f"CartaCompacta({self.datos_entrada.get('fecha_utc')}, {self.sistema}, {len(self.cuerpos)} cuerpos)"
+
+
+def carta_compacta_desde_localizacion(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    jd_ut: float,
+    local_dt: datetime,
+    dt_aware: datetime,
+    dt_utc: datetime,
+    zona_horaria: str,
+    sistema_casas: Optional[str] = None
+) -> CartaCompacta:
+    """Equivalente compacto de `_carta_desde_localizacion` (misma localización, sin dicts por cuerpo)."""
+    sistema = normalizar_sistema_casas(sistema_casas)
+    posiciones = calcular_posiciones_array([jd_ut])[0]
+    cuspides, ascmc, usado, fallback = calcular_cuspides(jd_ut, latitud, longitud, sistema)
+    datos = _datos_entrada(fecha, hora, latitud, longitud, local_dt, dt_aware, dt_utc, zona_horaria, usado, fallback)
+    return CartaCompacta(jd_ut, posiciones, cuspides[:12], ascmc[0], ascmc[1], usado, datos)
+
+
+def cartas_por_zodiaco(carta: CartaCompacta, ayanamsa: Optional[str] = None) -> Dict[str, CartaCompacta]:
+    """{'tropical': carta, 'sideral': carta.a_sideral(ayanamsa)} a partir de una carta tropical."""
+    return {ZODIACO_TROPICAL: carta, ZODIACO_SIDERAL: carta.a_sideral(ayanamsa)}
+
+
+def calcular_cartas_zodiacos(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None,
+    ayanamsa: Optional[str] = None
+) -> Dict[str, Dict]:
+    """Cartas tropical y sideral (formato legacy) de una sola pasada de efemérides."""
+    carta = calcular_carta_compacta(fecha, hora, latitud, longitud, zona_horaria, sistema_casas)
+    return {zodiaco: c.a_dict() for zodiaco, c in cartas_por_zodiaco(carta, ayanamsa).items()}
+
+
+def calcular_carta_compacta(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None
+) -> CartaCompacta:
+    """Como `calcular_carta_completa`, pero devuelve una `CartaCompacta`."""
+    localizacion = _localizar(fecha, hora, latitud, longitud, zona_horaria)
+    return carta_compacta_desde_localizacion(fecha, hora, latitud, longitud, *localizacion, sistema_casas=sistema_casas)
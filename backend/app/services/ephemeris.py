@@ -3,15 +3,31 @@ Servicio de cálculo de efemérides astrológicas usando Swiss Ephemeris
 Precisión profesional para análisis psico-astrológicos
 """
 import swisseph as swe
+import json
+import logging
 import math
-from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+import os
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Optional
 import pytz
+from app.services.astro_executor import astro_executor
 from app.services.geolocation_service import coordenadas_a_timezone
+from app.services.house_index import IndiceCasas
+from app.services.ephemeris_files import (
+    configurar_ruta as configurar_ruta_efemerides,
+    disponible,
+    es_fichero_no_encontrado,
+    marcar_no_disponible,
+)
+from app.services.metrics import contar, medir, traza
 
-# Configuración inicial: Usar efemérides analíticas Moshier
-# (precisión suficiente y sin archivos externos)
-swe.set_ephe_path('')
+logger = logging.getLogger(__name__)
+
+# Configuración inicial: ficheros .se1 de SWISSEPH_PATH si está definida; si no, efemérides
+# analíticas Moshier (precisión suficiente y sin archivos externos; sin Quirón ni asteroides)
+configurar_ruta_efemerides()
 
 # Constantes
 SIGNOS = ['Aries', 'Tauro', 'Géminis', 'Cáncer', 'Leo', 'Virgo',
@@ -33,6 +49,200 @@ PLANETAS = {
     'Nodo Norte': swe.TRUE_NODE     # Nodo Verdadero
 }
 
+# Nombre de la etapa de métricas de cada cuerpo (evita formatear el string en cada llamada)
+_ETAPAS_CALC_UT = {nombre: f"calc_ut.{nombre}" for nombre in PLANETAS}
+
+# Sistemas de casas soportados (nombre en config -> código Swiss Ephemeris)
+SISTEMAS_CASAS = {
+    'placidus': b'P',
+    'koch': b'K',
+    'whole_sign': b'W',
+    'equal': b'E',
+    'regiomontanus': b'R',
+    'campanus': b'C',
+    'porphyry': b'O',
+}
+
+NOMBRES_SISTEMAS_CASAS = {
+    'placidus': 'Placidus',
+    'koch': 'Koch',
+    'whole_sign': 'Signos Enteros',
+    'equal': 'Casas Iguales',
+    'regiomontanus': 'Regiomontanus',
+    'campanus': 'Campanus',
+    'porphyry': 'Porfirio',
+}
+
+
+def _cargar_config_efemerides() -> Dict[str, Any]:
+    """
+    Config base de efemérides (`data_knowledge_base/00_core_astrologia/efemerides_config.json`).
+    Se busca bajo KB_ROOT y, si no, en la raíz del repositorio.
+    """
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    candidatos = [
+        os.path.join(os.getenv("KB_ROOT") or "data_knowledge_base", "00_core_astrologia", "efemerides_config.json"),
+        os.path.join(repo_root, "data_knowledge_base", "00_core_astrologia", "efemerides_config.json"),
+    ]
+    for ruta in candidatos:
+        try:
+            if os.path.exists(ruta):
+                with open(ruta, "r", encoding="utf-8") as f:
+                    return json.load(f) or {}
+        except Exception as e:
+            print(f"⚠️ No se pudo leer {ruta}: {e}")
+    return {}
+
+
+EFEMERIDES_CONFIG = _cargar_config_efemerides()
+
+
+def normalizar_sistema_casas(sistema: Optional[str]) -> str:
+    """
+    Devuelve el nombre canónico del sistema de casas.
+    None -> EPHEMERIS_HOUSE_SYSTEM o `house_system` del config (por defecto Placidus).
+
+    Raises:
+        ValueError: si el sistema no está soportado
+    """
+    if sistema is None:
+        sistema = os.getenv("EPHEMERIS_HOUSE_SYSTEM") or EFEMERIDES_CONFIG.get("house_system") or "placidus"
+    clave = str(sistema).strip().lower().replace(" ", "_").replace("-", "_")
+    if clave not in SISTEMAS_CASAS:
+        raise ValueError(
+            f"Sistema de casas no soportado: {sistema}. Opciones: {', '.join(SISTEMAS_CASAS)}"
+        )
+    return clave
+
+
+# Zodiaco: tropical (por defecto) o sideral con el ayanamsa indicado. La carta sideral no
+# recalcula efemérides: resta el ayanamsa a todas las longitudes de la tropical (`chart_model`)
+ZODIACO_TROPICAL = 'tropical'
+ZODIACO_SIDERAL = 'sideral'
+_ALIAS_ZODIACO = {'tropical': ZODIACO_TROPICAL, 'sideral': ZODIACO_SIDERAL, 'sidereal': ZODIACO_SIDERAL}
+
+AYANAMSAS = {
+    'lahiri': swe.SIDM_LAHIRI,
+    'fagan_bradley': swe.SIDM_FAGAN_BRADLEY,
+    'krishnamurti': swe.SIDM_KRISHNAMURTI,
+    'raman': swe.SIDM_RAMAN,
+    'yukteshwar': swe.SIDM_YUKTESHWAR,
+    'true_citra': swe.SIDM_TRUE_CITRA,
+    'djwhal_khul': swe.SIDM_DJWHAL_KHUL,
+    'deluce': swe.SIDM_DELUCE,
+}
+
+# `swe.set_sid_mode` es estado global del proceso: modo + consulta van juntos bajo el lock
+_lock_ayanamsa = threading.Lock()
+
+
+def normalizar_zodiaco(zodiaco: Optional[str]) -> str:
+    """
+    'tropical' o 'sideral'. None -> EPHEMERIS_ZODIAC o `zodiac` del config (por defecto tropical).
+
+    Raises:
+        ValueError: si el zodiaco no está soportado
+    """
+    if zodiaco is None:
+        zodiaco = os.getenv("EPHEMERIS_ZODIAC") or EFEMERIDES_CONFIG.get("zodiac") or ZODIACO_TROPICAL
+    clave = str(zodiaco).strip().lower()
+    if clave not in _ALIAS_ZODIACO:
+        raise ValueError(f"Zodiaco no soportado: {zodiaco}. Opciones: {ZODIACO_TROPICAL}, {ZODIACO_SIDERAL}")
+    return _ALIAS_ZODIACO[clave]
+
+
+def normalizar_ayanamsa(ayanamsa: Optional[str]) -> str:
+    """
+    Nombre canónico del ayanamsa. None -> EPHEMERIS_AYANAMSA o `ayanamsa` del config (por defecto Lahiri).
+
+    Raises:
+        ValueError: si el ayanamsa no está soportado
+    """
+    if ayanamsa is None:
+        ayanamsa = os.getenv("EPHEMERIS_AYANAMSA") or EFEMERIDES_CONFIG.get("ayanamsa") or "lahiri"
+    clave = str(ayanamsa).strip().lower().replace(" ", "_").replace("-", "_")
+    if clave not in AYANAMSAS:
+        raise ValueError(f"Ayanamsa no soportado: {ayanamsa}. Opciones: {', '.join(AYANAMSAS)}")
+    return clave
+
+
+def etiqueta_zodiaco(zodiaco: Optional[str] = None, ayanamsa: Optional[str] = None) -> str:
+    """Identificador estable del zodiaco (clave de caché): 'tropical' o 'sideral:<ayanamsa>'."""
+    zodiaco = normalizar_zodiaco(zodiaco)
+    if zodiaco == ZODIACO_TROPICAL:
+        return ZODIACO_TROPICAL
+    return f"{ZODIACO_SIDERAL}:{normalizar_ayanamsa(ayanamsa)}"
+
+
+def valor_ayanamsa(jd_ut: float, ayanamsa: Optional[str] = None) -> float:
+    """
+    Ayanamsa verdadero (con nutación) en grados: longitud tropical - longitud sideral, el mismo
+    que aplica Swiss Ephemeris con FLG_SIDEREAL a planetas y casas.
+    """
+    modo = AYANAMSAS[normalizar_ayanamsa(ayanamsa)]
+    with _lock_ayanamsa:
+        swe.set_sid_mode(modo)
+        return swe.get_ayanamsa_ex_ut(jd_ut, swe.FLG_SWIEPH)[1]
+
+
+# Sistemas sin definición por encima de los círculos polares (|lat| >= 90° - oblicuidad):
+# allí se sustituyen de forma determinista por `SISTEMA_CASAS_POLAR`
+SISTEMAS_NO_POLARES = frozenset({'placidus', 'koch'})
+SISTEMA_CASAS_POLAR = normalizar_sistema_casas(os.getenv("EPHEMERIS_POLAR_FALLBACK") or "porphyry")
+
+# Por debajo de esta latitud ningún sistema falla (evita calcular la oblicuidad)
+_LATITUD_POLAR_MIN = 66.0
+
+# Combinaciones (sistema, latitud) que ya fallaron en Swiss Ephemeris: no se reintentan
+_COMBINACIONES_FALLIDAS: set = set()
+_MAX_COMBINACIONES_FALLIDAS = 4096
+
+
+def sistema_casas_efectivo(jd_ut: float, lat: float, sistema: str) -> Tuple[str, Optional[str]]:
+    """
+    Sistema que se usará realmente y el motivo de la sustitución (None si no la hay).
+    Se decide antes de llamar a Swiss Ephemeris: no se paga un error por carta polar.
+    """
+    if (sistema, round(lat, 4)) in _COMBINACIONES_FALLIDAS:
+        return SISTEMA_CASAS_POLAR, "error_previo"
+    if sistema in SISTEMAS_NO_POLARES and abs(lat) >= _LATITUD_POLAR_MIN:
+        eps = swe.calc_ut(jd_ut, swe.ECL_NUT)[0][0]
+        if abs(lat) >= 90.0 - eps:
+            return SISTEMA_CASAS_POLAR, "latitud_polar"
+    return sistema, None
+
+
+def calcular_cuspides(
+    jd_ut: float,
+    lat: float,
+    lon: float,
+    sistema: str
+) -> Tuple[Tuple[float, ...], Tuple[float, ...], str, Optional[Dict[str, str]]]:
+    """
+    `swe.houses` con sustitución polar.
+
+    Returns:
+        (cúspides, ascmc, sistema usado, fallback) con fallback = {solicitado, usado, motivo}
+        o None si se usó el sistema pedido.
+    """
+    usado, motivo = sistema_casas_efectivo(jd_ut, lat, sistema)
+    if usado != sistema:
+        contar(f"casas.fallback.{motivo}")
+    try:
+        cuspides, ascmc = swe.houses(jd_ut, lat, lon, SISTEMAS_CASAS[usado])
+    except swe.Error as e:
+        if usado == SISTEMA_CASAS_POLAR:
+            raise
+        print(f"⚠️ {sistema} no calculable en latitud {lat}: {e}. Usando {SISTEMA_CASAS_POLAR}")
+        if len(_COMBINACIONES_FALLIDAS) >= _MAX_COMBINACIONES_FALLIDAS:
+            _COMBINACIONES_FALLIDAS.clear()
+        _COMBINACIONES_FALLIDAS.add((sistema, round(lat, 4)))
+        contar("casas.fallback.error")
+        usado, motivo = SISTEMA_CASAS_POLAR, "error"
+        cuspides, ascmc = swe.houses(jd_ut, lat, lon, SISTEMAS_CASAS[usado])
+    fallback = {'solicitado': sistema, 'usado': usado, 'motivo': motivo} if usado != sistema else None
+    return cuspides, ascmc, usado, fallback
+
 
 def grado_a_zodiaco(deg: float, incluir_segundos: bool = True) -> Dict[str, any]:
     """
@@ -136,26 +346,76 @@ def calcular_julian_day(
         >>> tz
         'Europe/Madrid'
     """
-    # Si no se proporcionó zona horaria, calcularla automáticamente
+    jd_ut, _local_dt, _dt_aware, dt_utc, zona_horaria = _localizar(fecha, hora, latitud, longitud, zona_horaria)
+    return jd_ut, dt_utc, zona_horaria
+
+
+@lru_cache(maxsize=4096)
+def _zona_horaria_cacheada(latitud: float, longitud: float) -> str:
+    """Detección de timezone memoizada (TimezoneFinder es la parte más lenta del cálculo)."""
+    with medir("zona_horaria.deteccion"):
+        zona = coordenadas_a_timezone(latitud, longitud)
+    contar("zona_horaria.detecciones")
+    logger.debug("Zona horaria detectada: %s (Lat %s, Lon %s)", zona, latitud, longitud)
+    return zona
+
+
+def _resolver_zona_horaria(latitud: float, longitud: float, zona_horaria: Optional[str]) -> str:
+    """Devuelve la zona IANA a usar; "UTC" o None implican detección automática."""
     if zona_horaria is None or zona_horaria == "UTC":
-        zona_horaria = coordenadas_a_timezone(latitud, longitud)
-        print(f"🌍 Zona horaria detectada: {zona_horaria} (Lat {latitud}, Lon {longitud})")
+        # Redondeo a 4 decimales (~11 m): misma zona, y permite reutilizar el resultado
+        return _zona_horaria_cacheada(round(latitud, 4), round(longitud, 4))
+    return zona_horaria
+
+
+def _localizar(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None
+) -> Tuple[float, datetime, datetime, datetime, str]:
+    """
+    Resuelve zona horaria y convierte la hora local a UTC y Julian Day en un único paso.
+
+    Returns:
+        Tupla (julian_day_ut, datetime_local, datetime_aware, datetime_utc, zona_horaria)
+    """
+    with medir("zona_horaria"):
+        zona_horaria = _resolver_zona_horaria(latitud, longitud, zona_horaria)
 
-    # Parsear fecha y hora local
-    local_dt = datetime.strptime(f"{fecha} {hora}", "%Y-%m-%d %H:%M")
+    with medir("localizar"):
+        # Parsear fecha y hora local
+        local_dt = datetime.strptime(f"{fecha} {hora}", "%Y-%m-%d %H:%M")
 
-    # Convertir a UTC
-    tz = pytz.timezone(zona_horaria)
-    dt_aware = tz.localize(local_dt)
-    dt_utc = dt_aware.astimezone(pytz.utc)
+        # Convertir a UTC
+        tz = pytz.timezone(zona_horaria)
+        dt_aware = tz.localize(local_dt)
+        dt_utc = dt_aware.astimezone(pytz.utc)
 
-    # Hora decimal para Swiss Ephemeris
-    hora_utc_dec = dt_utc.hour + dt_utc.minute/60.0 + dt_utc.second/3600.0
+        # Hora decimal para Swiss Ephemeris
+        hora_utc_dec = dt_utc.hour + dt_utc.minute/60.0 + dt_utc.second/3600.0
 
-    # Calcular Julian Day (UT) - es el valor que espera swe.calc_ut() y swe.houses()
-    jd_ut = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, hora_utc_dec)
+        # Calcular Julian Day (UT) - es el valor que espera swe.calc_ut() y swe.houses()
+        jd_ut = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, hora_utc_dec)
+
+    return jd_ut, local_dt, dt_aware, dt_utc, zona_horaria
 
-    return jd_ut, dt_utc, zona_horaria
+
+def jd_a_datetime_utc(jd_ut: float) -> datetime:
+    """Convierte un Julian Day (UT) a datetime UTC (aware), redondeado al segundo."""
+    year, month, day, hora_dec = swe.revjul(jd_ut)
+    segundos = int(round(hora_dec * 3600.0))
+    base = datetime(year, month, day, tzinfo=pytz.utc)
+    return base + timedelta(seconds=segundos)
+
+
+def datetime_a_jd(dt: datetime) -> float:
+    """Convierte un datetime (aware o naive en UTC) a Julian Day (UT)."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(pytz.utc)
+    hora_dec = dt.hour + dt.minute/60.0 + dt.second/3600.0 + dt.microsecond/3.6e9
+    return swe.julday(dt.year, dt.month, dt.day, hora_dec)
 
 
 def calcular_posiciones_planetas(jd_ut: float, lat: Optional[float] = None, lon: Optional[float] = None) -> Dict[str, Dict]:
@@ -180,8 +440,13 @@ def calcular_posiciones_planetas(jd_ut: float, lat: Optional[float] = None, lon:
     )
     
     for nombre, id_cuerpo in PLANETAS.items():
+        if not disponible(nombre):
+            # Sin ficheros para este cuerpo: ya falló antes, no se vuelve a pedir
+            posiciones[nombre] = None
+            continue
         try:
-            res = swe.calc_ut(jd_ut, id_cuerpo, flags)
+            with medir(_ETAPAS_CALC_UT[nombre]):
+                res = swe.calc_ut(jd_ut, id_cuerpo, flags)
             longitud = res[0][0]
             velocidad = res[0][3]
             
@@ -205,19 +470,19 @@ def calcular_posiciones_planetas(jd_ut: float, lat: Optional[float] = None, lon:
             }
             
         except swe.Error as e:
-            # Algunos cuerpos (p.ej. Quirón) pueden requerir ficheros .se1 externos.
+            # Algunos cuerpos (p.ej. Quirón) requieren ficheros .se1 externos.
             # Si no están disponibles, no bloqueamos el cálculo de la carta.
-            msg = str(e)
-            if nombre == 'Quirón' and ('not found' in msg or 'not found in PATH' in msg):
-                posiciones[nombre] = None
+            contar(f"calc_ut.error.{nombre}")
+            if es_fichero_no_encontrado(e):
+                marcar_no_disponible(nombre, e)
             else:
                 print(f"Error calculando {nombre}: {e}")
-                posiciones[nombre] = None
+            posiciones[nombre] = None
     
     return posiciones
 
 
-def calcular_casas_y_angulos(jd_ut: float, lat: float, lon: float) -> Dict[str, any]:
+def calcular_casas_y_angulos(jd_ut: float, lat: float, lon: float, sistema: Optional[str] = None) -> Dict[str, any]:
     """
     Calcula las casas astrológicas y ángulos (ASC, MC)
     
@@ -225,18 +490,58 @@ def calcular_casas_y_angulos(jd_ut: float, lat: float, lon: float) -> Dict[str,
         jd_ut: Julian Day (UT)
         lat: Latitud
         lon: Longitud
+        sistema: Sistema de casas (ver `SISTEMAS_CASAS`); por defecto el del config
         
     Returns:
-        Dict con cúspides de casas y ángulos
+        Dict con cúspides de casas y ángulos (y `fallback` si el sistema no es válido en
+        esa latitud y se sustituyó, ver `calcular_cuspides`)
     """
-    # Sistema Placidus (código 'P')
-    res_casas = swe.houses(jd_ut, lat, lon, b'P')
-    cuspides = res_casas[0]  # Cúspides de las 12 casas
-    asc_mc = res_casas[1]    # [ASC, MC, ARMC, Vertex, ...]
-    
+    sistema = normalizar_sistema_casas(sistema)
+    with medir("casas"):
+        cuspides, ascmc, usado, fallback = calcular_cuspides(jd_ut, lat, lon, sistema)
+    return _formatear_casas(cuspides, ascmc, usado, fallback)
+
+
+def calcular_casas_multiples(jd_ut: float, lat: float, lon: float, sistemas: List[str]) -> Dict[str, Dict]:
+    """
+    Calcula varios sistemas de casas para el mismo instante y lugar.
+
+    Tiempo sidéreo (ARMC) y oblicuidad se obtienen una sola vez; cada sistema adicional
+    solo cuesta un `swe.houses_armc`, así que los informes comparativos no multiplican el coste.
+
+    Returns:
+        Dict {sistema: resultado de `calcular_casas_y_angulos`}
+    """
+    canonicos = [normalizar_sistema_casas(s) for s in sistemas]
+    if not canonicos:
+        return {}
+
+    primero = canonicos[0]
+    cuspides, ascmc, usado, fallback = calcular_cuspides(jd_ut, lat, lon, primero)
+    resultados = {primero: _formatear_casas(cuspides, ascmc, usado, fallback)}
+
+    armc = ascmc[2]
+    eps = swe.calc_ut(jd_ut, swe.ECL_NUT)[0][0]  # oblicuidad verdadera
+    for sistema in canonicos[1:]:
+        if sistema in resultados:
+            continue
+        usado, motivo = sistema_casas_efectivo(jd_ut, lat, sistema)
+        cuspides, ascmc = swe.houses_armc(armc, lat, eps, SISTEMAS_CASAS[usado])
+        fallback = {'solicitado': sistema, 'usado': usado, 'motivo': motivo} if usado != sistema else None
+        resultados[sistema] = _formatear_casas(cuspides, ascmc, usado, fallback)
+    return resultados
+
+
+def _formatear_casas(
+    cuspides: Tuple[float, ...],
+    asc_mc: Tuple[float, ...],
+    sistema: str,
+    fallback: Optional[Dict[str, str]] = None
+) -> Dict[str, any]:
+    """Convierte la salida cruda de swe.houses al formato de carta."""
     # Convertir cúspides a formato zodiacal
     casas = []
-    for i, cusp in enumerate(cuspides):
+    for i, cusp in enumerate(cuspides[:12]):
         pos_zodiacal = grado_a_zodiaco(cusp, incluir_segundos=False)
         casas.append({
             'numero': i + 1,
@@ -248,7 +553,8 @@ def calcular_casas_y_angulos(jd_ut: float, lat: float, lon: float) -> Dict[str,
     ascendente = grado_a_zodiaco(asc_mc[0], incluir_segundos=False)
     medio_cielo = grado_a_zodiaco(asc_mc[1], incluir_segundos=False)
     
-    return {
+    resultado = {
+        'sistema': sistema,
         'casas': casas,
         'ascendente': {
             'longitud': asc_mc[0],
@@ -259,6 +565,9 @@ def calcular_casas_y_angulos(jd_ut: float, lat: float, lon: float) -> Dict[str,
             **medio_cielo
         }
     }
+    if fallback:
+        resultado['fallback'] = fallback
+    return resultado
 
 
 def calcular_parte_fortuna(asc: float, sol: float, luna: float, es_diurno: bool = True) -> Dict:
@@ -295,34 +604,17 @@ def asignar_casas_a_planetas(posiciones: Dict, cuspides: List[float]) -> Dict:
     
     Args:
         posiciones: Dict con posiciones planetarias
-        cuspides: Lista de 12 cúspides de casas
+        cuspides: Lista de 12 cúspides de casas (cualquier sistema)
         
     Returns:
         Posiciones actualizadas con número de casa
     """
+    # Un único índice (búsqueda binaria) para todos los cuerpos
+    indice = IndiceCasas(cuspides)
     for nombre, pos in posiciones.items():
         if pos is None:
             continue
-            
-        longitud = pos['longitud']
-        
-        # Encontrar casa (método Placidus)
-        casa = 1
-        for i in range(12):
-            cusp_actual = cuspides[i]
-            cusp_siguiente = cuspides[(i + 1) % 12]
-            
-            # Manejar el cruce de 0° Aries
-            if cusp_siguiente < cusp_actual:
-                if longitud >= cusp_actual or longitud < cusp_siguiente:
-                    casa = i + 1
-                    break
-            else:
-                if cusp_actual <= longitud < cusp_siguiente:
-                    casa = i + 1
-                    break
-        
-        pos['casa'] = casa
+        pos['casa'] = indice.casa(pos['longitud'])
     
     return posiciones
 
@@ -332,7 +624,10 @@ def calcular_carta_completa(
     hora: str,
     latitud: float,
     longitud: float,
-    zona_horaria: Optional[str] = None
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None,
+    zodiaco: Optional[str] = None,
+    ayanamsa: Optional[str] = None
 ) -> Dict:
     """
     Calcula la carta astral completa con todos los elementos y detección automática de timezone
@@ -343,9 +638,13 @@ def calcular_carta_completa(
         latitud: Latitud del lugar
         longitud: Longitud del lugar
         zona_horaria: Zona horaria IANA (opcional, se detecta automáticamente desde coordenadas)
+        sistema_casas: Sistema de casas (opcional, por defecto el de efemerides_config.json)
+        zodiaco: 'tropical' o 'sideral' (opcional, por defecto el de efemerides_config.json)
+        ayanamsa: Ayanamsa para el zodiaco sideral (ver `AYANAMSAS`, por defecto Lahiri)
 
     Returns:
         Dict completo con toda la información astrológica
+        (en sideral, `datos_entrada` incluye zodiaco, ayanamsa y ayanamsa_valor)
 
     Ejemplos:
         >>> # Madrid - Detección automática
@@ -353,31 +652,106 @@ def calcular_carta_completa(
         >>> carta['datos_entrada']['zona_horaria']
         'Europe/Madrid'
     """
-    # 1. Calcular Julian Day (UT) con detección automática de timezone
-    jd_ut, dt_utc, zona_horaria_detectada = calcular_julian_day(fecha, hora, latitud, longitud, zona_horaria)
-
+    with traza("carta_completa"):
+        # 1. Calcular Julian Day (UT) con detección automática de timezone
+        localizacion = _localizar(fecha, hora, latitud, longitud, zona_horaria)
+        if normalizar_zodiaco(zodiaco) == ZODIACO_SIDERAL:
+            # Import diferido: chart_model depende de este módulo
+            from app.services.chart_model import carta_compacta_desde_localizacion
+
+            carta = carta_compacta_desde_localizacion(
+                fecha, hora, latitud, longitud, *localizacion, sistema_casas=sistema_casas
+            )
+            return carta.a_sideral(ayanamsa).a_dict()
+        return _carta_desde_localizacion(fecha, hora, latitud, longitud, *localizacion, sistema_casas=sistema_casas)
+
+
+def calcular_carta_desde_jd(
+    jd_ut: float,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None
+) -> Dict:
+    """
+    Carta completa para un instante dado como Julian Day (UT), p.ej. el momento exacto de una
+    revolución. Usa el JD tal cual (sin redondear al minuto) y expresa la hora local en `zona_horaria`.
+    """
+    with traza("carta_desde_jd"):
+        zona = _resolver_zona_horaria(latitud, longitud, zona_horaria)
+        dt_utc = jd_a_datetime_utc(jd_ut)
+        dt_aware = dt_utc.astimezone(pytz.timezone(zona))
+        local_dt = dt_aware.replace(tzinfo=None)
+        return _carta_desde_localizacion(
+            local_dt.strftime("%Y-%m-%d"), local_dt.strftime("%H:%M"), latitud, longitud,
+            jd_ut, local_dt, dt_aware, dt_utc, zona, sistema_casas=sistema_casas
+        )
+
+
+def _carta_desde_localizacion(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    jd_ut: float,
+    local_dt: datetime,
+    dt_aware: datetime,
+    dt_utc: datetime,
+    zona_horaria_detectada: str,
+    sistema_casas: Optional[str] = None
+) -> Dict:
+    """Construye la carta completa a partir de una localización ya resuelta (ver `_localizar`)."""
     # 2. Calcular posiciones planetarias (con corrección topocéntrica)
-    posiciones = calcular_posiciones_planetas(jd_ut, latitud, longitud)
+    with medir("posiciones"):
+        posiciones = calcular_posiciones_planetas(jd_ut, latitud, longitud)
     
     # 3. Calcular casas y ángulos
-    casas_data = calcular_casas_y_angulos(jd_ut, latitud, longitud)
-    
-    # 4. Asignar casas a planetas
-    cuspides_raw = [c['cuspide'] for c in casas_data['casas']]
-    posiciones = asignar_casas_a_planetas(posiciones, cuspides_raw)
+    casas_data = calcular_casas_y_angulos(jd_ut, latitud, longitud, sistema_casas)
     
-    # 5. Calcular Parte de Fortuna (usar fórmula diurna por defecto)
-    asc_lon = casas_data['ascendente']['longitud']
-    sol_lon = posiciones['Sol']['longitud']
-    luna_lon = posiciones['Luna']['longitud']
-    parte_fortuna = calcular_parte_fortuna(asc_lon, sol_lon, luna_lon)
-    
-    # 6. Calcular información detallada de timezone
-    # Reconstruir dt_aware para obtener offset
-    local_dt = datetime.strptime(f"{fecha} {hora}", "%Y-%m-%d %H:%M")
-    tz = pytz.timezone(zona_horaria_detectada)
-    dt_aware = tz.localize(local_dt)
+    with medir("formato"):
+        # 4. Asignar casas a planetas
+        cuspides_raw = [c['cuspide'] for c in casas_data['casas']]
+        posiciones = asignar_casas_a_planetas(posiciones, cuspides_raw)
+
+        # 5. Calcular Parte de Fortuna (usar fórmula diurna por defecto)
+        asc_lon = casas_data['ascendente']['longitud']
+        sol_lon = posiciones['Sol']['longitud']
+        luna_lon = posiciones['Luna']['longitud']
+        parte_fortuna = calcular_parte_fortuna(asc_lon, sol_lon, luna_lon)
+
+        # 6. Compilar resultado completo
+        return {
+            'datos_entrada': _datos_entrada(
+                fecha, hora, latitud, longitud, local_dt, dt_aware, dt_utc, zona_horaria_detectada, casas_data['sistema'],
+                casas_data.get('fallback')
+            ),
+            'planetas': posiciones,
+            'casas': casas_data['casas'],
+            'angulos': {
+                'ascendente': casas_data['ascendente'],
+                'medio_cielo': casas_data['medio_cielo'],
+                'parte_fortuna': parte_fortuna
+            }
+        }
+
 
+def _datos_entrada(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    local_dt: datetime,
+    dt_aware: datetime,
+    dt_utc: datetime,
+    zona_horaria_detectada: str,
+    sistema_casas: str,
+    fallback_casas: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Bloque `datos_entrada` de la carta (hora local, zona, offset/DST y UTC).
+    Si el sistema pedido no era válido en esa latitud, `fallback_casas` registra la sustitución.
+    """
+    # Calcular información detallada de timezone (dt_aware ya viene localizado)
     # Obtener offset en formato legible
     offset_seconds = dt_aware.utcoffset().total_seconds()
     offset_hours = int(offset_seconds / 3600)
@@ -388,37 +762,126 @@ def calcular_carta_completa(
     # Detectar DST (Daylight Saving Time)
     dst_activo = bool(dt_aware.dst())
 
-    # 7. Compilar resultado completo
     return {
-        'datos_entrada': {
-            # Datos originales del usuario
-            'fecha_local': fecha,
-            'hora_local': hora,
-            'hora_local_completa': local_dt.strftime("%Y-%m-%d %H:%M:%S"),
-
-            # Ubicación
-            'latitud': latitud,
-            'longitud': longitud,
-
-            # Información de zona horaria
-            'zona_horaria': zona_horaria_detectada,
-            'offset_utc': offset_str,  # "+01:00"
-            'offset_utc_legible': offset_legible,  # "UTC+01:00"
-            'dst_activo': dst_activo,  # True/False
-
-            # Conversión UTC
-            'fecha_utc': dt_utc.strftime("%Y-%m-%d %H:%M:%S UTC")
-        },
-        'planetas': posiciones,
-        'casas': casas_data['casas'],
-        'angulos': {
-            'ascendente': casas_data['ascendente'],
-            'medio_cielo': casas_data['medio_cielo'],
-            'parte_fortuna': parte_fortuna
-        }
+        # Datos originales del usuario
+        'fecha_local': fecha,
+        'hora_local': hora,
+        'hora_local_completa': local_dt.strftime("%Y-%m-%d %H:%M:%S"),
+
+        # Ubicación
+        'latitud': latitud,
+        'longitud': longitud,
+
+        # Información de zona horaria
+        'zona_horaria': zona_horaria_detectada,
+        'offset_utc': offset_str,  # "+01:00"
+        'offset_utc_legible': offset_legible,  # "UTC+01:00"
+        'dst_activo': dst_activo,  # True/False
+
+        # Conversión UTC
+        'fecha_utc': dt_utc.strftime("%Y-%m-%d %H:%M:%S UTC"),
+
+        # Sistema de casas usado
+        'sistema_casas': sistema_casas,
+        **({'fallback_casas': fallback_casas} if fallback_casas else {})
     }
 
 
+# ---------------------------------------------------------------------------
+# Cálculo por lotes (familias, equipos, importaciones masivas)
+# ---------------------------------------------------------------------------
+
+# Por debajo de este tamaño no compensa arrancar procesos: se calcula en el proceso actual
+LOTE_MIN_PARALELO = 32
+# Bloques en que se reparte un lote grande (por defecto dos por worker del pool, para amortizar el IPC);
+# el nº de procesos lo fija `astro_executor` (ASTRO_WORKERS), no este valor
+LOTE_BLOQUES = int(os.getenv("EPHEMERIS_BATCH_CHUNKS", "0") or 0) or 2 * astro_executor.max_workers
+
+
+def _calcular_lote_secuencial(registros: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Calcula un bloque de cartas en el proceso actual.
+    Cada elemento devuelve {'ok': True, 'carta': CartaCompacta} o {'ok': False, 'error': ...}
+    para que un registro inválido no invalide el lote completo. Las cartas viajan en forma
+    compacta (menos coste de pickle entre procesos); el llamador decide si las expande.
+    """
+    # Import diferido: chart_model depende de este módulo
+    from app.services.chart_model import carta_compacta_desde_localizacion
+
+    resultados = []
+    for reg in registros:
+        try:
+            localizacion = _localizar(
+                reg['fecha'], reg['hora'], float(reg['latitud']), float(reg['longitud']),
+                reg.get('zona_horaria')
+            )
+            carta = carta_compacta_desde_localizacion(
+                reg['fecha'], reg['hora'], float(reg['latitud']), float(reg['longitud']), *localizacion,
+                sistema_casas=reg.get('sistema_casas')
+            )
+            resultados.append({'ok': True, 'carta': carta})
+        except Exception as e:
+            resultados.append({'ok': False, 'error': f"{type(e).__name__}: {e}"})
+    return resultados
+
+
+def calcular_cartas_lote(
+    registros: List[Dict[str, Any]],
+    bloques: Optional[int] = None,
+    compacto: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Calcula N cartas natales en una sola llamada.
+
+    Las zonas horarias se resuelven una vez por coordenada en el proceso principal
+    (los registros de una misma ciudad comparten la detección) y, si el lote es grande,
+    el cálculo se reparte en bloques sobre el pool compartido de `astro_executor`.
+
+    Args:
+        registros: Lista de dicts con las claves de `calcular_carta_completa`
+            (fecha, hora, latitud, longitud; zona_horaria y sistema_casas opcionales)
+        bloques: Nº de bloques en que se reparte el lote sobre el pool (1 = todo en este proceso).
+            Solo controla el troceo; los procesos son los del pool. Por defecto, `LOTE_BLOQUES`.
+        compacto: Devolver `CartaCompacta` en lugar del dict legacy (se expande con `a_dict()`)
+
+    Returns:
+        Lista en el mismo orden que `registros`: {'ok': True, 'carta': {...}}
+        o {'ok': False, 'error': "..."}
+    """
+    if not registros:
+        return []
+
+    # Resolver zonas horarias una sola vez (deduplicado por coordenada vía caché)
+    normalizados: List[Dict[str, Any]] = []
+    for reg in registros:
+        reg = dict(reg)
+        try:
+            reg['zona_horaria'] = _resolver_zona_horaria(
+                float(reg['latitud']), float(reg['longitud']), reg.get('zona_horaria')
+            )
+        except (KeyError, TypeError, ValueError):
+            # Se reporta como error del registro en `_calcular_lote_secuencial`
+            pass
+        normalizados.append(reg)
+
+    n_bloques = bloques if bloques is not None else LOTE_BLOQUES
+    if n_bloques <= 1 or len(normalizados) < LOTE_MIN_PARALELO:
+        resultados = _calcular_lote_secuencial(normalizados)
+    else:
+        # Bloques contiguos para amortizar el coste de IPC
+        tam_bloque = max(1, math.ceil(len(normalizados) / n_bloques))
+        trozos = [normalizados[i:i + tam_bloque] for i in range(0, len(normalizados), tam_bloque)]
+        resultados = []
+        for parcial in astro_executor.map(_calcular_lote_secuencial, trozos):
+            resultados.extend(parcial)
+
+    if not compacto:
+        for res in resultados:
+            if res['ok']:
+                res['carta'] = res['carta'].a_dict()
+    return resultados
+
+
 # Función de utilidad para formato de texto legible
 def formato_texto_carta(carta: Dict) -> str:
     """
@@ -431,6 +894,7 @@ def formato_texto_carta(carta: Dict) -> str:
         String formateado para mostrar
     """
     datos = carta['datos_entrada']
+    sistema_casas = NOMBRES_SISTEMAS_CASAS.get(datos.get('sistema_casas') or 'placidus', 'Placidus')
     dst_indicator = " (DST)" if datos.get('dst_activo') else ""
 
     texto = f"""
@@ -464,7 +928,7 @@ Ascendente   : {carta['angulos']['ascendente']['texto']}
 Medio Cielo  : {carta['angulos']['medio_cielo']['texto']}
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-  CÚSPIDES DE CASAS (Placidus)
+  CÚSPIDES DE CASAS ({sistema_casas})
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
     
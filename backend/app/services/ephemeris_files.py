@@ -0,0 +1,118 @@
+"""
+Ficheros de Swiss Ephemeris (.se1): ruta, precalentado y diagnóstico por cuerpo
+
+Sin ruta configurada Swiss Ephemeris usa Moshier (analítico) para los planetas, y Quirón y los
+asteroides fallan con "not found" porque solo existen en ficheros. Con `SWISSEPH_PATH`
+(o `SE_EPHE_PATH`) apuntando a un directorio con `sepl_*.se1`, `semo_*.se1` y `seas_*.se1`:
+
+- `configurar_ruta()` fija la ruta al importar `ephemeris` (y en cada worker del pool).
+- `precalentar()` calcula una vez cada cuerpo: abre sus ficheros en el proceso y registra
+  de dónde sale (ficheros, Moshier o analítico) para `GET /health/ephemeris`.
+- Un cuerpo cuyo fichero no existe se marca como no disponible la primera vez que falla y ya no
+  se vuelve a pedir a Swiss Ephemeris (sale como None sin coste) hasta que cambie la ruta.
+"""
+import glob
+import os
+import threading
+from typing import Dict, Optional
+
+import swisseph as swe
+
+from app.services.metrics import contar
+
+RUTA_EFEMERIDES = (os.getenv("SWISSEPH_PATH") or os.getenv("SE_EPHE_PATH") or "").strip()
+
+JD_REFERENCIA = 2451545.0  # J2000
+
+# Calculados siempre analíticamente (no dependen de ficheros ni de Moshier)
+CUERPOS_ANALITICOS = frozenset({'Lilith med.'})
+
+ORIGEN_FICHEROS = "ficheros"
+ORIGEN_MOSHIER = "moshier"
+ORIGEN_ANALITICO = "analitico"
+ORIGEN_NO_DISPONIBLE = "no_disponible"
+
+_lock = threading.Lock()
+_ruta_actual: Optional[str] = None
+_no_disponibles: Dict[str, str] = {}
+_diagnostico: Dict[str, Dict[str, Optional[str]]] = {}
+
+
+def configurar_ruta(ruta: Optional[str] = None) -> str:
+    """Fija la ruta de ficheros ('' = Moshier) y olvida los fallos registrados con la anterior."""
+    global _ruta_actual
+    ruta = RUTA_EFEMERIDES if ruta is None else ruta
+    swe.set_ephe_path(ruta)
+    with _lock:
+        _ruta_actual = ruta
+        _no_disponibles.clear()
+        _diagnostico.clear()
+    return ruta
+
+
+def es_fichero_no_encontrado(error: Exception) -> bool:
+    return 'not found' in str(error)
+
+
+def disponible(nombre: str) -> bool:
+    """False si el cuerpo ya falló por falta de ficheros con la ruta actual."""
+    return nombre not in _no_disponibles
+
+
+def marcar_no_disponible(nombre: str, error: Exception) -> None:
+    """Registra el fallo (avisa una sola vez por cuerpo y ruta)."""
+    with _lock:
+        if nombre in _no_disponibles:
+            return
+        _no_disponibles[nombre] = str(error)
+    contar(f"efemerides.no_disponible.{nombre}")
+    print(f"⚠️ {nombre} no disponible (faltan ficheros de efemérides): {error}")
+
+
+def diagnosticar(cuerpos: Dict[str, int], jd_ut: float = JD_REFERENCIA) -> Dict[str, Dict[str, Optional[str]]]:
+    """Calcula cada cuerpo una vez y clasifica su origen según el flag devuelto por Swiss Ephemeris."""
+    resultado = {}
+    for nombre, id_cuerpo in cuerpos.items():
+        try:
+            retflag = swe.calc_ut(jd_ut, id_cuerpo, swe.FLG_SWIEPH | swe.FLG_SPEED)[1]
+        except swe.Error as e:
+            if es_fichero_no_encontrado(e):
+                marcar_no_disponible(nombre, e)
+            resultado[nombre] = {'origen': ORIGEN_NO_DISPONIBLE, 'error': str(e)}
+            continue
+        if nombre in CUERPOS_ANALITICOS:
+            origen = ORIGEN_ANALITICO
+        elif retflag & swe.FLG_MOSEPH:
+            origen = ORIGEN_MOSHIER
+        else:
+            origen = ORIGEN_FICHEROS
+        resultado[nombre] = {'origen': origen, 'error': None}
+    with _lock:
+        _diagnostico.update(resultado)
+    return resultado
+
+
+def precalentar() -> Dict[str, Dict[str, Optional[str]]]:
+    """Abre los ficheros de todos los cuerpos conocidos (planetas y asteroides) en este proceso."""
+    from app.services.ephemeris import PLANETAS
+    from app.services.fixed_stars import ASTEROIDES
+
+    return diagnosticar({**PLANETAS, **ASTEROIDES})
+
+
+def informe() -> Dict:
+    """Estado para /health/ephemeris: ruta, ficheros .se1 presentes y origen de cada cuerpo."""
+    if not _diagnostico:
+        precalentar()
+    with _lock:
+        cuerpos = {n: dict(d) for n, d in _diagnostico.items()}
+        ruta = _ruta_actual
+    ficheros = sorted(os.path.basename(f) for f in glob.glob(os.path.join(ruta, "*.se1"))) if ruta else []
+    origenes = {d['origen'] for d in cuerpos.values()}
+    return {
+        'ruta': ruta or None,
+        'modo': ORIGEN_FICHEROS if ORIGEN_FICHEROS in origenes else ORIGEN_MOSHIER,
+        'ficheros_se1': ficheros,
+        'cuerpos': cuerpos,
+        'no_disponibles': sorted(n for n, d in cuerpos.items() if d['origen'] == ORIGEN_NO_DISPONIBLE),
+    }
@@ -0,0 +1,265 @@
+"""
+Tablas de efemérides precalculadas (memory-mapped) con interpolación de Hermite
+
+Un builder offline (`app.scripts.build_ephemeris_tables`) tabula longitud y velocidad de cada
+cuerpo a paso fijo (1 h para la Luna, 1 día para el resto) y las guarda como `.npy` float32
+junto a un `indice.json`. En ejecución, `TablaEfemerides` abre los ficheros con `mmap_mode='r'`
+(todas las réplicas/procesos comparten las mismas páginas del SO) e interpola con Hermite
+cúbico usando la velocidad tabulada, con un error máximo medido y guardado en el índice.
+
+Consultas del tipo "¿dónde estaba X en el instante T?" cuestan microsegundos y no tocan
+Swiss Ephemeris. Fuera del rango tabulado se cae a `calcular_posiciones_planetas`.
+"""
+import json
+import math
+import os
+import unicodedata
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from app.services.ephemeris import PLANETAS, calcular_posiciones_planetas
+from app.services.ephemeris_vector import calcular_posiciones_array, posiciones_a_dict, POSICION_DTYPE, CUERPOS
+
+FORMATO_VERSION = 1
+INDICE = "indice.json"
+
+# Paso de tabulación (días) por cuerpo; el resto usa PASO_POR_DEFECTO
+PASOS_DIAS = {
+    'Luna': 1.0 / 24.0,
+}
+PASO_POR_DEFECTO = 1.0
+
+DIRECTORIO_POR_DEFECTO = os.getenv(
+    "EPHEMERIS_TABLES_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "ephemeris_tables")
+)
+
+
+def _slug(nombre: str) -> str:
+    s = unicodedata.normalize("NFKD", nombre).encode("ascii", "ignore").decode("ascii")
+    return "".join(c if c.isalnum() else "_" for c in s.lower()).strip("_")
+
+
+def _delta_angular(a: float, b: float) -> float:
+    """b - a en (-180, 180]"""
+    return (b - a + 180.0) % 360.0 - 180.0
+
+
+class TablaEfemerides:
+    """
+    Lector de tablas precalculadas. Los arrays son memmaps de solo lectura (n, 2): [lon, speed].
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_POR_DEFECTO):
+        with open(os.path.join(directorio, INDICE), "r", encoding="utf-8") as f:
+            self.indice = json.load(f)
+        if self.indice.get("version") != FORMATO_VERSION:
+            raise ValueError(f"Versión de tablas no soportada: {self.indice.get('version')}")
+
+        self.directorio = directorio
+        self._tablas: Dict[str, Tuple[np.ndarray, float, float, int]] = {}
+        for nombre, meta in self.indice["cuerpos"].items():
+            datos = np.load(os.path.join(directorio, meta["archivo"]), mmap_mode="r")
+            self._tablas[nombre] = (datos, float(meta["jd_inicio"]), float(meta["paso_dias"]), datos.shape[0])
+
+    @property
+    def cuerpos(self) -> Tuple[str, ...]:
+        return tuple(self._tablas)
+
+    def cubre(self, cuerpo: str, jd: float) -> bool:
+        tabla = self._tablas.get(cuerpo)
+        if tabla is None:
+            return False
+        _, jd0, paso, n = tabla
+        return jd0 <= jd <= jd0 + paso * (n - 1)
+
+    def error_maximo(self, cuerpo: str) -> Optional[float]:
+        """Error de interpolación máximo medido al construir la tabla (grados)."""
+        return self.indice["cuerpos"].get(cuerpo, {}).get("error_max_grados")
+
+    def posicion(self, cuerpo: str, jd: float) -> Tuple[float, float]:
+        """
+        Longitud (0-360) y velocidad (°/día) interpoladas para un instante.
+
+        Raises:
+            KeyError: si el cuerpo no está tabulado
+            ValueError: si `jd` está fuera del rango de la tabla
+        """
+        datos, jd0, paso, n = self._tablas[cuerpo]
+        x = (jd - jd0) / paso
+        i = int(math.floor(x))
+        if i < 0 or i > n - 1:
+            raise ValueError(f"JD {jd} fuera del rango tabulado para {cuerpo}")
+        if i == n - 1:
+            return float(datos[i, 0]), float(datos[i, 1])
+
+        t = x - i
+        l0, v0 = float(datos[i, 0]), float(datos[i, 1])
+        l1, v1 = float(datos[i + 1, 0]), float(datos[i + 1, 1])
+        d = _delta_angular(l0, l1)
+        m0, m1 = v0 * paso, v1 * paso
+
+        t2 = t * t
+        t3 = t2 * t
+        lon = l0 + (t3 - 2*t2 + t) * m0 + d * (-2*t3 + 3*t2) + (t3 - t2) * m1
+        dlon = (6*t2 - 6*t) * (-d) + (3*t2 - 4*t + 1) * m0 + (3*t2 - 2*t) * m1
+        return lon % 360.0, dlon / paso
+
+    def posiciones(self, cuerpo: str, jds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Versión vectorizada de `posicion` para un array de instantes."""
+        datos, jd0, paso, n = self._tablas[cuerpo]
+        jds = np.asarray(jds, dtype="f8")
+        x = (jds - jd0) / paso
+        if np.any(x < 0) or np.any(x > n - 1):
+            raise ValueError(f"Instantes fuera del rango tabulado para {cuerpo}")
+        return interpolar_hermite(datos[:, 0], datos[:, 1], x, paso)
+
+    def posiciones_array(self, jd: float, cuerpos: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Fila compatible con `ephemeris_vector` (campos lon/speed; lat/dist en NaN).
+        Los cuerpos no tabulados o fuera de rango quedan en NaN.
+        """
+        cuerpos = tuple(cuerpos) if cuerpos is not None else CUERPOS
+        fila = np.full(len(cuerpos), np.nan, dtype=POSICION_DTYPE)
+        for b, nombre in enumerate(cuerpos):
+            if self.cubre(nombre, jd):
+                fila['lon'][b], fila['speed'][b] = self.posicion(nombre, jd)
+        return fila
+
+
+def interpolar_hermite(lon: np.ndarray, speed: np.ndarray, x: np.ndarray, paso: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hermite cúbico sobre una rejilla regular de longitudes (grados) y velocidades (°/unidad).
+
+    Args:
+        lon, speed: (n,) o (n, B) muestras en la rejilla
+        x: (T,) posiciones fraccionarias en la rejilla, en [0, n - 1]
+        paso: Separación entre muestras (en las unidades de la velocidad)
+
+    Returns:
+        (lon, speed) interpolados, (T,) o (T, B); longitud en 0-360
+    """
+    n = lon.shape[0]
+    i = np.minimum(np.floor(x).astype(np.int64), n - 2)
+    t = x - i
+    if lon.ndim > 1:
+        t = t[:, None]
+    l0 = lon[i].astype("f8")
+    v0 = speed[i].astype("f8")
+    l1 = lon[i + 1].astype("f8")
+    v1 = speed[i + 1].astype("f8")
+    d = (l1 - l0 + 180.0) % 360.0 - 180.0
+    m0, m1 = v0 * paso, v1 * paso
+
+    t2 = t * t
+    t3 = t2 * t
+    res_lon = l0 + (t3 - 2*t2 + t) * m0 + d * (-2*t3 + 3*t2) + (t3 - t2) * m1
+    dlon = (6*t2 - 6*t) * (-d) + (3*t2 - 4*t + 1) * m0 + (3*t2 - 2*t) * m1
+    return res_lon % 360.0, dlon / paso
+
+
+_tabla_global: Optional[TablaEfemerides] = None
+_tabla_cargada = False
+
+
+def obtener_tabla(directorio: str = DIRECTORIO_POR_DEFECTO) -> Optional[TablaEfemerides]:
+    """Tabla compartida del proceso, o None si no se han generado las tablas."""
+    global _tabla_global, _tabla_cargada
+    if not _tabla_cargada:
+        _tabla_cargada = True
+        if os.path.exists(os.path.join(directorio, INDICE)):
+            try:
+                _tabla_global = TablaEfemerides(directorio)
+                print(f"✅ Tablas de efemérides cargadas desde {directorio}")
+            except Exception as e:
+                print(f"⚠️ No se pudieron cargar las tablas de efemérides: {e}")
+    return _tabla_global
+
+
+def calcular_posiciones_rapidas(jd_ut: float) -> Dict[str, Optional[Dict]]:
+    """
+    Igual que `calcular_posiciones_planetas` pero servido desde las tablas si cubren `jd_ut`.
+    Recurre a Swiss Ephemeris si no hay tablas o `jd_ut` cae fuera de su rango. Con una tabla
+    parcial (p.ej. `--cuerpos Luna`) los cuerpos no tabulados se calculan directamente; los que
+    tampoco tienen ficheros (p.ej. Quirón sin .se1) quedan en None, como en el cálculo directo.
+    """
+    tabla = obtener_tabla()
+    if tabla is None or not any(tabla.cubre(n, jd_ut) for n in tabla.cuerpos):
+        return calcular_posiciones_planetas(jd_ut)
+    fila = tabla.posiciones_array(jd_ut)
+    faltantes = [b for b, nombre in enumerate(CUERPOS) if not tabla.cubre(nombre, jd_ut)]
+    if faltantes:
+        fila[faltantes] = calcular_posiciones_array([jd_ut], [CUERPOS[b] for b in faltantes])[0]
+    return posiciones_a_dict(fila)
+
+
+# ---------------------------------------------------------------------------
+# Builder offline
+# ---------------------------------------------------------------------------
+
+def construir_tablas(
+    directorio: str,
+    jd_inicio: float,
+    jd_fin: float,
+    cuerpos: Optional[Sequence[str]] = None,
+    flags: int = swe.FLG_SWIEPH | swe.FLG_SPEED
+) -> Dict:
+    """
+    Tabula longitud/velocidad de cada cuerpo en [jd_inicio, jd_fin] y escribe `indice.json`.
+
+    El error de interpolación se mide en los puntos medios de una muestra de intervalos
+    contra Swiss Ephemeris y se guarda como `error_max_grados` por cuerpo.
+
+    Returns:
+        El índice escrito
+    """
+    os.makedirs(directorio, exist_ok=True)
+    cuerpos = tuple(cuerpos) if cuerpos is not None else CUERPOS
+    indice = {"version": FORMATO_VERSION, "jd_inicio": jd_inicio, "jd_fin": jd_fin, "cuerpos": {}}
+
+    for nombre in cuerpos:
+        id_cuerpo = PLANETAS[nombre]
+        paso = PASOS_DIAS.get(nombre, PASO_POR_DEFECTO)
+        n = int(math.floor((jd_fin - jd_inicio) / paso)) + 1
+
+        datos = np.empty((n, 2), dtype="f4")
+        try:
+            for k in range(n):
+                res = swe.calc_ut(jd_inicio + k * paso, id_cuerpo, flags)[0]
+                datos[k, 0] = res[0]
+                datos[k, 1] = res[3]
+        except swe.Error as e:
+            print(f"⚠️ {nombre} omitido: {e}")
+            continue
+
+        archivo = f"{_slug(nombre)}.npy"
+        np.save(os.path.join(directorio, archivo), datos)
+        indice["cuerpos"][nombre] = {
+            "archivo": archivo,
+            "jd_inicio": jd_inicio,
+            "paso_dias": paso,
+            "n": n,
+        }
+        print(f"  {nombre}: {n} muestras (paso {paso:.4f} d)")
+
+    with open(os.path.join(directorio, INDICE), "w", encoding="utf-8") as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2)
+
+    # Medir el error con la tabla ya escrita (mismo camino de lectura que en producción)
+    tabla = TablaEfemerides(directorio)
+    rng = np.random.default_rng(0)
+    for nombre in tabla.cuerpos:
+        meta = indice["cuerpos"][nombre]
+        muestras = rng.integers(0, meta["n"] - 1, size=min(2000, meta["n"] - 1))
+        jds = jd_inicio + (muestras + 0.5) * meta["paso_dias"]
+        lon, _ = tabla.posiciones(nombre, jds)
+        ref = np.array([swe.calc_ut(jd, PLANETAS[nombre], flags)[0][0] for jd in jds])
+        err = np.abs((lon - ref + 180.0) % 360.0 - 180.0)
+        meta["error_max_grados"] = float(err.max())
+        print(f"  {nombre}: error máx. {meta['error_max_grados'] * 3600:.2f}\"")
+
+    with open(os.path.join(directorio, INDICE), "w", encoding="utf-8") as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2)
+    return indice
@@ -0,0 +1,165 @@
+"""
+Motor vectorizado de posiciones planetarias (modo compacto)
+
+Devuelve arrays estructurados NumPy (tiempo × cuerpo × [lon, lat, dist, speed]) en lugar de
+dicts anidados. Signo, grado y retrogradación se derivan vectorialmente sobre el array completo
+y el formato de texto en español solo se genera al renderizar (`posiciones_a_dict`).
+
+Pensado para barridos de tránsitos y trabajo por lotes, donde el formato por cuerpo de
+`calcular_posiciones_planetas` domina el coste.
+"""
+import numpy as np
+import swisseph as swe
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from app.services.ephemeris import PLANETAS, SIGNOS
+from app.services.ephemeris_files import disponible, es_fichero_no_encontrado, marcar_no_disponible
+from app.services.metrics import contar
+
+# Orden canónico de cuerpos (columnas del eje "cuerpo")
+CUERPOS = tuple(PLANETAS)
+
+# Cuerpos cuya velocidad negativa NO se considera retrogradación
+SIN_RETROGRADACION = frozenset({'Nodo Norte', 'Lilith med.'})
+
+POSICION_DTYPE = np.dtype([
+    ('lon', 'f8'),
+    ('lat', 'f8'),
+    ('dist', 'f8'),
+    ('speed', 'f8'),
+])
+
+FLAGS_POR_DEFECTO = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+
+def calcular_posiciones_array(
+    jds: Iterable[float],
+    cuerpos: Optional[Sequence[str]] = None,
+    flags: int = FLAGS_POR_DEFECTO
+) -> np.ndarray:
+    """
+    Calcula posiciones para varios instantes y cuerpos en un único buffer preasignado.
+
+    Args:
+        jds: Julian Days (UT) a calcular
+        cuerpos: Nombres de `PLANETAS` (por defecto, todos en el orden de `CUERPOS`)
+        flags: Flags de Swiss Ephemeris
+
+    Returns:
+        Array estructurado de forma (T, B) con campos lon, lat, dist, speed.
+        Los cuerpos que no se pueden calcular (p.ej. Quirón sin ficheros .se1) quedan en NaN.
+    """
+    jds = np.asarray(list(jds) if not isinstance(jds, np.ndarray) else jds, dtype='f8').ravel()
+    cuerpos = tuple(cuerpos) if cuerpos is not None else CUERPOS
+    ids = [PLANETAS[n] for n in cuerpos]
+
+    # Buffer plano (T, B, 4): cada calc_ut escribe en su fila sin crear dicts intermedios
+    buf = np.full((jds.size, len(ids), 4), np.nan, dtype='f8')
+    calc_ut = swe.calc_ut
+
+    for b, id_cuerpo in enumerate(ids):
+        if not disponible(cuerpos[b]):
+            continue
+        for t in range(jds.size):
+            try:
+                buf[t, b] = calc_ut(jds[t], id_cuerpo, flags)[0][:4]
+            except swe.Error as e:
+                # Un cuerpo sin ficheros (p.ej. Quirón sin .se1) falla igual en todas las fechas: no reintentar
+                if es_fichero_no_encontrado(e):
+                    marcar_no_disponible(cuerpos[b], e)
+                    break
+                # Error de esa fecha concreta: solo esa época queda en NaN
+                contar(f"calc_ut.error.{cuerpos[b]}")
+                print(f"Error calculando {cuerpos[b]} (JD {jds[t]}): {e}")
+
+    return buf.view(POSICION_DTYPE)[..., 0]
+
+
+def declinaciones(lon, lat, oblicuidad: float) -> np.ndarray:
+    """
+    Declinación (grados) desde longitud y latitud eclípticas tropicales y la oblicuidad:
+    sin δ = sin β cos ε + cos β sin ε sin λ. NaN se propaga (cuerpos no calculados).
+    """
+    lon_r = np.radians(np.asarray(lon, dtype="f8"))
+    lat_r = np.radians(np.asarray(lat, dtype="f8"))
+    eps = np.radians(oblicuidad)
+    return np.degrees(np.arcsin(np.sin(lat_r) * np.cos(eps) + np.cos(lat_r) * np.sin(eps) * np.sin(lon_r)))
+
+
+def derivar_zodiaco(posiciones: np.ndarray, cuerpos: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Deriva signo, grado, minuto y retrogradación para todo el array de una vez.
+
+    Usa el mismo redondeo al minuto que `grado_a_zodiaco(..., incluir_segundos=False)`.
+
+    Returns:
+        Dict de arrays con la forma de `posiciones`: signo_idx, grados, minutos, retrogrado
+    """
+    cuerpos = tuple(cuerpos) if cuerpos is not None else CUERPOS
+    lon = np.mod(posiciones['lon'], 360.0)
+
+    signo_idx = np.floor_divide(lon, 30.0)
+    total_minutos = np.rint(np.mod(lon, 30.0) * 60.0)
+    # Carry 30°00' al signo siguiente
+    carry = total_minutos >= 1800
+    total_minutos = np.where(carry, 0, total_minutos)
+    signo_idx = np.mod(signo_idx + carry, 12)
+
+    valido = ~np.isnan(lon)
+    retro_permitido = np.array([n not in SIN_RETROGRADACION for n in cuerpos], dtype=bool)
+
+    return {
+        'signo_idx': np.where(valido, signo_idx, -1).astype('i1'),
+        'grados': np.where(valido, total_minutos // 60, 0).astype('i1'),
+        'minutos': np.where(valido, total_minutos % 60, 0).astype('i1'),
+        'retrogrado': (posiciones['speed'] < 0) & retro_permitido,
+    }
+
+
+def posiciones_a_dict(
+    fila: np.ndarray,
+    cuerpos: Optional[Sequence[str]] = None,
+    zodiaco: Optional[Dict[str, np.ndarray]] = None
+) -> Dict[str, Optional[Dict]]:
+    """
+    Renderiza una fila (un instante) al formato de `calcular_posiciones_planetas`.
+
+    Args:
+        fila: Array estructurado de forma (B,)
+        cuerpos: Nombres de las columnas (por defecto, `CUERPOS`)
+        zodiaco: Resultado de `derivar_zodiaco` para esa fila (se calcula si no se pasa)
+    """
+    cuerpos = tuple(cuerpos) if cuerpos is not None else CUERPOS
+    if zodiaco is None:
+        zodiaco = derivar_zodiaco(fila, cuerpos)
+
+    posiciones: Dict[str, Optional[Dict]] = {}
+    for b, nombre in enumerate(cuerpos):
+        idx = int(zodiaco['signo_idx'][b])
+        if idx < 0:
+            posiciones[nombre] = None
+            continue
+        signo = SIGNOS[idx]
+        grados = int(zodiaco['grados'][b])
+        minutos = int(zodiaco['minutos'][b])
+        retro = bool(zodiaco['retrogrado'][b])
+        posiciones[nombre] = {
+            'longitud': float(fila['lon'][b]),
+            'velocidad': float(fila['speed'][b]),
+            'retrogrado': retro,
+            'signo': signo,
+            'grados': grados,
+            'minutos': minutos,
+            'segundos': 0,
+            'texto': f"{grados:02d}°{minutos:02d}' {signo}" + (' R' if retro else '')
+        }
+    return posiciones
+
+
+def serie_a_dicts(posiciones: np.ndarray, cuerpos: Optional[Sequence[str]] = None) -> List[Dict[str, Optional[Dict]]]:
+    """Renderiza un array (T, B) completo a una lista de dicts legacy (uno por instante)."""
+    zodiaco = derivar_zodiaco(posiciones, cuerpos)
+    return [
+        posiciones_a_dict(posiciones[t], cuerpos, {k: v[t] for k, v in zodiaco.items()})
+        for t in range(posiciones.shape[0])
+    ]
@@ -0,0 +1,467 @@
+"""
+Calendario de eventos: fases lunares, ingresos en signo, Luna vacía de curso y horas planetarias
+
+Los eventos globales (no dependen del lugar) se calculan por meses:
+
+1. Una única pasada vectorizada (`calcular_posiciones_array`) cubre el mes más un margen a cada
+   lado: la Luna cada 6 h y el resto de cuerpos cada día, interpolados a la rejilla de 6 h.
+2. Los cambios de signo de la función buscada entre muestras consecutivas acotan cada raíz:
+   elongación Luna-Sol (fases), longitud - límite de signo (ingresos) y Luna - planeta - ángulo
+   (aspectos de la Luna, para la Luna vacía).
+3. Todas las raíces se refinan a la vez con Newton vectorizado protegido por bisección (~1 s).
+
+La Luna queda vacía de curso desde su último aspecto mayor a un planeta hasta que cambia de signo.
+
+Cada mes calculado se guarda en un LRU en memoria y, con `CALENDARIO_MONGO=1`, en la colección
+`calendario_eventos` (compartida entre réplicas; `app.scripts.build_event_calendar` la rellena por
+adelantado). Un rango se sirve juntando los meses que cubre y filtrando por JD.
+
+Las horas planetarias dependen del lugar (salida y puesta del Sol) y se calculan bajo demanda.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pytz
+import swisseph as swe
+
+from app.services.aspect_engine import ASPECTOS_MAYORES
+from app.services.ephemeris import SIGNOS, _resolver_zona_horaria, datetime_a_jd, jd_a_datetime_utc
+from app.services.ephemeris_vector import calcular_posiciones_array
+
+CALENDARIO_MONGO = (os.getenv("CALENDARIO_MONGO") or "").strip().lower() in {"1", "true", "yes"}
+
+# Versión del formato de eventos: subirla invalida los meses persistidos
+CALENDARIO_VERSION = 1
+
+TIPO_FASE = "fase"
+TIPO_INGRESO = "ingreso"
+TIPO_LUNA_VACIA = "luna_vacia"
+TIPOS_EVENTO = (TIPO_FASE, TIPO_INGRESO, TIPO_LUNA_VACIA)
+
+FASES = (
+    ('luna_nueva', 0.0),
+    ('cuarto_creciente', 90.0),
+    ('luna_llena', 180.0),
+    ('cuarto_menguante', 270.0),
+)
+
+CUERPOS_INGRESOS = ('Sol', 'Luna', 'Mercurio', 'Venus', 'Marte', 'Júpiter', 'Saturno', 'Urano', 'Neptuno', 'Plutón')
+# Planetas cuyos aspectos mayores con la Luna cierran el periodo de Luna vacía
+CUERPOS_ASPECTOS_LUNA = ('Sol', 'Mercurio', 'Venus', 'Marte', 'Júpiter', 'Saturno', 'Urano', 'Neptuno', 'Plutón')
+
+# Rejilla de búsqueda (días): la Luna recorre ~3.3° en 6 h, menos que la separación entre objetivos.
+# Los demás cuerpos se calculan cada día y se interpolan (solo sirven para acotar; las raíces son exactas)
+PASO_DIAS = 0.25
+PASO_PLANETAS_DIAS = 1.0
+# Margen alrededor del mes: la Luna pasa como mucho ~2.7 días en un signo
+MARGEN_DIAS = 3.0
+
+PRECISION_DIAS = 1.0 / 86400.0
+MAX_ITERACIONES = 40
+
+MAX_DIAS_RANGO = 400
+
+# Orden caldeo y regente del día (lunes = 0)
+ORDEN_CALDEO = ('Saturno', 'Júpiter', 'Marte', 'Sol', 'Venus', 'Mercurio', 'Luna')
+REGENTES_DIA = ('Luna', 'Marte', 'Mercurio', 'Júpiter', 'Venus', 'Saturno', 'Sol')
+
+
+def _envolver(x):
+    return np.mod(x + 180.0, 360.0) - 180.0
+
+
+def _raices(
+    evaluar: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]],
+    a: np.ndarray,
+    b: np.ndarray,
+    fa: np.ndarray,
+    fb: np.ndarray
+) -> np.ndarray:
+    """
+    Newton vectorizado con salvaguarda de bisección: una raíz por intervalo [a_i, b_i], donde f
+    cambia de signo. `evaluar(t) -> (f, df)` sobre arrays; cada iteración es una sola evaluación.
+    """
+    a, b, fa = a.astype("f8"), b.astype("f8"), fa.astype("f8")
+    t = a + (b - a) * fa / (fa - fb)
+    for _ in range(MAX_ITERACIONES):
+        f, df = evaluar(t)
+        mismo = (f < 0) == (fa < 0)
+        a, fa, b = np.where(mismo, t, a), np.where(mismo, f, fa), np.where(mismo, b, t)
+        paso = np.divide(f, df, out=np.zeros_like(f), where=df != 0)
+        convergido = (df != 0) & (np.abs(paso) < PRECISION_DIAS)
+        nuevo = t - paso
+        fuera = ~convergido & ((df == 0) | (nuevo <= a) | (nuevo >= b))
+        t = np.where(fuera, 0.5 * (a + b), nuevo)
+        if np.all(convergido | (b - a < PRECISION_DIAS)):
+            break
+    return t
+
+
+def _evaluador(cuerpo: str, referencia: Optional[str], objetivos: np.ndarray):
+    """f(t) = envolver(lon_cuerpo - lon_referencia - objetivo) y su derivada (velocidad relativa)."""
+    cuerpos = (cuerpo,) if referencia is None else (cuerpo, referencia)
+
+    def evaluar(t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        pos = calcular_posiciones_array(t, cuerpos)
+        lon, vel = pos['lon'][:, 0], pos['speed'][:, 0]
+        if referencia is not None:
+            lon, vel = lon - pos['lon'][:, 1], vel - pos['speed'][:, 1]
+        return _envolver(lon - objetivos), vel
+
+    return evaluar
+
+
+def _cruces(f: np.ndarray, solo_crecientes: bool = False) -> Tuple[np.ndarray, ...]:
+    """Índices (k, ...) donde f cambia de signo entre k y k+1, lejos del salto de ±180°."""
+    cambio = ((f[:-1] < 0) != (f[1:] < 0)) & (np.abs(f[:-1]) < 90.0) & (np.abs(f[1:]) < 90.0)
+    if solo_crecientes:
+        cambio &= f[:-1] < 0
+    return np.nonzero(cambio)
+
+
+def _refinar_cruces(
+    jds: np.ndarray,
+    f0: np.ndarray,
+    f1: np.ndarray,
+    k: np.ndarray,
+    cuerpo: str,
+    referencia: Optional[str],
+    objetivos: np.ndarray
+) -> np.ndarray:
+    """Raíces en [jds[k], jds[k+1]] (f0/f1: valores de f en los extremos) de una sola vez."""
+    if len(k) == 0:
+        return np.empty(0)
+    evaluar = _evaluador(cuerpo, referencia, np.asarray(objetivos, dtype="f8"))
+    return _raices(evaluar, jds[k], jds[k + 1], f0, f1)
+
+
+def _fecha(jd: float) -> str:
+    return jd_a_datetime_utc(jd).strftime("%Y-%m-%d %H:%M UTC")
+
+
+def _evento(tipo: str, jd: float, **extra) -> Dict:
+    return {'tipo': tipo, 'jd': round(float(jd), 6), 'fecha_utc': _fecha(jd), **extra}
+
+
+def calcular_eventos(jd_inicio: float, jd_fin: float) -> List[Dict]:
+    """
+    Fases lunares, ingresos en signo y periodos de Luna vacía en [jd_inicio, jd_fin), por JD.
+    Los periodos de Luna vacía se incluyen si empiezan en el rango.
+    """
+    jds = np.arange(jd_inicio - MARGEN_DIAS, jd_fin + MARGEN_DIAS + PASO_DIAS, PASO_DIAS)
+    cuerpos = CUERPOS_INGRESOS
+    col = {c: i for i, c in enumerate(cuerpos)}
+    lon = np.empty((len(jds), len(cuerpos)))
+    luna = lon[:, col['Luna']] = calcular_posiciones_array(jds, ('Luna',))['lon'][:, 0]
+    resto = tuple(c for c in cuerpos if c != 'Luna')
+    nodos = np.arange(jds[0], jds[-1] + PASO_PLANETAS_DIAS, PASO_PLANETAS_DIAS)
+    lon_nodos = calcular_posiciones_array(nodos, resto)['lon']
+    for b, cuerpo in enumerate(resto):
+        lon[:, col[cuerpo]] = np.mod(np.interp(jds, nodos, np.unwrap(lon_nodos[:, b], period=360.0)), 360.0)
+    eventos: List[Dict] = []
+
+    # Fases: elongación Luna - Sol (siempre creciente)
+    objetivos = np.array([angulo for _, angulo in FASES])
+    f = _envolver((luna - lon[:, col['Sol']])[:, None] - objetivos[None, :])
+    k, m = _cruces(f, solo_crecientes=True)
+    raices = _refinar_cruces(jds, f[k, m], f[k + 1, m], k, 'Luna', 'Sol', objetivos[m])
+    lon_fases = calcular_posiciones_array(raices, ('Luna',))['lon'][:, 0] if len(raices) else []
+    for jd, i, lon_luna in zip(raices, m, lon_fases):
+        eventos.append(_evento(TIPO_FASE, jd, fase=FASES[i][0], signo=SIGNOS[int(lon_luna // 30) % 12],
+                               longitud=round(float(lon_luna), 4)))
+
+    # Ingresos: cambios de floor(lon / 30) refinados contra el límite cruzado
+    ingresos_luna: List[Dict] = []
+    for cuerpo in cuerpos:
+        serie = lon[:, col[cuerpo]]
+        if np.isnan(serie).any():
+            continue
+        signo = (serie // 30.0).astype(int) % 12
+        k = np.nonzero(signo[:-1] != signo[1:])[0]
+        if not len(k):
+            continue
+        directo = _envolver(serie[k + 1] - serie[k]) > 0
+        limites = np.where(directo, signo[k + 1], signo[k]) * 30.0
+        f0, f1 = _envolver(serie[k] - limites), _envolver(serie[k + 1] - limites)
+        raices = _refinar_cruces(jds, f0, f1, k, cuerpo, None, limites)
+        for jd, i, d in zip(raices, k, directo):
+            evento = _evento(TIPO_INGRESO, jd, cuerpo=cuerpo, desde=SIGNOS[signo[i]], signo=SIGNOS[signo[i + 1]],
+                             retrogrado=not bool(d))
+            (ingresos_luna if cuerpo == 'Luna' else eventos).append(evento)
+
+    # Aspectos mayores de la Luna (solo para delimitar la Luna vacía)
+    angulos = sorted({(s * a) % 360.0 for a in ASPECTOS_MAYORES.values() for s in (1, -1)})
+    nombres = {a % 360.0: n for n, a in ASPECTOS_MAYORES.items()}
+    nombres.update({(-a) % 360.0: n for n, a in ASPECTOS_MAYORES.items()})
+    aspectos: List[Tuple[float, str, str]] = []
+    for planeta in CUERPOS_ASPECTOS_LUNA:
+        objetivos = np.array(angulos)
+        f = _envolver((luna - lon[:, col[planeta]])[:, None] - objetivos[None, :])
+        k, m = _cruces(f, solo_crecientes=True)
+        raices = _refinar_cruces(jds, f[k, m], f[k + 1, m], k, 'Luna', planeta, objetivos[m])
+        aspectos.extend((float(jd), planeta, nombres[angulos[i]]) for jd, i in zip(raices, m))
+    aspectos.sort()
+
+    # Luna vacía: del último aspecto en el signo hasta el ingreso (necesita el ingreso anterior)
+    ingresos_luna.sort(key=lambda e: e['jd'])
+    jds_aspectos = [a[0] for a in aspectos]
+    for previo, ingreso in zip(ingresos_luna, ingresos_luna[1:]):
+        i = int(np.searchsorted(jds_aspectos, ingreso['jd'])) - 1
+        ultimo = aspectos[i] if i >= 0 and aspectos[i][0] > previo['jd'] else None
+        inicio = ultimo[0] if ultimo else previo['jd']
+        eventos.append(_evento(
+            TIPO_LUNA_VACIA, inicio,
+            jd_fin=ingreso['jd'],
+            fecha_fin_utc=ingreso['fecha_utc'],
+            duracion_horas=round((ingreso['jd'] - inicio) * 24.0, 2),
+            signo=ingreso['desde'],
+            siguiente_signo=ingreso['signo'],
+            ultimo_aspecto={'cuerpo': ultimo[1], 'aspecto': ultimo[2]} if ultimo else None,
+        ))
+    eventos.extend(ingresos_luna)
+
+    eventos = [e for e in eventos if jd_inicio <= e['jd'] < jd_fin]
+    eventos.sort(key=lambda e: (e['jd'], e['tipo']))
+    return eventos
+
+
+# ---------------------------------------------------------------------------
+# Meses precalculados (memoria → Mongo → cálculo)
+# ---------------------------------------------------------------------------
+
+def limites_mes(año: int, mes: int) -> Tuple[float, float]:
+    siguiente = (año + 1, 1) if mes == 12 else (año, mes + 1)
+    return swe.julday(año, mes, 1, 0.0), swe.julday(siguiente[0], siguiente[1], 1, 0.0)
+
+
+def clave_mes(año: int, mes: int) -> str:
+    return f"v{CALENDARIO_VERSION}:{año:04d}-{mes:02d}"
+
+
+def meses_en_rango(jd_desde: float, jd_hasta: float) -> List[Tuple[int, int]]:
+    """Meses (año, mes) que intersecan [jd_desde, jd_hasta)."""
+    año, mes = swe.revjul(jd_desde)[:2]
+    meses = []
+    while True:
+        meses.append((año, mes))
+        año, mes = (año + 1, 1) if mes == 12 else (año, mes + 1)
+        if swe.julday(año, mes, 1, 0.0) >= jd_hasta:
+            return meses
+
+
+def calcular_meses(meses: Sequence[Tuple[int, int]]) -> Dict[str, List[Dict]]:
+    """{clave_mes: eventos} (apto para el pool de procesos)."""
+    return {clave_mes(a, m): calcular_eventos(*limites_mes(a, m)) for a, m in meses}
+
+
+class CacheCalendario:
+    """Eventos por mes ya calculados. LRU acotado, thread-safe."""
+
+    def __init__(self, max_meses: int = 600):
+        self.max_meses = max_meses
+        self._data: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obtener(self, claves: Iterable[str]) -> Dict[str, List[Dict]]:
+        encontrados = {}
+        with self._lock:
+            for clave in claves:
+                eventos = self._data.get(clave)
+                if eventos is None:
+                    self.misses += 1
+                    continue
+                self._data.move_to_end(clave)
+                self.hits += 1
+                encontrados[clave] = eventos
+        return encontrados
+
+    def guardar(self, meses: Dict[str, List[Dict]]) -> None:
+        with self._lock:
+            for clave, eventos in meses.items():
+                self._data[clave] = eventos
+                self._data.move_to_end(clave)
+            while len(self._data) > self.max_meses:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"meses": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class MongoCalendarioTier:
+    """Meses persistidos en MongoDB (colección `calendario_eventos`, un documento por mes)."""
+
+    def __init__(self):
+        self._collection = None
+        self.errors = 0
+
+    def _get_collection(self):
+        if self._collection is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            mongo_url = os.getenv("MONGODB_URL") or os.getenv("MONGODB_URI") or "mongodb://localhost:27017"
+            options = {"serverSelectionTimeoutMS": 5000, "connectTimeoutMS": 10000}
+            if "mongodb+srv://" in mongo_url or "mongodb.net" in mongo_url:
+                options.update({"tls": True, "tlsAllowInvalidCertificates": True})
+            self._collection = AsyncIOMotorClient(mongo_url, **options).fraktal.calendario_eventos
+        return self._collection
+
+    async def obtener(self, claves: List[str]) -> Dict[str, List[Dict]]:
+        try:
+            cursor = self._get_collection().find({"_id": {"$in": claves}}, {"eventos": 1})
+            return {doc["_id"]: doc["eventos"] async for doc in cursor}
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ calendario_eventos Mongo no disponible (get): {e}")
+            return {}
+
+    async def guardar(self, meses: Dict[str, List[Dict]]) -> None:
+        try:
+            for clave, eventos in meses.items():
+                await self._get_collection().replace_one(
+                    {"_id": clave},
+                    {"_id": clave, "eventos": eventos, "created_at": datetime.utcnow()},
+                    upsert=True
+                )
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ calendario_eventos Mongo no disponible (put): {e}")
+
+
+cache_calendario = CacheCalendario()
+calendario_mongo: Optional[MongoCalendarioTier] = MongoCalendarioTier() if CALENDARIO_MONGO else None
+
+
+def _validar_rango(jd_desde: float, jd_hasta: float) -> None:
+    if jd_hasta <= jd_desde:
+        raise ValueError("El final del rango debe ser posterior al inicio")
+    if jd_hasta - jd_desde > MAX_DIAS_RANGO:
+        raise ValueError(f"Rango demasiado largo (máximo {MAX_DIAS_RANGO} días)")
+
+
+def _filtrar(meses: Dict[str, List[Dict]], jd_desde: float, jd_hasta: float, tipos: Optional[Sequence[str]]) -> List[Dict]:
+    """Eventos del rango (incluye la Luna vacía que ya estaba en curso al empezar)."""
+    if tipos:
+        desconocidos = [t for t in tipos if t not in TIPOS_EVENTO]
+        if desconocidos:
+            raise ValueError(f"Tipos desconocidos: {', '.join(desconocidos)}. Opciones: {', '.join(TIPOS_EVENTO)}")
+    resultado = [
+        e for clave in sorted(meses) for e in meses[clave]
+        if e['jd'] < jd_hasta and e.get('jd_fin', e['jd']) >= jd_desde and (not tipos or e['tipo'] in tipos)
+    ]
+    return resultado
+
+
+def eventos_en_rango(jd_desde: float, jd_hasta: float, tipos: Optional[Sequence[str]] = None) -> List[Dict]:
+    """Eventos en [jd_desde, jd_hasta) con caché en memoria (uso síncrono)."""
+    _validar_rango(jd_desde, jd_hasta)
+    meses = meses_en_rango(jd_desde - MARGEN_DIAS, jd_hasta)
+    claves = [clave_mes(a, m) for a, m in meses]
+    encontrados = cache_calendario.obtener(claves)
+    pendientes = [am for am, clave in zip(meses, claves) if clave not in encontrados]
+    if pendientes:
+        nuevos = calcular_meses(pendientes)
+        cache_calendario.guardar(nuevos)
+        encontrados.update(nuevos)
+    return _filtrar(encontrados, jd_desde, jd_hasta, tipos)
+
+
+async def eventos_en_rango_async(jd_desde: float, jd_hasta: float, tipos: Optional[Sequence[str]] = None) -> List[Dict]:
+    """
+    Eventos en [jd_desde, jd_hasta): memoria → Mongo → cálculo de los meses que falten en una
+    sola tarea del pool de procesos (`astro_executor`), que después se guardan en ambos niveles.
+    """
+    from app.services.astro_executor import ejecutar_astro
+
+    _validar_rango(jd_desde, jd_hasta)
+    meses = meses_en_rango(jd_desde - MARGEN_DIAS, jd_hasta)
+    claves = [clave_mes(a, m) for a, m in meses]
+    encontrados = cache_calendario.obtener(claves)
+
+    if calendario_mongo is not None and len(encontrados) < len(claves):
+        persistidos = await calendario_mongo.obtener([c for c in claves if c not in encontrados])
+        cache_calendario.guardar(persistidos)
+        encontrados.update(persistidos)
+
+    pendientes = [am for am, clave in zip(meses, claves) if clave not in encontrados]
+    if pendientes:
+        nuevos = await ejecutar_astro(calcular_meses, pendientes)
+        cache_calendario.guardar(nuevos)
+        if calendario_mongo is not None:
+            await calendario_mongo.guardar(nuevos)
+        encontrados.update(nuevos)
+    return _filtrar(encontrados, jd_desde, jd_hasta, tipos)
+
+
+# ---------------------------------------------------------------------------
+# Horas planetarias (dependen del lugar)
+# ---------------------------------------------------------------------------
+
+def _salida_o_puesta(jd_ut: float, latitud: float, longitud: float, evento: int) -> float:
+    res, tret = swe.rise_trans(jd_ut, swe.SUN, evento, (longitud, latitud, 0.0))
+    if res != 0:
+        raise ValueError("El Sol no sale o no se pone ese día en esta latitud (día/noche polar)")
+    return tret[0]
+
+
+@lru_cache(maxsize=4096)
+def _horas_planetarias(fecha: str, latitud: float, longitud: float, zona: str) -> Tuple:
+    tz = pytz.timezone(zona)
+    dia = datetime.strptime(fecha, "%Y-%m-%d")
+    jd_medianoche = datetime_a_jd(tz.localize(dia))
+    salida = _salida_o_puesta(jd_medianoche, latitud, longitud, swe.CALC_RISE)
+    puesta = _salida_o_puesta(salida, latitud, longitud, swe.CALC_SET)
+    salida_siguiente = _salida_o_puesta(puesta, latitud, longitud, swe.CALC_RISE)
+    return salida, puesta, salida_siguiente, REGENTES_DIA[dia.weekday()]
+
+
+def horas_planetarias(fecha: str, latitud: float, longitud: float, zona_horaria: Optional[str] = None) -> Dict:
+    """
+    Las 24 horas planetarias del día `fecha` (12 diurnas de salida a puesta del Sol y 12 nocturnas
+    hasta la salida siguiente). La primera la rige el regente del día y siguen el orden caldeo.
+
+    Raises:
+        ValueError: si ese día no hay salida o puesta del Sol (latitudes polares)
+    """
+    zona = _resolver_zona_horaria(float(latitud), float(longitud), zona_horaria)
+    tz = pytz.timezone(zona)
+    salida, puesta, salida_siguiente, regente = _horas_planetarias(fecha, round(latitud, 4), round(longitud, 4), zona)
+
+    def _local(jd: float) -> str:
+        return jd_a_datetime_utc(jd).astimezone(tz).strftime("%Y-%m-%d %H:%M:%S")
+
+    horas = []
+    inicio_orden = ORDEN_CALDEO.index(regente)
+    for n in range(24):
+        diurna = n < 12
+        a, b = (salida, puesta) if diurna else (puesta, salida_siguiente)
+        duracion = (b - a) / 12.0
+        jd0 = a + (n % 12) * duracion
+        horas.append({
+            'numero': n + 1,
+            'periodo': 'dia' if diurna else 'noche',
+            'regente': ORDEN_CALDEO[(inicio_orden + n) % 7],
+            'inicio': _local(jd0),
+            'fin': _local(jd0 + duracion),
+            'duracion_minutos': round(duracion * 1440.0, 2),
+        })
+    return {
+        'fecha': fecha,
+        'zona_horaria': zona,
+        'regente_dia': regente,
+        'salida_sol': _local(salida),
+        'puesta_sol': _local(puesta),
+        'salida_sol_siguiente': _local(salida_siguiente),
+        'horas': horas,
+    }
@@ -0,0 +1,178 @@
+"""
+Estrellas fijas y asteroides
+
+Estrellas:
+- El catálogo (`app/data/estrellas_fijas.json`, longitudes eclípticas J2000) se carga una vez.
+  No depende de `sefstars.txt` de Swiss Ephemeris.
+- Por época (año) se precesa todo el catálogo con la precesión general en longitud y se ordena
+  por longitud: el índice resultante se cachea (`indice_para_epoca`).
+- "¿Qué estrellas están a menos de 1° de este punto?" es una búsqueda binaria en el índice,
+  partida en dos tramos cuando el intervalo cruza 0° Aries.
+
+Asteroides (Ceres, Palas, Juno, Vesta, Eris) se calculan con Swiss Ephemeris y requieren los
+ficheros .se1 (`SWISSEPH_PATH`, ver `ephemeris_files`); si no están instalados el asteroide
+queda en None (como Quirón en `calcular_posiciones_planetas`) y no se vuelve a intentar.
+"""
+import json
+import os
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import swisseph as swe
+
+from app.services.ephemeris import grado_a_zodiaco
+from app.services.ephemeris_files import disponible, es_fichero_no_encontrado, marcar_no_disponible
+from app.services.ephemeris_vector import FLAGS_POR_DEFECTO
+
+RUTA_CATALOGO = os.getenv("ESTRELLAS_FIJAS_CATALOGO") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "estrellas_fijas.json"
+)
+
+JD_J2000 = 2451545.0
+DIAS_POR_AÑO = 365.25
+
+# Precesión general en longitud (grados por año)
+PRECESION_ANUAL_GRADOS = 50.29 / 3600.0
+
+ORBE_ESTRELLAS_POR_DEFECTO = 1.0
+
+ASTEROIDES = {
+    'Ceres': swe.CERES,
+    'Palas': swe.PALLAS,
+    'Juno': swe.JUNO,
+    'Vesta': swe.VESTA,
+    'Eris': swe.AST_OFFSET + 136199,
+}
+
+
+@lru_cache(maxsize=1)
+def cargar_catalogo() -> Tuple[Tuple[str, float, float], ...]:
+    """Catálogo de estrellas como tuplas (nombre, longitud_j2000, magnitud). Vacío si no se puede leer."""
+    try:
+        with open(RUTA_CATALOGO, "r", encoding="utf-8") as f:
+            datos = json.load(f) or {}
+    except Exception as e:
+        print(f"⚠️ No se pudo leer el catálogo de estrellas fijas ({RUTA_CATALOGO}): {e}")
+        return ()
+    return tuple(
+        (e['nombre'], float(e['longitud_j2000']) % 360.0, float(e.get('magnitud', 0.0)))
+        for e in datos.get('estrellas', [])
+    )
+
+
+def epoca_de_jd(jd_ut: float) -> int:
+    """Año (época) usado para precesar el catálogo en una fecha."""
+    return int(round(2000.0 + (jd_ut - JD_J2000) / DIAS_POR_AÑO))
+
+
+class IndiceEstrellas:
+    """Catálogo precesado a una época y ordenado por longitud (búsqueda binaria con vuelta en 360°)."""
+
+    __slots__ = ("epoca", "nombres", "longitudes", "magnitudes")
+
+    def __init__(self, catalogo: Sequence[Tuple[str, float, float]], epoca: int):
+        self.epoca = epoca
+        desplazamiento = (epoca - 2000) * PRECESION_ANUAL_GRADOS
+        ordenado = sorted(((lon + desplazamiento) % 360.0, nombre, mag) for nombre, lon, mag in catalogo)
+        self.longitudes = [e[0] for e in ordenado]
+        self.nombres = [e[1] for e in ordenado]
+        self.magnitudes = [e[2] for e in ordenado]
+
+    def __len__(self) -> int:
+        return len(self.longitudes)
+
+    def _tramos(self, longitud: float, orbe: float) -> List[Tuple[int, int]]:
+        """Rangos de índices [i, j) con longitud dentro de ±orbe."""
+        a, b = longitud - orbe, longitud + orbe
+        if a < 0.0:
+            intervalos = [(a + 360.0, 360.0), (0.0, b)]
+        elif b >= 360.0:
+            intervalos = [(a, 360.0), (0.0, b - 360.0)]
+        else:
+            intervalos = [(a, b)]
+        return [(bisect_left(self.longitudes, lo), bisect_right(self.longitudes, hi)) for lo, hi in intervalos]
+
+    def cerca(self, longitud: float, orbe: float = ORBE_ESTRELLAS_POR_DEFECTO) -> List[Dict]:
+        """Estrellas a menos de `orbe` grados de `longitud`, de la más cercana a la más lejana."""
+        longitud = longitud % 360.0
+        encontradas = []
+        for i, j in self._tramos(longitud, orbe):
+            for k in range(i, j):
+                distancia = (self.longitudes[k] - longitud + 180.0) % 360.0 - 180.0
+                encontradas.append({
+                    'estrella': self.nombres[k],
+                    'longitud': round(self.longitudes[k], 4),
+                    'magnitud': self.magnitudes[k],
+                    'orbe': round(abs(distancia), 4),
+                })
+        return sorted(encontradas, key=lambda e: e['orbe'])
+
+
+@lru_cache(maxsize=64)
+def indice_para_epoca(epoca: int) -> IndiceEstrellas:
+    """Índice de estrellas precesado a `epoca` (cacheado: una precesión por época)."""
+    return IndiceEstrellas(cargar_catalogo(), epoca)
+
+
+def conjunciones_estrellas(
+    puntos: Dict[str, float],
+    jd_ut: float,
+    orbe: float = ORBE_ESTRELLAS_POR_DEFECTO,
+    magnitud_max: Optional[float] = None
+) -> List[Dict]:
+    """
+    Conjunciones de los puntos de una carta ({nombre: longitud}) con estrellas fijas.
+
+    Returns:
+        Lista de {punto, estrella, longitud, magnitud, orbe} ordenada por orbe.
+    """
+    if not 0 < orbe < 180:
+        raise ValueError(f"Orbe inválido: {orbe}")
+    indice = indice_para_epoca(epoca_de_jd(jd_ut))
+    resultado = []
+    for punto, lon in puntos.items():
+        if lon is None:
+            continue
+        for e in indice.cerca(lon, orbe):
+            if magnitud_max is None or e['magnitud'] <= magnitud_max:
+                resultado.append({'punto': punto, **e})
+    return sorted(resultado, key=lambda c: c['orbe'])
+
+
+def calcular_asteroides(jd_ut: float, asteroides: Optional[Sequence[str]] = None) -> Dict[str, Optional[Dict]]:
+    """
+    Posiciones de asteroides en el mismo formato que `calcular_posiciones_planetas`.
+    Los que no se pueden calcular (sin ficheros .se1) quedan en None.
+    """
+    posiciones = {}
+    for nombre in (asteroides or ASTEROIDES):
+        if nombre not in ASTEROIDES:
+            raise ValueError(f"Asteroide desconocido: {nombre}")
+        if not disponible(nombre):
+            # Sin ficheros .se1: falla igual en cualquier fecha, no se reintenta
+            posiciones[nombre] = None
+            continue
+        try:
+            res = swe.calc_ut(jd_ut, ASTEROIDES[nombre], FLAGS_POR_DEFECTO)[0]
+        except swe.Error as e:
+            if es_fichero_no_encontrado(e):
+                marcar_no_disponible(nombre, e)
+            else:
+                print(f"Error calculando {nombre}: {e}")
+            posiciones[nombre] = None
+            continue
+        longitud, velocidad = res[0], res[3]
+        pos_zodiacal = grado_a_zodiaco(longitud, incluir_segundos=False)
+        retro = velocidad < 0
+        posiciones[nombre] = {
+            'longitud': longitud,
+            'velocidad': velocidad,
+            'retrogrado': retro,
+            'signo': pos_zodiacal['signo'],
+            'grados': pos_zodiacal['grados'],
+            'minutos': pos_zodiacal['minutos'],
+            'segundos': pos_zodiacal['segundos'],
+            'texto': pos_zodiacal['texto'] + (' R' if retro else '')
+        }
+    return posiciones
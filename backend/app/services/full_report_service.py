@@ -8,6 +8,10 @@ from app.services.documentation_service import documentation_service
 from app.services.ai_expert_service import get_ai_expert_service
 from app.services.rag_router import rag_router
 import app.services.ephemeris as ephemeris
+from app.services.ephemeris_tables import calcular_posiciones_rapidas
+from app.services.aspect_engine import calcular_aspectos_cruzados, calcular_aspectos_natales, RECEIVER_PRIORITY
+from app.services.progressions import calcular_progresiones, jd_natal_de_carta
+from app.services.transit_search import puntos_natales_de_carta
 import pytz
 from datetime import datetime
 
@@ -17,9 +21,9 @@ try:
     root_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
     if root_path not in sys.path:
         sys.path.append(root_path)
-    from orb_engine import OrbEngine
+    from orb_engine import AsyncOrbEngine
 except ImportError:
-    OrbEngine = None
+    AsyncOrbEngine = None
 
 class FullReportService:
     """
@@ -34,17 +38,15 @@ class FullReportService:
         self.doc_service = documentation_service
         self.ai_service = get_ai_expert_service()
         
-        # Inicializar OrbEngine
+        # Inicializar OrbEngine (asíncrono y perezoso: usa el cliente Motor compartido
+        # y no conecta hasta la primera lectura de calculation_rules)
         self.orb_engine = None
-        if OrbEngine:
+        if AsyncOrbEngine:
             mongo_url = os.getenv("MONGODB_URL") or os.getenv("MONGODB_URI")
             if mongo_url:
-                try:
-                    # Usar la base de datos 'fraktal' por defecto
-                    self.orb_engine = OrbEngine(mongo_url, "fraktal")
-                    print("✅ FullReportService - OrbEngine inicializado correctamente")
-                except Exception as e:
-                    print(f"⚠️ FullReportService - Error al inicializar OrbEngine: {e}")
+                # Usar la base de datos 'fraktal' por defecto
+                self.orb_engine = AsyncOrbEngine(db_name="fraktal")
+                print("✅ FullReportService - OrbEngine inicializado correctamente")
 
     def _generate_ejes_template_prompt(self, *, report_mode: str = "full") -> str:
         """
@@ -169,10 +171,11 @@ RECUERDA: Todos los informes deben tener el mismo "peso" y densidad. Las casas v
 
         return True, ""
 
-    def build_chart_facts(self, chart_data: Dict) -> Dict:
+    def build_chart_facts(self, chart_data: Dict, orb_config: Optional[Dict] = None) -> Dict:
         """
         Construye un set compacto de 'facts' a partir de carta_data para reducir tokens de prompt.
         Diseñado para ser robusto ante variaciones de shape (usa .get y fallbacks).
+        `orb_config`: config NATAL ya resuelto (desde código async); si falta se usa el de la caché.
         """
         if not isinstance(chart_data, dict):
             return {"raw_type": str(type(chart_data))}
@@ -225,27 +228,48 @@ RECUERDA: Todos los informes deben tener el mismo "peso" y densidad. Las casas v
 
         # Filtrado inteligente de aspectos con OrbEngine si está disponible
         aspectos_compact: List[Dict] = []
-        if self.orb_engine:
-            config = self.orb_engine.get_effective_config("NATAL")
+        # Método síncrono: sin config resuelto se usa el de la caché sin esperar a Mongo
+        config = orb_config
+        if config is None and self.orb_engine:
+            config = self.orb_engine.peek_effective_config("NATAL")
+        if self.orb_engine and aspectos_raw:
             if config:
                 # Si tenemos orbes personalizados, filtramos la lista original
+                candidatos = []
                 for a in aspectos_raw:
                     if not isinstance(a, dict): continue
                     p1 = a.get("planeta1") or a.get("p1")
                     p2 = a.get("planeta2") or a.get("p2")
                     angle = a.get("angulo") or a.get("angle")
-                    
                     if p1 and p2 and angle is not None:
-                        # validar aspecto con lógica de orbes (Efecto Paraguas por defecto en NATAL)
-                        res = self.orb_engine.validate_aspect(p1, p2, angle, config)
-                        if res.get('isValid'):
-                            aspectos_compact.append({
-                                "p1": p1, "p2": p2,
-                                "tipo": res.get("aspectType") or a.get("tipo") or a.get("aspect") or "",
-                                "orbe": res.get("orb") or a.get("orbe") or a.get("orb") or "",
-                                "nota": res.get("note", "")
-                            })
+                        candidatos.append((a, p1, p2, float(angle)))
+
+                if candidatos:
+                    # validar todos los aspectos de una vez con las tablas de orbes compiladas
+                    # (Efecto Paraguas por defecto en NATAL)
+                    compilada = self.orb_engine.compile_config(config)
+                    _, p1s, p2s, angles = zip(*candidatos)
+                    val = compilada.validar_pares(p1s, p2s, angles)
+                    for i in map(int, val["valido"].nonzero()[0]):
+                        a, p1, p2, _ = candidatos[i]
+                        res = compilada.resultado(int(val["aspecto"][i]), val["orbe"][i], val["limite"][i])
+                        aspectos_compact.append({
+                            "p1": p1, "p2": p2,
+                            "tipo": res.get("aspectType") or a.get("tipo") or a.get("aspect") or "",
+                            "orbe": res.get("orb") or a.get("orbe") or a.get("orb") or "",
+                            "nota": res.get("note", "")
+                        })
         
+        # Sin aspectos del cliente: calcularlos en servidor a partir de las longitudes
+        if not aspectos_raw and isinstance(planetas, dict):
+            for a in calcular_aspectos_natales(planetas, angulos if isinstance(angulos, dict) else None, config)[:200]:
+                aspectos_compact.append({
+                    "p1": a["p1"], "p2": a["p2"],
+                    "tipo": a["tipo"],
+                    "orbe": a["orbe"],
+                    "aplicativo": a["aplicativo"],
+                })
+
         # Fallback si no hay OrbEngine o no se filtró nada útil
         if not aspectos_compact and isinstance(aspectos_raw, list):
             for a in aspectos_raw[:200]:
@@ -268,75 +292,80 @@ RECUERDA: Todos los informes deben tener el mismo "peso" y densidad. Las casas v
     async def _calculate_current_transits(self, natal_data: Dict) -> Dict:
         """
         Calcula tránsitos actuales comparándolos con las posiciones natales.
+        El cálculo (posiciones + matriz de aspectos) va en un hilo para no bloquear el event loop.
         """
         try:
-            # 1. Obtener Julian Day actual (UTC)
-            now = datetime.now(pytz.utc)
-            hora_utc_dec = now.hour + now.minute/60.0 + now.second/3600.0
-            import swisseph as swe
-            jd_now = swe.julday(now.year, now.month, now.day, hora_utc_dec)
-
-            # 2. Calcular posiciones de tránsitos
-            transit_positions = ephemeris.calcular_posiciones_planetas(jd_now)
-            
-            natal_planetas = natal_data.get("planetas") or {}
-            natal_casas = natal_data.get("casas_cuspides") or [c.get("grado") for c in natal_data.get("casas", [])]
-            if not natal_casas and "casas" in natal_data:
-                 # fallback a la lista de dicts
-                 natal_casas = [c.get("grado") or c.get("cuspide") for c in natal_data.get("casas", [])]
-
-            transitos_destacados = []
-            
             # Obtener config de tránsitos
             transit_config = None
             if self.orb_engine:
-                transit_config = self.orb_engine.get_config("TRANSIT")
+                transit_config = await self.orb_engine.get_effective_config_async("TRANSIT")
+            return await asyncio.to_thread(self._transitos_actuales, natal_data, transit_config)
+        except Exception as e:
+            print(f"⚠️ Error calculando tránsitos: {e}")
+            return {"error": str(e)}
 
-            # 3. Comparar Tránsitos vs Natal
-            for t_name, t_pos in transit_positions.items():
-                if not t_pos: continue
-                
-                # Aspectos a planetas natales
-                for n_name, n_pos in natal_planetas.items():
-                    if not n_pos: continue
-                    
-                    dist = self.orb_engine.angular_distance(t_pos["longitud"], n_pos["longitud"]) if self.orb_engine else abs(t_pos["longitud"] - n_pos["longitud"]) % 360
-                    if dist > 180: dist = 360 - dist
-                    
-                    # Validar si hay aspecto
-                    is_valid = False
-                    tipo_aspecto = ""
-                    nota_tecnica = ""
-                    if self.orb_engine and transit_config:
-                        res = self.orb_engine.validate_aspect(t_name, n_name, dist, transit_config)
-                        is_valid = res.get('isValid', False)
-                        tipo_aspecto = res.get('aspectType', "")
-                        nota_tecnica = res.get('note', "")
-                    else:
-                        # Fallback simple
-                        for asp, exact in {"conjunction": 0, "opposition": 180, "square": 90, "trine": 120, "sextile": 60}.items():
-                            if abs(dist - exact) <= 5: # orbe genérico 5°
-                                is_valid = True
-                                tipo_aspecto = asp
-                                break
-                    
-                    if is_valid:
-                        transitos_destacados.append({
-                            "transit_planet": t_name,
-                            "natal_planet": n_name,
-                            "aspect": tipo_aspecto,
-                            "orb": round(dist - self.orb_engine.get_exact_angle_for_aspect(tipo_aspecto), 2) if self.orb_engine and tipo_aspecto else round(dist, 2),
-                            "signo_transito": t_pos["signo"],
-                            "nota": nota_tecnica
-                        })
+    def _transitos_actuales(self, natal_data: Dict, transit_config: Optional[Dict]) -> Dict:
+        """Parte síncrona (CPU) de `_calculate_current_transits`."""
+        # 1. Obtener Julian Day actual (UTC)
+        now = datetime.now(pytz.utc)
+        hora_utc_dec = now.hour + now.minute/60.0 + now.second/3600.0
+        import swisseph as swe
+        jd_now = swe.julday(now.year, now.month, now.day, hora_utc_dec)
+
+        # 2. Calcular posiciones de tránsitos
+        # (servidas desde tablas precalculadas si existen; si no, Swiss Ephemeris)
+        transit_positions = calcular_posiciones_rapidas(jd_now)
+        
+        natal_planetas = natal_data.get("planetas") or {}
+        natal_casas = natal_data.get("casas_cuspides") or [c.get("grado") for c in natal_data.get("casas", [])]
+        if not natal_casas and "casas" in natal_data:
+             # fallback a la lista de dicts
+             natal_casas = [c.get("grado") or c.get("cuspide") for c in natal_data.get("casas", [])]
+
+        # 3. Comparar Tránsitos vs Natal (matriz completa en una pasada; manda el orbe natal)
+        transitos_destacados = []
+        for a in calcular_aspectos_cruzados(
+            transit_positions, natal_planetas, transit_config, estrategia=RECEIVER_PRIORITY
+        ):
+            transitos_destacados.append({
+                "transit_planet": a["p1"],
+                "natal_planet": a["p2"],
+                "aspect": a["tipo"],
+                "orb": a["orbe"],
+                "aplicativo": a["aplicativo"],
+                "signo_transito": transit_positions[a["p1"]]["signo"],
+                "nota": f"Orbe {a['orbe']:.2f}° <= {a['limite']}° ({'aplicativo' if a['aplicativo'] else 'separativo'}). Estrategia: Prioridad Receptor (Natal)."
+            })
+
+        return {
+            "fecha_actual": now.strftime("%Y-%m-%d %H:%M UTC"),
+            "posiciones_transito": {k: {"signo": v["signo"], "grado": v["grados"]} for k,v in transit_positions.items() if v},
+            "aspectos_transit_natal": transitos_destacados[:30] # Cap para el prompt
+        }
 
+    def _calculate_progressions(self, natal_data: Dict, años_adelante: float = 5.0) -> Dict:
+        """
+        Progresiones secundarias y arco solar alrededor de la edad actual:
+        posiciones progresadas de hoy y contactos exactos del último año a los próximos `años_adelante`.
+        """
+        try:
+            jd_natal = jd_natal_de_carta(natal_data)
+            edad = (datetime.now(pytz.utc) - pytz.utc.localize(
+                datetime.strptime(natal_data["datos_entrada"]["fecha_utc"].replace(" UTC", ""), "%Y-%m-%d %H:%M:%S")
+            )).days / 365.2422
+            desde = max(0.0, edad - 1.0)
+            res = calcular_progresiones(
+                jd_natal, puntos_natales_de_carta(natal_data), desde, min(120.0, edad + años_adelante), 1.0 / 12
+            )
+            actual = min(range(len(res["edades"])), key=lambda i: abs(res["edades"][i] - edad))
             return {
-                "fecha_actual": now.strftime("%Y-%m-%d %H:%M UTC"),
-                "posiciones_transito": {k: {"signo": v["signo"], "grado": v["grado"]} for k,v in transit_positions.items() if v},
-                "aspectos_transit_natal": transitos_destacados[:30] # Cap para el prompt
+                "edad_actual": round(edad, 1),
+                "posiciones_progresadas": {c: serie[actual] for c, serie in res["progresiones"].items()},
+                "arco_solar_actual": res["arco_solar"]["arco"][actual],
+                "contactos": res["contactos"][:30]  # Cap para el prompt
             }
         except Exception as e:
-            print(f"⚠️ Error calculando tránsitos: {e}")
+            print(f"⚠️ Error calculando progresiones: {e}")
             return {"error": str(e)}
 
     def _facts_for_module(self, chart_facts: Dict, module_id: str) -> Dict:
@@ -386,7 +415,8 @@ RECUERDA: Todos los informes deben tener el mismo "peso" y densidad. Las casas v
                 "datos_entrada": datos,
                 "planetas": planetas,
                 "aspectos": aspectos,
-                "transitos_actuales": chart_facts.get("transitos_actuales", {})
+                "transitos_actuales": chart_facts.get("transitos_actuales", {}),
+                "progresiones": chart_facts.get("progresiones", {})
             }
         
         if module_id in {"modulo_2_sintesis", "modulo_3_recomendaciones"}:
@@ -479,12 +509,17 @@ RECUERDA: Todos los informes deben tener el mismo "peso" y densidad. Las casas v
         await _progress("context_fetch_done", {"context_chars": len(context)})
 
         # Facts compactos (reduce tokens y latencia manteniendo rigor)
-        effective_facts = chart_facts if isinstance(chart_facts, dict) and chart_facts else self.build_chart_facts(chart_data)
+        if isinstance(chart_facts, dict) and chart_facts:
+            effective_facts = chart_facts
+        else:
+            orb_config = await self.orb_engine.get_effective_config_async("NATAL") if self.orb_engine else None
+            effective_facts = self.build_chart_facts(chart_data, orb_config=orb_config)
         
         # Inyectar tránsitos si es el Módulo 3
         if module_id == "modulo_3_transitos":
             transitos_facts = await self._calculate_current_transits(chart_data)
             effective_facts["transitos_actuales"] = transitos_facts
+            effective_facts["progresiones"] = await asyncio.to_thread(self._calculate_progressions, chart_data)
 
         module_facts = self._facts_for_module(effective_facts, module_id)
         facts_text = self._format_facts_for_prompt(module_facts, max_chars=12000 if section['requires_template'] else 8000)
@@ -0,0 +1,59 @@
+"""
+Índice de casas por búsqueda binaria sobre cúspides "desenrolladas"
+
+Las 12 cúspides se reescriben una sola vez como secuencia creciente a partir de la cúspide 1
+(c1, c1 + (c2 - c1) % 360, ...). Asignar una longitud a su casa es entonces un único `bisect`
+en lugar del recorrido lineal con cruce de 0° Aries por cada cuerpo.
+
+Lo comparten `ephemeris.asignar_casas_a_planetas` y `OrbEngine.get_geometric_house_index`
+(mismo criterio: una longitud pertenece a la casa i si c_i <= lon < c_{i+1}).
+"""
+from bisect import bisect_right
+from typing import List, Sequence
+
+import numpy as np
+
+
+class IndiceCasas:
+    """Cúspides preprocesadas para asignación de casa en O(log 12)."""
+
+    __slots__ = ("cuspides", "_origen", "_desenrolladas")
+
+    def __init__(self, cuspides: Sequence[float]):
+        if len(cuspides) != 12:
+            raise ValueError(f"Se esperaban 12 cúspides, recibidas {len(cuspides)}")
+        self.cuspides = [float(c) % 360.0 for c in cuspides]
+        self._origen = self.cuspides[0]
+        self._desenrolladas = [self._origen + ((c - self._origen) % 360.0) for c in self.cuspides]
+
+    def _relativa(self, longitud: float) -> float:
+        return self._origen + ((longitud - self._origen) % 360.0)
+
+    def indice(self, longitud: float) -> int:
+        """Índice de casa 0-based (0 = casa 1)."""
+        return bisect_right(self._desenrolladas, self._relativa(longitud)) - 1
+
+    def casa(self, longitud: float) -> int:
+        """Número de casa 1-based."""
+        return self.indice(longitud) + 1
+
+    def indices(self, longitudes) -> np.ndarray:
+        """Versión vectorizada de `indice` (acepta arrays; NaN -> -1)."""
+        lons = np.asarray(longitudes, dtype="f8")
+        rel = self._origen + np.mod(lons - self._origen, 360.0)
+        idx = np.searchsorted(self._desenrolladas, rel, side="right") - 1
+        return np.where(np.isnan(lons), -1, idx)
+
+    def siguiente_cuspide(self, idx: int) -> float:
+        return self.cuspides[(idx + 1) % 12]
+
+
+def indice_casa(longitud: float, cuspides: Sequence[float]) -> int:
+    """Atajo para una consulta aislada (0-based). Para varios cuerpos, reutilizar `IndiceCasas`."""
+    return IndiceCasas(cuspides).indice(longitud)
+
+
+def casas_para_longitudes(longitudes: Sequence[float], cuspides: Sequence[float]) -> List[int]:
+    """Números de casa (1-based) para varias longitudes con un único índice."""
+    indice = IndiceCasas(cuspides)
+    return [indice.casa(lon) for lon in longitudes]
@@ -0,0 +1,252 @@
+"""
+Instrumentación ligera: temporizadores por etapa, contadores y export tipo Prometheus
+
+- `medir("etapa")`: context manager que acumula número de llamadas, tiempo total, máximo y una
+  ventana de las últimas `MUESTRAS_PERCENTILES` duraciones (para p50/p99).
+- `contar("evento")`: contador monotónico.
+- `traza("operacion")`: agrupa las etapas medidas dentro de una llamada; con
+  `METRICAS_LOG_ESTRUCTURADO=1` emite al terminar una línea JSON con el desglose por etapa
+  (logger `fraktal.metricas`).
+- `exportar_prometheus()` / `instantanea()`: lo que sirve `GET /metrics` (cerrado salvo
+  `METRICS_TOKEN` en la cabecera `X-Metrics-Token` o `METRICS_PUBLIC=1`).
+
+Cada proceso tiene su registro. Las tareas del pool (`astro_executor`) se ejecutan con
+`ejecutar_con_delta`: lo medido en el worker vuelve con el resultado (`DeltaMetricas`) y se
+fusiona en el registro del proceso principal, junto a `astro_pool.tarea` (tiempo de pared de
+cada tarea). `METRICAS_ACTIVAS=0` desactiva todo (coste ~cero).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+METRICAS_ACTIVAS = (os.getenv("METRICAS_ACTIVAS", "1") or "").strip().lower() not in {"0", "false", "no"}
+METRICAS_LOG_ESTRUCTURADO = (os.getenv("METRICAS_LOG_ESTRUCTURADO") or "").strip().lower() in {"1", "true", "yes"}
+MUESTRAS_PERCENTILES = int(os.getenv("METRICAS_MUESTRAS", "512"))
+
+PREFIJO_PROMETHEUS = "fraktal"
+
+logger = logging.getLogger("fraktal.metricas")
+
+
+class _Temporizador:
+    __slots__ = ("llamadas", "total", "maximo", "muestras")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.muestras = deque(maxlen=MUESTRAS_PERCENTILES)
+
+    def registrar(self, segundos: float) -> None:
+        self.llamadas += 1
+        self.total += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+        self.muestras.append(segundos)
+
+    def resumen(self) -> Dict[str, Any]:
+        ordenadas = sorted(self.muestras)
+        n = len(ordenadas)
+
+        def _p(q: float) -> float:
+            return round(ordenadas[min(n - 1, int(q * n))] * 1000.0, 4) if n else 0.0
+
+        return {
+            "llamadas": self.llamadas,
+            "total_ms": round(self.total * 1000.0, 3),
+            "media_ms": round(self.total * 1000.0 / self.llamadas, 4) if self.llamadas else 0.0,
+            "max_ms": round(self.maximo * 1000.0, 4),
+            "p50_ms": _p(0.50),
+            "p99_ms": _p(0.99),
+        }
+
+    def fusionar(self, otro: "_Temporizador") -> None:
+        self.llamadas += otro.llamadas
+        self.total += otro.total
+        if otro.maximo > self.maximo:
+            self.maximo = otro.maximo
+        self.muestras.extend(otro.muestras)
+
+
+class DeltaMetricas:
+    """Lo medido durante una tarea del pool; viaja con su resultado (picklable) y se fusiona con `registro.fusionar`."""
+
+    __slots__ = ("temporizadores", "contadores")
+
+    def __init__(self):
+        self.temporizadores: Dict[str, _Temporizador] = {}
+        self.contadores: Dict[str, int] = {}
+
+    def registrar(self, etapa: str, segundos: float) -> None:
+        t = self.temporizadores.get(etapa)
+        if t is None:
+            t = self.temporizadores[etapa] = _Temporizador()
+        t.registrar(segundos)
+
+    def contar(self, evento: str, n: int = 1) -> None:
+        self.contadores[evento] = self.contadores.get(evento, 0) + n
+
+
+class RegistroMetricas:
+    """Temporizadores y contadores del proceso. Thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._temporizadores: Dict[str, _Temporizador] = {}
+        self._contadores: Dict[str, int] = {}
+        self.inicio = time.time()
+
+    def registrar(self, etapa: str, segundos: float) -> None:
+        with self._lock:
+            t = self._temporizadores.get(etapa)
+            if t is None:
+                t = self._temporizadores[etapa] = _Temporizador()
+            t.registrar(segundos)
+
+    def contar(self, evento: str, n: int = 1) -> None:
+        with self._lock:
+            self._contadores[evento] = self._contadores.get(evento, 0) + n
+
+    def fusionar(self, delta: DeltaMetricas) -> None:
+        """Suma las métricas de una tarea ejecutada en otro proceso."""
+        with self._lock:
+            for etapa, otro in delta.temporizadores.items():
+                t = self._temporizadores.get(etapa)
+                if t is None:
+                    t = self._temporizadores[etapa] = _Temporizador()
+                t.fusionar(otro)
+            for evento, n in delta.contadores.items():
+                self._contadores[evento] = self._contadores.get(evento, 0) + n
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._temporizadores.clear()
+            self._contadores.clear()
+            self.inicio = time.time()
+
+    def instantanea(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "desde": self.inicio,
+                "etapas": {k: t.resumen() for k, t in sorted(self._temporizadores.items())},
+                "contadores": dict(sorted(self._contadores.items())),
+            }
+
+
+registro = RegistroMetricas()
+
+# Desglose de la llamada en curso (etapa -> segundos) cuando hay una `traza` abierta
+_traza_actual: ContextVar[Optional[Dict[str, float]]] = ContextVar("traza_metricas", default=None)
+# En un worker del pool, las métricas de la tarea en curso van a su delta en lugar de al registro local
+_delta_actual: ContextVar[Optional[DeltaMetricas]] = ContextVar("delta_metricas", default=None)
+
+
+class medir:
+    """Mide el bloque y lo acumula en `etapa`: `with medir("casas"): ...`"""
+
+    __slots__ = ("etapa", "_t0")
+
+    def __init__(self, etapa: str):
+        self.etapa = etapa
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if not METRICAS_ACTIVAS:
+            return False
+        dt = time.perf_counter() - self._t0
+        (_delta_actual.get() or registro).registrar(self.etapa, dt)
+        desglose = _traza_actual.get()
+        if desglose is not None:
+            desglose[self.etapa] = desglose.get(self.etapa, 0.0) + dt
+        return False
+
+
+class traza(medir):
+    """
+    Como `medir`, y además recoge las etapas anidadas de esta llamada. Con log estructurado
+    activo emite `{"operacion", "total_ms", "etapas": {...}, ...extra}` al salir.
+    """
+
+    __slots__ = ("extra", "_desglose", "_token")
+
+    def __init__(self, operacion: str, **extra):
+        super().__init__(operacion)
+        self.extra = extra
+
+    def __enter__(self):
+        self._desglose = {}
+        self._token = _traza_actual.set(self._desglose)
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        # Primero se cierra el desglose propio: la duración total cuenta en la traza padre, si la hay
+        _traza_actual.reset(self._token)
+        super().__exit__(*exc)
+        if METRICAS_ACTIVAS and METRICAS_LOG_ESTRUCTURADO:
+            total = time.perf_counter() - self._t0
+            logger.info(json.dumps({
+                "operacion": self.etapa,
+                "total_ms": round(total * 1000.0, 3),
+                "etapas": {k: round(v * 1000.0, 3) for k, v in self._desglose.items()},
+                "error": exc[0].__name__ if exc and exc[0] else None,
+                **self.extra,
+            }, ensure_ascii=False, default=str))
+        return False
+
+
+def contar(evento: str, n: int = 1) -> None:
+    if METRICAS_ACTIVAS:
+        (_delta_actual.get() or registro).contar(evento, n)
+
+
+def ejecutar_con_delta(fn, *args: Any) -> Tuple[Any, DeltaMetricas]:
+    """Ejecuta `fn(*args)` (en un worker) y devuelve (resultado, métricas de la llamada)."""
+    delta = DeltaMetricas()
+    token = _delta_actual.set(delta)
+    try:
+        return fn(*args), delta
+    finally:
+        _delta_actual.reset(token)
+
+
+def instantanea() -> Dict[str, Any]:
+    return registro.instantanea()
+
+
+def _etiqueta(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def exportar_prometheus(gauges: Optional[Dict[str, float]] = None) -> str:
+    """Formato de exposición de texto de Prometheus (contadores, sumas, máximos y cuantiles)."""
+    datos = registro.instantanea()
+    p = PREFIJO_PROMETHEUS
+    lineas = [
+        f"# TYPE {p}_etapa_segundos summary",
+    ]
+    for etapa, r in datos["etapas"].items():
+        e = _etiqueta(etapa)
+        lineas.append(f'{p}_etapa_segundos{{etapa="{e}",quantile="0.5"}} {r["p50_ms"] / 1000.0}')
+        lineas.append(f'{p}_etapa_segundos{{etapa="{e}",quantile="0.99"}} {r["p99_ms"] / 1000.0}')
+        lineas.append(f'{p}_etapa_segundos_sum{{etapa="{e}"}} {r["total_ms"] / 1000.0}')
+        lineas.append(f'{p}_etapa_segundos_count{{etapa="{e}"}} {r["llamadas"]}')
+    lineas.append(f"# TYPE {p}_etapa_segundos_max gauge")
+    for etapa, r in datos["etapas"].items():
+        lineas.append(f'{p}_etapa_segundos_max{{etapa="{_etiqueta(etapa)}"}} {r["max_ms"] / 1000.0}')
+    lineas.append(f"# TYPE {p}_eventos_total counter")
+    for evento, n in datos["contadores"].items():
+        lineas.append(f'{p}_eventos_total{{evento="{_etiqueta(evento)}"}} {n}')
+    if gauges:
+        lineas.append(f"# TYPE {p}_estado gauge")
+        for nombre, valor in sorted(gauges.items()):
+            lineas.append(f'{p}_estado{{nombre="{_etiqueta(nombre)}"}} {float(valor)}')
+    return "\n".join(lineas) + "\n"
@@ -0,0 +1,268 @@
+"""
+Progresiones secundarias y direcciones por arco solar (líneas de tiempo vectorizadas)
+
+- Progresión secundaria ("un día por año"): la carta progresada a la edad `e` (años) es la
+  posición de los cuerpos en `jd_natal + e` días.
+- Arco solar: todos los puntos natales avanzan lo mismo que el Sol progresado,
+  `arco(e) = Sol_progresado(e) - Sol_natal`.
+
+Una vida entera (0-120 años) son ~120 días de efemérides: los cuerpos progresados se muestrean
+una sola vez por carta natal, cada mes de vida (2 h de efemérides), sobre todo el rango
+(tablas precalculadas si existen, si no una única llamada vectorizada) y se cachean. Cualquier
+ventana de edades sale de esa serie: recortada si cae en la rejilla, o con Hermite cúbico (con
+las velocidades) si no. Las líneas de tiempo se devuelven como arrays (edad × cuerpo).
+
+Los contactos exactos progresado→natal y dirigido→natal se localizan sobre esas muestras
+(cambio de signo + raíz del polinomio de Hermite con las velocidades), sin llamadas
+adicionales a Swiss Ephemeris.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pytz
+
+from app.services.ephemeris import datetime_a_jd, jd_a_datetime_utc
+from app.services.ephemeris_tables import interpolar_hermite, obtener_tabla
+from app.services.ephemeris_vector import POSICION_DTYPE, calcular_posiciones_array
+from app.services.returns import PERIODO_SOLAR
+from app.services.transit_search import objetivos_de_aspectos
+
+# Cuerpos progresados por defecto (los nodos y Lilith no aportan en progresión)
+CUERPOS_PROGRESADOS = ('Sol', 'Luna', 'Mercurio', 'Venus', 'Marte', 'Júpiter', 'Saturno')
+
+EDAD_MAXIMA = 120.0
+
+# Rejilla de la serie cacheada: 12 muestras por año de vida (= 2 h de efemérides)
+MUESTRAS_POR_AÑO = 12
+
+
+def _envolver(x):
+    return np.mod(x + 180.0, 360.0) - 180.0
+
+
+# ~320 KB por carta (1441 muestras × 7 cuerpos)
+@lru_cache(maxsize=64)
+def _serie_progresada(jd_natal: float) -> np.ndarray:
+    """
+    Posiciones (T, B) de `CUERPOS_PROGRESADOS` en jd_natal + k / MUESTRAS_POR_AÑO días, para
+    k = 0 .. EDAD_MAXIMA * MUESTRAS_POR_AÑO. Una sola serie por carta, válida para cualquier ventana
+    de edades. El array devuelto es de solo lectura: se comparte entre llamadas.
+    """
+    jds = jd_natal + np.arange(int(EDAD_MAXIMA * MUESTRAS_POR_AÑO) + 1) / MUESTRAS_POR_AÑO
+    pos = np.full((len(jds), len(CUERPOS_PROGRESADOS)), np.nan, dtype=POSICION_DTYPE)
+
+    tabla = obtener_tabla()
+    pendientes = []
+    for b, cuerpo in enumerate(CUERPOS_PROGRESADOS):
+        if tabla is not None and tabla.cubre(cuerpo, float(jds[0])) and tabla.cubre(cuerpo, float(jds[-1])):
+            pos['lon'][:, b], pos['speed'][:, b] = tabla.posiciones(cuerpo, jds)
+        else:
+            pendientes.append(b)
+    if pendientes:
+        calculadas = calcular_posiciones_array(jds, [CUERPOS_PROGRESADOS[b] for b in pendientes])
+        for k, b in enumerate(pendientes):
+            pos[:, b] = calculadas[:, k]
+
+    pos.flags.writeable = False
+    return pos
+
+
+def _muestras_progresadas(jd_natal: float, edades: np.ndarray, cuerpos: Sequence[str]):
+    """
+    (lon, speed), cada uno (T, B), de `cuerpos` en jd_natal + edades (días = años).
+    Los cuerpos progresados salen de la serie cacheada; cualquier otro se calcula directamente.
+    """
+    lon = np.full((len(edades), len(cuerpos)), np.nan)
+    speed = np.full((len(edades), len(cuerpos)), np.nan)
+
+    serie = _serie_progresada(round(jd_natal, 6))
+    columnas = [(j, CUERPOS_PROGRESADOS.index(c)) for j, c in enumerate(cuerpos) if c in CUERPOS_PROGRESADOS]
+    if columnas:
+        destino, origen = (list(x) for x in zip(*columnas))
+        x = edades * MUESTRAS_POR_AÑO
+        k = np.rint(x).astype(np.int64)
+        if np.allclose(x, k, rtol=0.0, atol=1e-9):
+            # Edades en la rejilla: recorte exacto
+            lon[:, destino] = serie['lon'][k][:, origen]
+            speed[:, destino] = serie['speed'][k][:, origen]
+        else:
+            lon[:, destino], speed[:, destino] = interpolar_hermite(
+                serie['lon'][:, origen], serie['speed'][:, origen], x, 1.0 / MUESTRAS_POR_AÑO
+            )
+
+    otros = [(j, c) for j, c in enumerate(cuerpos) if c not in CUERPOS_PROGRESADOS]
+    if otros:
+        calculadas = calcular_posiciones_array(jd_natal + edades, [c for _, c in otros])
+        for k, (j, _) in enumerate(otros):
+            lon[:, j], speed[:, j] = calculadas['lon'][:, k], calculadas['speed'][:, k]
+    return lon, speed
+
+
+def _edades(edad_desde: float, edad_hasta: float, paso_años: float) -> np.ndarray:
+    if paso_años <= 0 or edad_hasta < edad_desde or edad_desde < 0 or edad_hasta > EDAD_MAXIMA:
+        raise ValueError(f"Rango de edades inválido: {edad_desde}-{edad_hasta} (paso {paso_años}, máximo {EDAD_MAXIMA})")
+    return np.arange(edad_desde, edad_hasta + paso_años * 0.5, paso_años)
+
+
+def linea_progresiones(
+    jd_natal: float,
+    edad_desde: float = 0.0,
+    edad_hasta: float = 90.0,
+    paso_años: float = 1.0,
+    cuerpos: Optional[Sequence[str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Línea de tiempo de progresiones secundarias.
+
+    Returns:
+        Dict con:
+          - edades: (T,) años cumplidos
+          - jd_evento: (T,) fecha real (JD UT) a la que corresponde cada edad
+          - cuerpos: nombres de las columnas
+          - lon, speed: (T, B) longitud progresada y su velocidad (grados por año de vida)
+    """
+    edades = _edades(edad_desde, edad_hasta, paso_años)
+    cuerpos = tuple(cuerpos) if cuerpos else CUERPOS_PROGRESADOS
+    lon, speed = _muestras_progresadas(jd_natal, edades, cuerpos)
+    return {
+        'edades': edades,
+        'jd_evento': jd_natal + edades * PERIODO_SOLAR,
+        'cuerpos': cuerpos,
+        'lon': lon,
+        'speed': speed,
+    }
+
+
+def linea_arco_solar(
+    jd_natal: float,
+    puntos_natales: Dict[str, float],
+    edad_desde: float = 0.0,
+    edad_hasta: float = 90.0,
+    paso_años: float = 1.0
+) -> Dict[str, np.ndarray]:
+    """
+    Línea de tiempo de direcciones por arco solar.
+
+    Returns:
+        Dict con edades, jd_evento, arco (T,), cuerpos (puntos natales dirigidos),
+        lon (T, P) posiciones dirigidas y speed (T, P) = velocidad del arco.
+    """
+    edades = _edades(edad_desde, edad_hasta, paso_años)
+    lon_sol, vel_sol = (m[:, 0] for m in _muestras_progresadas(jd_natal, edades, ('Sol',)))
+    sol_natal = float(_serie_progresada(round(jd_natal, 6))['lon'][0, CUERPOS_PROGRESADOS.index('Sol')])
+
+    # El arco crece ~1°/año: desenrollar evita el salto de 360° → 0°
+    arco = np.mod(lon_sol - sol_natal, 360.0)
+    arco = np.unwrap(np.radians(arco))
+    arco = np.degrees(arco)
+
+    nombres = tuple(puntos_natales)
+    natal = np.array([puntos_natales[n] for n in nombres], dtype="f8")
+    velocidad = np.repeat(vel_sol[:, None], len(nombres), axis=1)
+    return {
+        'edades': edades,
+        'jd_evento': jd_natal + edades * PERIODO_SOLAR,
+        'arco': arco,
+        'cuerpos': nombres,
+        'lon': np.mod(natal[None, :] + arco[:, None], 360.0),
+        'speed': velocidad,
+    }
+
+
+def contactos_a_natal(
+    linea: Dict[str, np.ndarray],
+    puntos_natales: Dict[str, float],
+    aspectos: Optional[Sequence[str]] = None,
+    tecnica: str = 'progresion'
+) -> List[Dict]:
+    """
+    Edades exactas en que un punto móvil de `linea` forma aspecto con un punto natal.
+
+    Detecta cambios de signo de f = lon_móvil - (natal ± ángulo) en la rejilla (T × B × M) y
+    localiza la raíz dentro del intervalo con el polinomio cúbico de Hermite (usa `speed`).
+
+    Returns:
+        Lista ordenada por edad de {tecnica, movil, natal_point, aspect, edad, fecha_utc, longitud}
+    """
+    objetivos = objetivos_de_aspectos(puntos_natales, aspectos)
+    edades, lon, vel = linea['edades'], linea['lon'], linea['speed']
+    if not objetivos or len(edades) < 2:
+        return []
+    lon_objetivos = np.array([o[2] for o in objetivos], dtype="f8")
+
+    f = _envolver(lon[:, :, None] - lon_objetivos[None, None, :])          # (T, B, M)
+    cruce = ((f[:-1] < 0) != (f[1:] < 0)) & (np.abs(f[:-1]) < 90.0) & (np.abs(f[1:]) < 90.0)
+    cruce &= np.isfinite(f[:-1]) & np.isfinite(f[1:])
+    i, b, m = np.nonzero(cruce)
+    if i.size == 0:
+        return []
+
+    # Hermite en s ∈ [0, 1] sobre cada intervalo, arrancando en la interpolación lineal
+    h = edades[i + 1] - edades[i]
+    f0, f1 = f[i, b, m], f[i + 1, b, m]
+    d0, d1 = vel[i, b] * h, vel[i + 1, b] * h
+    s = f0 / (f0 - f1)
+    for _ in range(4):
+        s2, s3 = s * s, s * s * s
+        p = (2*s3 - 3*s2 + 1) * f0 + (s3 - 2*s2 + s) * d0 + (-2*s3 + 3*s2) * f1 + (s3 - s2) * d1
+        dp = (6*s2 - 6*s) * f0 + (3*s2 - 4*s + 1) * d0 + (-6*s2 + 6*s) * f1 + (3*s2 - 2*s) * d1
+        s = np.clip(s - np.where(dp != 0, p / np.where(dp != 0, dp, 1.0), 0.0), 0.0, 1.0)
+    edad = edades[i] + s * h
+    jd_evento = linea['jd_evento'][0] + (edad - edades[0]) * PERIODO_SOLAR
+    longitud = np.mod(lon_objetivos[m], 360.0)
+
+    contactos = []
+    for k in np.argsort(edad, kind="stable"):
+        punto, aspecto, _ = objetivos[m[k]]
+        contactos.append({
+            'tecnica': tecnica,
+            'movil': linea['cuerpos'][b[k]],
+            'natal_point': punto,
+            'aspect': aspecto,
+            'edad': round(float(edad[k]), 4),
+            'fecha_utc': jd_a_datetime_utc(float(jd_evento[k])).strftime("%Y-%m-%d"),
+            'longitud': round(float(longitud[k]), 4),
+        })
+    # Un punto coincide consigo mismo en el nacimiento: esa conjunción no es un contacto
+    return [c for c in contactos if not (c['movil'] == c['natal_point'] and c['edad'] < 1e-3)]
+
+
+def jd_natal_de_carta(carta: Dict) -> float:
+    """JD UT del nacimiento a partir de `datos_entrada.fecha_utc` de una carta completa."""
+    fecha_utc = carta['datos_entrada']['fecha_utc'].replace(" UTC", "")
+    return datetime_a_jd(pytz.utc.localize(datetime.strptime(fecha_utc, "%Y-%m-%d %H:%M:%S")))
+
+
+def calcular_progresiones(
+    jd_natal: float,
+    puntos_natales: Dict[str, float],
+    edad_desde: float = 0.0,
+    edad_hasta: float = 90.0,
+    paso_años: float = 1.0,
+    aspectos: Optional[Sequence[str]] = None,
+    incluir_arco_solar: bool = True
+) -> Dict:
+    """
+    Progresiones + arco solar + contactos a natal, en formato serializable (listas) para la API.
+    Apto para el pool de procesos (función de módulo, argumentos simples).
+    """
+    prog = linea_progresiones(jd_natal, edad_desde, edad_hasta, paso_años)
+    resultado = {
+        'edades': prog['edades'].round(4).tolist(),
+        'fechas_utc': [jd_a_datetime_utc(float(jd)).strftime("%Y-%m-%d") for jd in prog['jd_evento']],
+        'progresiones': {c: prog['lon'][:, j].round(4).tolist() for j, c in enumerate(prog['cuerpos'])},
+        'contactos': contactos_a_natal(prog, puntos_natales, aspectos, 'progresion'),
+    }
+    if incluir_arco_solar:
+        arco = linea_arco_solar(jd_natal, puntos_natales, edad_desde, edad_hasta, paso_años)
+        resultado['arco_solar'] = {
+            'arco': arco['arco'].round(4).tolist(),
+            'dirigidos': {c: arco['lon'][:, j].round(4).tolist() for j, c in enumerate(arco['cuerpos'])},
+        }
+        resultado['contactos'] = sorted(
+            resultado['contactos'] + contactos_a_natal(arco, puntos_natales, aspectos, 'arco_solar'),
+            key=lambda c: c['edad']
+        )
+    return resultado
@@ -0,0 +1,220 @@
+"""
+Barrido de rectificación de la hora de nacimiento
+
+Para rectificar se prueba la carta en cada minuto de una ventana (p.ej. ±2 h) y se buscan los
+instantes en que cambia algo relevante: signo del ASC/MC, signo de un cuerpo o la casa en que
+cae. En lugar de construir cientos de cartas completas:
+
+- El ARMC avanza linealmente con el tiempo sidéreo: se calcula una vez en el centro con
+  `swe.houses` y se extiende a toda la ventana con un único array.
+- La oblicuidad es constante en la ventana: cada paso solo cuesta un `swe.houses_armc`
+  (cúspides, ASC y MC) escrito en buffers preasignados.
+- Los cuerpos apenas se mueven en unas horas: se calculan en nodos cada `PASO_NODOS_MIN`
+  minutos y se interpolan a la rejilla.
+
+Los cambios se detectan comparando pasos consecutivos y el instante se interpola dentro del paso.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pytz
+import swisseph as swe
+
+from app.services.ephemeris import (
+    SIGNOS,
+    SISTEMAS_CASAS,
+    _localizar,
+    jd_a_datetime_utc,
+    normalizar_sistema_casas,
+    sistema_casas_efectivo,
+)
+from app.services.ephemeris_vector import CUERPOS, calcular_posiciones_array
+
+# Velocidad del tiempo sidéreo (grados de ARMC por día solar medio)
+GRADOS_SIDEREOS_POR_DIA = 360.98564736629
+
+VENTANA_MAX_MINUTOS = 12 * 60
+PASO_MIN_MINUTOS = 0.25
+MAX_PASOS = 5000
+
+# Separación de los nodos donde se calculan los cuerpos (después se interpolan)
+PASO_NODOS_MIN = 60.0
+
+MINUTOS_POR_DIA = 1440.0
+
+
+def _envolver(x):
+    return np.mod(x + 180.0, 360.0) - 180.0
+
+
+def _rejilla(ventana_minutos: float, paso_minutos: float) -> np.ndarray:
+    if not 0 < ventana_minutos <= VENTANA_MAX_MINUTOS:
+        raise ValueError(f"La ventana debe estar entre 0 y {VENTANA_MAX_MINUTOS} minutos")
+    if paso_minutos < PASO_MIN_MINUTOS:
+        raise ValueError(f"El paso mínimo es {PASO_MIN_MINUTOS} minutos")
+    n = int(round(ventana_minutos / paso_minutos))
+    if 2 * n + 1 > MAX_PASOS:
+        raise ValueError(f"Demasiados pasos ({2 * n + 1}); máximo {MAX_PASOS}")
+    return np.arange(-n, n + 1) * paso_minutos
+
+
+def angulos_y_cuspides(
+    jd_centro: float,
+    minutos: np.ndarray,
+    latitud: float,
+    longitud: float,
+    sistema: str
+) -> Dict[str, np.ndarray]:
+    """
+    ASC, MC y cúspides para jd_centro + minutos.
+
+    Returns:
+        Dict con armc (T,), ascendente (T,), medio_cielo (T,) y cuspides (T, 12)
+    """
+    hsys = SISTEMAS_CASAS[sistema]
+    armc0 = swe.houses(jd_centro, latitud, longitud, hsys)[1][2]
+    eps = swe.calc_ut(jd_centro, swe.ECL_NUT)[0][0]
+    armc = np.mod(armc0 + GRADOS_SIDEREOS_POR_DIA * minutos / MINUTOS_POR_DIA, 360.0)
+
+    cuspides = np.empty((len(minutos), 12), dtype="f8")
+    ascmc = np.empty((len(minutos), 2), dtype="f8")
+    houses_armc = swe.houses_armc
+    for t, a in enumerate(armc.tolist()):
+        c, am = houses_armc(a, latitud, eps, hsys)
+        cuspides[t] = c[:12]
+        ascmc[t] = am[:2]
+    return {'armc': armc, 'ascendente': ascmc[:, 0], 'medio_cielo': ascmc[:, 1], 'cuspides': cuspides}
+
+
+def _longitudes_cuerpos(jd_centro: float, minutos: np.ndarray, cuerpos: Sequence[str]) -> np.ndarray:
+    """Longitudes (T, B) interpoladas desde nodos cada `PASO_NODOS_MIN` minutos."""
+    nodos = np.arange(minutos[0], minutos[-1] + PASO_NODOS_MIN, PASO_NODOS_MIN)
+    nodos[-1] = max(nodos[-1], minutos[-1])
+    pos = calcular_posiciones_array(jd_centro + nodos / MINUTOS_POR_DIA, cuerpos)['lon']
+    lon = np.full((len(minutos), len(cuerpos)), np.nan)
+    for b in range(len(cuerpos)):
+        if np.all(np.isfinite(pos[:, b])):
+            lon[:, b] = np.mod(np.interp(minutos, nodos, np.unwrap(pos[:, b], period=360.0)), 360.0)
+    return lon
+
+
+def _instante_cruce(f0: float, f1: float) -> float:
+    """Fracción del paso en que f (envuelta a ±180°) pasa por cero."""
+    return float(np.clip(f0 / (f0 - f1), 0.0, 1.0)) if f0 != f1 else 0.5
+
+
+def barrido_rectificacion(
+    fecha: str,
+    hora: str,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None,
+    ventana_minutos: float = 120.0,
+    paso_minutos: float = 1.0,
+    cuerpos: Optional[Sequence[str]] = None,
+    incluir_muestras: bool = False
+) -> Dict:
+    """
+    Barre la hora de nacimiento en ±ventana_minutos y devuelve los cambios de signo
+    (ASC, MC, cuerpos) y de casa (cuerpos) dentro de la ventana.
+
+    Returns:
+        Dict JSON-ready con el centro, la configuración del barrido, el estado inicial
+        y `eventos` ordenados por `minutos` (desfase respecto a la hora dada).
+    """
+    sistema = normalizar_sistema_casas(sistema_casas)
+    cuerpos = tuple(cuerpos) if cuerpos else CUERPOS
+    desconocidos = [c for c in cuerpos if c not in CUERPOS]
+    if desconocidos:
+        raise ValueError(f"Cuerpos desconocidos: {', '.join(desconocidos)}")
+
+    jd_centro, _local, _aware, _utc, zona = _localizar(fecha, hora, latitud, longitud, zona_horaria)
+    tz = pytz.timezone(zona)
+    minutos = _rejilla(ventana_minutos, paso_minutos)
+
+    # Latitud polar: todo el barrido usa el sistema sustituto (mismo criterio que la carta)
+    solicitado = sistema
+    sistema, motivo = sistema_casas_efectivo(jd_centro, latitud, sistema)
+
+    casas = angulos_y_cuspides(jd_centro, minutos, latitud, longitud, sistema)
+    lon = _longitudes_cuerpos(jd_centro, minutos, cuerpos)
+
+    # Casa (0-11) de cada cuerpo en cada paso: búsqueda binaria sobre cúspides desenrolladas
+    cusp = casas['cuspides']
+    desenrolladas = cusp[:, :1] + np.mod(cusp - cusp[:, :1], 360.0)
+    rel = cusp[:, :1] + np.mod(lon - cusp[:, :1], 360.0)
+    idx_casa = np.stack([
+        np.searchsorted(desenrolladas[t], rel[t], side="right") - 1 for t in range(len(minutos))
+    ])
+
+    eventos: List[Dict] = []
+
+    def _evento(k: int, s: float, punto: str, tipo: str, desde, hasta, **extra):
+        offset = float(minutos[k] + s * (minutos[k + 1] - minutos[k]))
+        dt_utc = jd_a_datetime_utc(jd_centro + offset / MINUTOS_POR_DIA)
+        eventos.append({
+            'minutos': round(offset, 2),
+            'hora_local': dt_utc.astimezone(tz).strftime("%Y-%m-%d %H:%M:%S"),
+            'fecha_utc': dt_utc.strftime("%Y-%m-%d %H:%M:%S UTC"),
+            'punto': punto,
+            'tipo': tipo,
+            'desde': desde,
+            'hasta': hasta,
+            **extra,
+        })
+
+    # Cambios de signo (ángulos y cuerpos)
+    series = [('Ascendente', casas['ascendente']), ('Medio Cielo', casas['medio_cielo'])]
+    series += [(c, lon[:, b]) for b, c in enumerate(cuerpos) if np.all(np.isfinite(lon[:, b]))]
+    for punto, serie in series:
+        signo = (serie // 30).astype(int) % 12
+        for k in np.nonzero(signo[:-1] != signo[1:])[0]:
+            limite = float(signo[k + 1] if _envolver(serie[k + 1] - serie[k]) > 0 else signo[k]) * 30.0
+            s = _instante_cruce(_envolver(serie[k] - limite), _envolver(serie[k + 1] - limite))
+            _evento(int(k), s, punto, 'signo', SIGNOS[signo[k]], SIGNOS[signo[k + 1]])
+
+    # Cambios de casa de los cuerpos
+    for b, c in enumerate(cuerpos):
+        if not np.all(np.isfinite(lon[:, b])):
+            continue
+        serie = idx_casa[:, b]
+        for k in np.nonzero(serie[:-1] != serie[1:])[0]:
+            antes, despues = int(serie[k]), int(serie[k + 1])
+            salto = (despues - antes) % 12
+            # La cúspide cruzada: la de la casa abandonada (hacia atrás) o la de la nueva (hacia delante)
+            j = antes if salto == 11 else despues if salto == 1 else None
+            if j is None:
+                s = 0.5
+            else:
+                s = _instante_cruce(_envolver(lon[k, b] - cusp[k, j]), _envolver(lon[k + 1, b] - cusp[k + 1, j]))
+            _evento(int(k), s, c, 'casa', antes + 1, despues + 1, **({'cuspide': j + 1} if j is not None else {}))
+
+    eventos.sort(key=lambda e: (e['minutos'], e['punto']))
+
+    resultado = {
+        'centro': {
+            'fecha': fecha,
+            'hora': hora,
+            'zona_horaria': zona,
+            'jd': round(jd_centro, 6),
+        },
+        'sistema_casas': sistema,
+        **({'fallback_casas': {'solicitado': solicitado, 'usado': sistema, 'motivo': motivo}} if motivo else {}),
+        'ventana_minutos': float(minutos[-1]),
+        'paso_minutos': float(paso_minutos),
+        'pasos': int(len(minutos)),
+        'inicial': {
+            'ascendente': SIGNOS[int(casas['ascendente'][0] // 30) % 12],
+            'medio_cielo': SIGNOS[int(casas['medio_cielo'][0] // 30) % 12],
+            'casas': {c: int(idx_casa[0, b]) + 1 for b, c in enumerate(cuerpos) if np.isfinite(lon[0, b])},
+        },
+        'eventos': eventos,
+    }
+    if incluir_muestras:
+        resultado['muestras'] = {
+            'minutos': minutos.round(4).tolist(),
+            'ascendente': casas['ascendente'].round(4).tolist(),
+            'medio_cielo': casas['medio_cielo'].round(4).tolist(),
+        }
+    return resultado
@@ -0,0 +1,174 @@
+"""
+Revoluciones solares y lunares
+
+El momento de la revolución es el instante en que el Sol (o la Luna) vuelve a su longitud
+natal (geocéntrica, como en `calcular_posiciones_planetas`). Se encuentra con Newton sobre
+
+    f(t) = envolver(lon(t) - lon_natal)  en (-180, 180]
+
+partiendo de la estimación por periodo medio (año trópico / mes sideral). Todas las
+revoluciones pedidas se refinan a la vez: cada iteración es una única llamada vectorizada
+(`calcular_posiciones_array`), así que una serie de 10 años cuesta lo mismo que una.
+
+Los JD encontrados se guardan por carta natal (`CacheRetornos`), de modo que las series
+anuales o mensuales repetidas (informes, UI) no vuelven a buscar las raíces.
+"""
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from app.services.ephemeris import PLANETAS, calcular_carta_desde_jd, jd_a_datetime_utc
+from app.services.ephemeris_vector import calcular_posiciones_array
+
+# Periodos medios (días) para la estimación inicial
+PERIODO_SOLAR = 365.242190
+PERIODO_LUNAR = 27.321582
+
+# Convergencia de Newton (días): ~0.1 s
+PRECISION_DIAS = 1e-6
+MAX_ITERACIONES = 12
+
+CUERPOS_RETORNO = {'solar': 'Sol', 'lunar': 'Luna'}
+
+
+class CacheRetornos:
+    """JD de retornos ya encontrados, por (carta natal, cuerpo) → {índice de ciclo: jd}. LRU acotado."""
+
+    def __init__(self, max_natales: int = 1024):
+        self.max_natales = max_natales
+        self._data: "OrderedDict[Tuple[str, str], Dict[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obtener(self, clave: Tuple[str, str], indices: List[int]) -> Dict[int, float]:
+        with self._lock:
+            raices = self._data.get(clave)
+            if raices is None:
+                self.misses += len(indices)
+                return {}
+            self._data.move_to_end(clave)
+            encontrados = {k: raices[k] for k in indices if k in raices}
+            self.hits += len(encontrados)
+            self.misses += len(indices) - len(encontrados)
+            return encontrados
+
+    def guardar(self, clave: Tuple[str, str], raices: Dict[int, float]) -> None:
+        with self._lock:
+            self._data.setdefault(clave, {}).update(raices)
+            self._data.move_to_end(clave)
+            while len(self._data) > self.max_natales:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"natales": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+cache_retornos = CacheRetornos()
+
+
+def _envolver(x):
+    return np.mod(x + 180.0, 360.0) - 180.0
+
+
+def refinar_retornos(cuerpo: str, lon_natal: float, jds_aprox) -> np.ndarray:
+    """
+    Newton vectorizado: para cada estimación devuelve el JD exacto en que `cuerpo` está en `lon_natal`.
+    Las estimaciones deben estar a menos de medio ciclo de la raíz buscada.
+    """
+    jds = np.array(jds_aprox, dtype="f8")
+    if jds.size == 0:
+        return jds
+    for _ in range(MAX_ITERACIONES):
+        pos = calcular_posiciones_array(jds, (cuerpo,))[:, 0]
+        paso = _envolver(pos['lon'] - lon_natal) / pos['speed']
+        jds = jds - paso
+        if np.all(np.abs(paso) < PRECISION_DIAS):
+            break
+    return jds
+
+
+def _longitud_natal(cuerpo: str, jd_natal: float) -> float:
+    return swe.calc_ut(jd_natal, PLANETAS[cuerpo], swe.FLG_SWIEPH | swe.FLG_SPEED)[0][0]
+
+
+def _retornos_por_indice(tipo: str, jd_natal: float, indices: List[int]) -> Dict[int, float]:
+    """JD de los ciclos `indices` (k-ésima vuelta desde el nacimiento), usando y alimentando la caché."""
+    cuerpo = CUERPOS_RETORNO[tipo]
+    periodo = PERIODO_SOLAR if tipo == 'solar' else PERIODO_LUNAR
+    clave = (f"{jd_natal:.6f}", cuerpo)
+
+    raices = cache_retornos.obtener(clave, indices)
+    pendientes = [k for k in indices if k not in raices]
+    if pendientes:
+        lon_natal = _longitud_natal(cuerpo, jd_natal)
+        exactos = refinar_retornos(cuerpo, lon_natal, [jd_natal + k * periodo for k in pendientes])
+        nuevos = {k: float(jd) for k, jd in zip(pendientes, exactos)}
+        cache_retornos.guardar(clave, nuevos)
+        raices.update(nuevos)
+    return raices
+
+
+def retornos_solares(jd_natal: float, desde_año: int, n: int = 1) -> List[Tuple[int, float]]:
+    """
+    Revoluciones solares de `desde_año` a `desde_año + n - 1`.
+
+    Returns:
+        Lista de (año, jd_ut exacto)
+    """
+    año_natal = swe.revjul(jd_natal)[0]
+    años = list(range(desde_año, desde_año + n))
+    raices = _retornos_por_indice('solar', jd_natal, [a - año_natal for a in años])
+    return [(a, raices[a - año_natal]) for a in años]
+
+
+def retornos_lunares(jd_natal: float, jd_desde: float, n: int = 1) -> List[float]:
+    """
+    Las `n` primeras revoluciones lunares con jd >= `jd_desde`.
+
+    Returns:
+        Lista de jd_ut exactos, en orden cronológico
+    """
+    k0 = max(1, math.floor((jd_desde - jd_natal) / PERIODO_LUNAR))
+    # Un ciclo de margen por cada lado: el mes real se desvía hasta ~0.5 días del medio
+    indices = list(range(k0, k0 + n + 2))
+    raices = _retornos_por_indice('lunar', jd_natal, indices)
+    return [jd for jd in sorted(raices[k] for k in indices) if jd >= jd_desde][:n]
+
+
+def carta_retorno(
+    tipo: str,
+    jd_retorno: float,
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None
+) -> Dict:
+    """
+    Carta levantada en el momento exacto de la revolución y en el lugar elegido
+    (donde se pasa el cumpleaños, no necesariamente el lugar de nacimiento).
+    """
+    carta = calcular_carta_desde_jd(jd_retorno, latitud, longitud, zona_horaria, sistema_casas)
+    carta['revolucion'] = {
+        'tipo': tipo,
+        'jd': round(jd_retorno, 6),
+        'fecha_utc': jd_a_datetime_utc(jd_retorno).strftime("%Y-%m-%d %H:%M:%S UTC"),
+    }
+    return carta
+
+
+def cartas_retorno(
+    tipo: str,
+    jds_retorno: List[float],
+    latitud: float,
+    longitud: float,
+    zona_horaria: Optional[str] = None,
+    sistema_casas: Optional[str] = None
+) -> List[Dict]:
+    """Varias cartas de revolución en una sola llamada (una única tarea en el pool de procesos)."""
+    return [carta_retorno(tipo, jd, latitud, longitud, zona_horaria, sistema_casas) for jd in jds_retorno]
@@ -0,0 +1,223 @@
+"""
+Búsqueda de tránsitos exactos sobre rangos de fechas
+
+Para cada cuerpo en tránsito se muestrea su longitud en una rejilla gruesa (1 día; 6 h para la
+Luna) y se evalúa de golpe, para todos los objetivos natales, la función
+
+    f(t) = envolver(lon_tránsito(t) - (lon_natal ± ángulo_aspecto))  en (-180, 180]
+
+Un cambio de signo entre dos muestras (lejos de la discontinuidad de ±180°) marca un tránsito
+exacto, que se refina con Newton (usando la velocidad) protegido por bisección hasta ~30 s.
+
+Los resultados se emiten en orden cronológico por ventanas (generador), de modo que el
+endpoint puede paginarlos o hacer streaming sin calcular todo el rango de antemano. El orden
+es total por `clave_transito` (jd, cuerpo, aspecto, punto): el cursor de paginación es la clave
+del último resultado devuelto y la página siguiente empieza estrictamente después de ella.
+"""
+import itertools
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import swisseph as swe
+
+from app.services.aspect_engine import ASPECTOS_MAYORES, ASPECTOS_MENORES
+from app.services.ephemeris import PLANETAS, jd_a_datetime_utc
+from app.services.ephemeris_tables import obtener_tabla
+from app.services.ephemeris_vector import calcular_posiciones_array
+
+CUERPOS_LENTOS = ('Júpiter', 'Saturno', 'Urano', 'Neptuno', 'Plutón')
+
+# Paso de la rejilla gruesa (días): debe ser menor que el tiempo entre dos pasos exactos consecutivos
+PASOS_BUSQUEDA_DIAS = {
+    'Luna': 0.25,
+}
+PASO_BUSQUEDA_POR_DEFECTO = 1.0
+
+# Ventana de emisión: los resultados se ordenan y emiten por bloques de este tamaño
+VENTANA_DIAS = 30.0
+
+# Precisión del refinamiento (30 segundos)
+PRECISION_DIAS = 30.0 / 86400.0
+
+FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+
+def _envolver(x):
+    return np.mod(x + 180.0, 360.0) - 180.0
+
+
+def objetivos_de_aspectos(
+    puntos_natales: Dict[str, float],
+    aspectos: Optional[Sequence[str]] = None
+) -> List[Tuple[str, str, float]]:
+    """
+    Lista de (punto natal, aspecto, longitud objetivo).
+    Los aspectos distintos de conjunción/oposición generan dos objetivos (natal ± ángulo).
+    """
+    catalogo = {**ASPECTOS_MAYORES, **ASPECTOS_MENORES}
+    aspectos = tuple(aspectos) if aspectos else tuple(ASPECTOS_MAYORES)
+    objetivos = []
+    for punto, lon in puntos_natales.items():
+        if lon is None:
+            continue
+        for aspecto in aspectos:
+            angulo = catalogo[aspecto]
+            objetivos.append((punto, aspecto, (lon + angulo) % 360.0))
+            if 0.0 < angulo < 180.0:
+                objetivos.append((punto, aspecto, (lon - angulo) % 360.0))
+    return objetivos
+
+
+def puntos_natales_de_carta(carta: Dict, incluir_angulos: bool = True) -> Dict[str, float]:
+    """Longitudes natales (planetas y, opcionalmente, ASC/MC) de una carta de `calcular_carta_completa`."""
+    puntos = {
+        nombre: pos['longitud']
+        for nombre, pos in (carta.get('planetas') or {}).items()
+        if isinstance(pos, dict) and pos.get('longitud') is not None
+    }
+    if incluir_angulos:
+        angulos = carta.get('angulos') or {}
+        for clave, etiqueta in (('ascendente', 'Ascendente'), ('medio_cielo', 'Medio Cielo')):
+            if isinstance(angulos.get(clave), dict):
+                puntos[etiqueta] = angulos[clave]['longitud']
+    return puntos
+
+
+def _longitudes(cuerpo: str, jds: np.ndarray) -> np.ndarray:
+    """Longitudes en la rejilla: tablas precalculadas si las hay, si no Swiss Ephemeris."""
+    tabla = obtener_tabla()
+    if tabla is not None and tabla.cubre(cuerpo, float(jds[0])) and tabla.cubre(cuerpo, float(jds[-1])):
+        return tabla.posiciones(cuerpo, jds)[0]
+    return calcular_posiciones_array(jds, (cuerpo,))['lon'][:, 0]
+
+
+def _refinar(id_cuerpo: int, objetivo: float, a: float, b: float, fa: float, fb: float) -> Tuple[float, float, float]:
+    """
+    Newton con salvaguarda de bisección en [a, b] (f cambia de signo en el intervalo).
+    Arranca en la interpolación lineal de la rejilla, así que suele converger en 2-3 llamadas.
+
+    Returns:
+        (jd exacto, longitud, velocidad)
+    """
+    def f(t):
+        res = swe.calc_ut(t, id_cuerpo, FLAGS)[0]
+        return (res[0] - objetivo + 180.0) % 360.0 - 180.0, res[0], res[3]
+
+    t = a + (b - a) * fa / (fa - fb)
+    lon = vel = 0.0
+    for _ in range(60):
+        ft, lon, vel = f(t)
+        if (ft < 0) == (fa < 0):
+            a, fa = t, ft
+        else:
+            b = t
+        paso = ft / vel if vel else 0.0
+        if vel and abs(paso) < PRECISION_DIAS:
+            return t - paso, lon, vel
+        nuevo = t - paso if vel else 0.5 * (a + b)
+        if not (a < nuevo < b):
+            nuevo = 0.5 * (a + b)
+        if b - a < PRECISION_DIAS:
+            return 0.5 * (a + b), lon, vel
+        t = nuevo
+    return t, lon, vel
+
+
+def clave_transito(h: Dict) -> Tuple[float, str, str, str]:
+    """Orden total de los resultados: (jd, cuerpo, aspecto, punto natal)."""
+    return (h['jd'], h['transit_planet'], h['aspect'], h['natal_point'])
+
+
+def buscar_transitos_exactos(
+    puntos_natales: Dict[str, float],
+    jd_inicio: float,
+    jd_fin: float,
+    cuerpos: Optional[Sequence[str]] = None,
+    aspectos: Optional[Sequence[str]] = None,
+    despues_de: Optional[Sequence] = None
+) -> Iterator[Dict]:
+    """
+    Genera los tránsitos exactos de `cuerpos` a `puntos_natales` en [jd_inicio, jd_fin), en orden cronológico.
+
+    Args:
+        puntos_natales: {nombre: longitud} (ver `puntos_natales_de_carta`)
+        jd_inicio, jd_fin: Rango (Julian Day UT)
+        cuerpos: Cuerpos en tránsito (por defecto, `CUERPOS_LENTOS`)
+        aspectos: Nombres de aspectos (por defecto, mayores)
+        despues_de: Cursor exclusivo (`clave_transito` del último resultado ya entregado). Se
+            reanuda en la ventana que lo contiene, con la misma rejilla que la búsqueda completa,
+            así que cada resultado se encuentra con el mismo jd y los empates no se pierden.
+
+    Yields:
+        Dicts {transit_planet, natal_point, aspect, jd, fecha_utc, longitud, retrogrado}
+    """
+    cuerpos = tuple(cuerpos) if cuerpos else CUERPOS_LENTOS
+    objetivos = objetivos_de_aspectos(puntos_natales, aspectos)
+    if not objetivos or jd_fin <= jd_inicio:
+        return
+    lon_objetivos = np.array([o[2] for o in objetivos], dtype="f8")
+
+    cursor = None
+    k = 0
+    if despues_de is not None:
+        cursor = (float(despues_de[0]), *(str(c) for c in despues_de[1:4]))
+        # Un resultado en el borde puede haber salido de la ventana anterior
+        k = max(0, int((cursor[0] - PRECISION_DIAS - jd_inicio) // VENTANA_DIAS))
+
+    # Límites de ventana por índice (no acumulados) para que coincidan al reanudar
+    w0 = jd_inicio + k * VENTANA_DIAS
+    while w0 < jd_fin:
+        w1 = min(jd_inicio + (k + 1) * VENTANA_DIAS, jd_fin)
+        hallazgos: List[Dict] = []
+
+        for cuerpo in cuerpos:
+            paso = PASOS_BUSQUEDA_DIAS.get(cuerpo, PASO_BUSQUEDA_POR_DEFECTO)
+            n = max(2, int(np.ceil((w1 - w0) / paso)) + 1)
+            jds = np.linspace(w0, w1, n)
+            lons = _longitudes(cuerpo, jds)
+            if np.isnan(lons).any():
+                continue
+
+            # (T, M): todos los objetivos a la vez
+            f = _envolver(lons[:, None] - lon_objetivos[None, :])
+            cruce = ((f[:-1] < 0) != (f[1:] < 0)) & (np.abs(f[:-1]) < 90.0) & (np.abs(f[1:]) < 90.0)
+
+            for i, m in zip(*np.nonzero(cruce)):
+                jd, lon, vel = _refinar(
+                    PLANETAS[cuerpo], float(lon_objetivos[m]), float(jds[i]), float(jds[i + 1]),
+                    float(f[i, m]), float(f[i + 1, m])
+                )
+                if not (jd_inicio <= jd < jd_fin):
+                    continue
+                punto, aspecto, _ = objetivos[m]
+                hallazgos.append({
+                    'transit_planet': cuerpo,
+                    'natal_point': punto,
+                    'aspect': aspecto,
+                    'jd': round(jd, 6),
+                    'fecha_utc': jd_a_datetime_utc(jd).strftime("%Y-%m-%d %H:%M UTC"),
+                    'longitud': round(lon % 360.0, 4),
+                    'retrogrado': vel < 0,
+                })
+
+        hallazgos.sort(key=clave_transito)
+        for h in hallazgos:
+            if cursor is None or clave_transito(h) > cursor:
+                yield h
+        k += 1
+        w0 = w1
+
+
+def buscar_transitos_pagina(
+    puntos_natales: Dict[str, float],
+    jd_inicio: float,
+    jd_fin: float,
+    cuerpos: Optional[Sequence[str]] = None,
+    aspectos: Optional[Sequence[str]] = None,
+    limite: int = 200,
+    despues_de: Optional[Sequence] = None
+) -> List[Dict]:
+    """Los primeros `limite` resultados de `buscar_transitos_exactos` tras el cursor (apto para el pool de procesos)."""
+    return list(itertools.islice(
+        buscar_transitos_exactos(puntos_natales, jd_inicio, jd_fin, cuerpos, aspectos, despues_de), limite
+    ))
@@ -1,13 +1,15 @@
 """
 Punto de entrada principal del backend FastAPI
 """
+import asyncio
+import hmac
 import os
 import sys
 import certifi
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime
 from dotenv import load_dotenv
@@ -199,14 +201,35 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting FRAKTAL API...")
     await seed_default_data_if_empty()
+    try:
+        # Ficheros de efemérides del proceso principal (los workers precalientan en su arranque)
+        informe = await asyncio.to_thread(informe_efemerides)
+        print(f"✅ Ephemeris ready (modo {informe['modo']}, no disponibles: {informe['no_disponibles'] or 'ninguno'})")
+    except Exception as e:
+        print(f"⚠️ Warning: Could not warm up ephemeris files: {e}", file=sys.stderr)
+    try:
+        # Arrancar los workers de cálculo astrológico antes de la primera petición
+        await asyncio.to_thread(precalentar_pool)
+        print(f"✅ Astro worker pool ready ({astro_executor.max_workers} workers)")
+    except Exception as e:
+        print(f"⚠️ Warning: Could not warm up astro worker pool: {e}", file=sys.stderr)
+    if full_report_service.orb_engine:
+        # Presets de orbes en segundo plano: el arranque no espera a Mongo
+        full_report_service.orb_engine.programar_precarga()
     yield
     # Shutdown
     print("👋 Shutting down FRAKTAL API...")
+    astro_executor.shutdown()
 
 # Forzar uso de certificados actualizados para TLS
 os.environ["SSL_CERT_FILE"] = certifi.where()
 
 from app.main import router as app_router
+from app.services.astro_executor import astro_executor, precalentar_pool
+from app.services.chart_cache import estadisticas_cache
+from app.services.ephemeris_files import informe as informe_efemerides
+from app.services.full_report_service import full_report_service
+from app.services.metrics import exportar_prometheus, instantanea
 
 # Crear instancia de FastAPI
 app = FastAPI(
@@ -284,6 +307,44 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+def _estado_metricas() -> dict:
+    """Gauges de pool y caché que acompañan a los temporizadores en /metrics."""
+    gauges = {f"astro_pool.{k}": float(v) for k, v in astro_executor.stats().items()}
+    memoria = estadisticas_cache()["memoria"]
+    gauges.update({f"chart_cache.{k}": float(v) for k, v in memoria.items()})
+    return gauges
+
+
+def _metricas_autorizadas(request: Request) -> bool:
+    """/metrics es cerrado por defecto: `X-Metrics-Token` == METRICS_TOKEN, o METRICS_PUBLIC=1 (red interna)."""
+    if (os.getenv("METRICS_PUBLIC") or "").strip().lower() in {"1", "true", "yes"}:
+        return True
+    token = os.getenv("METRICS_TOKEN")
+    return bool(token) and hmac.compare_digest(request.headers.get("x-metrics-token", ""), token)
+
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    """Temporizadores por etapa, contadores y estado del pool/caché (formato Prometheus)"""
+    if not _metricas_autorizadas(request):
+        return JSONResponse(status_code=401, content={"detail": "Token de métricas inválido"})
+    return PlainTextResponse(exportar_prometheus(_estado_metricas()), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/json")
+async def metrics_json(request: Request):
+    """Las mismas métricas en JSON (p50/p99 en ms por etapa)"""
+    if not _metricas_autorizadas(request):
+        return JSONResponse(status_code=401, content={"detail": "Token de métricas inválido"})
+    return {**instantanea(), "estado": _estado_metricas()}
+
+
+@app.get("/health/ephemeris")
+async def health_ephemeris():
+    """Ruta de ficheros .se1 y origen de cada cuerpo (ficheros, Moshier, analítico o no disponible)"""
+    return informe_efemerides()
+
+
 @app.get("/health/db")
 async def health_db():
     """Verifica conexión a MongoDB"""
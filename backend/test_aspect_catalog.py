@@ -0,0 +1,126 @@
+"""
+Tests del catálogo de aspectos de OrbEngine (menores, paralelos de declinación, detección por bisect)
+Ejecutar con: python test_aspect_catalog.py
+
+TESTS:
+1. Catálogo desde calculation_rules: detección del exacto más cercano (escalar == vectorizada == fuerza bruta)
+2. Declinaciones de la carta (tropical y sideral) == Swiss Ephemeris ecuatorial
+3. Paralelos y contraparalelos validados con las tablas de orbes compiladas
+"""
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import swisseph as swe
+
+from orb_engine import OrbEngine, RECEIVER_PRIORITY
+from app.services.chart_model import calcular_carta_compacta
+from app.services.ephemeris import PLANETAS
+
+NACIMIENTO = ("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+
+CONFIG = {
+    "rules": {"aspects": {"strategy": "UMBRELLA_MAX", "catalog": [
+        "conjunction", "opposition", "square", "trine", "sextile",
+        {"type": "quincunx", "orb": 3},
+        {"type": "semisquare", "margin": 4},
+        "sesquiquadrate", "biquintile",
+        {"type": "septile", "angle": 360 / 7, "margin": 2, "orb": 1},
+        {"type": "parallel", "orb": 1.2},
+        "contraparallel",
+        {"type": "inventado"},
+    ]}},
+    "orbs": [
+        {"body": "Sol", "conjunction": 10, "square": 8, "parallel": 1.5},
+        {"body": "Luna", "conjunction": 10, "square": 8, "quincunx": 4},
+        {"body": "Marte", "conjunction": 7, "square": 6, "contraparallel": 0.5},
+    ],
+}
+CUERPOS = ["Sol", "Luna", "Marte", "Quirón"]
+
+
+def test_catalogo_y_deteccion():
+    """Test 1: catálogo configurable y candidato más cercano en O(log k)"""
+    engine = OrbEngine()
+    compilada = engine.compile_config(CONFIG)
+    assert compilada.aspectos == ("conjunction", "semisquare", "septile", "sextile", "square", "trine",
+                                  "sesquiquadrate", "biquintile", "quincunx", "opposition")
+    assert compilada.paralelos == ("parallel", "contraparallel")
+    assert list(compilada.exactos) == sorted(compilada.exactos)
+
+    rng = random.Random(21)
+    angulos = [rng.uniform(-360, 720) for _ in range(4000)] + [0.0, 180.0, 22.5, 147.0, 45.0 + 4.0, 45.0 + 4.01]
+    vector = compilada.validar_pares(["Sol"] * len(angulos), ["Luna"] * len(angulos), angulos)
+    for i, angulo in enumerate(angulos):
+        sep = abs(angulo) % 360
+        sep = 360 - sep if sep > 180 else sep
+        d = np.abs(compilada.exactos - sep)
+        cercano = int(np.argmin(d))  # empate: el de menor ángulo
+        esperado = cercano if d[cercano] <= compilada.margenes[cercano] else -1
+        k = compilada.detectar(angulo)
+        assert k == esperado == vector["aspecto"][i], f"❌ {angulo}: {k} {esperado} {vector['aspecto'][i]}"
+
+    assert engine.get_aspect_type(147.0, CONFIG) == "biquintile"
+    assert engine.get_aspect_type(40.5, CONFIG) is None, "❌ semisquare tiene margen 4°"
+    assert engine.get_aspect_type(350.0) == "conjunction" and engine.get_aspect_type(150.0) is None
+    assert engine.get_exact_angle_for_aspect("quincunx") == 150.0
+    # Orbes: el del cuerpo si lo define; si no, el del catálogo (o el genérico de aspect_engine)
+    assert engine.validate_aspect("Luna", "Marte", 148.0, CONFIG)["limit"] == 4.0
+    assert engine.validate_aspect("Sol", "Marte", 152.5, CONFIG)["limit"] == 3.0
+    res = engine.validate_aspect("Sol", "Marte", 134.0, CONFIG)
+    assert res["aspectType"] == "sesquiquadrate" and res["isValid"] and res["limit"] == 2.0
+    assert engine.validate_aspect("Quirón", "Marte", 51.5, CONFIG)["limit"] == 1.0
+    print("✅ PASS - Catálogo y detección por búsqueda binaria")
+
+
+def test_declinaciones():
+    """Test 2: declinación desde longitud y latitud eclípticas"""
+    for zodiaco in ("tropical", "sideral"):
+        carta = calcular_carta_compacta(*NACIMIENTO)
+        if zodiaco == "sideral":
+            carta = carta.a_sideral("lahiri")
+        decl = carta.declinaciones()
+        for b, nombre in enumerate(carta.cuerpos):
+            if nombre not in PLANETAS or np.isnan(decl[b]):
+                continue
+            nativo = swe.calc_ut(carta.jd_ut, PLANETAS[nombre], swe.FLG_SWIEPH | swe.FLG_EQUATORIAL)[0][1]
+            assert abs(nativo - decl[b]) < 1e-5, f"❌ {nombre} ({zodiaco}): {decl[b]} != {nativo}"
+    assert np.isnan(decl[list(carta.cuerpos).index("Quirón")])
+    print("✅ PASS - Declinaciones")
+
+
+def test_paralelos():
+    """Test 3: paralelos y contraparalelos con las tablas compiladas"""
+    engine = OrbEngine()
+    decl = np.array([10.0, 11.2, -10.3, np.nan])
+    res = engine.validate_declinations(CUERPOS, decl, CONFIG)
+    tipos = [[res["aspecto"][i, j] for j in range(4)] for i in range(4)]
+    nombres = engine.compile_config(CONFIG).paralelos
+    # Sol–Luna: |10 - 11.2| = 1.2 <= máx(1.5, 1.2) → paralelo
+    assert nombres[tipos[0][1]] == "parallel" and abs(res["orbe"][0, 1] - 1.2) < 1e-9
+    # Sol–Marte: |10 - 10.3| = 0.3 → contraparalelo (límite máx(1.0 del catálogo para el Sol, 0.5))
+    assert nombres[tipos[0][2]] == "contraparallel" and res["limite"][0, 2] == 1.0
+    # Luna–Marte: 0.9 <= máx(1.0, 0.5) → contraparalelo; cuerpos sin datos o sin orbes → ninguno
+    assert nombres[tipos[1][2]] == "contraparallel"
+    assert all(t == -1 for t in tipos[3]) and res["valido"].sum() == 2 * 3 + 3
+
+    receptor = engine.compile_config(CONFIG).validar_declinaciones(["Sol"], [10.0], ["Marte"], [-10.8], RECEIVER_PRIORITY)
+    assert not receptor["valido"][0, 0], "❌ Con prioridad al receptor manda el orbe de Marte (0.5)"
+    sin_paralelos = engine.validate_declinations(CUERPOS, decl, {"orbs": CONFIG["orbs"]})
+    assert not sin_paralelos["valido"].any()
+
+    carta = calcular_carta_compacta(*NACIMIENTO)
+    rejilla = engine.validate_declinations(carta.cuerpos, carta.declinaciones(), CONFIG)
+    assert rejilla["valido"].shape == (len(carta.cuerpos),) * 2
+    assert np.array_equal(rejilla["valido"], rejilla["valido"].T)
+    print(f"✅ PASS - Paralelos ({int(np.triu(rejilla['valido'], 1).sum())} en la carta de prueba)")
+
+
+if __name__ == "__main__":
+    test_catalogo_y_deteccion()
+    test_declinaciones()
+    test_paralelos()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
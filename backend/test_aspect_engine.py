@@ -0,0 +1,126 @@
+"""
+Tests del motor de aspectos vectorizado
+Ejecutar con: python test_aspect_engine.py
+
+TESTS:
+1. La matriz coincide con OrbEngine.validate_aspect par a par (ambas estrategias)
+2. Aplicativo/separativo según velocidades (B fijo en tránsitos; B en movimiento en sinastría)
+3. Aspectos natales de una carta real: cada par una vez, ordenados por orbe
+4. Mismo catálogo y orbes que OrbEngine (catálogo del config, cuerpos sin orbes, config vacío);
+   las estrategias son las de orb_engine (una sola definición)
+"""
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orb_engine import OrbEngine
+from app.services.aspect_engine import calcular_aspectos_cruzados, calcular_aspectos_natales
+from app.services.ephemeris import calcular_carta_completa
+
+CONFIG = {
+    "rules": {"aspects": {"strategy": "UMBRELLA_MAX"}},
+    "orbs": [
+        {"body": "Sol", "conjunction": 10, "opposition": 10, "square": 8, "trine": 8, "sextile": 6},
+        {"body": "Luna", "conjunction": 10, "opposition": 10, "square": 8, "trine": 8, "sextile": 6},
+        {"body": "Marte", "conjunction": 7, "opposition": 7, "square": 6, "trine": 6, "sextile": 4},
+        {"body": "Saturno", "conjunction": 5, "opposition": 5, "square": 4, "trine": 4, "sextile": 3},
+    ],
+}
+
+
+def _planetas(lons):
+    return {n: {"longitud": lon, "velocidad": 0.0} for n, lon in lons.items()}
+
+
+def test_equivalente_a_validate_aspect():
+    """Test 1: matriz vectorizada == validación par a par"""
+    engine = OrbEngine()
+    rng = random.Random(7)
+    cuerpos = ["Sol", "Luna", "Marte", "Saturno"]
+    for estrategia in ["UMBRELLA_MAX", "RECEIVER_PRIORITY"]:
+        config = dict(CONFIG, rules={"aspects": {"strategy": estrategia}})
+        for _ in range(200):
+            a = _planetas({n: rng.uniform(0, 360) for n in cuerpos})
+            b = _planetas({n: rng.uniform(0, 360) for n in cuerpos})
+            hallados = {(x["p1"], x["p2"]): x for x in calcular_aspectos_cruzados(a, b, config)}
+            for na in cuerpos:
+                for nb in cuerpos:
+                    angle = engine.angular_distance(a[na]["longitud"], b[nb]["longitud"])
+                    ref = engine.validate_aspect(na, nb, angle, config)
+                    if ref["isValid"]:
+                        assert (na, nb) in hallados, f"❌ Falta {na}-{nb} {ref}"
+                        assert hallados[(na, nb)]["tipo"] == ref["aspectType"]
+                    else:
+                        assert (na, nb) not in hallados, f"❌ Sobra {na}-{nb} {hallados.get((na, nb))}"
+    print("✅ PASS - Equivalencia con validate_aspect")
+
+
+def test_aplicativo_separativo():
+    """Test 2: Luna rápida acercándose/alejándose de un trígono"""
+    natal = {"Sol": {"longitud": 0.0, "velocidad": 0.0}}
+    acercandose = {"Luna": {"longitud": 117.0, "velocidad": 13.0}}
+    alejandose = {"Luna": {"longitud": 123.0, "velocidad": 13.0}}
+    assert calcular_aspectos_cruzados(acercandose, natal)[0]["aplicativo"] is True
+    assert calcular_aspectos_cruzados(alejandose, natal)[0]["aplicativo"] is False
+
+    # Carta natal real: la velocidad registrada de la Luna natal no cuenta (el punto natal es fijo)
+    carta = calcular_carta_completa("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+    luna = carta["planetas"]["Luna"]
+    assert abs(luna["velocidad"]) > 10
+    for desfase, esperado in ((-2.0, True), (2.0, False)):
+        saturno = {"Saturno": {"longitud": (luna["longitud"] + desfase) % 360, "velocidad": 0.1}}
+        cruzados = calcular_aspectos_cruzados(saturno, {"Luna": luna}, estrategia="RECEIVER_PRIORITY")
+        assert cruzados[0]["tipo"] == "conjunction" and cruzados[0]["aplicativo"] is esperado, f"❌ {cruzados}"
+        # Sinastría: la Luna de B avanza más rápido que Saturno, así que se invierte
+        sinastria = calcular_aspectos_cruzados(saturno, {"Luna": luna}, estrategia="RECEIVER_PRIORITY", b_fijo=False)
+        assert sinastria[0]["tipo"] == "conjunction" and sinastria[0]["aplicativo"] is not esperado, f"❌ {sinastria}"
+    print("✅ PASS - Aplicativo / separativo")
+
+
+def test_aspectos_natales():
+    """Test 3: carta real"""
+    carta = calcular_carta_completa("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+    aspectos = calcular_aspectos_natales(carta["planetas"], carta["angulos"])
+    pares = [(a["p1"], a["p2"]) for a in aspectos]
+    assert len(pares) == len(set(pares)) and all(p1 != p2 for p1, p2 in pares)
+    assert [a["orbe"] for a in aspectos] == sorted(a["orbe"] for a in aspectos)
+    assert any(a["p1"] == "Sol" or a["p2"] == "Sol" for a in aspectos)
+    print(f"✅ PASS - {len(aspectos)} aspectos natales")
+
+
+def test_catalogo_de_orb_engine():
+    """Test 4: catálogo y orbes de la ConfigCompilada"""
+    engine = OrbEngine()
+    config = dict(CONFIG, rules={"aspects": {"catalog": ["conjunction", "square", {"type": "quincunx", "orb": 3}]}})
+    a = _planetas({"Sol": 0.0, "Marte": 0.0})
+    b = _planetas({"Luna": 151.0, "Saturno": 60.0, "Quirón": 2.0})
+    hallados = {(x["p1"], x["p2"]): x["tipo"] for x in calcular_aspectos_cruzados(a, b, config)}
+    # El quincuncio del catálogo se detecta; el sextil no está en él
+    assert hallados[("Sol", "Luna")] == "quincunx" and ("Marte", "Saturno") not in hallados, hallados
+    # Quirón no tiene orbes en el config (0): solo aparece cuando manda el orbe del otro cuerpo
+    assert ("Sol", "Quirón") in hallados and engine.validate_aspect("Sol", "Quirón", 2.0, config)["isValid"]
+    receptor = calcular_aspectos_cruzados(a, b, config, estrategia="RECEIVER_PRIORITY")
+    assert not any(x["p2"] == "Quirón" for x in receptor)
+    assert not engine.validate_aspect("Sol", "Quirón", 2.0, dict(config, rules={"aspects": {
+        "strategy": "RECEIVER_PRIORITY", "catalog": config["rules"]["aspects"]["catalog"]}}))["isValid"]
+
+    # Config sin orbes: orbes por defecto para todos los cuerpos (+2° los luminares) y menores opcionales
+    vacio = {(x["p1"], x["p2"]): x["limite"] for x in calcular_aspectos_cruzados(a, b, {}, incluir_menores=True)}
+    assert vacio[("Sol", "Luna")] == 5.0 and vacio[("Sol", "Quirón")] == 10.0 and ("Marte", "Saturno") in vacio
+
+    import orb_engine
+    from app.services import aspect_engine
+    assert aspect_engine.RECEIVER_PRIORITY is orb_engine.RECEIVER_PRIORITY
+    assert aspect_engine.normalizar_estrategia is orb_engine.normalizar_estrategia
+    assert "UMBRELLA_MAX" not in vars(aspect_engine), "❌ Estrategias duplicadas en aspect_engine"
+    print("✅ PASS - Catálogo y orbes de OrbEngine")
+
+
+if __name__ == "__main__":
+    test_equivalente_a_validate_aspect()
+    test_aplicativo_separativo()
+    test_aspectos_natales()
+    test_catalogo_de_orb_engine()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
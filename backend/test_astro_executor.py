@@ -0,0 +1,98 @@
+"""
+Tests del pool de procesos para cálculo astrológico
+Ejecutar con: python test_astro_executor.py
+
+TESTS:
+1. Una carta calculada en el pool es idéntica a la calculada en el proceso actual
+2. Contrapresión: por encima del máximo en vuelo se rechaza con PoolAstroSaturado
+3. Timeout por llamada; en map, un único plazo para todo el lote
+"""
+import sys
+import os
+import asyncio
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from app.services.astro_executor import AstroExecutor, PoolAstroSaturado
+from app.services.ephemeris import calcular_carta_completa
+
+ARGS = ("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+
+
+def test_carta_en_pool():
+    """Test 1: pool == proceso actual"""
+    executor = AstroExecutor(max_workers=1, max_pendientes=4, timeout=60)
+    try:
+        carta = asyncio.run(executor.ejecutar(calcular_carta_completa, *ARGS))
+        assert carta == calcular_carta_completa(*ARGS), "❌ Carta distinta en el pool"
+        assert executor.stats()["completadas"] == 1
+    finally:
+        executor.shutdown()
+    print("✅ PASS - Carta calculada en el pool")
+
+
+def test_contrapresion():
+    """Test 2: rechazo al superar el máximo en vuelo"""
+    executor = AstroExecutor(max_workers=1, max_pendientes=2, timeout=60)
+    try:
+        futuros = [executor.enviar(time.sleep, 0.5) for _ in range(2)]
+        try:
+            executor.enviar(time.sleep, 0.5)
+            assert False, "❌ Debería rechazar la tercera tarea"
+        except PoolAstroSaturado:
+            pass
+        for f in futuros:
+            f.result()
+        assert executor.stats()["rechazadas"] == 1
+        executor.enviar(time.sleep, 0).result()
+
+        # map que se satura a mitad del envío: cancela lo ya enviado y libera los huecos
+        try:
+            executor.map(time.sleep, [0.3] * 4)
+            assert False, "❌ map debería propagar PoolAstroSaturado"
+        except PoolAstroSaturado:
+            pass
+        limite = time.time() + 5
+        while executor.stats()["en_vuelo"] and time.time() < limite:
+            time.sleep(0.01)
+        assert executor.stats()["en_vuelo"] == 0 and executor.stats()["rechazadas"] == 2
+    finally:
+        executor.shutdown()
+    print("✅ PASS - Contrapresión")
+
+
+def test_timeout():
+    """Test 3: timeout por llamada"""
+    executor = AstroExecutor(max_workers=1, max_pendientes=2, timeout=60)
+    try:
+        try:
+            asyncio.run(executor.ejecutar(time.sleep, 2, timeout=0.2))
+            assert False, "❌ Debería expirar"
+        except asyncio.TimeoutError:
+            pass
+        assert executor.stats()["timeouts"] == 1
+    finally:
+        executor.shutdown()
+
+    # 3 bloques de 0.3 s en un solo worker: cada uno cabe en 0.5 s, el lote no
+    executor = AstroExecutor(max_workers=1, max_pendientes=4, timeout=60)
+    try:
+        executor.enviar(time.sleep, 0).result()
+        inicio = time.time()
+        try:
+            executor.map(time.sleep, [0.3] * 3, timeout=0.5)
+            assert False, "❌ map debería expirar"
+        except TimeoutError:
+            pass
+        assert time.time() - inicio < 0.8, "❌ map esperó más que el plazo del lote"
+        assert executor.stats()["timeouts"] == 1
+    finally:
+        executor.shutdown()
+    print("✅ PASS - Timeout")
+
+
+if __name__ == "__main__":
+    test_carta_en_pool()
+    test_contrapresion()
+    test_timeout()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
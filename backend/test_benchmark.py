@@ -0,0 +1,49 @@
+"""
+Tests del benchmark de efemérides
+Ejecutar con: python test_benchmark.py
+
+TESTS:
+1. El corpus es determinista y cubre latitudes y siglos
+2. Un benchmark reducido mide todos los casos
+3. La comparación con la baseline detecta regresiones
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from app.scripts.benchmark_ephemeris import comparar, ejecutar_benchmark, generar_corpus
+
+
+def test_corpus_determinista():
+    """Test 1: corpus"""
+    a, b = generar_corpus(500), generar_corpus(500)
+    assert a == b
+    años = [int(c["fecha"][:4]) for c in a]
+    assert min(años) < 1750 and max(años) > 2050
+    assert min(c["latitud"] for c in a) < -55 and max(c["latitud"] for c in a) > 55
+    print("✅ PASS - Corpus determinista")
+
+
+def test_benchmark_reducido():
+    """Test 2: todos los casos"""
+    res = ejecutar_benchmark(n=60, repeticiones=1)
+    for nombre, r in res["casos"].items():
+        assert r["ops"] > 0 and r["ops_por_segundo"] > 0 and r["p50_us"] <= r["p99_us"], f"❌ {nombre}"
+    print(f"✅ PASS - Benchmark reducido ({len(res['casos'])} casos)")
+
+
+def test_comparacion():
+    """Test 3: regresiones"""
+    base = {"casos": {"x": {"ops_por_segundo": 1000.0, "p50_us": 1.0, "p99_us": 10.0}}}
+    igual = {"casos": {"x": {"ops_por_segundo": 950.0, "p50_us": 1.1, "p99_us": 25.0}}}
+    peor = {"casos": {"x": {"ops_por_segundo": 500.0, "p50_us": 2.0, "p99_us": 30.0}}}
+    assert not comparar(igual, base, 0.25)[0]["regresion"]
+    assert comparar(peor, base, 0.25)[0]["regresion"]
+    print("✅ PASS - Comparación con baseline")
+
+
+if __name__ == "__main__":
+    test_corpus_determinista()
+    test_benchmark_reducido()
+    test_comparacion()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
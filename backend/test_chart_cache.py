@@ -0,0 +1,74 @@
+"""
+Tests de la caché de cartas (LRU + TTL)
+Ejecutar con: python test_chart_cache.py
+
+TESTS:
+1. Clave normalizada: timezone auto-detectado == explícito, coordenadas redondeadas, "9:05" == "09:05";
+   una hora que el cálculo rechaza ("09:05:30") falla antes de consultar la caché
+2. Expulsión LRU por tamaño y expiración por TTL
+3. Las cartas devueltas son copias (mutarlas no contamina la caché)
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from app.services.chart_cache import ChartCache, clave_carta, calcular_carta_cacheada, chart_cache
+
+
+def test_clave_normalizada():
+    """Test 1: misma carta -> misma clave"""
+    auto = clave_carta("1990-01-15", "14:30", 40.41680001, -3.7038, None)
+    explicita = clave_carta("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+    assert auto == explicita, "❌ Error: auto-detección y zona explícita deberían compartir clave"
+    assert clave_carta("1990-01-15", "14:31", 40.4168, -3.7038, "Europe/Madrid") != explicita
+    assert clave_carta("1990-01-15", "9:05", 40.4168, -3.7038, "Europe/Madrid") == \
+        clave_carta("1990-01-15", "09:05", 40.4168, -3.7038, "Europe/Madrid")
+    for fecha, hora in (("1990-01-15", "09:05:30"), ("1990-01-15", "25:00"), ("15/01/1990", "09:05")):
+        try:
+            clave_carta(fecha, hora, 40.4168, -3.7038, "Europe/Madrid")
+            assert False, f"❌ {fecha} {hora} debería rechazarse como en el cálculo"
+        except ValueError:
+            pass
+        try:
+            calcular_carta_cacheada(fecha, hora, 40.4168, -3.7038, "Europe/Madrid")
+            assert False, f"❌ {fecha} {hora}: la caché no debe servir una hora inválida"
+        except ValueError:
+            pass
+    print("✅ PASS - Clave normalizada")
+
+
+def test_lru_y_ttl():
+    """Test 2: tamaño máximo y TTL"""
+    cache = ChartCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}  # 'a' pasa a ser la más reciente
+    cache.put("c", {"v": 3})           # expulsa 'b'
+    assert cache.get("b") is None and cache.evictions == 1
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.get("a") is None and cache.expirations == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    print("✅ PASS - LRU y TTL")
+
+
+def test_copias_aisladas():
+    """Test 3: mutar el resultado no altera la entrada cacheada"""
+    chart_cache.clear()
+    carta = calcular_carta_cacheada("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+    carta["datos_entrada"]["ciudad"] = "Madrid"
+
+    de_nuevo = calcular_carta_cacheada("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+    assert "ciudad" not in de_nuevo["datos_entrada"]
+    assert chart_cache.hits == 1
+    print("✅ PASS - Copias aisladas")
+
+
+if __name__ == "__main__":
+    test_clave_normalizada()
+    test_lru_y_ttl()
+    test_copias_aisladas()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
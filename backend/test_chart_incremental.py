@@ -0,0 +1,126 @@
+"""
+Tests del recálculo incremental de cartas
+Ejecutar con: python test_chart_incremental.py
+
+TESTS:
+1. Cambio de lugar con el mismo UTC: solo casas, planetas intactos, diff idéntico a recalcular
+2. Desplazamiento de minutos: solo se recalculan los cuerpos rápidos y el resultado coincide
+3. Desplazamiento grande: recálculo completo
+4. Endpoint: solo las cartas exactas (sin cuerpos extrapolados) quedan en la caché de cartas
+5. Endpoint sin la carta anterior en caché: calcula la nueva directamente (diff completo aplicable)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from app.services.chart_incremental import (
+    MODO_COMPLETO,
+    MODO_PARCIAL,
+    MODO_SOLO_CASAS,
+    aplicar_diff,
+    recalcular_incremental,
+)
+from app.services.ephemeris import calcular_carta_completa
+
+NACIMIENTO = ("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+ANTERIOR = calcular_carta_completa(*NACIMIENTO)
+
+
+def _error_maximo(a, b):
+    return max(abs(a["planetas"][k]["longitud"] - b["planetas"][k]["longitud"])
+               for k in a["planetas"] if a["planetas"][k])
+
+
+def test_solo_casas():
+    """Test 1: mismo instante, otro lugar"""
+    args = ("1990-01-15", "14:30", 41.3874, 2.1686, "Europe/Madrid")
+    nueva, diff = recalcular_incremental(ANTERIOR, *args)
+    assert diff["modo"] == MODO_SOLO_CASAS and diff["recalculados"] == []
+    assert nueva == calcular_carta_completa(*args)
+    assert aplicar_diff(ANTERIOR, diff) == nueva
+    assert all(set(p) <= {"casa"} for p in diff["cambios"].get("planetas", {}).values())
+    print("✅ PASS - Solo casas")
+
+
+def test_desplazamiento_corto():
+    """Test 2: cinco minutos más tarde"""
+    args = ("1990-01-15", "14:35", 40.4168, -3.7038, "Europe/Madrid")
+    nueva, diff = recalcular_incremental(ANTERIOR, *args)
+    completa = calcular_carta_completa(*args)
+    assert diff["modo"] == MODO_PARCIAL and "Luna" in diff["recalculados"] and "Plutón" in diff["extrapolados"]
+    assert aplicar_diff(ANTERIOR, diff) == nueva
+    assert _error_maximo(nueva, completa) < 1e-4
+    assert nueva["casas"] == completa["casas"]
+    print(f"✅ PASS - Desplazamiento corto ({len(diff['recalculados'])} cuerpos recalculados)")
+
+
+def test_desplazamiento_largo():
+    """Test 3: un mes más tarde"""
+    args = ("1990-02-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+    nueva, diff = recalcular_incremental(ANTERIOR, *args)
+    assert diff["modo"] == MODO_COMPLETO and diff["extrapolados"] == []
+    assert aplicar_diff(ANTERIOR, diff) == nueva == calcular_carta_completa(*args)
+    print("✅ PASS - Desplazamiento largo")
+
+
+def test_endpoint_cache():
+    """Test 4: /calculate-incremental no cachea cartas con cuerpos extrapolados"""
+    from fastapi.testclient import TestClient
+    from main import app
+    from app.api.endpoints.auth import get_current_user
+    from app.services.chart_cache import chart_cache, clave_carta
+
+    anterior = dict(zip(("fecha", "hora", "latitud", "longitud", "zona_horaria"), NACIMIENTO))
+    app.dependency_overrides[get_current_user] = lambda: {"username": "test"}
+    try:
+        cliente = TestClient(app)
+        chart_cache.clear()
+        cliente.post("/ephemeris/calculate", json=anterior)
+        diff = cliente.post("/ephemeris/calculate-incremental", json={"anterior": anterior, "cambios": {"hora": "14:35"}}).json()["diff"]
+        assert diff["extrapolados"], "❌ Se esperaban cuerpos extrapolados"
+        corta = ("1990-01-15", "14:35", 40.4168, -3.7038, "Europe/Madrid")
+        assert chart_cache.get(clave_carta(*corta, None)) is None, "❌ Carta extrapolada en la caché"
+        assert cliente.post("/ephemeris/calculate", json=dict(anterior, hora="14:35")).json()["data"] == calcular_carta_completa(*corta)
+
+        # Mismo instante en otro lugar: la carta es exacta y sí se guarda
+        diff = cliente.post("/ephemeris/calculate-incremental", json={"anterior": anterior, "cambios": {"latitud": 41.3874, "longitud": 2.1686}}).json()["diff"]
+        assert diff["modo"] == MODO_SOLO_CASAS
+        lugar = ("1990-01-15", "14:30", 41.3874, 2.1686, "Europe/Madrid")
+        assert chart_cache.get(clave_carta(*lugar, None)) == calcular_carta_completa(*lugar)
+    finally:
+        app.dependency_overrides.clear()
+    print("✅ PASS - Endpoint: solo cartas exactas en caché")
+
+
+def test_endpoint_sin_anterior_en_cache():
+    """Test 5: fallo de caché de la carta anterior"""
+    from fastapi.testclient import TestClient
+    from main import app
+    from app.api.endpoints.auth import get_current_user
+    from app.services.chart_cache import chart_cache, clave_carta
+
+    anterior = dict(zip(("fecha", "hora", "latitud", "longitud", "zona_horaria"), NACIMIENTO))
+    app.dependency_overrides[get_current_user] = lambda: {"username": "test"}
+    try:
+        cliente = TestClient(app)
+        chart_cache.clear()
+        diff = cliente.post("/ephemeris/calculate-incremental", json={"anterior": anterior, "cambios": {"hora": "14:35"}}).json()["diff"]
+        corta = ("1990-01-15", "14:35", 40.4168, -3.7038, "Europe/Madrid")
+        completa = calcular_carta_completa(*corta)
+        assert diff["modo"] == MODO_COMPLETO and diff["extrapolados"] == []
+        assert aplicar_diff(ANTERIOR, diff) == completa
+        # La nueva es exacta y queda en caché; la anterior no se ha calculado
+        assert chart_cache.get(clave_carta(*corta, None)) == completa
+        assert chart_cache.get(clave_carta(*NACIMIENTO, None)) is None
+    finally:
+        app.dependency_overrides.clear()
+    print("✅ PASS - Endpoint: sin carta anterior en caché, cálculo directo")
+
+
+if __name__ == "__main__":
+    test_solo_casas()
+    test_desplazamiento_corto()
+    test_desplazamiento_largo()
+    test_endpoint_cache()
+    test_endpoint_sin_anterior_en_cache()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
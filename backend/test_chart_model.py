@@ -0,0 +1,57 @@
+"""
+Tests del modelo compacto de carta
+Ejecutar con: python test_chart_model.py
+
+TESTS:
+1. `a_dict()` es idéntico a `calcular_carta_completa` (varios lugares y sistemas de casas)
+2. Ida y vuelta dict legacy → CartaCompacta → dict
+3. Se serializa con pickle (pool de procesos) y ocupa menos que el dict
+"""
+import sys
+import os
+import pickle
+sys.path.append(os.path.dirname(__file__))
+
+from app.services.chart_model import CartaCompacta, calcular_carta_compacta
+from app.services.ephemeris import calcular_carta_completa
+
+NACIMIENTOS = [
+    ("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid"),
+    ("1985-06-02", "07:05", 40.7128, -74.0060, "America/New_York"),
+    ("2001-11-30", "23:59", -33.8688, 151.2093, None),
+]
+
+
+def test_identico_a_legacy():
+    """Test 1: mismo formato y valores"""
+    for args in NACIMIENTOS:
+        for sistema in (None, "whole_sign", "koch"):
+            compacta = calcular_carta_compacta(*args, sistema_casas=sistema)
+            assert compacta.a_dict() == calcular_carta_completa(*args, sistema_casas=sistema), f"❌ {args} {sistema}"
+    print("✅ PASS - a_dict() idéntico a calcular_carta_completa")
+
+
+def test_ida_y_vuelta():
+    """Test 2: desde_dict"""
+    for args in NACIMIENTOS:
+        carta = calcular_carta_completa(*args)
+        compacta = CartaCompacta.desde_dict(carta)
+        assert compacta.a_dict() == carta
+        assert compacta.casa("Sol") == carta["planetas"]["Sol"]["casa"]
+    print("✅ PASS - Ida y vuelta")
+
+
+def test_pickle():
+    """Test 3: pickle"""
+    compacta = calcular_carta_compacta(*NACIMIENTOS[0])
+    copia = pickle.loads(pickle.dumps(compacta))
+    assert copia.a_dict() == compacta.a_dict()
+    assert len(pickle.dumps(compacta)) < len(pickle.dumps(compacta.a_dict()))
+    print("✅ PASS - Pickle compacto")
+
+
+if __name__ == "__main__":
+    test_identico_a_legacy()
+    test_ida_y_vuelta()
+    test_pickle()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
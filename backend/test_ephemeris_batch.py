@@ -0,0 +1,60 @@
+"""
+Tests del cálculo de cartas por lotes
+Ejecutar con: python test_ephemeris_batch.py
+
+TESTS:
+1. El lote produce exactamente las mismas cartas que el cálculo individual
+2. Un registro inválido no invalida el resto del lote
+3. El reparto en pool de procesos conserva el orden y los resultados
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from app.services.ephemeris import calcular_carta_completa, calcular_cartas_lote
+
+
+REGISTROS = [
+    {"fecha": "1990-01-15", "hora": "14:30", "latitud": 40.4168, "longitud": -3.7038, "zona_horaria": None},
+    {"fecha": "1985-06-02", "hora": "07:05", "latitud": 40.7128, "longitud": -74.0060, "zona_horaria": "America/New_York"},
+    {"fecha": "2001-11-30", "hora": "23:59", "latitud": -33.8688, "longitud": 151.2093, "zona_horaria": None},
+]
+
+
+def test_lote_igual_a_individual():
+    """Test 1: lote == N llamadas a calcular_carta_completa"""
+    resultados = calcular_cartas_lote(REGISTROS, bloques=1)
+    assert len(resultados) == len(REGISTROS)
+
+    for reg, res in zip(REGISTROS, resultados):
+        assert res["ok"], f"❌ Error inesperado: {res.get('error')}"
+        individual = calcular_carta_completa(**reg)
+        assert res["carta"] == individual, f"❌ Carta distinta para {reg['fecha']}"
+    print("✅ PASS - Lote idéntico al cálculo individual")
+
+
+def test_error_por_registro():
+    """Test 2: errores aislados por registro"""
+    registros = [REGISTROS[0], {"fecha": "1990-13-45", "hora": "25:00", "latitud": 0, "longitud": 0}, REGISTROS[1]]
+    resultados = calcular_cartas_lote(registros, bloques=1)
+
+    assert resultados[0]["ok"] and resultados[2]["ok"]
+    assert not resultados[1]["ok"] and "ValueError" in resultados[1]["error"]
+    print("✅ PASS - Registro inválido aislado")
+
+
+def test_lote_en_paralelo():
+    """Test 3: pool de procesos conserva orden y resultados"""
+    registros = [dict(REGISTROS[i % len(REGISTROS)], hora=f"{i % 24:02d}:{i % 60:02d}") for i in range(40)]
+    secuencial = calcular_cartas_lote(registros, bloques=1)
+    paralelo = calcular_cartas_lote(registros, bloques=4)
+
+    assert [r["carta"] for r in paralelo] == [r["carta"] for r in secuencial]
+    print("✅ PASS - Resultados paralelos idénticos y en orden")
+
+
+if __name__ == "__main__":
+    test_lote_igual_a_individual()
+    test_error_por_registro()
+    test_lote_en_paralelo()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
@@ -0,0 +1,80 @@
+"""
+Tests de ficheros de efemérides (ruta, precalentado, cuerpos no disponibles)
+Ejecutar con: python test_ephemeris_files.py
+
+TESTS:
+1. Un cuerpo sin ficheros (Quirón sin .se1) falla una sola vez y no se vuelve a pedir
+2. Diagnóstico por cuerpo: Moshier, analítico o no disponible
+3. Cambiar la ruta olvida los fallos; /health/ephemeris
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from app.services import ephemeris_files, metrics
+from app.services.ephemeris import calcular_carta_completa
+from app.services.ephemeris_vector import calcular_posiciones_array
+from app.services.fixed_stars import calcular_asteroides
+
+NACIMIENTO = ("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+JD = 2447907.0
+
+
+def _errores_quiron() -> int:
+    return metrics.instantanea()["contadores"].get("calc_ut.error.Quirón", 0)
+
+
+def test_sin_reintentos():
+    """Test 1: Quirón falla una vez y después sale None sin llamar a Swiss Ephemeris"""
+    ephemeris_files.configurar_ruta("")
+    antes = _errores_quiron()
+    cartas = [calcular_carta_completa(*NACIMIENTO) for _ in range(5)]
+    assert _errores_quiron() - antes == 1, "❌ Quirón se reintentó"
+    assert all(c['planetas']['Quirón'] is None for c in cartas)
+    assert cartas[0]['planetas'] == cartas[-1]['planetas']
+    assert not ephemeris_files.disponible('Quirón') and ephemeris_files.disponible('Sol')
+
+    pos = calcular_posiciones_array([JD, JD + 1.0], ('Sol', 'Quirón'))
+    assert all(v == v for v in pos['lon'][:, 0]) and all(v != v for v in pos['lon'][:, 1])
+    assert calcular_asteroides(JD) == {n: None for n in ('Ceres', 'Palas', 'Juno', 'Vesta', 'Eris')}
+    print("✅ PASS - Sin reintentos de cuerpos no disponibles")
+
+
+def test_diagnostico():
+    """Test 2: origen de cada cuerpo sin ficheros instalados"""
+    ephemeris_files.configurar_ruta("")
+    diag = ephemeris_files.precalentar()
+    assert diag['Sol']['origen'] == ephemeris_files.ORIGEN_MOSHIER
+    assert diag['Lilith med.']['origen'] == ephemeris_files.ORIGEN_ANALITICO
+    assert diag['Quirón']['origen'] == ephemeris_files.ORIGEN_NO_DISPONIBLE and 'not found' in diag['Quirón']['error']
+    assert diag['Ceres']['origen'] == ephemeris_files.ORIGEN_NO_DISPONIBLE
+    assert not ephemeris_files.disponible('Ceres')
+    print("✅ PASS - Diagnóstico por cuerpo")
+
+
+def test_ruta_e_informe():
+    """Test 3: ruta configurada y endpoint de salud"""
+    with tempfile.TemporaryDirectory() as tmp:
+        open(os.path.join(tmp, "sepl_18.se1"), "wb").close()
+        ephemeris_files.configurar_ruta(tmp)
+        assert ephemeris_files.disponible('Quirón'), "❌ Cambiar la ruta debe permitir reintentar"
+        informe = ephemeris_files.informe()
+        assert informe['ruta'] == tmp and informe['ficheros_se1'] == ["sepl_18.se1"]
+        assert 'Quirón' in informe['no_disponibles']
+    ephemeris_files.configurar_ruta()
+
+    from fastapi.testclient import TestClient
+    from main import app
+    respuesta = TestClient(app).get("/health/ephemeris")
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    assert datos['cuerpos']['Sol']['origen'] in (ephemeris_files.ORIGEN_MOSHIER, ephemeris_files.ORIGEN_FICHEROS)
+    print(f"✅ PASS - Informe (modo {datos['modo']})")
+
+
+if __name__ == "__main__":
+    test_sin_reintentos()
+    test_diagnostico()
+    test_ruta_e_informe()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
@@ -0,0 +1,123 @@
+"""
+Tests de las tablas de efemérides precalculadas (ephemeris_tables)
+Ejecutar con: python test_ephemeris_tables.py
+
+TESTS:
+1. Tabla de un rango corto en un directorio temporal: error de interpolación < 1" frente a swe.calc_ut
+2. calcular_posiciones_rapidas: servida desde la tabla dentro del rango; Swiss Ephemeris fuera de él o sin tablas
+3. Tabla parcial (solo Luna): la Luna sale de la tabla y el resto de cuerpos se calcula directamente
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import swisseph as swe
+
+import app.services.ephemeris_tables as ephemeris_tables
+from app.services.ephemeris import PLANETAS, calcular_posiciones_planetas
+from app.services.ephemeris_tables import TablaEfemerides, calcular_posiciones_rapidas, construir_tablas
+
+JD_INICIO = swe.julday(2024, 1, 1, 0.0)
+JD_FIN = JD_INICIO + 40.0
+# Hermite cúbico con la velocidad tabulada (1 h la Luna, 1 día el resto) y almacenamiento float32
+ERROR_MAX_ARCSEG = 1.0
+FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+
+def _dif(a, b) -> np.ndarray:
+    return np.abs((np.asarray(a) - np.asarray(b) + 180.0) % 360.0 - 180.0)
+
+
+def test_error_de_interpolacion():
+    """Test 1: tabla de 40 días frente a Swiss Ephemeris"""
+    with tempfile.TemporaryDirectory() as directorio:
+        indice = construir_tablas(directorio, JD_INICIO, JD_FIN)
+        tabla = TablaEfemerides(directorio)
+        assert set(tabla.cuerpos) == set(indice["cuerpos"]) and "Sol" in tabla.cuerpos and "Luna" in tabla.cuerpos
+
+        rng = np.random.default_rng(4)
+        jds = rng.uniform(JD_INICIO, JD_FIN, 500)
+        peor = 0.0
+        for nombre in tabla.cuerpos:
+            assert tabla.error_maximo(nombre) * 3600 < ERROR_MAX_ARCSEG, f"❌ {nombre}: error medido {tabla.error_maximo(nombre)}"
+            lon, vel = tabla.posiciones(nombre, jds)
+            ref = np.array([swe.calc_ut(jd, PLANETAS[nombre], FLAGS)[0] for jd in jds])
+            error = _dif(lon, ref[:, 0]).max() * 3600
+            peor = max(peor, error)
+            assert error < ERROR_MAX_ARCSEG, f"❌ {nombre}: {error:.3f}\""
+            assert np.max(np.abs(vel - ref[:, 3])) < 0.01, f"❌ {nombre}: velocidad"
+            # La consulta escalar coincide con la vectorizada
+            escalar = tabla.posicion(nombre, float(jds[0]))
+            assert _dif(escalar[0], lon[0]) < 1e-9 and abs(escalar[1] - vel[0]) < 1e-9
+
+        assert tabla.cubre("Sol", JD_FIN) and not tabla.cubre("Sol", JD_FIN + 1) and not tabla.cubre("Sol", JD_INICIO - 0.01)
+        try:
+            tabla.posicion("Sol", JD_INICIO - 1)
+            assert False, "❌ Debería rechazar un JD fuera de rango"
+        except ValueError:
+            pass
+    print(f"✅ PASS - Error de interpolación < {ERROR_MAX_ARCSEG:g}\" (peor {peor:.3f}\")")
+
+
+def test_posiciones_rapidas_y_fallback():
+    """Test 2: tabla dentro del rango, Swiss Ephemeris fuera o sin tablas"""
+    original = (ephemeris_tables._tabla_global, ephemeris_tables._tabla_cargada)
+    try:
+        with tempfile.TemporaryDirectory() as directorio:
+            construir_tablas(directorio, JD_INICIO, JD_FIN, ["Sol", "Luna", "Marte"])
+            ephemeris_tables._tabla_global = TablaEfemerides(directorio)
+            ephemeris_tables._tabla_cargada = True
+
+            dentro = JD_INICIO + 12.37
+            rapidas = calcular_posiciones_rapidas(dentro)
+            directas = calcular_posiciones_planetas(dentro)
+            for nombre in ("Sol", "Luna", "Marte"):
+                assert _dif(rapidas[nombre]["longitud"], directas[nombre]["longitud"]) * 3600 < ERROR_MAX_ARCSEG
+                assert rapidas[nombre]["retrogrado"] == directas[nombre]["retrogrado"]
+            # Los cuerpos no tabulados se calculan directamente
+            assert rapidas["Júpiter"] == directas["Júpiter"]
+
+            # Fuera del rango tabulado: cálculo directo idéntico
+            for jd in (JD_INICIO - 3.0, JD_FIN + 0.5):
+                assert calcular_posiciones_rapidas(jd) == calcular_posiciones_planetas(jd)
+
+        # Sin tablas generadas: cálculo directo
+        ephemeris_tables._tabla_global = None
+        assert calcular_posiciones_rapidas(dentro) == directas
+        ephemeris_tables._tabla_cargada = False
+        with tempfile.TemporaryDirectory() as vacio:
+            assert ephemeris_tables.obtener_tabla(vacio) is None
+    finally:
+        ephemeris_tables._tabla_global, ephemeris_tables._tabla_cargada = original
+    print("✅ PASS - Posiciones rápidas y fallback a Swiss Ephemeris")
+
+
+def test_tabla_parcial():
+    """Test 3: una tabla con un solo cuerpo no deja al resto en None"""
+    original = (ephemeris_tables._tabla_global, ephemeris_tables._tabla_cargada)
+    try:
+        with tempfile.TemporaryDirectory() as directorio:
+            construir_tablas(directorio, JD_INICIO, JD_FIN, ["Luna"])
+            ephemeris_tables._tabla_global = TablaEfemerides(directorio)
+            ephemeris_tables._tabla_cargada = True
+
+            dentro = JD_INICIO + 7.81
+            rapidas = calcular_posiciones_rapidas(dentro)
+            directas = calcular_posiciones_planetas(dentro)
+            assert list(rapidas) == list(directas)
+            assert _dif(rapidas["Luna"]["longitud"], directas["Luna"]["longitud"]) * 3600 < ERROR_MAX_ARCSEG
+            for nombre, ref in directas.items():
+                if nombre != "Luna":
+                    assert rapidas[nombre] == ref, f"❌ {nombre}: {rapidas[nombre]} != {ref}"
+    finally:
+        ephemeris_tables._tabla_global, ephemeris_tables._tabla_cargada = original
+    print("✅ PASS - Tabla parcial completada con Swiss Ephemeris")
+
+
+if __name__ == "__main__":
+    test_error_de_interpolacion()
+    test_posiciones_rapidas_y_fallback()
+    test_tabla_parcial()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
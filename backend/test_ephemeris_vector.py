@@ -0,0 +1,139 @@
+"""
+Tests del motor vectorizado de posiciones (ephemeris_vector)
+Ejecutar con: python test_ephemeris_vector.py
+
+TESTS:
+1. posiciones_a_dict(calcular_posiciones_array(...)) == calcular_posiciones_planetas en varias fechas
+2. derivar_zodiaco: acarreo segundos → minutos → grados → signo en los límites (29°59'59.9", 359.99999°)
+3. Serie completa (T × B) renderizada == instantes por separado
+4. Un error de Swiss Ephemeris en una fecha deja en NaN solo esa época
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import swisseph as swe
+
+from app.services.ephemeris import SIGNOS, calcular_posiciones_planetas, grado_a_zodiaco
+from app.services.ephemeris_vector import (
+    CUERPOS,
+    POSICION_DTYPE,
+    calcular_posiciones_array,
+    derivar_zodiaco,
+    posiciones_a_dict,
+    serie_a_dicts,
+)
+
+# 1900, 1990, 2000 (J2000), 2024 y 2050: fechas con retrogradaciones distintas
+JDS = [
+    swe.julday(1900, 3, 1, 6.0),
+    swe.julday(1990, 1, 15, 13.5),
+    2451545.0,
+    swe.julday(2024, 4, 8, 18.25),
+    swe.julday(2050, 12, 31, 23.99),
+]
+
+# Justo por debajo de cada límite de redondeo al minuto (y justo por encima, sin acarreo)
+SEGUNDO = 1.0 / 3600.0
+LIMITES = [
+    29 + 59 / 60 + 59.9 * SEGUNDO,   # 29°59'59.9" Aries → 00°00' Tauro
+    59 + 59 / 60 + 59.9 * SEGUNDO,   # 29°59'59.9" Tauro → 00°00' Géminis
+    359.99999,                       # 29°59'59.96" Piscis → 00°00' Aries
+    -0.000001,                       # Equivalente a 359.999999°
+    29 + 59 / 60 + 29 * SEGUNDO,     # 29°59'29" → 29°59' (sin acarreo)
+    14 + 59 / 60 + 30.1 * SEGUNDO,   # 14°59'30.1" → 15°00' (acarreo solo a grados)
+    0.0,
+    330.0,
+]
+
+
+def _fila(longitudes) -> np.ndarray:
+    fila = np.zeros(len(longitudes), dtype=POSICION_DTYPE)
+    fila['lon'] = longitudes
+    return fila
+
+
+def test_igual_a_calcular_posiciones_planetas():
+    """Test 1: mismo dict que la ruta escalar"""
+    posiciones = calcular_posiciones_array(JDS)
+    assert posiciones.shape == (len(JDS), len(CUERPOS))
+    for t, jd in enumerate(JDS):
+        vector = posiciones_a_dict(posiciones[t])
+        escalar = calcular_posiciones_planetas(jd)
+        assert list(vector) == list(escalar)
+        for nombre, ref in escalar.items():
+            assert vector[nombre] == ref, f"❌ JD {jd} {nombre}: {vector[nombre]} != {ref}"
+    print(f"✅ PASS - Array vectorizado == calcular_posiciones_planetas ({len(JDS)} fechas)")
+
+
+def test_acarreo_en_limites():
+    """Test 2: redondeo al minuto con acarreo a grados y signo"""
+    zodiaco = derivar_zodiaco(_fila(LIMITES), ['Sol'] * len(LIMITES))
+    esperados = [
+        ("Tauro", 0, 0), ("Géminis", 0, 0), ("Aries", 0, 0), ("Aries", 0, 0),
+        ("Aries", 29, 59), ("Aries", 15, 0), ("Aries", 0, 0), ("Piscis", 0, 0),
+    ]
+    for i, (lon, (signo, grados, minutos)) in enumerate(zip(LIMITES, esperados)):
+        obtenido = (SIGNOS[zodiaco['signo_idx'][i]], int(zodiaco['grados'][i]), int(zodiaco['minutos'][i]))
+        assert obtenido == (signo, grados, minutos), f"❌ {lon}: {obtenido}"
+        ref = grado_a_zodiaco(lon, incluir_segundos=False)
+        assert obtenido == (ref['signo'], ref['grados'], ref['minutos']), f"❌ {lon} != grado_a_zodiaco {ref}"
+        # Con segundos, el acarreo 59.9" → 60" → 60' → 30° llega igualmente al signo siguiente
+        if i < 4:
+            con_segundos = grado_a_zodiaco(lon)
+            assert (con_segundos['signo'], con_segundos['grados'], con_segundos['minutos'], con_segundos['segundos']) == \
+                (signo, 0, 0, 0), f"❌ {lon} con segundos: {con_segundos}"
+
+    # Barrido denso alrededor de todos los cambios de signo: idéntico a grado_a_zodiaco
+    cambios = np.arange(12) * 30.0
+    barrido = np.concatenate([cambios + d for d in np.linspace(-1.0 / 60, 1.0 / 60, 241)])
+    zodiaco = derivar_zodiaco(_fila(barrido), ['Sol'] * len(barrido))
+    for i, lon in enumerate(barrido):
+        ref = grado_a_zodiaco(float(lon), incluir_segundos=False)
+        assert SIGNOS[zodiaco['signo_idx'][i]] == ref['signo'] and zodiaco['grados'][i] == ref['grados'] \
+            and zodiaco['minutos'][i] == ref['minutos'], f"❌ {lon}"
+
+    nan = derivar_zodiaco(_fila([np.nan]), ['Quirón'])
+    assert nan['signo_idx'][0] == -1 and posiciones_a_dict(_fila([np.nan]), ['Quirón'])['Quirón'] is None
+    print(f"✅ PASS - Acarreo en los límites ({len(barrido)} longitudes)")
+
+
+def test_serie_completa():
+    """Test 3: render de la serie == render por instante"""
+    posiciones = calcular_posiciones_array(JDS, ['Sol', 'Luna', 'Mercurio', 'Nodo Norte'])
+    serie = serie_a_dicts(posiciones, ['Sol', 'Luna', 'Mercurio', 'Nodo Norte'])
+    for t in range(len(JDS)):
+        assert serie[t] == posiciones_a_dict(posiciones[t], ['Sol', 'Luna', 'Mercurio', 'Nodo Norte'])
+        # El Nodo Norte nunca se marca retrógrado (velocidad media negativa)
+        assert serie[t]['Nodo Norte']['retrogrado'] is False
+    print("✅ PASS - Serie completa")
+
+
+def test_error_en_una_fecha():
+    """Test 4: el resto de épocas del cuerpo se siguen calculando"""
+    original = swe.calc_ut
+
+    def _calc_ut(jd, id_cuerpo, flags):
+        if jd == JDS[1] and id_cuerpo == swe.SUN:
+            raise swe.Error("error transitorio")
+        return original(jd, id_cuerpo, flags)
+
+    swe.calc_ut = _calc_ut
+    try:
+        posiciones = calcular_posiciones_array(JDS, ['Sol', 'Luna'])
+    finally:
+        swe.calc_ut = original
+    sol = posiciones['lon'][:, 0]
+    assert np.isnan(sol[1]) and not np.isnan(np.delete(sol, 1)).any(), f"❌ {sol}"
+    assert not np.isnan(posiciones['lon'][:, 1]).any()
+    assert posiciones_a_dict(posiciones[1], ['Sol', 'Luna'])['Sol'] is None
+    print("✅ PASS - Error en una sola fecha")
+
+
+if __name__ == "__main__":
+    test_igual_a_calcular_posiciones_planetas()
+    test_acarreo_en_limites()
+    test_serie_completa()
+    test_error_en_una_fecha()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
@@ -0,0 +1,68 @@
+"""
+Tests de estrellas fijas y asteroides
+Ejecutar con: python test_fixed_stars.py
+
+TESTS:
+1. El índice devuelve lo mismo que la fuerza bruta (incluido el cruce de 0° Aries)
+2. La precesión desplaza el catálogo ~1° cada 72 años y se cachea por época
+3. Los asteroides sin ficheros .se1 quedan en None sin romper el cálculo
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+from app.services.fixed_stars import (
+    ASTEROIDES,
+    IndiceEstrellas,
+    calcular_asteroides,
+    cargar_catalogo,
+    conjunciones_estrellas,
+    indice_para_epoca,
+)
+
+
+def _fuerza_bruta(indice, lon, orbe):
+    return sorted(n for n, l in zip(indice.nombres, indice.longitudes)
+                  if abs((l - lon + 180.0) % 360.0 - 180.0) <= orbe)
+
+
+def test_indice():
+    """Test 1: índice frente a fuerza bruta"""
+    indice = indice_para_epoca(2000)
+    assert len(indice) == len(cargar_catalogo()) > 50
+    for lon in np.concatenate([np.linspace(0, 359.9, 997), [0.0, 359.99, 0.2, 359.5]]):
+        for orbe in (0.5, 1.0, 3.0):
+            encontradas = indice.cerca(float(lon), orbe)
+            assert sorted(e["estrella"] for e in encontradas) == _fuerza_bruta(indice, lon, orbe), f"❌ {lon} {orbe}"
+    # Scheat (359.37) está a menos de 1° de 0.2°
+    assert "Scheat" in [e["estrella"] for e in indice.cerca(0.2, 1.0)]
+    print("✅ PASS - Índice con vuelta en 360°")
+
+
+def test_precesion():
+    """Test 2: precesión por época"""
+    base = dict(zip(indice_para_epoca(2000).nombres, indice_para_epoca(2000).longitudes))
+    futuro = dict(zip(indice_para_epoca(2072).nombres, indice_para_epoca(2072).longitudes))
+    assert abs(futuro["Regulus"] - base["Regulus"] - 1.006) < 0.01
+    assert indice_para_epoca(2072) is indice_para_epoca(2072)
+    regulus = conjunciones_estrellas({"Sol": 150.2}, 2451545.0 + 20 * 365.25)
+    assert regulus and regulus[0]["estrella"] == "Regulus"
+    print("✅ PASS - Precesión cacheada por época")
+
+
+def test_asteroides():
+    """Test 3: asteroides"""
+    pos = calcular_asteroides(2447907.0)
+    assert set(pos) == set(ASTEROIDES)
+    for p in pos.values():
+        assert p is None or 0 <= p["longitud"] < 360
+    print(f"✅ PASS - Asteroides ({sum(p is not None for p in pos.values())} disponibles)")
+
+
+if __name__ == "__main__":
+    test_indice()
+    test_precesion()
+    test_asteroides()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
@@ -0,0 +1,99 @@
+"""
+Tests de la corrección de casas por proximidad en bloque (OrbEngine.calculate_house_placements)
+Ejecutar con: python test_house_correction.py
+
+TESTS:
+1. Una carta: mismo resultado y nota que calculate_house_placement cuerpo a cuerpo
+2. Varios perfiles (sinastría) con sus cúspides en una sola pasada
+3. Corrección desactivada, NaN y cúspides inválidas
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from orb_engine import OrbEngine
+from app.services.ephemeris import calcular_carta_completa
+
+CONFIG = {"rules": {"houseCorrection": {"enabled": True, "angularOrb": 3, "otherOrb": 1.5}}}
+
+
+def _cuspides_aleatorias(rng) -> np.ndarray:
+    # Casas desiguales con cruce de 0° Aries en cualquier posición
+    tamanos = rng.uniform(10, 50, 12)
+    return np.mod(rng.uniform(0, 360) + np.concatenate([[0], np.cumsum(tamanos * 360 / tamanos.sum())[:-1]]), 360)
+
+
+def test_equivalente_por_cuerpo():
+    """Test 1: bloque == llamada por cuerpo"""
+    engine = OrbEngine()
+    carta = calcular_carta_completa("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+    cusps = [c["cuspide"] for c in carta["casas"]]
+    nombres = [n for n, p in carta["planetas"].items() if p]
+    lons = [carta["planetas"][n]["longitud"] for n in nombres]
+    # Cuerpos pegados a cada cúspide (a ambos lados) para forzar saltos
+    lons += [c + d for c in cusps for d in (-3.5, -2.9, -1.4, -0.01, 0.0, 0.3)]
+    nombres += [f"p{i}" for i in range(len(lons) - len(nombres))]
+
+    bloque = engine.calculate_house_placements(lons, cusps, CONFIG)
+    assert bloque.corregido.any() and not bloque.corregido.all()
+    for i, lon in enumerate(lons):
+        ref = engine.calculate_house_placement(lon, cusps, CONFIG)
+        assert bloque.resultado(i) == ref, f"❌ {nombres[i]}: {bloque.resultado(i)} != {ref}"
+        assert bloque.geometrica[i] == engine.get_geometric_house_index(lon, cusps) + 1
+    assert bloque.por_cuerpo(nombres)["Sol"] == engine.calculate_house_placement(lons[0], cusps, CONFIG)
+    print(f"✅ PASS - Bloque == por cuerpo ({int(bloque.corregido.sum())} corregidos de {len(lons)})")
+
+
+def test_perfiles():
+    """Test 2: 10 perfiles × 40 cuerpos, cada uno con sus cúspides"""
+    engine = OrbEngine()
+    rng = np.random.default_rng(5)
+    cusps = np.stack([_cuspides_aleatorias(rng) for _ in range(10)])
+    lons = rng.uniform(0, 360, (10, 40))
+    t0 = time.perf_counter()
+    bloque = engine.calculate_house_placements(lons, cusps, CONFIG)
+    t_bloque = time.perf_counter() - t0
+    assert bloque.casa.shape == (10, 40)
+
+    t0 = time.perf_counter()
+    for p in range(10):
+        for i in range(40):
+            ref = engine.calculate_house_placement(float(lons[p, i]), cusps[p].tolist(), CONFIG)
+            assert bloque.resultado(p, i) == ref, f"❌ perfil {p} cuerpo {i}"
+    t_bucle = time.perf_counter() - t0
+
+    # Las mismas cúspides para todos los perfiles se difunden sin repetirlas
+    mismas = engine.calculate_house_placements(lons, cusps[0], CONFIG)
+    assert np.array_equal(mismas.casa[3], engine.calculate_house_placements(lons[3], cusps[0], CONFIG).casa)
+    print(f"✅ PASS - 400 cuerpos en una pasada ({t_bloque * 1e3:.2f} ms; por cuerpo con notas {t_bucle * 1e3:.1f} ms)")
+
+
+def test_casos_limite():
+    """Test 3: desactivada, NaN, cúspides inválidas"""
+    engine = OrbEngine()
+    cusps = [(i * 30 + 15) % 360 for i in range(12)]
+    lons = [44.5, np.nan, 14.0]
+    desactivada = engine.calculate_house_placements(lons, cusps, {})
+    assert not desactivada.corregido.any() and desactivada.casa.tolist() == [1, 0, 12]
+    assert desactivada.resultado(0) == engine.calculate_house_placement(44.5, cusps, {})
+
+    activa = engine.calculate_house_placements(lons, cusps, CONFIG)
+    assert activa.casa.tolist() == [2, 0, 1] and activa.corregido.tolist() == [True, False, True]
+    assert activa.umbral[2] == 3 and activa.umbral[0] == 1.5
+    try:
+        engine.calculate_house_placements(lons, cusps[:11], CONFIG)
+        assert False, "❌ Debería rechazar 11 cúspides"
+    except ValueError:
+        pass
+    print("✅ PASS - Casos límite")
+
+
+if __name__ == "__main__":
+    test_equivalente_por_cuerpo()
+    test_perfiles()
+    test_casos_limite()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
@@ -0,0 +1,113 @@
+"""
+Tests de sistemas de casas e índice de cúspides
+Ejecutar con: python test_house_systems.py
+
+TESTS:
+1. El índice por bisect coincide con el recorrido lineal clásico (incluido el cruce de 0° Aries)
+2. Varios sistemas en una llamada == cálculo individual de cada sistema
+3. La carta completa respeta el sistema pedido y rechaza sistemas desconocidos
+4. Latitudes polares: Placidus/Koch se sustituyen sin errores y queda registrado
+"""
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(__file__))
+
+import swisseph as swe
+
+from app.services import ephemeris
+from app.services.ephemeris import (
+    SISTEMA_CASAS_POLAR,
+    calcular_carta_completa,
+    calcular_casas_multiples,
+    calcular_casas_y_angulos,
+    calcular_julian_day,
+)
+from app.services.house_index import IndiceCasas
+
+
+def _casa_lineal(pos, cusps):
+    """Implementación de referencia (recorrido lineal con wraparound)."""
+    for i in range(12):
+        c1 = cusps[i]
+        c2 = cusps[(i + 1) % 12]
+        if c1 <= c2:
+            if c1 <= pos < c2:
+                return i
+        else:
+            if pos >= c1 or pos < c2:
+                return i
+    return 0
+
+
+def test_indice_equivalente_a_lineal():
+    """Test 1: bisect == recorrido lineal"""
+    rng = random.Random(42)
+    jd, _, _ = calcular_julian_day("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+    for sistema in ["placidus", "koch", "equal", "whole_sign", "regiomontanus", "campanus"]:
+        cusps = [c["cuspide"] for c in calcular_casas_y_angulos(jd, 40.4168, -3.7038, sistema)["casas"]]
+        indice = IndiceCasas(cusps)
+        lons = [rng.uniform(0, 360) for _ in range(500)] + cusps
+        for lon in lons:
+            assert indice.indice(lon) == _casa_lineal(lon, cusps), f"❌ {sistema}: {lon}"
+        assert list(indice.indices(lons)) == [_casa_lineal(lon, cusps) for lon in lons]
+    print("✅ PASS - Índice bisect equivalente al recorrido lineal")
+
+
+def test_casas_multiples():
+    """Test 2: un ARMC, varios sistemas"""
+    jd, _, _ = calcular_julian_day("1985-06-02", "07:05", 40.7128, -74.0060, "America/New_York")
+    sistemas = ["placidus", "koch", "whole_sign", "equal", "regiomontanus", "campanus"]
+    multiples = calcular_casas_multiples(jd, 40.7128, -74.0060, sistemas)
+    for sistema in sistemas:
+        individual = calcular_casas_y_angulos(jd, 40.7128, -74.0060, sistema)
+        for a, b in zip(multiples[sistema]["casas"], individual["casas"]):
+            assert abs(a["cuspide"] - b["cuspide"]) < 1e-6, f"❌ {sistema} casa {a['numero']}"
+    print("✅ PASS - Sistemas múltiples coherentes")
+
+
+def test_carta_con_sistema():
+    """Test 3: sistema de casas en la carta completa"""
+    carta = calcular_carta_completa("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid", sistema_casas="Whole Sign")
+    assert carta["datos_entrada"]["sistema_casas"] == "whole_sign"
+    assert all(c["cuspide"] % 30 < 1e-9 for c in carta["casas"]), "❌ Signos enteros deben empezar en 0°"
+
+    try:
+        calcular_carta_completa("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid", sistema_casas="topocentrico")
+        assert False, "❌ Debería rechazar un sistema desconocido"
+    except ValueError:
+        pass
+    print("✅ PASS - Sistema de casas configurable")
+
+
+def test_latitudes_polares():
+    """Test 4: sustitución polar determinista"""
+    jd = 2447907.0
+    for lat in (66.6, 69.6492, 78.2232, -77.85, -89.9):
+        for sistema in ("placidus", "koch"):
+            try:
+                swe.houses(jd, lat, 18.9, sistema[0].upper().encode())
+                assert False, f"❌ Swiss Ephemeris debería fallar en {lat}"
+            except swe.Error:
+                pass
+            res = calcular_casas_y_angulos(jd, lat, 18.9, sistema)
+            assert res["sistema"] == SISTEMA_CASAS_POLAR
+            assert res["fallback"] == {"solicitado": sistema, "usado": SISTEMA_CASAS_POLAR, "motivo": "latitud_polar"}
+
+    # Justo por debajo del círculo polar se mantiene Placidus
+    assert "fallback" not in calcular_casas_y_angulos(jd, 66.5, 18.9, "placidus")
+
+    carta = calcular_carta_completa("1990-01-15", "14:30", 69.6492, 18.9553, "Europe/Oslo")
+    assert carta["datos_entrada"]["sistema_casas"] == SISTEMA_CASAS_POLAR
+    assert carta["datos_entrada"]["fallback_casas"]["solicitado"] == "placidus"
+    assert "fallback_casas" not in calcular_carta_completa("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")["datos_entrada"]
+    assert not ephemeris._COMBINACIONES_FALLIDAS, "❌ La detección previa debe evitar errores de Swiss Ephemeris"
+    print("✅ PASS - Latitudes polares")
+
+
+if __name__ == "__main__":
+    test_indice_equivalente_a_lineal()
+    test_casas_multiples()
+    test_carta_con_sistema()
+    test_latitudes_polares()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
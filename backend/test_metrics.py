@@ -0,0 +1,120 @@
+"""
+Tests de instrumentación (temporizadores, contadores, export)
+Ejecutar con: python test_metrics.py
+
+TESTS:
+1. Una carta completa registra sus etapas y el desglose de la traza suma ~el total
+2. El log estructurado emite una línea JSON por carta
+3. Export Prometheus y endpoint /metrics (cerrado sin token)
+4. Las etapas medidas en los workers del pool llegan al registro del proceso principal
+"""
+import sys
+import os
+import asyncio
+import json
+import logging
+sys.path.append(os.path.dirname(__file__))
+
+from app.services import metrics
+from app.services.ephemeris import calcular_carta_completa
+
+NACIMIENTO = ("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+
+
+def test_etapas():
+    """Test 1: etapas de calcular_carta_completa"""
+    metrics.registro.reiniciar()
+    for _ in range(5):
+        calcular_carta_completa(*NACIMIENTO)
+    etapas = metrics.instantanea()["etapas"]
+    for etapa in ("carta_completa", "zona_horaria", "localizar", "posiciones", "casas", "formato", "calc_ut.Sol"):
+        assert etapas[etapa]["llamadas"] == 5, f"❌ {etapa}"
+    total = etapas["carta_completa"]["total_ms"]
+    partes = sum(etapas[e]["total_ms"] for e in ("zona_horaria", "localizar", "posiciones", "casas", "formato"))
+    assert partes <= total
+    assert etapas["carta_completa"]["p50_ms"] <= etapas["carta_completa"]["p99_ms"] <= etapas["carta_completa"]["max_ms"]
+    print(f"✅ PASS - Etapas ({total / 5:.3f} ms/carta)")
+
+
+def test_log_estructurado():
+    """Test 2: una línea JSON por carta"""
+    lineas = []
+
+    class _Captura(logging.Handler):
+        def emit(self, record):
+            lineas.append(record.getMessage())
+
+    handler = _Captura()
+    metrics.logger.addHandler(handler)
+    metrics.logger.setLevel(logging.INFO)
+    metrics.METRICAS_LOG_ESTRUCTURADO = True
+    try:
+        calcular_carta_completa(*NACIMIENTO)
+    finally:
+        metrics.METRICAS_LOG_ESTRUCTURADO = False
+        metrics.logger.removeHandler(handler)
+    assert len(lineas) == 1
+    evento = json.loads(lineas[0])
+    assert evento["operacion"] == "carta_completa" and "casas" in evento["etapas"] and evento["error"] is None
+    print("✅ PASS - Log estructurado")
+
+
+def test_export():
+    """Test 3: Prometheus"""
+    metrics.contar("prueba.evento", 3)
+    texto = metrics.exportar_prometheus({"astro_pool.workers": 2})
+    assert 'fraktal_etapa_segundos_count{etapa="carta_completa"}' in texto
+    assert 'fraktal_eventos_total{evento="prueba.evento"} 3' in texto
+    assert 'fraktal_estado{nombre="astro_pool.workers"} 2.0' in texto
+
+    from fastapi.testclient import TestClient
+    from main import app
+    cliente = TestClient(app)
+    entorno = {k: os.environ.pop(k, None) for k in ("METRICS_TOKEN", "METRICS_PUBLIC")}
+    try:
+        # Sin token configurado el endpoint está cerrado
+        assert cliente.get("/metrics").status_code == 401
+        os.environ["METRICS_TOKEN"] = "secreto"
+        assert cliente.get("/metrics", headers={"X-Metrics-Token": "otro"}).status_code == 401
+        respuesta = cliente.get("/metrics", headers={"X-Metrics-Token": "secreto"})
+        assert respuesta.status_code == 200 and "fraktal_estado" in respuesta.text
+        del os.environ["METRICS_TOKEN"]
+        os.environ["METRICS_PUBLIC"] = "1"
+        assert cliente.get("/metrics/json").status_code == 200
+    finally:
+        for clave, valor in entorno.items():
+            os.environ.pop(clave, None)
+            if valor is not None:
+                os.environ[clave] = valor
+    print("✅ PASS - Export /metrics")
+
+
+def test_etapas_del_pool():
+    """Test 4: desglose por etapa de los workers en el registro principal"""
+    from app.services.astro_executor import AstroExecutor
+    from app.services.ephemeris import _calcular_lote_secuencial
+
+    executor = AstroExecutor(max_workers=1, max_pendientes=8, timeout=60)
+    metrics.registro.reiniciar()
+    try:
+        asyncio.run(executor.ejecutar(calcular_carta_completa, *NACIMIENTO))
+        registro = dict(zip(("fecha", "hora", "latitud", "longitud", "zona_horaria"), NACIMIENTO))
+        executor.map(_calcular_lote_secuencial, [[registro] * 2, [registro]])
+    finally:
+        executor.shutdown()
+    etapas = metrics.instantanea()["etapas"]
+    assert etapas["astro_pool.tarea"]["llamadas"] == 1
+    for etapa in ("carta_completa", "posiciones", "casas", "calc_ut.Sol"):
+        assert etapas[etapa]["llamadas"] == 1, f"❌ {etapa}: {etapas.get(etapa)}"
+    # Una carta con ejecutar + tres del lote repartido en dos bloques con map
+    assert etapas["localizar"]["llamadas"] == 4 and etapas["zona_horaria"]["llamadas"] == 4
+    assert etapas["carta_completa"]["max_ms"] > 0
+    print("✅ PASS - Etapas de los workers fusionadas")
+
+
+if __name__ == "__main__":
+    test_etapas()
+    test_log_estructurado()
+    test_export()
+    test_etapas_del_pool()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
@@ -0,0 +1,179 @@
+"""
+Tests de AsyncOrbEngine (presets con Motor, perezoso y degradado si Mongo no responde)
+Ejecutar con: python test_orb_engine_async.py
+
+TESTS:
+1. Perezoso: crear el motor no lee; lecturas concurrentes del mismo tipo se comparten
+2. Mongo caído: se sirve el preset en caché (o {}) sin esperar y se reintenta tras la pausa
+3. Caducado: se sigue sirviendo el preset y se revalida en segundo plano; peek sin esperar
+4. La API síncrona heredada sigue siendo síncrona (sustituible por OrbEngine) y nunca espera a Mongo
+"""
+import sys
+import os
+import asyncio
+import copy
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orb_engine
+from orb_engine import AsyncOrbEngine
+
+PRESET_NATAL = {
+    "type": "NATAL",
+    "rules": {"aspects": {"strategy": "UMBRELLA_MAX"}},
+    "orbs": [{"body": "Sol", "conjunction": 10, "square": 8}, {"body": "Luna", "conjunction": 10, "square": 8}],
+}
+
+
+class ColeccionAsyncFalsa:
+    """Imita una colección de Motor: find_one asíncrono con latencia y fallos configurables."""
+
+    def __init__(self, presets):
+        self.presets = copy.deepcopy(presets)
+        self.lecturas = 0
+        self.latencia = 0.01
+        self.caida = False
+
+    async def find_one(self, filtro, proyeccion=None):
+        self.lecturas += 1
+        if self.caida:
+            await asyncio.sleep(3600)  # servidor que no responde: lo corta el timeout
+        await asyncio.sleep(self.latencia)
+        for preset in self.presets:
+            if preset["type"] == filtro["presets.type"]:
+                return {"_id": 1, "presets": [copy.deepcopy(preset)]}
+        return None
+
+
+class BaseDatosFalsa:
+    def __init__(self, coleccion):
+        self.coleccion = coleccion
+
+    def __getitem__(self, nombre):
+        assert nombre == "calculation_rules"
+        return self.coleccion
+
+
+def _motor():
+    coleccion = ColeccionAsyncFalsa([PRESET_NATAL])
+    return AsyncOrbEngine(BaseDatosFalsa(coleccion)), coleccion
+
+
+def test_perezoso_y_compartido():
+    """Test 1: sin lecturas al crear; una lectura para N peticiones concurrentes"""
+    motor, coleccion = _motor()
+    assert coleccion.lecturas == 0 and motor._coleccion_async is None
+
+    async def _escenario():
+        configs = await asyncio.gather(*(motor.get_effective_config_async("NATAL") for _ in range(20)))
+        assert all(c is configs[0] for c in configs)
+        prefs = {"orbs": {"Sol": {"square": 9}}}
+        efectivo = await motor.get_effective_config_async("NATAL", prefs)
+        assert await motor.get_effective_config_async("NATAL", prefs) is efectivo
+        compilada = await motor.get_compiled_config_async("NATAL", prefs)
+        assert compilada.validar("Sol", "Marte", 99.0)[2] == 9.0
+        return configs[0]
+
+    natal = asyncio.run(_escenario())
+    assert natal == PRESET_NATAL and coleccion.lecturas == 1, f"❌ {coleccion.lecturas} lecturas"
+    assert motor.validate_aspect("Sol", "Luna", 5.0, natal)["isValid"]
+    print("✅ PASS - Perezoso y lecturas compartidas")
+
+
+def test_degradado():
+    """Test 2: Mongo sin respuesta"""
+    motor, coleccion = _motor()
+    orb_engine.TIMEOUT_CONFIG_ASYNC = 0.05
+    orb_engine.ESPERA_REINTENTO_CONFIG = 0.2
+    try:
+        async def _escenario():
+            natal = await motor.get_effective_config_async("NATAL")
+            coleccion.caida = True
+            motor.invalidate_cache("NATAL")
+            # Sin preset en caché: {} (orbes por defecto) tras el timeout
+            assert await motor.get_effective_config_async("NATAL") == {}
+            lecturas = coleccion.lecturas
+            # Durante la pausa no se vuelve a consultar
+            for _ in range(10):
+                assert await motor.get_effective_config_async("TRANSIT") == {}
+                assert await motor.get_effective_config_async("NATAL") == {}
+            assert coleccion.lecturas == lecturas + 1, "❌ Solo TRANSIT debería haber consultado"
+            assert motor.cache_stats()["en_espera"] == ["NATAL", "TRANSIT"]
+
+            # Con preset en caché y Mongo caído se sigue sirviendo el preset
+            coleccion.caida = False
+            await asyncio.sleep(0.25)
+            assert await motor.get_effective_config_async("NATAL") == natal
+            coleccion.caida = True
+            assert await motor.refresh_presets_async() == []
+            assert await motor.get_effective_config_async("NATAL") == natal
+            return motor.cache_stats()["degradaciones"]
+
+        assert asyncio.run(_escenario()) == 3
+    finally:
+        orb_engine.TIMEOUT_CONFIG_ASYNC = 2.0
+        orb_engine.ESPERA_REINTENTO_CONFIG = 30.0
+    print("✅ PASS - Degradado a la caché")
+
+
+def test_revalidacion():
+    """Test 3: stale-while-revalidate y peek"""
+    motor, coleccion = _motor()
+    orb_engine.INTERVALO_SONDEO_CONFIG = 0.05
+    try:
+        async def _escenario():
+            # peek nunca espera: {} y lectura programada
+            assert motor.peek_effective_config("NATAL") == {}
+            await asyncio.sleep(0.05)
+            antes = motor.peek_effective_config("NATAL")
+            assert antes == PRESET_NATAL
+
+            coleccion.presets[0]["orbs"][0]["conjunction"] = 12
+            await asyncio.sleep(0.06)
+            coleccion.latencia = 0.2
+            # Caducado: se devuelve al instante el preset anterior y se revalida detrás
+            assert (await asyncio.wait_for(motor.get_effective_config_async("NATAL"), 0.05)) is antes
+            await asyncio.sleep(0.3)
+            despues = await motor.get_effective_config_async("NATAL")
+            assert despues["orbs"][0]["conjunction"] == 12
+            motor.programar_precarga(("TRANSIT",))
+            await asyncio.sleep(0.25)
+            assert "TRANSIT" in motor.cache_stats()["presets"]
+
+        asyncio.run(_escenario())
+    finally:
+        orb_engine.INTERVALO_SONDEO_CONFIG = 30.0
+    # Fuera de un event loop peek no programa nada
+    motor2, coleccion2 = _motor()
+    assert motor2.peek_effective_config("NATAL") == {} and coleccion2.lecturas == 0
+    print("✅ PASS - Revalidación en segundo plano")
+
+
+def test_api_sincrona():
+    """Test 4: get_effective_config / get_compiled_config / refresh_presets síncronos"""
+    motor, coleccion = _motor()
+
+    async def _escenario():
+        efectivo = motor.get_effective_config("NATAL")
+        assert efectivo == {} and not asyncio.iscoroutine(efectivo)
+        # El {} degradado no ocupa la caché: la lectura programada trae el preset real
+        assert motor.cache.preset("NATAL") is None
+        await asyncio.sleep(0.05)
+        assert motor.get_effective_config("NATAL") == PRESET_NATAL
+        assert isinstance(motor.get_compiled_config("NATAL"), orb_engine.ConfigCompilada)
+        lecturas = coleccion.lecturas
+        assert motor.refresh_presets() == []
+        await asyncio.sleep(0.05)
+        assert coleccion.lecturas == lecturas + 1
+        assert await motor.refresh_presets_async() == []
+
+    asyncio.run(_escenario())
+    print("✅ PASS - API síncrona heredada")
+
+
+if __name__ == "__main__":
+    test_perezoso_y_compartido()
+    test_degradado()
+    test_revalidacion()
+    test_api_sincrona()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
@@ -0,0 +1,138 @@
+"""
+Tests de la caché de configuración de OrbEngine (presets con versión + configs efectivos memoizados)
+Ejecutar con: python test_orb_engine_cache.py
+
+TESTS:
+1. Un único find_one por tipo de informe; la fusión con preferencias se memoiza
+2. La fusión no modifica el preset en caché ni las preferencias
+3. Un cambio de versión (sondeo) descarta los configs derivados; invalidación manual
+"""
+import sys
+import os
+import copy
+import time
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo.errors import OperationFailure
+
+import orb_engine
+from orb_engine import OrbEngine
+
+PRESETS = [
+    {
+        "type": "NATAL",
+        "rules": {"aspects": {"strategy": "UMBRELLA_MAX"}, "houseCorrection": {"enabled": True}},
+        "orbs": [
+            {"body": "Sol", "conjunction": 10, "square": 8},
+            {"body": "Luna", "conjunction": 10, "square": 8},
+            {"body": "Marte", "conjunction": 7, "square": 6},
+        ],
+    },
+    {
+        "type": "TRANSIT",
+        "rules": {"aspects": {"strategy": "RECEIVER_PRIORITY"}},
+        "orbs": [{"body": "Sol", "conjunction": 1}],
+    },
+]
+
+
+class ColeccionFalsa:
+    """Imita `calculation_rules` (find_one con proyección posicional) y cuenta las lecturas."""
+
+    def __init__(self, presets):
+        self.presets = copy.deepcopy(presets)
+        self.lecturas = 0
+
+    def find_one(self, filtro, proyeccion=None):
+        self.lecturas += 1
+        for preset in self.presets:
+            if preset["type"] == filtro["presets.type"]:
+                return {"_id": 1, "presets": [copy.deepcopy(preset)]}
+        return None
+
+    def watch(self):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", 40573)
+
+
+def _engine(presets=PRESETS) -> OrbEngine:
+    # El hilo de vigilancia se arranca a mano en test_invalidacion
+    return OrbEngine(collection=ColeccionFalsa(presets), vigilar=False)
+
+
+def test_memoizacion():
+    """Test 1: lecturas y fusiones una sola vez"""
+    motor = _engine()
+    prefs = {"orbs": {"Sol": {"conjunction": 12}}, "activeBodies": ["Sol", "Luna"]}
+    for _ in range(50):
+        natal = motor.get_effective_config("NATAL")
+        efectivo = motor.get_effective_config("NATAL", prefs)
+        # Mismas preferencias con otro orden de claves → misma entrada
+        assert motor.get_effective_config("NATAL", dict(reversed(list(prefs.items())))) is efectivo
+    motor.get_effective_config("TRANSIT")
+    assert motor.collection.lecturas == 2, f"❌ {motor.collection.lecturas} lecturas"
+    assert natal["orbs"][0]["conjunction"] == 10
+    assert [o["body"] for o in efectivo["orbs"]] == ["Sol", "Luna"] and efectivo["orbs"][0]["conjunction"] == 12
+    stats = motor.cache_stats()
+    assert stats["misses"] == 1 and stats["hits"] == 99 and stats["efectivos"] == 1
+    assert set(stats["presets"]) == {"NATAL", "TRANSIT"}
+    assert motor.get_effective_config("SYNASTRY") == {}
+    # Los configs emitidos por la caché se compilan una vez y se resuelven por identidad
+    assert motor.compile_config(efectivo) is motor.compile_config(efectivo)
+    assert motor.compile_config(efectivo).validar("Sol", "Marte", 11.0)[2] == 12.0
+    print("✅ PASS - Un find_one por tipo y fusión memoizada")
+
+
+def test_sin_mutaciones():
+    """Test 2: el preset en caché y las preferencias quedan intactos"""
+    motor = _engine()
+    prefs = {"logicSettings": {"houseCorrection": {"enabled": False}}, "orbs": {"Sol": {"conjunction": 15}, "Plutón": {"conjunction": 3}}}
+    prefs_original = copy.deepcopy(prefs)
+    efectivo = motor.get_effective_config("NATAL", prefs)
+    assert efectivo["rules"]["houseCorrection"] == {"enabled": False}
+    assert {o["body"]: o["conjunction"] for o in efectivo["orbs"]} == {"Sol": 15, "Luna": 10, "Marte": 7, "Plutón": 3}
+    assert motor.get_effective_config("NATAL") == PRESETS[0], "❌ La fusión modificó el preset en caché"
+    assert prefs == prefs_original, "❌ La fusión modificó las preferencias"
+    print("✅ PASS - Fusión sin mutaciones")
+
+
+def test_invalidacion():
+    """Test 3: nueva versión por sondeo e invalidación manual"""
+    motor = _engine()
+    prefs = {"orbs": {"Sol": {"square": 9}}}
+    antes = motor.get_effective_config("NATAL", prefs)
+    version = motor.cache_stats()["presets"]["NATAL"]
+
+    assert motor.refresh_presets() == [], "❌ Sin cambios no debe haber nueva versión"
+    assert motor.get_effective_config("NATAL", prefs) is antes
+
+    # Edición en Mongo detectada por el hilo de sondeo (el servidor no soporta change streams)
+    orb_engine.INTERVALO_SONDEO_CONFIG = 0.02
+    try:
+        motor.iniciar_vigilancia()
+        motor.collection.presets[0]["orbs"][2]["conjunction"] = 9
+        limite = time.time() + 5
+        while motor.cache_stats()["presets"]["NATAL"] == version and time.time() < limite:
+            time.sleep(0.01)
+        assert motor.cache_stats()["vigilancia"] == "sondeo"
+    finally:
+        motor.detener_vigilancia()
+        orb_engine.INTERVALO_SONDEO_CONFIG = 30.0
+    assert motor.cache_stats()["presets"]["NATAL"] != version, "❌ El sondeo no detectó el cambio"
+    assert motor.cache_stats()["efectivos"] == 0
+    despues = motor.get_effective_config("NATAL", prefs)
+    assert despues is not antes and despues["orbs"][2]["conjunction"] == 9
+
+    lecturas = motor.collection.lecturas
+    motor.invalidate_cache("NATAL")
+    motor.get_effective_config("NATAL")
+    motor.get_effective_config("TRANSIT")
+    assert motor.collection.lecturas == lecturas + 2
+    print("✅ PASS - Invalidación por versión")
+
+
+if __name__ == "__main__":
+    test_memoizacion()
+    test_sin_mutaciones()
+    test_invalidacion()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
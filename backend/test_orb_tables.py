@@ -0,0 +1,117 @@
+"""
+Tests de las tablas de orbes compiladas de OrbEngine
+Ejecutar con: python test_orb_tables.py
+
+TESTS:
+1. validate_aspect compilado == validación original con diccionarios (ambas estrategias)
+2. La rejilla A × B vectorizada coincide par a par con la validación escalar
+3. Un config se compila una sola vez; cuerpos sin orbes y configs vacíos
+"""
+import sys
+import os
+import copy
+import random
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from orb_engine import ConfigCompilada, OrbEngine, RECEIVER_PRIORITY, UMBRELLA_MAX
+
+CONFIG = {
+    "rules": {"aspects": {"strategy": UMBRELLA_MAX}},
+    "orbs": [
+        {"body": "Sol", "conjunction": 10, "opposition": 10, "square": 8, "trine": 8, "sextile": 6},
+        {"body": "Luna", "conjunction": 10, "opposition": 10, "square": 8, "trine": 8, "sextile": 6},
+        {"body": "Marte", "conjunction": 7, "opposition": 7, "square": 6, "trine": 6, "sextile": 4},
+        {"body": "Saturno", "conjunction": 5, "opposition": 5, "square": 4.5, "trine": 4, "sextile": 3},
+        {"body": "Plutón", "conjunction": 3},
+    ],
+}
+CUERPOS = ["Sol", "Luna", "Marte", "Saturno", "Plutón", "Quirón"]
+
+
+def _referencia(body_a, body_b, angle, config):
+    """validate_aspect tal como reconstruía los diccionarios en cada llamada."""
+    margins = {"conjunction": 0, "opposition": 180, "square": 90, "trine": 120, "sextile": 60}
+    orbs_data = {item['body']: item for item in config.get('orbs', [])}
+    aspect_type = next((n for n, e in margins.items() if abs(angle - e) <= 12), None)
+    if not aspect_type:
+        return {"isValid": False, "orb": 0, "aspectType": None}
+    current_orb = abs(angle - margins[aspect_type])
+    if config.get('rules', {}).get('aspects', {}).get('strategy') == 'RECEIVER_PRIORITY':
+        limit = orbs_data.get(body_b, {}).get(aspect_type, 0)
+    else:
+        limit = max(orbs_data.get(body_a, {}).get(aspect_type, 0), orbs_data.get(body_b, {}).get(aspect_type, 0))
+    return {"isValid": current_orb <= limit, "orb": round(current_orb, 2), "limit": limit, "aspectType": aspect_type}
+
+
+def test_equivalente_a_original():
+    """Test 1: mismos resultados que la validación con diccionarios"""
+    engine = OrbEngine()
+    rng = random.Random(11)
+    for estrategia in (UMBRELLA_MAX, RECEIVER_PRIORITY):
+        config = dict(CONFIG, rules={"aspects": {"strategy": estrategia}})
+        for _ in range(3000):
+            a, b, angle = rng.choice(CUERPOS), rng.choice(CUERPOS), rng.uniform(0, 180)
+            res = engine.validate_aspect(a, b, angle, config)
+            ref = _referencia(a, b, angle, config)
+            for clave, valor in ref.items():
+                assert res[clave] == valor, f"❌ {a}-{b} {angle} {clave}: {res[clave]} != {valor}"
+    res = engine.validate_aspect("Saturno", "Marte", 94.0, CONFIG)
+    assert res["note"] == "Aspecto square VÁLIDO (4.00° <= 6°). Estrategia: Efecto Paraguas (Max Orb)."
+    print("✅ PASS - Equivalencia con la validación original")
+
+
+def test_rejilla_vectorizada():
+    """Test 2: una sola llamada para toda la rejilla"""
+    engine = OrbEngine()
+    rng = np.random.default_rng(3)
+    angulos = rng.uniform(0, 180, (len(CUERPOS), len(CUERPOS)))
+    compilada = engine.compile_config(CONFIG)
+    for estrategia in (UMBRELLA_MAX, RECEIVER_PRIORITY):
+        rejilla = compilada.validar_rejilla(CUERPOS, CUERPOS, angulos, estrategia)
+        assert rejilla["valido"].shape == (len(CUERPOS), len(CUERPOS))
+        for i, a in enumerate(CUERPOS):
+            for j, b in enumerate(CUERPOS):
+                k, orbe, limite = compilada.validar(a, b, float(angulos[i, j]), estrategia)
+                assert rejilla["aspecto"][i, j] == k
+                assert np.isclose(rejilla["orbe"][i, j], orbe) and rejilla["limite"][i, j] == limite
+                assert bool(rejilla["valido"][i, j]) == (k >= 0 and orbe <= limite)
+    pares = compilada.validar_pares(["Sol", "Quirón"], ["Marte", "Quirón"], [3.0, 0.0])
+    assert pares["valido"].tolist() == [True, True] and pares["limite"].tolist() == [10.0, 0.0]
+    assert engine.validate_aspect_grid(CUERPOS, CUERPOS, angulos, CONFIG)["valido"].sum() == \
+        compilada.validar_rejilla(CUERPOS, CUERPOS, angulos)["valido"].sum()
+    print("✅ PASS - Rejilla vectorizada")
+
+
+def test_compilacion_unica():
+    """Test 3: caché de compilación por config"""
+    engine = OrbEngine()
+    compilada = engine.compile_config(CONFIG)
+    assert engine.compile_config(CONFIG) is compilada and engine.compile_config(compilada) is compilada
+    assert engine.cache_stats()["compiladas"] == 1
+    # Los dicts del llamador se memoizan por contenido: modificarlos no deja tablas obsoletas
+    propio = {"orbs": [{"body": "Sol", "conjunction": 2}]}
+    assert not engine.validate_aspect("Sol", "Luna", 5.0, propio)["isValid"]
+    propio["orbs"][0]["conjunction"] = 8
+    assert engine.validate_aspect("Sol", "Luna", 5.0, propio)["isValid"], "❌ Tablas obsoletas tras modificar el config"
+    assert engine.compile_config(copy.deepcopy(CONFIG)) is compilada
+    assert compilada.orbes.shape == (len(CONFIG["orbs"]) + 1, 5)
+    assert not compilada.orbes[-1].any(), "❌ La fila de cuerpos desconocidos debe ser 0"
+    vacia = ConfigCompilada(None)
+    assert vacia.estrategia == UMBRELLA_MAX and vacia.validar("Sol", "Luna", 0.0) == (0, 0.0, 0.0)
+    assert engine.validate_aspect("Sol", "Luna", 45.0, {})["aspectType"] is None
+    # Estrategias desconocidas (config o llamada) se tratan como UMBRELLA_MAX
+    rara = engine.compile_config(dict(CONFIG, rules={"aspects": {"strategy": "umbrella"}}))
+    assert rara.estrategia == UMBRELLA_MAX
+    lote = compilada.validar_pares(["Marte"], ["Saturno"], [94.0], "umbrella")
+    assert lote["limite"].tolist() == [6.0] and compilada.validar("Marte", "Saturno", 94.0, "umbrella")[2] == 6.0
+    print("✅ PASS - Compilación única")
+
+
+if __name__ == "__main__":
+    test_equivalente_a_original()
+    test_rejilla_vectorizada()
+    test_compilacion_unica()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
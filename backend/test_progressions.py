@@ -0,0 +1,100 @@
+"""
+Tests de progresiones secundarias y arco solar
+Ejecutar con: python test_progressions.py
+
+TESTS:
+1. La línea de progresiones coincide con Swiss Ephemeris en jd_natal + edad
+2. Los contactos progresado→natal y dirigido→natal son exactos
+3. El arco solar es monótono y ~1° por año
+4. Una sola serie cacheada por carta sirve cualquier ventana de edades (en la rejilla o interpolada)
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import swisseph as swe
+
+from app.services.aspect_engine import ASPECTOS_MAYORES
+from app.services.ephemeris import PLANETAS, calcular_carta_completa
+from app.services.progressions import (
+    CUERPOS_PROGRESADOS,
+    _serie_progresada,
+    calcular_progresiones,
+    jd_natal_de_carta,
+    linea_arco_solar,
+    linea_progresiones,
+)
+from app.services.transit_search import puntos_natales_de_carta
+
+CARTA = calcular_carta_completa("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+JD_NATAL = jd_natal_de_carta(CARTA)
+PUNTOS = puntos_natales_de_carta(CARTA)
+
+
+def test_linea_progresiones():
+    """Test 1: un día por año"""
+    linea = linea_progresiones(JD_NATAL, 0, 80)
+    assert linea["lon"].shape == (81, len(linea["cuerpos"]))
+    assert abs(linea["lon"][0, 0] - CARTA["planetas"]["Sol"]["longitud"]) < 1e-6
+    for edad in (10, 33, 80):
+        for j, cuerpo in enumerate(linea["cuerpos"]):
+            ref = swe.calc_ut(JD_NATAL + edad, PLANETAS[cuerpo])[0][0]
+            assert abs(linea["lon"][edad, j] - ref) < 1e-3, f"❌ {cuerpo} a los {edad}"
+    print("✅ PASS - Línea de progresiones")
+
+
+def test_contactos_exactos():
+    """Test 2: contactos a natal"""
+    res = calcular_progresiones(JD_NATAL, PUNTOS, 0, 60)
+    assert res["contactos"], "❌ Sin contactos en 60 años"
+    assert [c["edad"] for c in res["contactos"]] == sorted(c["edad"] for c in res["contactos"])
+    for c in res["contactos"]:
+        if c["tecnica"] == "progresion":
+            lon = swe.calc_ut(JD_NATAL + c["edad"], PLANETAS[c["movil"]])[0][0]
+        else:
+            arco = swe.calc_ut(JD_NATAL + c["edad"], swe.SUN)[0][0] - PUNTOS["Sol"]
+            lon = PUNTOS[c["movil"]] + arco
+        sep = abs((lon - PUNTOS[c["natal_point"]] + 180.0) % 360.0 - 180.0)
+        assert abs(sep - ASPECTOS_MAYORES[c["aspect"]]) < 0.005, f"❌ No exacto: {c}"
+    print(f"✅ PASS - {len(res['contactos'])} contactos exactos")
+
+
+def test_arco_solar():
+    """Test 3: arco solar"""
+    linea = linea_arco_solar(JD_NATAL, PUNTOS, 0, 90)
+    assert linea["arco"][0] == 0.0 and np.all(np.diff(linea["arco"]) > 0.9)
+    assert 85 < linea["arco"][-1] < 95
+    print("✅ PASS - Arco solar")
+
+
+def test_serie_cacheada():
+    """Test 4: ventanas distintas, misma serie"""
+    _serie_progresada.cache_clear()
+    linea_progresiones(JD_NATAL, 0, 80)
+    # Ventana del informe: edad actual fraccionaria, paso mensual (fuera de la rejilla)
+    linea = linea_progresiones(JD_NATAL, 35.37, 41.37, 1 / 12)
+    linea_arco_solar(JD_NATAL, PUNTOS, 12.5, 20.0, 0.5)
+    info = _serie_progresada.cache_info()
+    assert info.misses == 1 and info.hits >= 2, f"❌ {info}"
+    assert _serie_progresada(round(JD_NATAL, 6)).shape[1] == len(CUERPOS_PROGRESADOS)
+
+    for t in (0, 37, len(linea["edades"]) - 1):
+        jd = JD_NATAL + linea["edades"][t]
+        for j, cuerpo in enumerate(linea["cuerpos"]):
+            ref = swe.calc_ut(jd, PLANETAS[cuerpo], swe.FLG_SWIEPH | swe.FLG_SPEED)[0]
+            assert abs((linea["lon"][t, j] - ref[0] + 180.0) % 360.0 - 180.0) < 1e-3, f"❌ {cuerpo} a los {linea['edades'][t]}"
+            assert abs(linea["speed"][t, j] - ref[3]) < 1e-3, f"❌ Velocidad de {cuerpo}"
+
+    # Un cuerpo no progresado por defecto se calcula directamente
+    urano = linea_progresiones(JD_NATAL, 10, 12, 1, ["Urano", "Sol"])
+    assert abs(urano["lon"][0, 0] - swe.calc_ut(JD_NATAL + 10, swe.URANUS)[0][0]) < 1e-6
+    print(f"✅ PASS - Serie cacheada ({info.hits} aciertos, 1 cálculo)")
+
+
+if __name__ == "__main__":
+    test_linea_progresiones()
+    test_contactos_exactos()
+    test_arco_solar()
+    test_serie_cacheada()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
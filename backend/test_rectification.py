@@ -0,0 +1,75 @@
+"""
+Tests del barrido de rectificación
+Ejecutar con: python test_rectification.py
+
+TESTS:
+1. ASC/MC y cúspides del barrido coinciden con swe.houses en cada paso
+2. Cada evento coincide con la carta completa justo antes y justo después
+3. Validación de ventana y paso
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import swisseph as swe
+
+from app.services.ephemeris import SISTEMAS_CASAS, calcular_carta_desde_jd
+from app.services.rectification import angulos_y_cuspides, barrido_rectificacion
+
+NACIMIENTO = ("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+
+
+def test_angulos_y_cuspides():
+    """Test 1: ARMC por pasos frente a swe.houses"""
+    jd = 2447907.0
+    minutos = np.arange(-120, 121, 10.0)
+    for sistema in ("placidus", "koch", "whole_sign"):
+        res = angulos_y_cuspides(jd, minutos, 40.4168, -3.7038, sistema)
+        for t, m in enumerate(minutos):
+            cuspides, ascmc = swe.houses(jd + m / 1440.0, 40.4168, -3.7038, SISTEMAS_CASAS[sistema])
+            assert abs(res["ascendente"][t] - ascmc[0]) < 1e-3, f"❌ ASC {sistema} {m}"
+            assert abs(res["medio_cielo"][t] - ascmc[1]) < 1e-3
+            assert np.allclose(res["cuspides"][t], cuspides[:12], atol=1e-3)
+    print("✅ PASS - ASC/MC y cúspides")
+
+
+def _valor(carta, evento):
+    if evento["tipo"] == "casa":
+        return carta["planetas"][evento["punto"]]["casa"]
+    if evento["punto"] == "Ascendente":
+        return carta["angulos"]["ascendente"]["signo"]
+    if evento["punto"] == "Medio Cielo":
+        return carta["angulos"]["medio_cielo"]["signo"]
+    return carta["planetas"][evento["punto"]]["signo"]
+
+
+def test_eventos():
+    """Test 2: eventos frente a cartas completas"""
+    res = barrido_rectificacion(*NACIMIENTO, ventana_minutos=120, paso_minutos=1)
+    assert res["pasos"] == 241 and res["eventos"]
+    assert any(e["punto"] == "Ascendente" for e in res["eventos"])
+    jd = res["centro"]["jd"]
+    for e in res["eventos"]:
+        antes = calcular_carta_desde_jd(jd + (e["minutos"] - 0.5) / 1440.0, 40.4168, -3.7038, "Europe/Madrid")
+        despues = calcular_carta_desde_jd(jd + (e["minutos"] + 0.5) / 1440.0, 40.4168, -3.7038, "Europe/Madrid")
+        assert _valor(antes, e) == e["desde"] and _valor(despues, e) == e["hasta"], f"❌ {e}"
+    print(f"✅ PASS - {len(res['eventos'])} eventos verificados")
+
+
+def test_validacion():
+    """Test 3: límites"""
+    for kwargs in ({"ventana_minutos": 0}, {"ventana_minutos": 10000}, {"paso_minutos": 0.01}, {"cuerpos": ["Xena"]}):
+        try:
+            barrido_rectificacion(*NACIMIENTO, **kwargs)
+            assert False, f"❌ Debería fallar: {kwargs}"
+        except ValueError:
+            pass
+    print("✅ PASS - Validación")
+
+
+if __name__ == "__main__":
+    test_angulos_y_cuspides()
+    test_eventos()
+    test_validacion()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
@@ -0,0 +1,74 @@
+"""
+Tests de revoluciones solares y lunares
+Ejecutar con: python test_returns.py
+
+TESTS:
+1. Revolución solar: el Sol vuelve exactamente a su longitud natal, una por año
+2. Revoluciones lunares consecutivas, exactas y posteriores a la fecha pedida
+3. Las series repetidas salen de la caché de raíces
+4. La carta de revolución se levanta en el lugar elegido
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import swisseph as swe
+
+from app.services.ephemeris import calcular_julian_day
+from app.services.returns import cache_retornos, carta_retorno, retornos_lunares, retornos_solares
+
+JD_NATAL, _, _ = calcular_julian_day("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+
+
+def _separacion(jd, cuerpo):
+    lon = swe.calc_ut(jd, cuerpo)[0][0]
+    natal = swe.calc_ut(JD_NATAL, cuerpo)[0][0]
+    return abs((lon - natal + 180.0) % 360.0 - 180.0)
+
+
+def test_revolucion_solar():
+    """Test 1: 10 años"""
+    serie = retornos_solares(JD_NATAL, 2020, 10)
+    assert [a for a, _ in serie] == list(range(2020, 2030))
+    for año, jd in serie:
+        assert swe.revjul(jd)[0] == año and swe.revjul(jd)[1] == 1, f"❌ {año}: fecha inesperada"
+        assert _separacion(jd, swe.SUN) < 1e-6, f"❌ {año}: Sol fuera de su longitud natal"
+    print("✅ PASS - Revoluciones solares exactas")
+
+
+def test_revolucion_lunar():
+    """Test 2: 13 meses desde 2026-01-01"""
+    desde = swe.julday(2026, 1, 1, 0.0)
+    serie = retornos_lunares(JD_NATAL, desde, 13)
+    assert len(serie) == 13 and serie[0] >= desde
+    assert all(26.5 < b - a < 28.5 for a, b in zip(serie, serie[1:])), "❌ Revoluciones no consecutivas"
+    assert all(_separacion(jd, swe.MOON) < 1e-6 for jd in serie)
+    print("✅ PASS - Revoluciones lunares exactas")
+
+
+def test_cache_raices():
+    """Test 3: segunda serie sin búsqueda"""
+    retornos_solares(JD_NATAL, 2040, 5)
+    hits = cache_retornos.stats()["hits"]
+    retornos_solares(JD_NATAL, 2040, 5)
+    assert cache_retornos.stats()["hits"] == hits + 5, "❌ La serie repetida debería salir de caché"
+    print("✅ PASS - Caché de raíces")
+
+
+def test_carta_revolucion():
+    """Test 4: carta en Barcelona"""
+    _, jd = retornos_solares(JD_NATAL, 2026)[0]
+    carta = carta_retorno("solar", jd, 41.3874, 2.1686, "Europe/Madrid")
+    assert carta["datos_entrada"]["latitud"] == 41.3874
+    assert carta["datos_entrada"]["fecha_local"].startswith("2026-01-")
+    assert carta["revolucion"]["tipo"] == "solar"
+    assert _separacion(jd, swe.SUN) < 1e-6
+    print("✅ PASS - Carta de revolución")
+
+
+if __name__ == "__main__":
+    test_revolucion_solar()
+    test_revolucion_lunar()
+    test_cache_raices()
+    test_carta_revolucion()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
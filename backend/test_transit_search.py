@@ -0,0 +1,64 @@
+"""
+Tests de la búsqueda de tránsitos exactos
+Ejecutar con: python test_transit_search.py
+
+TESTS:
+1. Cada tránsito encontrado es exacto (< 0.01°) y se emite en orden cronológico
+2. La búsqueda por páginas (cursor exclusivo con desempate) da los mismos resultados que de una vez,
+   también con empates en el mismo jd partidos entre dos páginas
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import swisseph as swe
+
+from app.services.aspect_engine import ASPECTOS_MAYORES
+from app.services.ephemeris import PLANETAS, calcular_carta_completa
+from app.services.transit_search import buscar_transitos_exactos, buscar_transitos_pagina, clave_transito, puntos_natales_de_carta
+
+JD_INICIO = swe.julday(2026, 1, 1, 0.0)
+
+
+def _puntos():
+    carta = calcular_carta_completa("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+    return puntos_natales_de_carta(carta)
+
+
+def test_transitos_exactos():
+    """Test 1: dos años de planetas lentos + Sol"""
+    puntos = _puntos()
+    hallazgos = list(buscar_transitos_exactos(puntos, JD_INICIO, JD_INICIO + 730, cuerpos=["Sol", "Júpiter", "Saturno", "Plutón"]))
+    assert hallazgos, "❌ Sin tránsitos en dos años"
+    assert [h["jd"] for h in hallazgos] == sorted(h["jd"] for h in hallazgos)
+    for h in hallazgos:
+        lon = swe.calc_ut(h["jd"], PLANETAS[h["transit_planet"]])[0][0]
+        sep = abs((lon - puntos[h["natal_point"]] + 180.0) % 360.0 - 180.0)
+        assert abs(sep - ASPECTOS_MAYORES[h["aspect"]]) < 0.01, f"❌ No exacto: {h}"
+    print(f"✅ PASS - {len(hallazgos)} tránsitos exactos")
+
+
+def test_paginacion():
+    """Test 2: reanudar desde el cursor no pierde ni duplica resultados"""
+    puntos = _puntos()
+    # Un punto duplicado produce empates exactos en jd: con páginas de 1 cada empate queda partido
+    puntos["Sol (copia)"] = puntos["Sol"]
+    completo = list(buscar_transitos_exactos(puntos, JD_INICIO, JD_INICIO + 365, cuerpos=["Sol", "Marte"]))
+    jds = [h["jd"] for h in completo]
+    assert len(jds) > len(set(jds)), "❌ El test necesita empates en jd"
+    for tam in (1, 7):
+        paginado, cursor = [], None
+        while True:
+            pagina = buscar_transitos_pagina(puntos, JD_INICIO, JD_INICIO + 365, ["Sol", "Marte"], None, tam, cursor)
+            paginado.extend(pagina)
+            if len(pagina) < tam:
+                break
+            cursor = list(clave_transito(pagina[-1]))
+        assert paginado == completo, f"❌ Paginación inconsistente (páginas de {tam})"
+    print(f"✅ PASS - Paginación ({len(completo)} resultados)")
+
+
+if __name__ == "__main__":
+    test_transitos_exactos()
+    test_paginacion()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
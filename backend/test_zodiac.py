@@ -0,0 +1,100 @@
+"""
+Tests del zodiaco sideral (ayanamsa aplicado sobre la carta tropical)
+Ejecutar con: python test_zodiac.py
+
+TESTS:
+1. La carta sideral coincide con Swiss Ephemeris (FLG_SIDEREAL) en cuerpos, cúspides y ángulos
+2. Tropical y sideral de una sola pasada == cartas calculadas por separado
+3. Caché: calcular la sideral deja también la tropical en caché; endpoint /calculate-zodiacs
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import swisseph as swe
+
+from app.services.chart_cache import calcular_carta_cacheada, calcular_cartas_zodiacos_cacheadas, chart_cache
+from app.services.chart_model import calcular_carta_compacta, calcular_cartas_zodiacos
+from app.services.ephemeris import AYANAMSAS, PLANETAS, SISTEMAS_CASAS, calcular_carta_completa, normalizar_zodiaco
+
+NACIMIENTO = ("1990-01-15", "14:30", 40.4168, -3.7038, "Europe/Madrid")
+
+
+def _dif(a, b) -> float:
+    return float(np.max(np.abs((np.asarray(a) - np.asarray(b) + 180.0) % 360.0 - 180.0)))
+
+
+def test_coincide_con_swiss_ephemeris():
+    """Test 1: un único desplazamiento == cálculo sideral nativo"""
+    for sistema in ('placidus', 'whole_sign', 'equal'):
+        for ayanamsa in ('lahiri', 'fagan_bradley', 'krishnamurti'):
+            tropical = calcular_carta_compacta(*NACIMIENTO, sistema)
+            sideral = tropical.a_sideral(ayanamsa)
+            swe.set_sid_mode(AYANAMSAS[ayanamsa])
+            flags = swe.FLG_SWIEPH | swe.FLG_SPEED | swe.FLG_SIDEREAL
+            for nombre in ('Sol', 'Luna', 'Plutón', 'Nodo Norte', 'Lilith med.'):
+                nativo = swe.calc_ut(tropical.jd_ut, PLANETAS[nombre], flags)[0][0]
+                assert _dif(nativo, sideral.longitud(nombre)) < 1e-9, f"❌ {nombre} {ayanamsa}"
+            cusp, ascmc = swe.houses_ex(tropical.jd_ut, NACIMIENTO[2], NACIMIENTO[3], SISTEMAS_CASAS[sistema], swe.FLG_SIDEREAL)
+            assert _dif(cusp[:12], sideral.cuspides) < 1e-9, f"❌ cúspides {sistema}"
+            assert _dif(ascmc[:2], [sideral.ascendente, sideral.medio_cielo]) < 1e-9
+    assert tropical.zodiaco == 'tropical' and sideral.datos_entrada['ayanamsa'] == 'krishnamurti'
+    try:
+        sideral.a_sideral()
+        assert False, "❌ Una carta sideral no se puede volver a desplazar"
+    except ValueError:
+        pass
+    print("✅ PASS - Coincide con Swiss Ephemeris")
+
+
+def test_una_pasada():
+    """Test 2: ambas variantes de una pasada == cálculos independientes"""
+    cartas = calcular_cartas_zodiacos(*NACIMIENTO, None, 'lahiri')
+    assert cartas['tropical'] == calcular_carta_completa(*NACIMIENTO)
+    assert cartas['sideral'] == calcular_carta_completa(*NACIMIENTO, zodiaco='sideral', ayanamsa='lahiri')
+    assert 'zodiaco' not in cartas['tropical']['datos_entrada']
+    assert cartas['sideral']['datos_entrada']['zodiaco'] == 'sideral'
+    assert 23.5 < cartas['sideral']['datos_entrada']['ayanamsa_valor'] < 24.0
+    assert normalizar_zodiaco('Sidereal') == 'sideral'
+    for invalido in (dict(zodiaco='draconico'), dict(zodiaco='sideral', ayanamsa='inventado')):
+        try:
+            calcular_carta_completa(*NACIMIENTO, **invalido)
+            assert False, f"❌ Debería rechazar {invalido}"
+        except ValueError:
+            pass
+    print("✅ PASS - Una pasada para ambos zodiacos")
+
+
+def test_cache_conjunta():
+    """Test 3: la sideral y la tropical se guardan juntas"""
+    chart_cache.clear()
+    sideral = calcular_carta_cacheada(*NACIMIENTO, None, 'sideral', 'raman')
+    hits = chart_cache.hits
+    tropical = calcular_carta_cacheada(*NACIMIENTO)
+    assert chart_cache.hits == hits + 1, "❌ La tropical debería salir de caché"
+    assert calcular_cartas_zodiacos_cacheadas(*NACIMIENTO, None, 'raman') == {'tropical': tropical, 'sideral': sideral}
+    assert chart_cache.hits == hits + 3
+
+    from fastapi.testclient import TestClient
+    from main import app
+    from app.api.endpoints.auth import get_current_user
+    app.dependency_overrides[get_current_user] = lambda: {"username": "test"}
+    try:
+        cliente = TestClient(app)
+        cuerpo = dict(zip(("fecha", "hora", "latitud", "longitud", "zona_horaria"), NACIMIENTO), ayanamsa="raman")
+        datos = cliente.post("/ephemeris/calculate-zodiacs", json=cuerpo).json()['data']
+        assert datos['sideral'] == sideral and datos['tropical'] == tropical
+        datos = cliente.post("/ephemeris/calculate", json={**cuerpo, "zodiaco": "sideral"}).json()['data']
+        assert datos == sideral
+        assert cliente.post("/ephemeris/calculate", json={**cuerpo, "zodiaco": "x"}).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+    print("✅ PASS - Caché conjunta y endpoints")
+
+
+if __name__ == "__main__":
+    test_coincide_con_swiss_ephemeris()
+    test_una_pasada()
+    test_cache_conjunta()
+    print("\n✅ ✅ ✅  TODOS LOS TESTS PASARON  ✅ ✅ ✅")
@@ -1,36 +1,644 @@
 from pymongo import MongoClient
+from pymongo.errors import OperationFailure, PyMongoError
+from collections import OrderedDict
+from bisect import bisect_left
+import asyncio
+import copy
+import hashlib
+import json
 import math
-from typing import Dict, List, Optional, Any
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Any, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from app.services.house_index import IndiceCasas
+except ImportError:
+    # Uso standalone (fuera del backend): añadir backend/ al path
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+    from app.services.house_index import IndiceCasas
+from app.services.aspect_engine import ASPECTOS_MAYORES, ASPECTOS_MENORES, ORBES_POR_DEFECTO
+
+# Segundos entre comprobaciones de versión cuando no hay change stream (no es replica set)
+INTERVALO_SONDEO_CONFIG = float(os.getenv("ORB_CONFIG_POLL_SECONDS", "30"))
+# "0" desactiva el change stream y deja solo el sondeo
+CHANGE_STREAM_CONFIG = os.getenv("ORB_CONFIG_CHANGE_STREAM", "1") != "0"
+MAX_CONFIGS_EFECTIVOS = 256
+# AsyncOrbEngine: espera máxima de una lectura y pausa antes de reintentar si Mongo no responde
+TIMEOUT_CONFIG_ASYNC = float(os.getenv("ORB_CONFIG_TIMEOUT_SECONDS", "2"))
+ESPERA_REINTENTO_CONFIG = float(os.getenv("ORB_CONFIG_RETRY_SECONDS", "30"))
+MAX_CONFIGS_COMPILADAS = 256
+
+# Ángulos exactos en el orden de detección de get_aspect_type (Matriz de Orbes v6.0)
+ANGULOS_ASPECTOS = {
+    "conjunction": 0,
+    "opposition": 180,
+    "square": 90,
+    "trine": 120,
+    "sextile": 60
+}
+# Margen de detección inicial (antes de validar el orbe preciso)
+MARGEN_DETECCION = 12
+# Ángulos de todos los aspectos que un catálogo puede nombrar sin dar el ángulo
+ANGULOS_CONOCIDOS = {**ASPECTOS_MAYORES, **ASPECTOS_MENORES}
+# Aspectos de declinación (no dependen de la separación en longitud)
+ASPECTOS_DECLINACION = ("parallel", "contraparallel")
+ORBE_DECLINACION_POR_DEFECTO = 1.0
+
+UMBRELLA_MAX = "UMBRELLA_MAX"
+RECEIVER_PRIORITY = "RECEIVER_PRIORITY"
+NOMBRES_ESTRATEGIA = {
+    UMBRELLA_MAX: "Efecto Paraguas (Max Orb)",
+    RECEIVER_PRIORITY: "Prioridad Receptor (Natal)",
+}
+
+
+def sello_version(preset: Dict) -> str:
+    """Sello de versión de un preset: hash estable de su contenido (cambia con cualquier edición)."""
+    return hashlib.sha1(json.dumps(preset, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def hash_preferencias(user_prefs: Optional[Dict]) -> str:
+    """Hash estable de las preferencias de usuario (independiente del orden de las claves)."""
+    if not user_prefs:
+        return ""
+    return hashlib.sha1(json.dumps(user_prefs, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def normalizar_estrategia(estrategia: Optional[str]) -> str:
+    """Estrategia de orbes conocida; cualquier otro valor (o ninguno) es UMBRELLA_MAX."""
+    return estrategia if estrategia in NOMBRES_ESTRATEGIA else UMBRELLA_MAX
+
+
+def _plegar(angulo: float) -> float:
+    """Separación angular en [0, 180] (admite diferencias de longitud sin normalizar)."""
+    a = abs(angulo) % 360
+    return 360 - a if a > 180 else a
+
+
+def catalogo_desde_config(config: Optional[Dict]) -> Tuple[List[Tuple[str, float, float, float]], List[Tuple[str, float]]]:
+    """
+    Catálogo de aspectos de `rules.aspects.catalog` en un preset de `calculation_rules`.
+
+    Cada entrada es un nombre ("quincunx", "parallel") o un dict
+    `{"type": ..., "angle": ..., "margin": ..., "orb": ...}`; el ángulo de los nombres conocidos
+    (mayores y menores) es opcional. `orb` es el orbe de los cuerpos del config que no lo definen.
+    Sin catálogo: los cinco mayores con el margen de 12° y orbe 0 (comportamiento original).
+
+    Returns:
+        (angulares [(nombre, ángulo, margen, orbe)] ordenados por ángulo, declinación [(nombre, orbe)])
+    """
+    entradas = ((config or {}).get('rules', {}).get('aspects', {}) or {}).get('catalog')
+    if not entradas:
+        return sorted(((n, float(a), float(MARGEN_DETECCION), 0.0) for n, a in ANGULOS_ASPECTOS.items()), key=lambda e: e[1]), []
+
+    angulares: Dict[str, Tuple[str, float, float, float]] = {}
+    declinacion: Dict[str, Tuple[str, float]] = {}
+    for entrada in entradas:
+        if isinstance(entrada, str):
+            entrada = {"type": entrada}
+        if not isinstance(entrada, dict):
+            continue
+        nombre = entrada.get('type') or entrada.get('name')
+        if nombre in ASPECTOS_DECLINACION:
+            declinacion[nombre] = (nombre, float(entrada.get('orb', ORBE_DECLINACION_POR_DEFECTO)))
+            continue
+        angulo = entrada.get('angle', ANGULOS_CONOCIDOS.get(nombre))
+        if not nombre or angulo is None:
+            print(f"⚠️ OrbEngine - Aspecto desconocido en el catálogo ignorado: {entrada}")
+            continue
+        angulares[nombre] = (
+            nombre,
+            _plegar(float(angulo)),
+            float(entrada.get('margin', MARGEN_DETECCION)),
+            float(entrada.get('orb', ORBES_POR_DEFECTO.get(nombre, 0.0))),
+        )
+    orden_declinacion = [declinacion[n] for n in ASPECTOS_DECLINACION if n in declinacion]
+    return sorted(angulares.values(), key=lambda e: e[1]), orden_declinacion
+
+
+class ConfigCompilada:
+    """
+    Config efectivo preparado una sola vez para validar aspectos sin reconstruir diccionarios:
+
+    - `aspectos` / `exactos`: catálogo angular ordenado por ángulo exacto; la detección es una
+      búsqueda binaria que devuelve el candidato más cercano (O(log k)) si cae dentro de su margen.
+    - `orbes`: matriz densa (cuerpos + 1) × aspectos; la última fila (ceros) es la de los cuerpos
+      que el config no define, igual que `orbs_data.get(body, {})` en la validación original.
+    - `limites[estrategia]`: (cuerpos + 1) × (cuerpos + 1) × aspectos con el orbe permitido para
+      cada par: máx(A, B) en UMBRELLA_MAX y el del receptor B en RECEIVER_PRIORITY.
+    - `paralelos`, `orbes_declinacion`, `limites_declinacion`: lo mismo para paralelos y
+      contraparalelos de declinación, si el catálogo los incluye.
+
+    Validar un par es una consulta a la tabla y validar una rejilla A × B, una sola operación vectorizada.
+    """
+
+    def __init__(self, config: Optional[Dict]):
+        config = config or {}
+        self.estrategia = normalizar_estrategia((config.get('rules', {}).get('aspects', {}) or {}).get('strategy'))
+        angulares, declinacion = catalogo_desde_config(config)
+        self.aspectos: Tuple[str, ...] = tuple(e[0] for e in angulares)
+        self.exactos = np.array([e[1] for e in angulares], dtype="f8")
+        self.margenes = np.array([e[2] for e in angulares], dtype="f8")
+        self.paralelos: Tuple[str, ...] = tuple(e[0] for e in declinacion)
+
+        orbs_data = {item['body']: item for item in config.get('orbs', []) if isinstance(item, dict)}
+        self.cuerpos: Tuple[str, ...] = tuple(orbs_data)
+        self.indice: Dict[str, int] = {c: i for i, c in enumerate(self.cuerpos)}
+        self.orbes = self._tabla(orbs_data, [(e[0], e[3]) for e in angulares])
+        self.orbes_declinacion = self._tabla(orbs_data, declinacion)
+        self.limites = self._limites(self.orbes)
+        self.limites_declinacion = self._limites(self.orbes_declinacion)
+        # Corrección de casas por proximidad: (activada, orbe hacia angular, orbe hacia el resto)
+        reglas_casas = config.get('rules', {}).get('houseCorrection', {}) or {}
+        self.correccion_casas = (
+            bool(reglas_casas.get('enabled', False)),
+            reglas_casas.get('angularOrb', 2.0),
+            reglas_casas.get('otherOrb', 1.0),
+        )
+        # Copias en listas para la validación escalar (más rápida que indexar arrays de NumPy)
+        self._orbes_lista = self.orbes.tolist()
+        self._exactos_lista = [float(a) for a in self.exactos]
+        self._margenes_lista = [float(m) for m in self.margenes]
+
+    @staticmethod
+    def _tabla(orbs_data: Dict[str, Dict], columnas: Sequence[Tuple[str, float]]) -> np.ndarray:
+        tabla = np.zeros((len(orbs_data) + 1, len(columnas)), dtype="f8")
+        for i, item in enumerate(orbs_data.values()):
+            for k, (aspecto, por_defecto) in enumerate(columnas):
+                tabla[i, k] = float(item.get(aspecto, por_defecto) or 0)
+        return tabla
+
+    @staticmethod
+    def _limites(orbes: np.ndarray) -> Dict[str, np.ndarray]:
+        return {
+            UMBRELLA_MAX: np.maximum(orbes[:, None, :], orbes[None, :, :]),
+            RECEIVER_PRIORITY: np.broadcast_to(orbes[None, :, :], (len(orbes),) + orbes.shape),
+        }
+
+    def _estrategia(self, estrategia: Optional[str]) -> str:
+        return normalizar_estrategia(estrategia) if estrategia else self.estrategia
+
+    def indices(self, cuerpos: Sequence[str]) -> np.ndarray:
+        """Fila de cada cuerpo en las tablas (-1 = no definido en el config → orbes 0)."""
+        return np.array([self.indice.get(c, -1) for c in cuerpos], dtype=np.intp)
+
+    def detectar(self, angulo: float) -> int:
+        """Índice del aspecto más cercano si está dentro de su margen de detección (-1 si ninguno)."""
+        exactos = self._exactos_lista
+        if not exactos:
+            return -1
+        a = _plegar(angulo)
+        i = bisect_left(exactos, a)
+        # Candidatos: el exacto inmediatamente inferior y el superior
+        if i == len(exactos) or (i > 0 and a - exactos[i - 1] <= exactos[i] - a):
+            i -= 1
+        return i if abs(a - exactos[i]) <= self._margenes_lista[i] else -1
+
+    def validar(self, body_a: str, body_b: str, angulo: float, estrategia: Optional[str] = None) -> Tuple[int, float, float]:
+        """(índice de aspecto, orbe, límite) de un par; índice -1 si no hay aspecto detectable."""
+        k = self.detectar(angulo)
+        if k < 0:
+            return -1, 0.0, 0.0
+        orbe = abs(_plegar(angulo) - self._exactos_lista[k])
+        fila_b = self._orbes_lista[self.indice.get(body_b, -1)][k]
+        if self._estrategia(estrategia) == RECEIVER_PRIORITY:
+            return k, orbe, fila_b
+        return k, orbe, max(self._orbes_lista[self.indice.get(body_a, -1)][k], fila_b)
+
+    def validar_lote(self, idx_a, idx_b, angulos, estrategia: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Núcleo vectorizado: `idx_a`, `idx_b` (de `indices`) y `angulos` se combinan por broadcasting.
+
+        Returns:
+            Dict con aspecto (-1 si ninguno), orbe, limite y valido, todos con la forma del broadcast
+        """
+        angulos = np.abs(np.asarray(angulos, dtype="f8")) % 360.0
+        angulos = np.where(angulos > 180.0, 360.0 - angulos, angulos)
+        idx_a, idx_b, angulos = np.broadcast_arrays(np.asarray(idx_a), np.asarray(idx_b), angulos)
+        if not len(self.aspectos):
+            vacio = np.zeros(angulos.shape)
+            return {"aspecto": np.full(angulos.shape, -1), "orbe": vacio, "limite": vacio, "valido": vacio.astype(bool)}
+
+        # Búsqueda binaria del exacto más cercano (inferior o superior)
+        ultimo = len(self.exactos) - 1
+        superior = np.clip(np.searchsorted(self.exactos, angulos), 0, ultimo)
+        inferior = np.clip(superior - 1, 0, ultimo)
+        d_sup = np.abs(self.exactos[superior] - angulos)
+        d_inf = np.abs(angulos - self.exactos[inferior])
+        aspecto = np.where(d_inf <= d_sup, inferior, superior)
+        orbe = np.minimum(d_inf, d_sup)
+
+        detectado = orbe <= self.margenes[aspecto]
+        limite = self.limites[self._estrategia(estrategia)][idx_a, idx_b, aspecto]
+        return {
+            "aspecto": np.where(detectado, aspecto, -1),
+            "orbe": np.where(detectado, orbe, 0.0),
+            "limite": np.where(detectado, limite, 0.0),
+            "valido": detectado & (orbe <= limite),
+        }
+
+    def validar_pares(self, cuerpos_a: Sequence[str], cuerpos_b: Sequence[str], angulos, estrategia: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Valida N pares (cuerpos_a[i], cuerpos_b[i], angulos[i]) de una vez."""
+        return self.validar_lote(self.indices(cuerpos_a), self.indices(cuerpos_b), angulos, estrategia)
+
+    def validar_rejilla(self, cuerpos_a: Sequence[str], cuerpos_b: Sequence[str], angulos, estrategia: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Valida la rejilla completa A × B (`angulos` con forma (A, B)) de una vez."""
+        return self.validar_lote(self.indices(cuerpos_a)[:, None], self.indices(cuerpos_b)[None, :], angulos, estrategia)
+
+    def validar_declinaciones(
+        self,
+        cuerpos_a: Sequence[str],
+        decl_a,
+        cuerpos_b: Sequence[str],
+        decl_b,
+        estrategia: Optional[str] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Paralelos (|δA - δB|) y contraparalelos (|δA + δB|) de la rejilla A × B contra las tablas
+        de declinación. `aspecto` indexa `paralelos` (-1 si ninguno o el catálogo no los incluye).
+        """
+        decl_a = np.asarray(decl_a, dtype="f8")[:, None]
+        decl_b = np.asarray(decl_b, dtype="f8")[None, :]
+        desviaciones = {"parallel": np.abs(decl_a - decl_b), "contraparallel": np.abs(decl_a + decl_b)}
+        forma = np.broadcast_shapes(decl_a.shape, decl_b.shape)
+        if not self.paralelos:
+            vacio = np.zeros(forma)
+            return {"aspecto": np.full(forma, -1), "orbe": vacio, "limite": vacio, "valido": vacio.astype(bool)}
+
+        desviacion = np.stack([desviaciones[p] for p in self.paralelos], axis=-1)
+        limite = self.limites_declinacion[self._estrategia(estrategia)][
+            self.indices(cuerpos_a)[:, None], self.indices(cuerpos_b)[None, :]
+        ]
+        candidata = np.where(desviacion <= limite, desviacion, np.inf)
+        aspecto = np.argmin(candidata, axis=-1)
+        valido = np.isfinite(np.take_along_axis(candidata, aspecto[..., None], axis=-1)[..., 0])
+        return {
+            "aspecto": np.where(valido, aspecto, -1),
+            "orbe": np.where(valido, np.take_along_axis(desviacion, aspecto[..., None], axis=-1)[..., 0], 0.0),
+            "limite": np.where(valido, np.take_along_axis(limite, aspecto[..., None], axis=-1)[..., 0], 0.0),
+            "valido": valido,
+        }
+
+    def resultado(self, aspecto: int, orbe: float, limite: float, estrategia: Optional[str] = None, declinacion: bool = False) -> Dict:
+        """Formato de `OrbEngine.validate_aspect` para un resultado ya validado."""
+        if aspecto < 0:
+            return {"isValid": False, "orb": 0, "note": "Sin aspecto detectado fuera de rango genérico.", "aspectType": None}
+        aspect_type = (self.paralelos if declinacion else self.aspectos)[aspecto]
+        is_valid = orbe <= limite
+        status = "VÁLIDO" if is_valid else "FUERA DE ORBE"
+        strategy_name = NOMBRES_ESTRATEGIA[self._estrategia(estrategia)]
+        return {
+            "isValid": bool(is_valid),
+            "orb": round(float(orbe), 2),
+            "limit": float(limite),
+            "aspectType": aspect_type,
+            "note": f"Aspecto {aspect_type} {status} ({orbe:.2f}° <= {limite:g}°). Estrategia: {strategy_name}."
+        }
+
+
+# Catálogo por defecto (cinco mayores, margen de 12°) para consultas sin config
+CATALOGO_BASE = ConfigCompilada(None)
+
+
+def _nota_casa(casa: int, corregido: bool, distancia: float, umbral, habilitada: bool) -> str:
+    if not habilitada:
+        return f"Ubicación geométrica estándar en Casa {casa}. Corrección desactivada."
+    if corregido:
+        return f"Movido a Casa {casa} por proximidad a cúspide ({distancia:.2f}° <= {umbral}°)."
+    return f"Permanencia en Casa {casa}. Distancia a cúspide ({distancia:.2f}°) superior al umbral ({umbral}°)."
+
+
+class ColocacionCasas:
+    """
+    Resultado de `OrbEngine.calculate_house_placements`: arrays con la forma de las longitudes
+    (cuerpos, o perfiles × cuerpos). Las notas en texto solo se generan al pedirlas.
+
+    - geometrica: casa geométrica (1-12; 0 si la longitud es NaN)
+    - casa: casa tras la corrección por proximidad a la siguiente cúspide
+    - distancia: distancia angular a la siguiente cúspide
+    - umbral: orbe aplicado (angular o resto, según la siguiente casa)
+    - corregido: True si el cuerpo salta a la casa siguiente
+    """
+
+    def __init__(self, geometrica, casa, distancia, umbral, corregido, angular, habilitada: bool, umbrales: Tuple[Any, Any]):
+        self.geometrica = geometrica
+        self.casa = casa
+        self.distancia = distancia
+        self.umbral = umbral
+        self.corregido = corregido
+        self.habilitada = habilitada
+        self._angular = angular
+        self._umbrales = umbrales
+
+    def nota(self, *indice) -> str:
+        """Nota de un cuerpo (índice con la forma de las longitudes, p.ej. `nota(3)` o `nota(perfil, 3)`)."""
+        return _nota_casa(
+            int(self.casa[indice]), bool(self.corregido[indice]), float(self.distancia[indice]),
+            self._umbrales[0] if self._angular[indice] else self._umbrales[1], self.habilitada
+        )
+
+    def resultado(self, *indice) -> Dict:
+        """Formato de `OrbEngine.calculate_house_placement` para un cuerpo."""
+        return {
+            "houseNumber": int(self.casa[indice]),
+            "isCorrected": bool(self.corregido[indice]),
+            "note": self.nota(*indice),
+        }
+
+    def por_cuerpo(self, nombres: Sequence[str], *perfil) -> Dict[str, Dict]:
+        """{cuerpo: resultado} para una carta (o para el perfil indicado)."""
+        return {n: self.resultado(*perfil, i) for i, n in enumerate(nombres)}
+
+
+class CachePresets:
+    """
+    Presets de `calculation_rules` por tipo de informe, con sello de versión, y configs efectivos
+    (preset + preferencias de usuario) memoizados por (tipo, versión, hash de preferencias). LRU acotado.
+
+    Al cambiar la versión de un preset (change stream o sondeo) sus configs efectivos se descartan.
+    Los configs devueltos son compartidos: solo lectura.
+
+    Las tablas compiladas se memoizan por contenido (sello del config), de modo que un dict del
+    llamador modificado entre llamadas se vuelve a compilar; los configs emitidos por la propia
+    caché (inmutables) se resuelven además por identidad, sin calcular el sello.
+    """
+
+    def __init__(self, max_efectivos: int = MAX_CONFIGS_EFECTIVOS):
+        self.max_efectivos = max_efectivos
+        self._presets: Dict[str, Tuple[Dict, str]] = {}
+        self._cargados: Dict[str, float] = {}
+        self._efectivos: "OrderedDict[Tuple[str, str, str], Dict]" = OrderedDict()
+        self._compiladas: "OrderedDict[str, ConfigCompilada]" = OrderedDict()
+        # Configs emitidos (presets y efectivos) → sus tablas; se guarda el config para que su id no se reutilice
+        self._emitidos: Dict[int, Tuple[Dict, Optional[ConfigCompilada]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.cargas = 0
+        self.invalidaciones = 0
+
+    def preset(self, report_type: str) -> Optional[Tuple[Dict, str]]:
+        with self._lock:
+            return self._presets.get(report_type)
+
+    def edad(self, report_type: str) -> float:
+        """Segundos desde la última lectura de Mongo del preset (inf si no está en caché)."""
+        with self._lock:
+            cargado = self._cargados.get(report_type)
+        return time.monotonic() - cargado if cargado is not None else float("inf")
+
+    def tipos(self) -> List[str]:
+        with self._lock:
+            return list(self._presets)
+
+    def guardar_preset(self, report_type: str, preset: Dict) -> Tuple[Dict, str]:
+        """Guarda el preset; si su versión cambió, descarta los configs efectivos derivados."""
+        entrada = (preset, sello_version(preset))
+        with self._lock:
+            self.cargas += 1
+            self._cargados[report_type] = time.monotonic()
+            anterior = self._presets.get(report_type)
+            if anterior is not None and anterior[1] == entrada[1]:
+                return anterior
+            self._presets[report_type] = entrada
+            self._emitir(preset)
+            if anterior is not None:
+                self._olvidar(anterior[0])
+                self._descartar_efectivos(report_type)
+        return entrada
+
+    def efectivo(self, clave: Tuple[str, str, str], construir: Callable[[], Dict]) -> Dict:
+        with self._lock:
+            config = self._efectivos.get(clave)
+            if config is not None:
+                self._efectivos.move_to_end(clave)
+                self.hits += 1
+                return config
+            self.misses += 1
+        config = construir()
+        with self._lock:
+            # Solo se guarda si la versión sigue vigente (pudo invalidarse mientras se construía)
+            vigente = self._presets.get(clave[0])
+            if vigente is not None and vigente[1] == clave[1]:
+                self._efectivos[clave] = config
+                self._emitir(config)
+                while len(self._efectivos) > self.max_efectivos:
+                    self._olvidar(self._efectivos.popitem(last=False)[1])
+        return config
+
+    def compilada(self, config: Dict) -> ConfigCompilada:
+        with self._lock:
+            emitido = self._emitidos.get(id(config))
+            if emitido is not None and emitido[0] is config and emitido[1] is not None:
+                return emitido[1]
+        clave = sello_version(config)
+        with self._lock:
+            compilada = self._compiladas.get(clave)
+            if compilada is not None:
+                self._compiladas.move_to_end(clave)
+        if compilada is None:
+            compilada = ConfigCompilada(config)
+        with self._lock:
+            self._compiladas[clave] = compilada
+            while len(self._compiladas) > MAX_CONFIGS_COMPILADAS:
+                self._compiladas.popitem(last=False)
+            emitido = self._emitidos.get(id(config))
+            if emitido is not None and emitido[0] is config:
+                self._emitidos[id(config)] = (config, compilada)
+        return compilada
+
+    def _emitir(self, config: Dict) -> None:
+        self._emitidos.setdefault(id(config), (config, None))
+
+    def _olvidar(self, config: Dict) -> None:
+        emitido = self._emitidos.get(id(config))
+        if emitido is not None and emitido[0] is config:
+            del self._emitidos[id(config)]
+
+    def invalidar(self, report_type: Optional[str] = None) -> None:
+        """Olvida un tipo de informe (o todos); la siguiente petición vuelve a leer de Mongo."""
+        with self._lock:
+            self.invalidaciones += 1
+            if report_type is None:
+                self._presets.clear()
+                self._cargados.clear()
+                self._efectivos.clear()
+                self._emitidos.clear()
+            else:
+                anterior = self._presets.pop(report_type, None)
+                if anterior is not None:
+                    self._olvidar(anterior[0])
+                self._cargados.pop(report_type, None)
+                self._descartar_efectivos(report_type)
+
+    def _descartar_efectivos(self, report_type: str) -> None:
+        for clave in [c for c in self._efectivos if c[0] == report_type]:
+            self._olvidar(self._efectivos.pop(clave))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "presets": {t: v for t, (_, v) in self._presets.items()},
+                "efectivos": len(self._efectivos),
+                "compiladas": len(self._compiladas),
+                "hits": self.hits,
+                "misses": self.misses,
+                "cargas": self.cargas,
+                "invalidaciones": self.invalidaciones,
+            }
+
 
 class OrbEngine:
     """
     Motor de Orbes y Lógica de Negocio Astrológica (Core Fractal).
     Encargado de la precisión técnica, corrección de casas y validación de aspectos.
+
+    Los presets se leen de Mongo una vez por tipo de informe y se mantienen en memoria
+    (`CachePresets`); un hilo en segundo plano los invalida con un change stream sobre
+    `calculation_rules` o, si el servidor no lo soporta, sondeando cada `INTERVALO_SONDEO_CONFIG` s.
+
+    `OrbEngine()` sin conexión ni colección no usa Mongo (solo la lógica de orbes; los presets son
+    configs vacíos); `collection` permite inyectar una colección `calculation_rules` ya abierta.
     """
-    def __init__(self, db_connection_string: str, db_name: str):
-        self.client = MongoClient(db_connection_string)
-        self.db = self.client[db_name]
-        self.collection = self.db['calculation_rules']
 
-    def get_effective_config(self, report_type: str = "NATAL", user_prefs: Optional[Dict] = None) -> Dict:
-        """
-        Tarea 1.2: Carga la configuración base y la fusiona con las preferencias del usuario.
-        """
-        # 1. Cargar Configuración Base ("Default") para el tipo de reporte
+    def __init__(
+        self,
+        db_connection_string: Optional[str] = None,
+        db_name: str = "fraktal",
+        vigilar: bool = True,
+        collection=None
+    ):
+        self.client = None
+        self.db = None
+        if collection is None and db_connection_string:
+            self.client = MongoClient(db_connection_string)
+            self.db = self.client[db_name]
+            collection = self.db['calculation_rules']
+        self.collection = collection
+        self.cache = CachePresets()
+        self._vigilante: Optional[threading.Thread] = None
+        self._modo_vigilancia: Optional[str] = None
+        self._detener: Optional[threading.Event] = None
+        if vigilar:
+            self.iniciar_vigilancia()
+
+    # --- Caché de presets ---
+    def _leer_preset(self, report_type: str) -> Dict:
+        if self.collection is None:
+            return {}
         doc = self.collection.find_one(
             {"presets.type": report_type},
             {"presets.$": 1}
         )
-        
-        base_config = {}
         if doc and 'presets' in doc:
-            base_config = doc['presets'][0]
-        
+            return doc['presets'][0]
+        return {}
+
+    def _preset(self, report_type: str) -> Tuple[Dict, str]:
+        entrada = self.cache.preset(report_type)
+        if entrada is None:
+            entrada = self.cache.guardar_preset(report_type, self._leer_preset(report_type))
+        return entrada
+
+    def refresh_presets(self) -> List[str]:
+        """Relee los presets en memoria; devuelve los tipos cuya versión cambió."""
+        cambiados = []
+        for report_type in self.cache.tipos():
+            anterior = self.cache.preset(report_type)
+            nuevo = self.cache.guardar_preset(report_type, self._leer_preset(report_type))
+            if anterior is None or anterior[1] != nuevo[1]:
+                cambiados.append(report_type)
+        return cambiados
+
+    def invalidate_cache(self, report_type: Optional[str] = None) -> None:
+        self.cache.invalidar(report_type)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        stats = self.cache.stats()
+        stats["vigilancia"] = self._modo_vigilancia
+        return stats
+
+    def iniciar_vigilancia(self) -> None:
+        """Arranca (una vez) el hilo que invalida la caché ante cambios en `calculation_rules`."""
+        if self.collection is None or (self._vigilante is not None and self._vigilante.is_alive()):
+            return
+        self._detener = threading.Event()
+        self._vigilante = threading.Thread(target=self._vigilar, name="orb-config-watch", daemon=True)
+        self._vigilante.start()
+
+    def detener_vigilancia(self) -> None:
+        if self._detener is not None:
+            self._detener.set()
+
+    def _vigilar(self) -> None:
+        detener = self._detener
+        if CHANGE_STREAM_CONFIG:
+            try:
+                self._modo_vigilancia = "change_stream"
+                with self.collection.watch() as stream:
+                    while not detener.is_set():
+                        # try_next no bloquea más allá de maxAwaitTimeMS: permite detener el hilo
+                        if stream.try_next() is not None:
+                            # Un documento puede contener presets de varios tipos: se releen todos
+                            # aquí (fuera del camino de los informes) y solo cambian los modificados
+                            self.refresh_presets()
+                return
+            except OperationFailure as e:
+                print(f"ℹ️ OrbEngine - Change stream no disponible ({e.code}); sondeo cada {INTERVALO_SONDEO_CONFIG:g}s")
+            except PyMongoError as e:
+                print(f"⚠️ OrbEngine - Change stream interrumpido: {e}; sondeo cada {INTERVALO_SONDEO_CONFIG:g}s")
+                self.cache.invalidar()
+        self._modo_vigilancia = "sondeo"
+        while not detener.wait(INTERVALO_SONDEO_CONFIG):
+            try:
+                cambiados = self.refresh_presets()
+                if cambiados:
+                    print(f"🔄 OrbEngine - Presets actualizados: {', '.join(cambiados)}")
+            except PyMongoError as e:
+                print(f"⚠️ OrbEngine - Error al sondear calculation_rules: {e}")
+
+    def get_effective_config(self, report_type: str = "NATAL", user_prefs: Optional[Dict] = None) -> Dict:
+        """
+        Tarea 1.2: Carga la configuración base y la fusiona con las preferencias del usuario.
+        El preset sale de la caché en memoria y la fusión se memoiza por (tipo, versión, preferencias);
+        el resultado es compartido y no debe modificarse.
+        """
+        # 1. Cargar Configuración Base ("Default") para el tipo de reporte
+        base_config, version = self._preset(report_type)
+
+        return self._fusionar(report_type, base_config, version, user_prefs)
+
+    def _fusionar(self, report_type: str, base_config: Dict, version: str, user_prefs: Optional[Dict]) -> Dict:
         if not user_prefs:
             return base_config
+        clave = (report_type, version, hash_preferencias(user_prefs))
+        return self.cache.efectivo(clave, lambda: self.merge_config(base_config, user_prefs))
+
+    def compile_config(self, config: Optional[Dict]) -> ConfigCompilada:
+        """
+        Tablas de orbes del config, compiladas una vez por contenido: los configs de
+        `get_effective_config` se resuelven por identidad y los dicts del llamador por su sello,
+        así que modificar un dict entre llamadas nunca devuelve tablas obsoletas.
+        """
+        if isinstance(config, ConfigCompilada):
+            return config
+        if not config:
+            return ConfigCompilada(config)
+        return self.cache.compilada(config)
 
-        # 2. Fusión Dinámica (Override de Usuario)
-        effective_config = base_config.copy()
+    def get_compiled_config(self, report_type: str = "NATAL", user_prefs: Optional[Dict] = None) -> ConfigCompilada:
+        return self.compile_config(self.get_effective_config(report_type, user_prefs))
+
+    @staticmethod
+    def merge_config(base_config: Dict, user_prefs: Dict) -> Dict:
+        """Fusión Dinámica (Override de Usuario) sobre una copia: ni el preset ni las preferencias se modifican."""
+        effective_config = copy.deepcopy(base_config)
+        user_prefs = copy.deepcopy(user_prefs)
         
         # Sobrescribir lógica de casas
         if 'logicSettings' in user_prefs:
@@ -61,14 +669,15 @@ class OrbEngine:
         """
         Tarea 1.3: Corrección de Casas por Proximidad (Regla de los 5 grados / Parametrizada).
         Retorna: { houseNumber: N, isCorrected: boolean, note: str }
+        Para todos los cuerpos de una o varias cartas, `calculate_house_placements`.
         """
-        rules = config.get('rules', {}).get('houseCorrection', {})
-        if not rules.get('enabled', False):
+        enabled, angular_orb, other_orb = self.compile_config(config).correccion_casas
+        if not enabled:
             geom_house = self.get_geometric_house_index(planet_degree, house_cusps) + 1
             return {
                 "houseNumber": geom_house,
                 "isCorrected": False,
-                "note": f"Ubicación geométrica estándar en Casa {geom_house}. Corrección desactivada."
+                "note": _nota_casa(geom_house, False, 0.0, None, False)
             }
 
         # 1. Identificar casa geométrica
@@ -81,61 +690,95 @@ class OrbEngine:
         
         # 3. Determinar umbral según el tipo de casa (Angular vs Resto)
         is_next_angular = (next_idx + 1) in [1, 4, 7, 10]
-        threshold = rules.get('angularOrb', 2.0) if is_next_angular else rules.get('otherOrb', 1.0)
+        threshold = angular_orb if is_next_angular else other_orb
         
         # 4. Condición de salto
-        if distance <= threshold:
-            corrected_house = next_idx + 1
-            return {
-                "houseNumber": corrected_house,
-                "isCorrected": True,
-                "note": f"Movido a Casa {corrected_house} por proximidad a cúspide ({distance:.2f}° <= {threshold}°)."
-            }
-        else:
-            final_house = current_idx + 1
-            return {
-                "houseNumber": final_house,
-                "isCorrected": False,
-                "note": f"Permanencia en Casa {final_house}. Distancia a cúspide ({distance:.2f}°) superior al umbral ({threshold}°)."
-            }
+        is_corrected = distance <= threshold
+        house = next_idx + 1 if is_corrected else current_idx + 1
+        return {
+            "houseNumber": house,
+            "isCorrected": is_corrected,
+            "note": _nota_casa(house, is_corrected, distance, threshold, True)
+        }
+
+    def calculate_house_placements(self, longitudes, house_cusps, config: Dict) -> ColocacionCasas:
+        """
+        Corrección de casas por proximidad para todos los cuerpos en una pasada vectorizada.
+
+        Args:
+            longitudes: (N,) longitudes de una carta, o (P, N) para P perfiles (p.ej. sinastría)
+            house_cusps: (12,) cúspides, o (P, 12) con las de cada perfil
+            config: Config efectivo (o `ConfigCompilada`) con `rules.houseCorrection`
+
+        Returns:
+            `ColocacionCasas` con arrays de la forma de `longitudes`; las notas se generan al pedirlas.
+        """
+        enabled, angular_orb, other_orb = self.compile_config(config).correccion_casas
+        lons = np.asarray(longitudes, dtype="f8")
+        cusps = np.mod(np.asarray(house_cusps, dtype="f8"), 360.0)
+        if cusps.shape[-1] != 12:
+            raise ValueError(f"Se esperaban 12 cúspides, recibidas {cusps.shape[-1]}")
+
+        # Mismo criterio que IndiceCasas: bisect_right sobre las cúspides desenrolladas desde la casa 1
+        origen = cusps[..., :1]
+        desenrolladas = origen + np.mod(cusps - origen, 360.0)
+        rel = origen + np.mod(lons - origen, 360.0)
+        idx = np.sum(desenrolladas[..., None, :] <= rel[..., :, None], axis=-1) - 1
+        validos = ~np.isnan(lons)
+        idx = np.where(validos, idx, 0)
+
+        siguiente = (idx + 1) % 12
+        proxima = np.take_along_axis(np.broadcast_to(cusps, idx.shape[:-1] + (12,)), siguiente, axis=-1)
+        d = np.mod(np.abs(lons - proxima), 360.0)
+        distancia = np.where(d < 180.0, d, 360.0 - d)
+
+        # Cúspides angulares: 1, 4, 7, 10 (índices 0, 3, 6, 9)
+        angular = siguiente % 3 == 0
+        umbral = np.where(angular, float(angular_orb), float(other_orb))
+        corregido = (distancia <= umbral) & validos if enabled else np.zeros(idx.shape, dtype=bool)
+        geometrica = np.where(validos, idx + 1, 0)
+        return ColocacionCasas(
+            geometrica=geometrica,
+            casa=np.where(corregido, siguiente + 1, geometrica),
+            distancia=distancia,
+            umbral=umbral,
+            corregido=corregido,
+            angular=angular,
+            habilitada=enabled,
+            umbrales=(angular_orb, other_orb),
+        )
 
     def validate_aspect(self, body_a: str, body_b: str, angle: float, config: Dict) -> Dict:
         """
         Tarea 1.4: Validación con Efecto Paraguas vs Prioridad Receptor.
         Retorna: { isValid: bool, orb: float, note: str, aspectType: str }
+
+        - TRÁNSITOS (RECEIVER_PRIORITY): el planeta B es el receptor natal y manda su orbe.
+        - NATAL/SINASTRÍA (UMBRELLA_MAX): inclusión máxima, máx(orbe A, orbe B).
+        `config` puede ser el dict efectivo o una `ConfigCompilada`.
         """
-        aspect_rules = config.get('rules', {}).get('aspects', {})
-        orbs_data = {item['body']: item for item in config.get('orbs', [])}
-        
-        # Identificar tipo de aspecto
-        aspect_type = self.get_aspect_type(angle)
-        if not aspect_type:
-            return {"isValid": False, "orb": 0, "note": "Sin aspecto detectado fuera de rango genérico.", "aspectType": None}
+        compilada = self.compile_config(config)
+        return compilada.resultado(*compilada.validar(body_a, body_b, angle))
 
-        exact_angle = self.get_exact_angle_for_aspect(aspect_type)
-        current_orb = abs(angle - exact_angle)
-
-        # Caso TRÁNSITOS (RECEIVER_PRIORITY): El planeta B es el receptor natal
-        if aspect_rules.get('strategy') == 'RECEIVER_PRIORITY':
-            limit = orbs_data.get(body_b, {}).get(aspect_type, 0)
-            strategy_name = "Prioridad Receptor (Natal)"
-        # Caso NATAL/SINASTRÍA (UMBRELLA_MAX): Inclusión máxima
-        else:
-            orb_a = orbs_data.get(body_a, {}).get(aspect_type, 0)
-            orb_b = orbs_data.get(body_b, {}).get(aspect_type, 0)
-            limit = max(orb_a, orb_b)
-            strategy_name = "Efecto Paraguas (Max Orb)"
-
-        is_valid = current_orb <= limit
-        status = "VÁLIDO" if is_valid else "FUERA DE ORBE"
-        
-        return {
-            "isValid": is_valid,
-            "orb": round(current_orb, 2),
-            "limit": limit,
-            "aspectType": aspect_type,
-            "note": f"Aspecto {aspect_type} {status} ({current_orb:.2f}° <= {limit}°). Estrategia: {strategy_name}."
-        }
+    def validate_aspect_grid(self, bodies_a: Sequence[str], bodies_b: Sequence[str], angles, config: Dict) -> Dict[str, np.ndarray]:
+        """Valida la rejilla A × B de ángulos (forma (A, B)) en una sola llamada vectorizada."""
+        return self.compile_config(config).validar_rejilla(bodies_a, bodies_b, angles)
+
+    def validate_declinations(
+        self,
+        bodies_a: Sequence[str],
+        declinations_a,
+        config: Dict,
+        bodies_b: Optional[Sequence[str]] = None,
+        declinations_b=None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Paralelos y contraparalelos de declinación de la rejilla A × B (A × A si no se da B),
+        con los orbes del catálogo del config. Declinaciones: `CartaCompacta.declinaciones()`.
+        """
+        if bodies_b is None:
+            bodies_b, declinations_b = bodies_a, declinations_a
+        return self.compile_config(config).validar_declinaciones(bodies_a, declinations_a, bodies_b, declinations_b)
 
     # --- Utilidades Matemáticas ---
     def angular_distance(self, a: float, b: float) -> float:
@@ -143,36 +786,157 @@ class OrbEngine:
         return d if d < 180 else 360 - d
 
     def get_geometric_house_index(self, pos: float, cusps: List[float]) -> int:
-        for i in range(12):
-            c1 = cusps[i]
-            c2 = cusps[(i + 1) % 12]
-            if c1 <= c2:
-                if c1 <= pos < c2: return i
-            else:
-                if pos >= c1 or pos < c2: return i
-        return 0
+        # Índice compartido con ephemeris.asignar_casas_a_planetas (bisect sobre cúspides desenrolladas)
+        return IndiceCasas(cusps).indice(pos)
 
-    def get_aspect_type(self, angle: float) -> Optional[str]:
+    def get_aspect_type(self, angle: float, config: Optional[Dict] = None) -> Optional[str]:
         # Rangos aproximados para identificación inicial antes de validar el orbe preciso
         # Basado en la Matriz de Orbes v6.0 (puntos 36-39 del prompt)
-        # Se usa un margen de 12° para la detección inicial de luminares
-        margins = {
-            "conjunction": 0,
-            "opposition": 180,
-            "square": 90,
-            "trine": 120,
-            "sextile": 60
-        }
-        for name, exact in margins.items():
-            if abs(angle - exact) <= 12: 
-                return name
-        return None
+        # Se usa un margen de 12° para la detección inicial de luminares; con `config`, su catálogo
+        compilada = self.compile_config(config) if config else CATALOGO_BASE
+        k = compilada.detectar(angle)
+        return compilada.aspectos[k] if k >= 0 else None
 
-    def get_exact_angle_for_aspect(self, aspect_type: str) -> float:
-        return {
-            "conjunction": 0,
-            "opposition": 180,
-            "square": 90,
-            "trine": 120,
-            "sextile": 60
-        }.get(aspect_type, 0)
+    def get_exact_angle_for_aspect(self, aspect_type: str, config: Optional[Dict] = None) -> float:
+        compilada = self.compile_config(config) if config else CATALOGO_BASE
+        if aspect_type in compilada.aspectos:
+            return compilada._exactos_lista[compilada.aspectos.index(aspect_type)]
+        return ANGULOS_CONOCIDOS.get(aspect_type, 0)
+
+
+class AsyncOrbEngine(OrbEngine):
+    """
+    Variante asíncrona para el código de informes. Lee `calculation_rules` con el cliente Motor
+    compartido de la aplicación (el de `app.api.endpoints.auth`) y no toca Mongo hasta la primera
+    lectura: crearla no bloquea el arranque ni abre otro pool de conexiones.
+
+    - Los presets se sirven de la misma caché en memoria que OrbEngine. Pasados
+      `INTERVALO_SONDEO_CONFIG` s se revalidan en segundo plano mientras se sigue sirviendo la versión actual.
+    - Si Mongo no responde en `TIMEOUT_CONFIG_ASYNC` s se degrada al último preset en caché
+      (o a {} si nunca se cargó: orbes por defecto) y no se reintenta hasta pasados `ESPERA_REINTENTO_CONFIG` s.
+    - La API asíncrona lleva el sufijo `_async` (`get_effective_config_async`, `get_compiled_config_async`,
+      `refresh_presets_async`). Los métodos síncronos heredados siguen siendo síncronos y nunca esperan
+      a Mongo: sirven lo que haya en caché (o degradado) y programan la lectura en segundo plano, así que
+      el código síncrono que corre en el event loop puede usarlos (o `peek_effective_config`).
+    """
+
+    def __init__(self, database=None, db_name: str = "fraktal"):
+        super().__init__(db_name=db_name, vigilar=False)
+        self._database = database
+        self.db_name = db_name
+        self._coleccion_async = None
+        self._lecturas: Dict[str, "asyncio.Task"] = {}
+        self._fallo_hasta: Dict[str, float] = {}
+        self.degradaciones = 0
+
+    def _coleccion(self):
+        if self._coleccion_async is None:
+            database = self._database
+            if database is None:
+                from app.api.endpoints.auth import client
+                database = client[self.db_name]
+            self._coleccion_async = database['calculation_rules']
+        return self._coleccion_async
+
+    def _en_espera(self, report_type: str) -> bool:
+        return time.monotonic() < self._fallo_hasta.get(report_type, 0.0)
+
+    def _degradado(self, report_type: str) -> Tuple[Dict, str]:
+        entrada = self.cache.preset(report_type)
+        return entrada if entrada is not None else ({}, sello_version({}))
+
+    async def _leer_y_guardar(self, report_type: str) -> Tuple[Dict, str]:
+        try:
+            doc = await asyncio.wait_for(
+                self._coleccion().find_one({"presets.type": report_type}, {"presets.$": 1}),
+                TIMEOUT_CONFIG_ASYNC
+            )
+        except Exception as e:
+            self._fallo_hasta[report_type] = time.monotonic() + ESPERA_REINTENTO_CONFIG
+            self.degradaciones += 1
+            print(f"⚠️ AsyncOrbEngine - calculation_rules no disponible ({report_type}): {e!r}; se usa el preset en caché")
+            return self._degradado(report_type)
+        self._fallo_hasta.pop(report_type, None)
+        preset = doc['presets'][0] if doc and 'presets' in doc else {}
+        return self.cache.guardar_preset(report_type, preset)
+
+    def _tarea_lectura(self, report_type: str) -> "asyncio.Task":
+        """Una sola lectura en curso por tipo de informe (las peticiones concurrentes la comparten)."""
+        tarea = self._lecturas.get(report_type)
+        if tarea is None:
+            tarea = asyncio.ensure_future(self._leer_y_guardar(report_type))
+            self._lecturas[report_type] = tarea
+            tarea.add_done_callback(lambda _t: self._lecturas.pop(report_type, None))
+        return tarea
+
+    def _programar_lectura(self, report_type: str) -> None:
+        """Lanza la lectura en segundo plano si hay event loop y no está en pausa tras un fallo."""
+        if self._en_espera(report_type):
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._tarea_lectura(report_type)
+
+    async def _preset_async(self, report_type: str) -> Tuple[Dict, str]:
+        entrada = self.cache.preset(report_type)
+        if entrada is not None:
+            if self.cache.edad(report_type) > INTERVALO_SONDEO_CONFIG:
+                self._programar_lectura(report_type)
+            return entrada
+        if self._en_espera(report_type):
+            return self._degradado(report_type)
+        return await asyncio.shield(self._tarea_lectura(report_type))
+
+    def _preset(self, report_type: str) -> Tuple[Dict, str]:
+        """Ruta síncrona: lo que haya en caché (o degradado) sin esperar; si falta o caducó, lectura en segundo plano."""
+        if self.cache.edad(report_type) > INTERVALO_SONDEO_CONFIG:
+            self._programar_lectura(report_type)
+        return self._degradado(report_type)
+
+    async def get_effective_config_async(self, report_type: str = "NATAL", user_prefs: Optional[Dict] = None) -> Dict:
+        """Como OrbEngine.get_effective_config, esperando (sin bloquear el event loop) la primera lectura."""
+        base_config, version = await self._preset_async(report_type)
+        return self._fusionar(report_type, base_config, version, user_prefs)
+
+    async def get_compiled_config_async(self, report_type: str = "NATAL", user_prefs: Optional[Dict] = None) -> ConfigCompilada:
+        return self.compile_config(await self.get_effective_config_async(report_type, user_prefs))
+
+    def peek_effective_config(self, report_type: str = "NATAL", user_prefs: Optional[Dict] = None) -> Dict:
+        """
+        Para código síncrono: config con lo que haya en caché (o degradado) sin esperar;
+        si falta o caducó, la lectura queda programada en segundo plano.
+        """
+        return self.get_effective_config(report_type, user_prefs)
+
+    def programar_precarga(self, tipos: Sequence[str] = ("NATAL", "TRANSIT")) -> None:
+        """Precarga los presets en segundo plano (p.ej. en el arranque) sin esperar a Mongo."""
+        for report_type in tipos:
+            self._programar_lectura(report_type)
+
+    def refresh_presets(self) -> List[str]:
+        """
+        Ruta síncrona: programa la relectura de los presets en segundo plano y devuelve [] (aún no
+        ha cambiado nada). Para esperar el resultado, `refresh_presets_async`.
+        """
+        for report_type in self.cache.tipos():
+            self._programar_lectura(report_type)
+        return []
+
+    async def refresh_presets_async(self) -> List[str]:
+        """Relee los presets en memoria; devuelve los tipos cuya versión cambió."""
+        cambiados = []
+        for report_type in self.cache.tipos():
+            anterior = self.cache.preset(report_type)
+            nuevo = await asyncio.shield(self._tarea_lectura(report_type))
+            if anterior is None or anterior[1] != nuevo[1]:
+                cambiados.append(report_type)
+        return cambiados
+
+    def cache_stats(self) -> Dict[str, Any]:
+        stats = super().cache_stats()
+        stats["vigilancia"] = "revalidacion"
+        stats["degradaciones"] = self.degradaciones
+        stats["en_espera"] = sorted(t for t in self._fallo_hasta if self._en_espera(t))
+        return stats